@@ -10,16 +10,26 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from oslo_config import cfg
 from oslo_log import log as logging
 
 from senlin.common import context
 from senlin.common import exception
+from senlin.common import utils
 from senlin.common import wsgi
 from senlin.db import api as db_api
 from senlin.drivers import base as driver_base
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_opt('trust_cache_ttl', 'senlin.common.config')
+CONF.import_opt('trust_cache_size', 'senlin.common.config')
+
+# Trust IDs keyed by the trustor and the project, and the ID of the service
+# user, the trustee of all trusts
+_trust_cache = utils.ExpiringCache()
+
 
 class TrustMiddleware(wsgi.Middleware):
     '''Extract trust info from request.
@@ -27,7 +37,26 @@ class TrustMiddleware(wsgi.Middleware):
     The extracted information is filled into the request context.
     Senlin engine will use this information for access control.
     '''
+    def __init__(self, application):
+        super(TrustMiddleware, self).__init__(application)
+        _trust_cache.max_size = CONF.trust_cache_size
+
     def _get_trust(self, ctx):
+        '''Get the trust of the current user, creating it if not found.'''
+
+        return _trust_cache.get((ctx.user, ctx.project),
+                                lambda: self._load_trust(ctx),
+                                CONF.trust_cache_ttl)
+
+    def _get_admin_id(self, kc):
+        '''Get the ID of the service user.'''
+
+        service_cred = context.get_service_context()
+        return _trust_cache.get(('service_user',),
+                                lambda: kc.get_user_id(**service_cred),
+                                CONF.trust_cache_ttl)
+
+    def _load_trust(self, ctx):
         '''List trusts with current user as the trustor.'''
 
         # DB table is used as a cache for the trusts.
@@ -49,8 +78,7 @@ class TrustMiddleware(wsgi.Middleware):
             'user_id': ctx.user,
         }
         kc = driver_base.SenlinDriver().identity(params)
-        service_cred = context.get_service_context()
-        admin_id = kc.get_user_id(**service_cred)
+        admin_id = self._get_admin_id(kc)
         try:
             trust = kc.trust_get_by_trustor(ctx.user, admin_id, ctx.project)
         except exception.InternalError as ex:
@@ -10,8 +10,12 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import hashlib
+
+from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_serialization import jsonutils
+from oslo_utils import timeutils
 import six
 from six.moves.urllib import parse as urlparse
 
@@ -25,6 +29,36 @@ from senlin.engine import webhook as webhook_mod
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_opt('webhook_token_cache_ttl', 'senlin.common.config')
+
+# Seconds before its expiry a cached token is no longer handed out, so that
+# it remains valid until the request is served
+TOKEN_EXPIRY_MARGIN = 120
+
+# Tokens issued for triggering webhooks, with their expiry time, keyed by the
+# webhook ID and the hash of the key
+_token_cache = utils.ExpiringCache()
+
+
+def invalidate(webhook_id):
+    '''Drop the tokens cached for a webhook.
+
+    :param webhook_id: ID of the webhook.
+    '''
+    _token_cache.invalidate(lambda k: k[0] == webhook_id)
+
+
+def _token_ttl(token_info):
+    '''Get the seconds a token is cached, which end before it expires.'''
+    ttl = CONF.webhook_token_cache_ttl
+    expires_at = token_info[1]
+    if expires_at is not None:
+        remaining = timeutils.delta_seconds(
+            timeutils.utcnow(), timeutils.normalize_time(expires_at))
+        ttl = min(ttl, remaining - TOKEN_EXPIRY_MARGIN)
+    return ttl
+
 
 class WebhookMiddleware(wsgi.Middleware):
     """Middleware for authenticating webhook triggering requests.
@@ -45,22 +79,31 @@ class WebhookMiddleware(wsgi.Middleware):
 
         (webhook_id, key) = results
 
-        credential = self._get_credential(webhook_id, key)
-        if not credential:
-            return
-
-        svc_ctx = context.get_service_context()
-        kwargs = {
-            'auth_url': svc_ctx['auth_url'],
-            'username': svc_ctx['username'],
-            'user_domain_name': svc_ctx['user_domain_name'],
-            'password': svc_ctx['password']
-        }
-        kwargs.update(credential)
+        # A token issued for an earlier trigger with the same key saves the
+        # loading of the webhook and the authentication
+        cache_key = (webhook_id,
+                     hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+        def _load():
+            credential = self._get_credential(webhook_id, key)
+            if not credential:
+                return None
+
+            svc_ctx = context.get_service_context()
+            kwargs = {
+                'auth_url': svc_ctx['auth_url'],
+                'username': svc_ctx['username'],
+                'user_domain_name': svc_ctx['user_domain_name'],
+                'password': svc_ctx['password']
+            }
+            kwargs.update(credential)
+            return self._get_token(**kwargs)
 
         # Get token and fill it into the request header
-        token = self._get_token(**kwargs)
-        req.headers['X-Auth-Token'] = token
+        token_info = _token_cache.get(cache_key, _load, _token_ttl,
+                                      negative_ttl=0)
+        if token_info:
+            req.headers['X-Auth-Token'] = token_info[0]
 
     def _parse_url(self, url):
         """Extract webhook ID from the request URL.
@@ -107,12 +150,14 @@ class WebhookMiddleware(wsgi.Middleware):
         """Get a valid token based on the credential provided.
 
         :param cred: Rebuilt credential dictionary for authentication.
+        :returns: A tuple of the token and its expiry time.
         """
         try:
-            token = driver_base.SenlinDriver().identity.get_token(**kwargs)
+            identity = driver_base.SenlinDriver().identity
+            token_info = identity.get_token_info(**kwargs)
         except Exception as ex:
             LOG.exception(_('Webhook failed authentication: %s.'),
                           six.text_type(ex))
             raise exc.Forbidden()
 
-        return token
+        return token_info
@@ -248,6 +248,14 @@ class API(wsgi.Router):
                                "/events",
                                action="index",
                                conditions={'method': 'GET'})
+            sub_mapper.connect("event_watch",
+                               "/events/watch",
+                               action="watch",
+                               conditions={'method': 'GET'})
+            sub_mapper.connect("event_aggregate",
+                               "/events/aggregate",
+                               action="aggregate",
+                               conditions={'method': 'GET'})
             sub_mapper.connect("event_get",
                                "/events/{event_id}",
                                action="get",
@@ -12,10 +12,12 @@
 
 from webob import exc
 
+from oslo_config import cfg
 from oslo_log import log as logging
 
 from senlin.api.openstack.v1 import util
 from senlin.common import consts
+from senlin.common import event_hub
 from senlin.common import serializers
 from senlin.common import utils
 from senlin.common import wsgi
@@ -23,6 +25,10 @@ from senlin.rpc import client as rpc_client
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_opt('event_hub_size', 'senlin.common.config')
+CONF.import_opt('max_event_watch_timeout', 'senlin.common.config')
+
 
 class EventController(object):
     '''WSGI controller for events in Senlin v1 API.'''
@@ -53,6 +59,8 @@ class EventController(object):
             'sort_keys': 'multi',
             'global_project': 'single',
             'show_deleted': 'single',
+            'start_time': 'single',
+            'end_time': 'single',
         }
         params = util.get_allowed_params(req.params, param_whitelist)
         filters = util.get_allowed_params(req.params, filter_whitelist)
@@ -80,6 +88,99 @@ class EventController(object):
 
         return {'events': events}
 
+    @util.policy_enforce
+    def watch(self, req):
+        filter_whitelist = {
+            'obj_name': 'mixed',
+            'obj_type': 'mixed',
+            'obj_id': 'mixed',
+            'cluster_id': 'mixed',
+            'action': 'mixed',
+        }
+        param_whitelist = {
+            'cursor': 'single',
+            'timeout': 'single',
+            'global_project': 'single',
+        }
+        params = util.get_allowed_params(req.params, param_whitelist)
+        filters = util.get_allowed_params(req.params, filter_whitelist)
+
+        project_safe = True
+        key = consts.PARAM_GLOBAL_PROJECT
+        if key in params:
+            project_safe = not utils.parse_bool_param(key, params[key])
+
+        max_timeout = CONF.max_event_watch_timeout
+        timeout = max_timeout
+        key = 'timeout'
+        if key in params:
+            timeout = min(utils.parse_int_param(key, params[key]),
+                          max_timeout)
+
+        project = req.context.project
+
+        def match(event):
+            if project_safe and event['project'] != project:
+                return False
+            return event_hub.match_filters(event, filters or {})
+
+        # The watch waits in this process, on the hub fed by the events
+        # broadcast by engines, rather than holding an engine RPC worker.
+        hub = event_hub.global_hub()
+        cursor = params.get('cursor')
+        events, new_cursor = hub.watch(cursor, match, timeout)
+        if events is None:
+            # The cursor is unknown to the hub, e.g. when the watcher
+            # reconnects after a while, so we resume from the database.
+            # Events published during the query are caught up from the
+            # position of the hub taken before.
+            since = hub.position()
+            events = self.rpc_client.event_list(
+                req.context, filters=filters or None, marker=cursor,
+                limit=CONF.event_hub_size, sort_keys=['timestamp'],
+                sort_dir='asc', project_safe=project_safe)
+            if events:
+                new_cursor = events[-1]['id']
+            else:
+                events, new_cursor = hub.watch(None, match, timeout,
+                                               since=since)
+                new_cursor = new_cursor or cursor
+
+        return {'events': events, 'cursor': new_cursor}
+
+    @util.policy_enforce
+    def aggregate(self, req):
+        filter_whitelist = {
+            'cluster_id': 'mixed',
+            'action': 'mixed',
+            'level': 'mixed',
+            'status': 'mixed',
+        }
+        param_whitelist = {
+            'group_by': 'multi',
+            'bucket': 'single',
+            'start_time': 'single',
+            'end_time': 'single',
+            'global_project': 'single',
+        }
+        params = util.get_allowed_params(req.params, param_whitelist)
+        filters = util.get_allowed_params(req.params, filter_whitelist)
+
+        key = consts.PARAM_GLOBAL_PROJECT
+        if key in params:
+            global_project = utils.parse_bool_param(key, params[key])
+            params.pop(key)
+            params['project_safe'] = not global_project
+
+        if not filters:
+            filters = None
+
+        aggregates = self.rpc_client.event_aggregate(req.context,
+                                                     filters=filters,
+                                                     **params)
+
+        return {'aggregates': aggregates}
+
     @util.policy_enforce
     def get(self, req, event_id):
         event = self.rpc_client.event_get(req.context, event_id)
@@ -18,6 +18,7 @@ from webob import exc
 
 from oslo_log import log as logging
 
+from senlin.api.middleware import webhook as webhook_middleware
 from senlin.api.openstack.v1 import util
 from senlin.common import consts
 from senlin.common.i18n import _
@@ -159,6 +160,8 @@ class WebhookController(object):
     @util.policy_enforce
     def delete(self, req, webhook_id):
         self.rpc_client.webhook_delete(req.context, webhook_id, cast=False)
+        # Tokens are no longer issued for the webhook deleted
+        webhook_middleware.invalidate(webhook_id)
 
 
 def create_resource(options):
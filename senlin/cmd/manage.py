@@ -22,6 +22,7 @@ from oslo_log import log as logging
 from senlin.common.i18n import _
 from senlin.db import api
 from senlin.db import utils
+from senlin.engine import event_archive
 from senlin import version
 
 CONF = cfg.CONF
@@ -46,6 +47,16 @@ def purge_deleted():
     utils.purge_deleted(CONF.command.age, CONF.command.unit)
 
 
+def archive_events():
+    """Move old events from database into the event archive."""
+
+    if event_archive.get_archive() is None:
+        sys.exit(_("ERROR: event_archive_dir is not configured"))
+
+    count = event_archive.archive_events(CONF.command.age)
+    print(_("%s events archived") % count)
+
+
 def add_command_parsers(subparsers):
     parser = subparsers.add_parser('db_version')
     parser.set_defaults(func=do_db_version)
@@ -64,6 +75,12 @@ def add_command_parsers(subparsers):
         choices=['days', 'hours', 'minutes', 'seconds'],
         help=_('Unit to use for age argument, defaults to days.'))
 
+    parser = subparsers.add_parser('event_archive')
+    parser.set_defaults(func=archive_events)
+    parser.add_argument('age', nargs='?', type=int,
+                        help=_('Number of days to keep events in database, '
+                               'defaults to the event_archive_age option.'))
+
 command_opt = cfg.SubCommandOpt('command',
                                 title='Commands',
                                 help='Show available commands.',
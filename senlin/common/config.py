@@ -43,7 +43,30 @@ service_opts = [
                help=_('Maximum depth allowed when using nested clusters.')),
     cfg.IntOpt('num_engine_workers',
                default=1,
-               help=_('Number of senlin-engine processes to fork and run.'))]
+               help=_('Number of senlin-engine processes to fork and run.')),
+    cfg.IntOpt('webhook_token_cache_ttl',
+               default=3000,
+               help=_('Maximum seconds a token issued for triggering a '
+                      'webhook is reused by later triggers. Tokens are '
+                      'never reused once about to expire. Set to 0 to '
+                      'disable caching.')),
+    cfg.IntOpt('trust_cache_ttl',
+               default=300,
+               help=_('Seconds the trusts of users are cached by the API '
+                      'service. Set to 0 to look them up on every '
+                      'request.')),
+    cfg.IntOpt('trust_cache_size',
+               default=10000,
+               help=_('Maximum number of trusts cached by the API '
+                      'service.')),
+    cfg.IntOpt('event_hub_size',
+               default=1000,
+               help=_('Number of recent events kept in memory by each API '
+                      'process for serving event watchers.')),
+    cfg.IntOpt('max_event_watch_timeout',
+               default=30,
+               help=_('Maximum number of seconds an event watch request '
+                      'waits for new events.'))]
 
 engine_opts = [
     cfg.StrOpt('environment_dir',
@@ -61,6 +84,27 @@ engine_opts = [
                help=_('Maximum events per cluster. Older events will be '
                       'deleted when this is reached.  Set to 0 for unlimited '
                       'events per cluster.')),
+    cfg.StrOpt('event_min_level',
+               default='INFO',
+               choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+               help=_('Minimum level of events to be saved into database. '
+                      'Events below this level are only logged.')),
+    cfg.IntOpt('event_batch_size',
+               default=100,
+               help=_('Maximum number of events buffered by an engine before '
+                      'they are written into database. Set to 0 to write '
+                      'each event when it is generated.')),
+    cfg.IntOpt('event_flush_interval',
+               default=2,
+               help=_('Seconds between writing buffered events into '
+                      'database.')),
+    cfg.StrOpt('event_archive_dir',
+               help=_('Directory for archived events. Archiving is disabled '
+                      'if not specified.')),
+    cfg.IntOpt('event_archive_age',
+               default=30,
+               help=_('Number of days events are kept in database before '
+                      'they are archived.')),
     cfg.IntOpt('default_action_timeout',
                default=3600,
                help=_('Timeout in seconds for actions.')),
@@ -68,9 +112,70 @@ engine_opts = [
                default=10,
                help=_('Maximum number of actions per batch when operating a '
                       'cluster.')),
+    cfg.BoolOpt('enable_bulk_create',
+                default=False,
+                help=_('Create the physical objects of new nodes sharing a '
+                       'placement with a single request where the profile '
+                       'supports it.')),
     cfg.IntOpt('default_policy_priority',
                default=50,
                help=_('Default priority for policies attached to a cluster.')),
+    cfg.IntOpt('placement_cache_ttl',
+               default=60,
+               help=_('Seconds the availability zones known to placement '
+                      'policies are cached. Set to 0 to disable caching.')),
+    cfg.IntOpt('catalog_cache_ttl',
+               default=300,
+               help=_('Seconds the regions, services and endpoints looked up '
+                      'from the identity service are cached. Set to 0 to '
+                      'disable caching.')),
+    cfg.IntOpt('catalog_negative_cache_ttl',
+               default=30,
+               help=_('Seconds an identity catalog lookup which finds '
+                      'nothing is cached.')),
+    cfg.IntOpt('reference_cache_ttl',
+               default=300,
+               help=_('Seconds the images, flavors and networks referenced '
+                      'by server profiles are cached after being looked '
+                      'up. Set to 0 to disable caching.')),
+    cfg.IntOpt('reference_negative_cache_ttl',
+               default=30,
+               help=_('Seconds an image, flavor or network referenced by a '
+                      'server profile and not found is cached.')),
+    cfg.IntOpt('connection_pool_size',
+               default=100,
+               help=_('Maximum number of connections to the cloud services '
+                      'shared by the drivers of an engine. Set to 0 to '
+                      'create a connection for every driver.')),
+    cfg.IntOpt('connection_idle_timeout',
+               default=600,
+               help=_('Seconds a shared connection to the cloud services '
+                      'is kept while not used.')),
+    cfg.IntOpt('lb_member_concurrency',
+               default=4,
+               help=_('Maximum number of load-balancer pool members created '
+                      'or deleted in parallel.')),
+    cfg.IntOpt('status_poll_interval',
+               default=5,
+               help=_('Seconds between two bulk queries for the status of '
+                      'servers and stacks being waited for. Set to 0 to '
+                      'poll each resource separately.')),
+    cfg.BoolOpt('enable_notification_listener',
+                default=False,
+                help=_('Update the status of nodes from the notifications '
+                       'sent by the compute and orchestration services.')),
+    cfg.StrOpt('notification_topic',
+               default='notifications',
+               help=_('Topic on which the compute and orchestration '
+                      'services send notifications.')),
+    cfg.IntOpt('notification_batch_size',
+               default=500,
+               help=_('Maximum number of notifications processed '
+                      'together.')),
+    cfg.IntOpt('notification_batch_timeout',
+               default=1,
+               help=_('Maximum number of seconds a notification waits for '
+                      'its batch to fill up.')),
     cfg.IntOpt('lock_retry_times',
                default=3,
                help=_('Number of times trying to grab a lock.')),
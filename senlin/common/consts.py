@@ -14,11 +14,13 @@ RPC_ATTRS = (
     ENGINE_TOPIC,
     ENGINE_DISPATCHER_TOPIC,
     ENGINE_HEALTH_MGR_TOPIC,
+    EVENT_TOPIC,
     RPC_API_VERSION,
 ) = (
     'senlin-engine',
     'engine-dispatcher',
     'engine-health_mgr',
+    'senlin-events',
     '1.0',
 )
 
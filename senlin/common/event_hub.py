@@ -0,0 +1,173 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import threading
+import time
+
+from oslo_config import cfg
+import oslo_messaging
+from oslo_utils import uuidutils
+
+from senlin.common import consts
+from senlin.common import messaging as rpc_messaging
+
+CONF = cfg.CONF
+CONF.import_opt('event_hub_size', 'senlin.common.config')
+
+_hub = None
+
+
+def publish_events(context, events):
+    '''Broadcast saved events to the event hubs of all API processes.
+
+    :param context: The context used for the RPC cast.
+    :param events: A list of events in their dict form.
+    '''
+    client = rpc_messaging.get_rpc_client(version=consts.RPC_API_VERSION)
+    call_context = client.prepare(version=consts.RPC_API_VERSION,
+                                  topic=consts.EVENT_TOPIC,
+                                  fanout=True)
+    call_context.cast(context, 'publish_events', events=events)
+
+
+def match_filters(values, filters):
+    '''Check whether an event matches the given filters.
+
+    :param values: A dict of event properties.
+    :param filters: A dict of event properties to match. A property can be
+                    matched against a list of values.
+    '''
+    for key, value in filters.items():
+        if isinstance(value, list):
+            if values.get(key) not in value:
+                return False
+        elif values.get(key) != value:
+            return False
+    return True
+
+
+def global_hub():
+    '''Get the event hub of this process.
+
+    The hub is created on first use, which happens in each API worker
+    process after forking, and starts receiving the events published by
+    all engines.
+    '''
+    global _hub
+
+    if _hub is None:
+        _hub = EventHub(CONF.event_hub_size)
+        _hub.start()
+    return _hub
+
+
+class EventHub(object):
+    '''In-memory fan-out of recently saved events to event watchers.
+
+    The hub keeps the most recent events in a bounded buffer, each tagged
+    with a local sequence number. Watchers wait on a condition variable
+    which is notified when new events are published, so no watcher polls
+    the database for new events. Watchers wait in the API process holding
+    the hub, so they don't occupy the RPC executors of engines.
+    '''
+
+    def __init__(self, size):
+        self._events = collections.deque(maxlen=size)
+        self._seqs = {}
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._server = None
+
+    def start(self):
+        '''Receive the events broadcast by engines once saved.'''
+        # Each hub listens with its own server name, so that every hub gets
+        # a copy of the fanout casts.
+        target = oslo_messaging.Target(server=uuidutils.generate_uuid(),
+                                       topic=consts.EVENT_TOPIC,
+                                       version=consts.RPC_API_VERSION)
+        self._server = rpc_messaging.get_rpc_server(target, self)
+        self._server.start()
+
+    def publish_events(self, ctxt, events):
+        '''RPC endpoint of the events broadcast by engines.'''
+        self.publish(events)
+
+    def position(self):
+        '''Get the sequence number of the last event published.
+
+        The position can be passed to `watch` to get events published after
+        it, e.g. when the watcher queries the database in the meantime.
+        '''
+        with self._cond:
+            return self._seq
+
+    def publish(self, events):
+        '''Add events to the hub and wake up all watchers.
+
+        :param events: A list of events in their dict form.
+        '''
+        with self._cond:
+            for event in events:
+                if len(self._events) == self._events.maxlen:
+                    old = self._events.popleft()
+                    self._seqs.pop(old[1]['id'], None)
+                self._seq += 1
+                self._events.append((self._seq, event))
+                self._seqs[event['id']] = self._seq
+
+            self._cond.notify_all()
+
+    def _collect(self, pos, match):
+        found = []
+        for seq, event in reversed(self._events):
+            if seq <= pos:
+                break
+            if match(event):
+                found.append(event)
+
+        found.reverse()
+        return found
+
+    def watch(self, cursor, match, timeout, since=None):
+        '''Wait for events published after the cursor.
+
+        :param cursor: ID of the last event seen by the watcher, or None to
+                       watch events published from now on.
+        :param match: A function that checks whether an event is wanted.
+        :param timeout: Maximum number of seconds to wait.
+        :param since: A position returned by `position`, from which events
+                      are watched when the cursor is None.
+        :returns: A tuple of the matched events and the new cursor. The
+                  events are None if the cursor is unknown to this hub.
+        '''
+        deadline = time.time() + timeout
+        with self._cond:
+            if cursor is None:
+                pos = self._seq if since is None else since
+            else:
+                pos = self._seqs.get(cursor)
+                if pos is None:
+                    return None, cursor
+
+            while True:
+                found = self._collect(pos, match)
+                if self._seq > pos:
+                    pos = self._seq
+                    cursor = self._events[-1][1]['id']
+                if found:
+                    return found, cursor
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return [], cursor
+                self._cond.wait(remaining)
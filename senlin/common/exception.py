@@ -252,6 +252,18 @@ class ResourceStatusError(InternalError):
                 "- '%(status)s' due to '%(reason)s'.")
 
 
+class ResourceTimeout(InternalError):
+    # Used when waiting for resources from other services
+    msg_fmt = _("Timed out after %(timeout)s seconds waiting for "
+                "%(resource)s.")
+
+
+class ResourceWaitCancelled(InternalError):
+    # Used when waiting for resources is interrupted by the owning action
+    msg_fmt = _("Waiting for %(resource)s was cancelled by action "
+                "%(action)s.")
+
+
 class InvalidPlugin(InternalError):
     msg_fmt = _("%(message)s")
 
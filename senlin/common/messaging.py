@@ -102,6 +102,14 @@ def get_rpc_client(**kwargs):
                                     serializer=serializer)
 
 
+def get_notification_listener(targets, endpoints, pool=None,
+                              batch_size=None, batch_timeout=None):
+    """Return a configured oslo_messaging listener of notification batches."""
+    return oslo_messaging.get_batch_notification_listener(
+        TRANSPORT, targets, endpoints, executor='eventlet', pool=pool,
+        batch_size=batch_size, batch_timeout=batch_timeout)
+
+
 def get_notifier(publisher_id):
     """Return a configured oslo_messaging notifier."""
     return NOTIFIER.prepare(publisher_id=publisher_id)
@@ -0,0 +1,188 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+from eventlet import event as eventlet_event
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import timeutils
+import six
+
+from senlin.common.i18n import _LW
+from senlin.common import waiter
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_opt('status_poll_interval', 'senlin.common.config')
+
+# Number of rounds a resource can be missing from the bulk query results
+# before it is retrieved separately
+FALLBACK_ROUNDS = 6
+
+# Maximum seconds a waiter sleeps between checks of its owning action
+MAX_CHECK_INTERVAL = 30
+
+
+class _Waiter(object):
+
+    __slots__ = ('check', 'event', 'registered', 'missed')
+
+    def __init__(self, check):
+        self.check = check
+        self.event = eventlet_event.Event()
+        self.registered = timeutils.utcnow()
+        self.missed = 0
+
+
+class StatusPoller(object):
+    '''Poll the status of many resources of a kind with bulk queries.
+
+    Threads waiting for resources register with a poller, which queries
+    the status of all registered resources at once in every round and wakes
+    a waiter when its resource reaches the expected state. The poller runs
+    in its own green thread only while there are resources being waited for.
+    '''
+
+    def __init__(self, key, lister, getter, interval):
+        '''Initialize a poller.
+
+        :param key: The key of the poller in the registry.
+        :param lister: A callable taking a list of resource IDs and the time
+                       the oldest waiter registered. It returns an iterable
+                       of resources which may include other resources and
+                       may miss some of those requested.
+        :param getter: A callable retrieving a resource by ID, used for
+                       resources missed by the lister for several rounds.
+        :param interval: Seconds between two rounds.
+        '''
+        self.key = key
+        self.lister = lister
+        self.getter = getter
+        self.interval = interval
+        self.waiters = {}
+        self.thread = None
+
+    def wait(self, resource_id, check, resource, timeout=None):
+        '''Wait for a resource to reach an expected state.
+
+        :param resource_id: The ID of the resource.
+        :param check: A callable taking the resource, or None if the resource
+                      was not found. It returns a true value when the wait is
+                      over, or raises an exception when the resource failed.
+        :param resource: A description of the resource, used in messages.
+        :param timeout: Seconds to wait, see `waiter.wait_for`.
+        :returns: The value returned by the check.
+        '''
+        w = _Waiter(check)
+        self.waiters.setdefault(resource_id, []).append(w)
+        if self.thread is None:
+            self.thread = eventlet.spawn(self._run)
+
+        try:
+            waiter.wait_for(w.event.ready, resource, timeout=timeout,
+                            interval=self.interval,
+                            max_interval=max(self.interval,
+                                             MAX_CHECK_INTERVAL),
+                            event=w.event)
+        finally:
+            self._unregister(resource_id, w)
+
+        return w.event.wait()
+
+    def _unregister(self, resource_id, w):
+        waiters = self.waiters.get(resource_id, [])
+        if w in waiters:
+            waiters.remove(w)
+        if not waiters:
+            self.waiters.pop(resource_id, None)
+
+    def _notify(self, resource_id, resource):
+        for w in list(self.waiters.get(resource_id, [])):
+            if w.event.ready():
+                continue
+            try:
+                result = w.check(resource)
+            except Exception as ex:
+                w.event.send_exception(ex)
+                continue
+            if result:
+                w.event.send(result)
+
+    def _poll(self):
+        ids = list(self.waiters)
+        since = min(w.registered for waiters in self.waiters.values()
+                    for w in waiters)
+        try:
+            resources = self.lister(ids, since)
+            found = dict((r.id, r) for r in resources if r.id in self.waiters)
+        except Exception as ex:
+            LOG.warning(_LW('Failed in querying status of %(n)s resources: '
+                            '%(ex)s'), {'n': len(ids),
+                                        'ex': six.text_type(ex)})
+            return
+
+        for resource_id in ids:
+            if resource_id in found:
+                for w in self.waiters.get(resource_id, []):
+                    w.missed = 0
+                self._notify(resource_id, found[resource_id])
+                continue
+
+            waiters = self.waiters.get(resource_id, [])
+            for w in waiters:
+                w.missed += 1
+            if not any(w.missed >= FALLBACK_ROUNDS for w in waiters):
+                continue
+
+            for w in waiters:
+                w.missed = 0
+            try:
+                resource = self.getter(resource_id)
+            except Exception as ex:
+                for w in waiters:
+                    if not w.event.ready():
+                        w.event.send_exception(ex)
+                continue
+            self._notify(resource_id, resource)
+
+    def _run(self):
+        while self.waiters:
+            self._poll()
+            eventlet.sleep(self.interval)
+
+        self.thread = None
+        if _pollers.get(self.key) is self:
+            _pollers.pop(self.key)
+
+
+_pollers = {}
+
+
+def get_poller(key, lister, getter):
+    '''Get the poller for a kind of resources visible in a scope.
+
+    :param key: A tuple identifying the kind of resources and the scope, e.g.
+                the project and region, they are visible in.
+    :param lister: The lister used if a new poller is created.
+    :param getter: The getter used if a new poller is created.
+    :returns: A `StatusPoller` object, or None if multiplexed polling is
+              disabled.
+    '''
+    if CONF.status_poll_interval <= 0:
+        return None
+
+    poller = _pollers.get(key)
+    if poller is None:
+        poller = StatusPoller(key, lister, getter, CONF.status_poll_interval)
+        _pollers[key] = poller
+    return poller
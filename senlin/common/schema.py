@@ -80,12 +80,18 @@ class Schema(collections.Mapping):
         self.constraints = constraints or []
         self.readonly = readonly
         self._len = None
+        self._resolved_default = None
 
     def has_default(self):
         return self.default is not None
 
     def get_default(self):
-        return self.resolve(self.default)
+        # Defaults are resolved only once unless they are reassigned
+        cached = self._resolved_default
+        if cached is None or cached[0] is not self.default:
+            cached = (self.default, self.resolve(self.default))
+            self._resolved_default = cached
+        return cached[1]
 
     def _validate_default(self, context):
         if self.default is None:
@@ -282,18 +288,23 @@ class List(Schema):
             return super(List, self).__getitem__(key)
 
     def _get_children(self, values, keys, context):
-        sub_schema = self.schema
-        if sub_schema is not None:
-            # We have a child schema specified for list elements
-            # Fake a dict of array elements, since we have only one schema
-            schema_arr = dict((k, sub_schema[k]) for k in keys)
-            subspec = Spec(schema_arr, dict(values))
-            subspec.validate()
-
-            return ((k, subspec[k]) for k in keys)
-        else:
+        item_schema = self.schema.value
+        if item_schema is None:
             return values
 
+        # All elements share the same schema, so we resolve them directly
+        # instead of faking a Spec with one schema entry per element.
+        children = []
+        for k, v in values:
+            try:
+                children.append((k, item_schema.resolve(v)))
+            except (TypeError, ValueError) as err:
+                msg = _('Spec validation error (%(key)s): %(err)s') % dict(
+                    key=k, err=six.text_type(err))
+                raise exception.SpecValidationFailed(message=msg)
+
+        return children
+
     def get_default(self):
         if not isinstance(self.default, collections.Sequence):
             raise TypeError(_('"%s" is not a List') % self.default)
@@ -362,13 +373,22 @@ class Map(Schema):
 
 
 class Spec(collections.Mapping):
-    '''A class that contains all spec items.'''
+    '''A class that contains all spec items.
+
+    Spec items are resolved lazily and the resolved values are cached, so a
+    spec should be treated as read-only once it is created.
+    '''
     def __init__(self, schema, data):
         self._schema = schema
         self._data = data
+        self._resolved = {}
+        self._validated = False
 
     def validate(self):
         '''Validate the schema.'''
+        if self._validated:
+            return
+
         for (k, s) in self._schema.items():
             try:
                 # validate through resolve
@@ -383,18 +403,30 @@ class Spec(collections.Mapping):
                 msg = _('Unrecognizable spec item "%s"') % key
                 raise exception.SpecValidationFailed(message=msg)
 
+        self._validated = True
+
     def resolve_value(self, key):
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
         if key not in self:
             raise KeyError(_('Invalid spec item: "%s"') % key)
 
         schema_item = self._schema[key]
         if key in self._data:
             raw_value = self._data[key]
-            return schema_item.resolve(raw_value)
+            value = schema_item.resolve(raw_value)
         elif schema_item.has_default():
-            return schema_item.get_default()
+            value = schema_item.get_default()
         elif schema_item.required:
             raise ValueError(_('Required spec item "%s" not assigned') % key)
+        else:
+            value = None
+
+        self._resolved[key] = value
+        return value
 
     def __getitem__(self, key):
         '''Lazy evaluation for spec items.'''
@@ -14,8 +14,11 @@
 Utilities module.
 '''
 
+import collections
 import random
 import string
+import threading
+import time
 
 from cryptography.fernet import Fernet
 import requests
@@ -149,9 +152,121 @@ def random_name(length=8):
     return lead + tail
 
 
+def hashable(value):
+    """Get a hashable equivalent of a value made of lists and dicts.
+
+    Lists become tuples and dicts become sorted tuples of their items, e.g.
+    the list of trust IDs that policies give to drivers.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, hashable(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(hashable(v) for v in value)
+    return value
+
+
 def format_time(value):
     """Cut microsecond and format to isoformat string."""
     if value:
         value = value.replace(microsecond=0)
         value = value.isoformat()
     return value
+
+
+class ExpiringCache(object):
+    """A cache of values which expire some time after being loaded.
+
+    Concurrent lookups of a missing value wait for a single load of it.
+    """
+
+    def __init__(self, max_size=0):
+        """Initialize the cache.
+
+        :param max_size: Maximum number of values cached. The least recently
+                         used values are dropped to make room for new ones.
+                         The cache is not bounded if this is not positive.
+        """
+        self.max_size = max_size
+        self._entries = collections.OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key, now):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[0] <= now:
+            return None
+        # Keep the entries in the order they were last used
+        self._entries[key] = entry
+        return entry
+
+    def _done_loading(self, key, key_lock):
+        if self._loading.get(key) is key_lock:
+            del self._loading[key]
+
+    def get(self, key, loader, ttl, negative_ttl=None):
+        """Get a cached value, loading it if missing or expired.
+
+        :param key: The key of the value.
+        :param loader: A function called without arguments to load the value.
+        :param ttl: Number of seconds the value loaded is cached. Caching is
+                    bypassed if this is not a positive number. It can also
+                    be a function called with the value loaded, for values
+                    which are valid for a time of their own.
+        :param negative_ttl: Number of seconds an empty value, e.g. None for
+                             something not found, is cached. It defaults to
+                             the ttl and is not cached if not positive.
+        :returns: The value.
+        """
+        if not callable(ttl) and ttl <= 0:
+            return loader()
+
+        with self._lock:
+            entry = self._lookup(key, time.time())
+            if entry is not None:
+                return entry[1]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # The value may have been loaded while waiting for the lock
+            with self._lock:
+                entry = self._lookup(key, time.time())
+            if entry is not None:
+                return entry[1]
+
+            try:
+                value = loader()
+            except Exception:
+                with self._lock:
+                    self._done_loading(key, key_lock)
+                raise
+
+            if not value and negative_ttl is not None:
+                ttl = negative_ttl
+            elif callable(ttl):
+                ttl = ttl(value)
+            with self._lock:
+                self._entries.pop(key, None)
+                if ttl > 0:
+                    self._entries[key] = (time.time() + ttl, value)
+                    while 0 < self.max_size < len(self._entries):
+                        self._entries.popitem(last=False)
+                self._done_loading(key, key_lock)
+            return value
+
+    def invalidate(self, match=None):
+        """Drop cached values so that they are loaded again.
+
+        :param match: A function called with the key of each value to check
+                      whether the value is to be dropped. All values are
+                      dropped if it is not specified.
+        """
+        with self._lock:
+            if match is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if match(k)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,116 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import random
+import time
+
+import eventlet
+from eventlet import corolocal
+from oslo_log import log as logging
+
+from senlin.common import exception
+
+LOG = logging.getLogger(__name__)
+
+wallclock = time.time
+
+# The action being executed by the current green thread, if any
+_local = corolocal.local()
+
+
+def bind_action(action):
+    '''Make the action the owner of waits in the current green thread.
+
+    :param action: The action object, or None to clear the binding.
+    '''
+    _local.action = action
+
+
+def current_action():
+    '''Get the action owning waits in the current green thread.'''
+    return getattr(_local, 'action', None)
+
+
+def _deadline(timeout, action):
+    deadline = None
+    if timeout is not None:
+        deadline = wallclock() + timeout
+
+    # Never wait beyond the time the owning action is allowed to run
+    start_time = getattr(action, 'start_time', None)
+    action_timeout = getattr(action, 'timeout', None)
+    if start_time and action_timeout is not None:
+        action_deadline = start_time + action_timeout
+        if deadline is None or action_deadline < deadline:
+            deadline = action_deadline
+
+    return deadline
+
+
+def wait_for(check, resource, timeout=None, interval=1, max_interval=10,
+             backoff=1.5, jitter=0.2, action=None, event=None):
+    '''Poll until an asynchronous operation completes.
+
+    The check is called immediately and then after intervals which start
+    at `interval` seconds and grow by the `backoff` factor up to
+    `max_interval` seconds. Each interval is randomized by the `jitter`
+    fraction so that concurrent waiters don't poll a service in lockstep.
+
+    :param check: A callable which returns a true value when the operation
+                  has completed, or raises an exception when it has failed.
+    :param resource: A description of what is waited for, used in messages.
+    :param timeout: Seconds to wait; None means waiting without a limit
+                    other than that of the owning action.
+    :param interval: Seconds to wait before the second check.
+    :param max_interval: Maximum seconds between two checks.
+    :param backoff: Factor by which the interval grows after each check.
+    :param jitter: Fraction by which an interval is randomized.
+    :param action: The action owning the wait; defaults to the action bound
+                   to the current green thread.
+    :param event: An optional eventlet event which, when sent, ends the
+                  current interval early so the check is made at once.
+    :returns: The value returned by the last check.
+    :raises: `ResourceTimeout` when the deadline is reached, or
+             `ResourceWaitCancelled` when the owning action is cancelled.
+    '''
+    if action is None:
+        action = current_action()
+    started = wallclock()
+    deadline = _deadline(timeout, action)
+
+    delay = interval
+    while True:
+        result = check()
+        if result:
+            return result
+
+        if action is not None and action.is_cancelled():
+            raise exception.ResourceWaitCancelled(resource=resource,
+                                                  action=action.id)
+
+        now = wallclock()
+        if deadline is not None and now >= deadline:
+            raise exception.ResourceTimeout(resource=resource,
+                                            timeout=int(now - started))
+
+        sleep_time = delay * random.uniform(1 - jitter, 1 + jitter)
+        if deadline is not None:
+            sleep_time = min(sleep_time, deadline - now)
+
+        LOG.debug('Waiting %(time).1f seconds for %(resource)s.',
+                  {'time': sleep_time, 'resource': resource})
+        if event is not None and not event.ready():
+            with eventlet.Timeout(sleep_time, False):
+                event.wait()
+        else:
+            eventlet.sleep(sleep_time)
+        delay = min(delay * backoff, max_interval)
@@ -69,6 +69,14 @@ def cluster_next_index(context, cluster_id):
     return IMPL.cluster_next_index(context, cluster_id)
 
 
+def cluster_throttled_add(context, cluster_id):
+    return IMPL.cluster_throttled_add(context, cluster_id)
+
+
+def cluster_throttled_get(context, cluster_id):
+    return IMPL.cluster_throttled_get(context, cluster_id)
+
+
 def cluster_count_all(context, filters=None, project_safe=True,
                       show_deleted=False, show_nested=False):
     return IMPL.cluster_count_all(context, filters=filters,
@@ -122,6 +130,22 @@ def node_get_all_by_cluster(context, cluster_id, project_safe=True):
                                         project_safe=project_safe)
 
 
+def node_ids_by_cluster(context, cluster_id, filters=None,
+                        project_safe=True):
+    return IMPL.node_ids_by_cluster(context, cluster_id, filters=filters,
+                                    project_safe=project_safe)
+
+
+def node_brief_by_cluster(context, cluster_id, project_safe=True):
+    return IMPL.node_brief_by_cluster(context, cluster_id,
+                                      project_safe=project_safe)
+
+
+def node_placements_by_cluster(context, cluster_id, project_safe=True):
+    return IMPL.node_placements_by_cluster(context, cluster_id,
+                                           project_safe=project_safe)
+
+
 def node_get_by_name_and_cluster(context, node_name, cluster_id,
                                  project_safe=True):
     return IMPL.node_get_by_name_and_cluster(context,
@@ -134,6 +158,15 @@ def node_get_by_physical_id(context, physical_id, project_safe=True):
                                         project_safe=project_safe)
 
 
+def node_get_all_by_physical_id(context, physical_ids, project_safe=True):
+    return IMPL.node_get_all_by_physical_id(context, physical_ids,
+                                            project_safe=project_safe)
+
+
+def node_status_update(context, changes, statuses=None):
+    return IMPL.node_status_update(context, changes, statuses=statuses)
+
+
 def node_update(context, node_id, values):
     return IMPL.node_update(context, node_id, values)
 
@@ -292,6 +325,25 @@ def event_create(context, values):
     return IMPL.event_create(context, values)
 
 
+def event_create_batch(context, values_list):
+    return IMPL.event_create_batch(context, values_list)
+
+
+def event_rollup_update(context, counts):
+    return IMPL.event_rollup_update(context, counts)
+
+
+def event_rollup_get(context, group_by=None, filters=None, start_time=None,
+                     end_time=None, project_safe=True):
+    return IMPL.event_rollup_get(context, group_by=group_by, filters=filters,
+                                 start_time=start_time, end_time=end_time,
+                                 project_safe=project_safe)
+
+
+def event_delete_by_ids(context, event_ids):
+    return IMPL.event_delete_by_ids(context, event_ids)
+
+
 def event_get(context, event_id, project_safe=True):
     return IMPL.event_get(context, event_id, project_safe=project_safe)
 
@@ -303,12 +355,13 @@ def event_get_by_short_id(context, short_id, project_safe=True):
 
 def event_get_all(context, limit=None, marker=None, sort_keys=None,
                   sort_dir=None, filters=None, project_safe=True,
-                  show_deleted=False):
+                  show_deleted=False, start_time=None, end_time=None):
 
     return IMPL.event_get_all(context, limit=limit, marker=marker,
                               sort_keys=sort_keys, sort_dir=sort_dir,
                               filters=filters, project_safe=project_safe,
-                              show_deleted=show_deleted)
+                              show_deleted=show_deleted,
+                              start_time=start_time, end_time=end_time)
 
 
 def event_count_by_cluster(context, cluster_id, project_safe=True):
@@ -388,6 +441,10 @@ def action_get_all_by_owner(context, owner):
     return IMPL.action_get_all_by_owner(context, owner)
 
 
+def action_count_running_by_cluster(context, cluster_id):
+    return IMPL.action_count_running_by_cluster(context, cluster_id)
+
+
 def action_get_all(context, filters=None, limit=None, marker=None,
                    sort_keys=None, sort_dir=None, show_deleted=False):
     return IMPL.action_get_all(context, filters=filters,
@@ -481,6 +538,42 @@ def receiver_delete(context, receiver_id, force=False):
     return IMPL.receiver_delete(context, receiver_id, force=force)
 
 
+def registry_create(context, cluster_id, check_type, interval, params,
+                    engine_id=None):
+    return IMPL.registry_create(context, cluster_id, check_type, interval,
+                                params, engine_id=engine_id)
+
+
+def registry_delete(context, cluster_id):
+    return IMPL.registry_delete(context, cluster_id)
+
+
+def registry_claim(context, engine_id, dead_engines=None, num_engines=1):
+    return IMPL.registry_claim(context, engine_id, dead_engines=dead_engines,
+                               num_engines=num_engines)
+
+
+def registry_release(context, engine_id):
+    return IMPL.registry_release(context, engine_id)
+
+
+def registry_engines(context):
+    return IMPL.registry_engines(context)
+
+
+def node_health_get_all(context, cluster_id):
+    return IMPL.node_health_get_all(context, cluster_id)
+
+
+def node_health_update(context, cluster_id, checked, changes, timestamp):
+    return IMPL.node_health_update(context, cluster_id, checked, changes,
+                                   timestamp)
+
+
+def node_health_delete(context, node_ids):
+    return IMPL.node_health_delete(context, node_ids)
+
+
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
     return IMPL.db_sync(engine, version=version)
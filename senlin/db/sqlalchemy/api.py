@@ -15,10 +15,12 @@ Implementation of SQLAlchemy backend.
 '''
 
 import datetime
+import random
 import six
 import sys
 
 from oslo_config import cfg
+from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import session as db_session
 from oslo_db.sqlalchemy import utils
 from oslo_log import log as logging
@@ -40,6 +42,12 @@ LOG = logging.getLogger(__name__)
 CONF = cfg.CONF
 CONF.import_opt('max_events_per_cluster', 'senlin.common.config')
 
+# Maximum number of rows deleted by one statement when purging
+PURGE_BATCH_SIZE = 1000
+
+# Maximum number of IDs in the IN clause of one statement
+IN_BATCH_SIZE = 1000
+
 _facade = None
 
 
@@ -89,7 +97,10 @@ def _paginate_query(context, query, model, limit=None, marker=None,
     sort_keys = sort_keys + ['id']
 
     model_marker = None
-    if marker:
+    if isinstance(marker, dict):
+        # Values of a record not in database, e.g. an archived event
+        model_marker = model(**marker)
+    elif marker:
         model_marker = model_query(context, model).get(marker)
     try:
         query = utils.paginate_query(query, model, limit, sort_keys,
@@ -231,6 +242,22 @@ def cluster_next_index(context, cluster_id):
     return next_index
 
 
+def cluster_throttled_add(context, cluster_id):
+    session = _session(context)
+    with session.begin(subtransactions=True):
+        session.query(models.Cluster).filter_by(id=cluster_id).update(
+            {'throttled': models.Cluster.throttled + 1},
+            synchronize_session=False)
+
+
+def cluster_throttled_get(context, cluster_id):
+    # Querying the column rather than the cluster, which may be a stale
+    # object in the session
+    query = _session(context).query(models.Cluster.throttled).\
+        filter_by(id=cluster_id)
+    return query.scalar() or 0
+
+
 def cluster_count_all(context, filters=None, project_safe=True,
                       show_deleted=False, show_nested=False):
     query = _query_cluster_get_all(context, project_safe=project_safe,
@@ -375,6 +402,64 @@ def node_get_all_by_cluster(context, cluster_id, show_deleted=False,
     return nodes
 
 
+def node_ids_by_cluster(context, cluster_id, filters=None,
+                        project_safe=True):
+    '''Get IDs of nodes in a cluster without loading the node records.
+
+    :param cluster_id: ID of the cluster.
+    :param filters: Optional dictionary of filters applied to the nodes.
+    :returns: A list of node IDs sorted by node initialization time.
+    '''
+    query = model_query(context, models.Node.id).filter_by(
+        cluster_id=cluster_id, deleted_time=None)
+
+    if project_safe:
+        query = query.filter_by(project=context.project)
+
+    query = db_filters.exact_filter(query, models.Node, filters)
+    query = query.order_by(models.Node.init_time, models.Node.id)
+    return [n[0] for n in query.all()]
+
+
+def node_brief_by_cluster(context, cluster_id, project_safe=True):
+    '''Get brief info of nodes in a cluster, joined with their profiles.
+
+    :param cluster_id: ID of the cluster.
+    :returns: A list of rows each having the node 'id', 'name', 'status',
+              'created_time' and the 'profile_created_time'.
+    '''
+    query = model_query(context, models.Node.id, models.Node.name,
+                        models.Node.status, models.Node.created_time,
+                        models.Profile.created_time.label(
+                            'profile_created_time'))
+    query = query.outerjoin(models.Profile,
+                            models.Node.profile_id == models.Profile.id)
+    query = query.filter(models.Node.cluster_id == cluster_id,
+                         models.Node.deleted_time.is_(None))
+
+    if project_safe:
+        query = query.filter(models.Node.project == context.project)
+
+    return query.all()
+
+
+def node_placements_by_cluster(context, cluster_id, project_safe=True):
+    '''Get the placement data of nodes in a cluster.
+
+    :param cluster_id: ID of the cluster.
+    :returns: A list of (node ID, placement) tuples, where placement is the
+              dict saved as 'placement' in the node data, or an empty dict.
+    '''
+    query = model_query(context, models.Node.id, models.Node.data).filter_by(
+        cluster_id=cluster_id, deleted_time=None)
+
+    if project_safe:
+        query = query.filter_by(project=context.project)
+
+    return [(node_id, (data or {}).get('placement') or {})
+            for node_id, data in query.all()]
+
+
 def node_get_by_name_and_cluster(context, node_name, cluster_id,
                                  project_safe=True):
     query = model_query(context, models.Node).filter_by(name=node_name)
@@ -395,6 +480,52 @@ def node_get_by_physical_id(context, phy_id, project_safe=True):
     return query.first()
 
 
+def node_get_all_by_physical_id(context, physical_ids, project_safe=True):
+    '''Get the nodes backed by the given physical resources.
+
+    :param physical_ids: A list of physical resource IDs.
+    :returns: A list of the nodes found, deleted nodes excluded.
+    '''
+    nodes = []
+    for start in range(0, len(physical_ids), IN_BATCH_SIZE):
+        ids = physical_ids[start:start + IN_BATCH_SIZE]
+        query = model_query(context, models.Node).filter(
+            models.Node.physical_id.in_(ids)).filter_by(deleted_time=None)
+        if project_safe:
+            query = query.filter_by(project=context.project)
+        nodes.extend(query.all())
+    return nodes
+
+
+def node_status_update(context, changes, statuses=None):
+    '''Update the status of many nodes at once.
+
+    :param changes: A dict mapping node IDs to a tuple of the new status and
+                    its reason.
+    :param statuses: If given, only nodes currently in one of these statuses
+                     are updated.
+    :returns: The number of nodes updated.
+    '''
+    groups = {}
+    for node_id, change in changes.items():
+        groups.setdefault(change, []).append(node_id)
+
+    count = 0
+    session = _session(context)
+    with session.begin(subtransactions=True):
+        for (status, reason), node_ids in groups.items():
+            for start in range(0, len(node_ids), IN_BATCH_SIZE):
+                ids = node_ids[start:start + IN_BATCH_SIZE]
+                query = session.query(models.Node).filter(
+                    models.Node.id.in_(ids))
+                if statuses is not None:
+                    query = query.filter(models.Node.status.in_(statuses))
+                count += query.update({'status': status,
+                                       'status_reason': reason},
+                                      synchronize_session=False)
+    return count
+
+
 def node_update(context, node_id, values):
     '''Update a node with new property values.
 
@@ -969,6 +1100,83 @@ def event_create(context, values):
     return event
 
 
+def event_create_batch(context, values_list):
+    '''Insert multiple event records with one multi-row INSERT.
+
+    All items in values_list must have the same set of keys.
+    '''
+    if not values_list:
+        return
+
+    session = _session(context)
+    with session.begin(subtransactions=True):
+        session.execute(models.Event.__table__.insert(), values_list)
+
+
+def event_rollup_update(context, counts):
+    '''Add event counts to the rollup table.
+
+    :param counts: A list of dicts each containing the rollup key, i.e.
+                   'bucket', 'project', 'cluster_id', 'action', 'level' and
+                   'status', and the 'count' to be added.
+    '''
+    table = models.EventRollup.__table__
+    session = _session(context)
+    for values in counts:
+        key = dict(values)
+        count = key.pop('count')
+        cond = sqlalchemy.and_(*[table.c[k] == v for k, v in key.items()])
+        update = table.update().where(cond).values(count=table.c.count + count)
+
+        try:
+            with session.begin(subtransactions=True):
+                if session.execute(update).rowcount:
+                    continue
+                session.execute(table.insert().values(count=count, **key))
+        except db_exc.DBDuplicateEntry:
+            # Inserted by another engine in the meantime. The failed insert
+            # has rolled back the transaction, so update in a new one.
+            with session.begin(subtransactions=True):
+                session.execute(update)
+
+
+def event_rollup_get(context, group_by=None, filters=None, start_time=None,
+                     end_time=None, project_safe=True):
+    '''Get event counts per hour grouped by the given keys.
+
+    :returns: A list of dicts containing the 'bucket', the group_by keys
+              and the 'count'.
+    '''
+    group_by = group_by or []
+    model = models.EventRollup
+    columns = [model.bucket] + [getattr(model, k) for k in group_by]
+    query = model_query(context, *columns + [sqlalchemy.func.sum(model.count)])
+
+    if project_safe:
+        query = query.filter_by(project=context.project)
+    if start_time is not None:
+        start_time = start_time.replace(minute=0, second=0, microsecond=0)
+        query = query.filter(model.bucket >= start_time)
+    if end_time is not None:
+        query = query.filter(model.bucket < end_time)
+    query = db_filters.exact_filter(query, model, filters)
+    query = query.group_by(*columns).order_by(*columns)
+
+    keys = ['bucket'] + group_by + ['count']
+    return [dict(zip(keys, row)) for row in query.all()]
+
+
+def event_delete_by_ids(context, event_ids):
+    if not event_ids:
+        return 0
+
+    session = _session(context)
+    with session.begin(subtransactions=True):
+        query = session.query(models.Event).filter(
+            models.Event.id.in_(event_ids))
+        return query.delete(synchronize_session=False)
+
+
 def event_get(context, event_id, project_safe=True):
     event = model_query(context, models.Event).get(event_id)
     if project_safe and event is not None:
@@ -1008,11 +1216,15 @@ def _event_filter_paginate_query(context, query, filters=None,
 
 def event_get_all(context, limit=None, marker=None, sort_keys=None,
                   sort_dir=None, filters=None, project_safe=True,
-                  show_deleted=False):
+                  show_deleted=False, start_time=None, end_time=None):
     query = soft_delete_aware_query(context, models.Event,
                                     show_deleted=show_deleted)
     if project_safe:
         query = query.filter_by(project=context.project)
+    if start_time is not None:
+        query = query.filter(models.Event.timestamp >= start_time)
+    if end_time is not None:
+        query = query.filter(models.Event.timestamp < end_time)
 
     return _event_filter_paginate_query(context, query, filters=filters,
                                         limit=limit, marker=marker,
@@ -1091,6 +1303,15 @@ def action_get_all_by_owner(context, owner_id):
     return query.all()
 
 
+def action_count_running_by_cluster(context, cluster_id):
+    query = model_query(context, models.Action).\
+        join(models.Node, models.Action.target == models.Node.id).\
+        filter(models.Node.cluster_id == cluster_id).\
+        filter(models.Action.status.in_([consts.ACTION_READY,
+                                         consts.ACTION_RUNNING]))
+    return query.count()
+
+
 def action_get_all(context, filters=None, limit=None, marker=None,
                    sort_keys=None, sort_dir=None, show_deleted=False):
     query = soft_delete_aware_query(context, models.Action,
@@ -1501,6 +1722,134 @@ def receiver_delete(context, receiver_id, force=False):
     session.flush()
 
 
+# Health registry
+def registry_create(context, cluster_id, check_type, interval, params,
+                    engine_id=None):
+    registry = models.HealthRegistry()
+    registry.update({
+        'cluster_id': cluster_id,
+        'check_type': check_type,
+        'interval': interval,
+        'params': params,
+        'engine_id': engine_id,
+    })
+    registry.save(_session(context))
+    return registry
+
+
+def registry_delete(context, cluster_id):
+    session = _session(context)
+    with session.begin(subtransactions=True):
+        session.query(models.HealthRegistry).filter_by(
+            cluster_id=cluster_id).delete(synchronize_session=False)
+        session.query(models.NodeHealth).filter_by(
+            cluster_id=cluster_id).delete(synchronize_session=False)
+
+
+def registry_claim(context, engine_id, dead_engines=None, num_engines=1):
+    '''Claim unowned registries and those of dead engines.
+
+    Registries to be claimed are shared among the live engines: a claim
+    takes at most an equal share of them, so that other engines claiming
+    at the same time get theirs.
+
+    :param engine_id: ID of the engine claiming the registries.
+    :param dead_engines: IDs of engines found dead, whose registries are
+                         taken over.
+    :param num_engines: Number of live engines, including the claiming one.
+    :returns: A list of all registries owned by the engine.
+    '''
+    model = models.HealthRegistry
+    session = _session(context)
+    with session.begin(subtransactions=True):
+        cond = model.engine_id.is_(None)
+        if dead_engines:
+            cond = sqlalchemy.or_(cond, model.engine_id.in_(dead_engines))
+        ids = [r[0] for r in session.query(model.id).filter(cond)]
+        share = -(-len(ids) // max(num_engines, 1))
+        if ids:
+            # Claims made at the same time mostly pick different registries
+            ids = random.sample(ids, share)
+            session.query(model).filter(model.id.in_(ids)).filter(
+                cond).update({'engine_id': engine_id},
+                             synchronize_session=False)
+
+    return session.query(model).filter_by(engine_id=engine_id).all()
+
+
+def registry_release(context, engine_id):
+    '''Give up the registries owned by an engine, e.g. when it stops.'''
+    session = _session(context)
+    with session.begin(subtransactions=True):
+        session.query(models.HealthRegistry).filter_by(
+            engine_id=engine_id).update({'engine_id': None},
+                                        synchronize_session=False)
+
+
+def registry_engines(context):
+    '''Get the IDs of engines owning registries.'''
+    query = model_query(context, models.HealthRegistry.engine_id).filter(
+        models.HealthRegistry.engine_id.isnot(None)).distinct()
+    return [r[0] for r in query.all()]
+
+
+# Node health
+def node_health_get_all(context, cluster_id):
+    '''Get the health records of the nodes in a cluster.
+
+    :returns: A dict mapping node IDs to health records.
+    '''
+    # Records may have been updated in bulk in the same session
+    query = model_query(context, models.NodeHealth).filter_by(
+        cluster_id=cluster_id).populate_existing()
+    return dict((r.node_id, r) for r in query.all())
+
+
+def node_health_update(context, cluster_id, checked, changes, timestamp):
+    '''Save the results of a round of health checks on a cluster.
+
+    :param checked: IDs of nodes checked whose status has not changed.
+    :param changes: A dict mapping the IDs of nodes whose status has changed
+                    to a tuple of the new status and its reason.
+    :param timestamp: Time of the checks.
+    '''
+    model = models.NodeHealth
+    session = _session(context)
+    with session.begin(subtransactions=True):
+        for start in range(0, len(checked), IN_BATCH_SIZE):
+            ids = checked[start:start + IN_BATCH_SIZE]
+            session.query(model).filter(model.node_id.in_(ids)).update(
+                {'checked_time': timestamp}, synchronize_session=False)
+
+        if not changes:
+            return
+        records = session.query(model).filter(
+            model.node_id.in_(list(changes))).all()
+        records = dict((r.node_id, r) for r in records)
+        for node_id, (status, reason) in changes.items():
+            record = records.get(node_id)
+            if record is None:
+                record = model(node_id=node_id, cluster_id=cluster_id)
+                session.add(record)
+            record.update({
+                'status': status,
+                'status_reason': reason,
+                'checked_time': timestamp,
+                'changed_time': timestamp,
+            })
+
+
+def node_health_delete(context, node_ids):
+    if not node_ids:
+        return 0
+
+    session = _session(context)
+    with session.begin(subtransactions=True):
+        query = session.query(models.NodeHealth).filter(
+            models.NodeHealth.node_id.in_(node_ids))
+        return query.delete(synchronize_session=False)
+
+
 # Utils
 def db_sync(engine, version=None):
     """Migrate the database to `version` or the most recent version."""
@@ -1554,9 +1903,14 @@ def purge_deleted(age, unit='days'):
     policy_del = policy.delete().where(policy.c.deleted_time < timeline)
     engine.execute(policy_del)
 
-    # delete events
-    event_del = event.delete().where(event.c.timestamp < timeline)
-    engine.execute(event_del)
+    # delete events in batches to avoid one long-running statement
+    while True:
+        query = sqlalchemy.select([event.c.id]).where(
+            event.c.timestamp < timeline).limit(PURGE_BATCH_SIZE)
+        event_ids = [row[0] for row in engine.execute(query)]
+        if not event_ids:
+            break
+        engine.execute(event.delete().where(event.c.id.in_(event_ids)))
 
     # delete actions
     action_del = action.delete().where(action.c.deleted_time < timeline)
@@ -0,0 +1,44 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    event_rollup = sqlalchemy.Table(
+        'event_rollup', meta,
+        sqlalchemy.Column('id', sqlalchemy.Integer,
+                          primary_key=True, nullable=False),
+        sqlalchemy.Column('bucket', sqlalchemy.DateTime, nullable=False),
+        sqlalchemy.Column('project', sqlalchemy.String(32), nullable=False),
+        sqlalchemy.Column('cluster_id', sqlalchemy.String(36),
+                          nullable=False),
+        sqlalchemy.Column('action', sqlalchemy.String(36), nullable=False),
+        sqlalchemy.Column('level', sqlalchemy.Integer, nullable=False),
+        sqlalchemy.Column('status', sqlalchemy.String(36), nullable=False),
+        sqlalchemy.Column('count', sqlalchemy.Integer, nullable=False),
+        sqlalchemy.UniqueConstraint('bucket', 'project', 'cluster_id',
+                                    'action', 'level', 'status',
+                                    name='uniq_event_rollup0key'),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+
+    event_rollup.create()
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would drop all tables')
@@ -0,0 +1,56 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import sqlalchemy
+
+from senlin.db.sqlalchemy import types
+
+
+def upgrade(migrate_engine):
+    meta = sqlalchemy.MetaData()
+    meta.bind = migrate_engine
+
+    health_registry = sqlalchemy.Table(
+        'health_registry', meta,
+        sqlalchemy.Column('id', sqlalchemy.String(36),
+                          primary_key=True, nullable=False),
+        sqlalchemy.Column('cluster_id', sqlalchemy.String(36),
+                          nullable=False, unique=True),
+        sqlalchemy.Column('check_type', sqlalchemy.String(255)),
+        sqlalchemy.Column('interval', sqlalchemy.Integer),
+        sqlalchemy.Column('params', types.Dict),
+        sqlalchemy.Column('engine_id', sqlalchemy.String(36), index=True),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+
+    node_health = sqlalchemy.Table(
+        'node_health', meta,
+        sqlalchemy.Column('node_id', sqlalchemy.String(36),
+                          primary_key=True, nullable=False),
+        sqlalchemy.Column('cluster_id', sqlalchemy.String(36),
+                          nullable=False, index=True),
+        sqlalchemy.Column('status', sqlalchemy.String(36)),
+        sqlalchemy.Column('status_reason', sqlalchemy.Text),
+        sqlalchemy.Column('checked_time', sqlalchemy.DateTime),
+        sqlalchemy.Column('changed_time', sqlalchemy.DateTime),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+
+    health_registry.create()
+    node_health.create()
+
+
+def downgrade(migrate_engine):
+    raise NotImplementedError('Database downgrade not supported - '
+                              'would drop all tables')
@@ -113,6 +113,9 @@ class Cluster(BASE, SenlinBase, SoftDelete):
     status_reason = sqlalchemy.Column(sqlalchemy.Text)
     meta_data = sqlalchemy.Column(types.Dict)
     data = sqlalchemy.Column(types.Dict)
+    # Number of times drivers have been rate limited working on the cluster
+    throttled = sqlalchemy.Column(sqlalchemy.Integer, nullable=False,
+                                  default=0, server_default='0')
 
 
 class Node(BASE, SenlinBase, SoftDelete):
@@ -123,7 +126,7 @@ class Node(BASE, SenlinBase, SoftDelete):
     id = sqlalchemy.Column('id', sqlalchemy.String(36), primary_key=True,
                            default=lambda: str(uuid.uuid4()))
     name = sqlalchemy.Column(sqlalchemy.String(255))
-    physical_id = sqlalchemy.Column(sqlalchemy.String(36))
+    physical_id = sqlalchemy.Column(sqlalchemy.String(36), index=True)
     cluster_id = sqlalchemy.Column(sqlalchemy.String(36),
                                    sqlalchemy.ForeignKey('cluster.id'))
     profile_id = sqlalchemy.Column(sqlalchemy.String(36),
@@ -355,3 +358,54 @@ class Event(BASE, SenlinBase, SoftDelete):
     status = sqlalchemy.Column(sqlalchemy.String(255))
     status_reason = sqlalchemy.Column(sqlalchemy.Text)
     meta_data = sqlalchemy.Column(types.Dict)
+
+
+class EventRollup(BASE, SenlinBase):
+    """Number of events per hour and per aggregation key."""
+
+    __tablename__ = 'event_rollup'
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint('bucket', 'project', 'cluster_id',
+                                    'action', 'level', 'status',
+                                    name='uniq_event_rollup0key'),
+        {'mysql_engine': 'InnoDB'},
+    )
+
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    bucket = sqlalchemy.Column(sqlalchemy.DateTime, nullable=False)
+    project = sqlalchemy.Column(sqlalchemy.String(32), nullable=False)
+    cluster_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    action = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    level = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    status = sqlalchemy.Column(sqlalchemy.String(36), nullable=False)
+    count = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+
+
+class HealthRegistry(BASE, SenlinBase):
+    """A cluster registered for health checking and the engine checking it."""
+
+    __tablename__ = 'health_registry'
+
+    id = sqlalchemy.Column('id', sqlalchemy.String(36), primary_key=True,
+                           default=lambda: str(uuid.uuid4()))
+    cluster_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False,
+                                   unique=True)
+    check_type = sqlalchemy.Column(sqlalchemy.String(255))
+    interval = sqlalchemy.Column(sqlalchemy.Integer)
+    params = sqlalchemy.Column(types.Dict)
+    engine_id = sqlalchemy.Column(sqlalchemy.String(36), index=True)
+
+
+class NodeHealth(BASE, SenlinBase):
+    """Result of the latest health check of a node."""
+
+    __tablename__ = 'node_health'
+
+    node_id = sqlalchemy.Column(sqlalchemy.String(36), primary_key=True,
+                                nullable=False)
+    cluster_id = sqlalchemy.Column(sqlalchemy.String(36), nullable=False,
+                                   index=True)
+    status = sqlalchemy.Column(sqlalchemy.String(36))
+    status_reason = sqlalchemy.Column(sqlalchemy.Text)
+    checked_time = sqlalchemy.Column(sqlalchemy.DateTime)
+    changed_time = sqlalchemy.Column(sqlalchemy.DateTime)
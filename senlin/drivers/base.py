@@ -15,6 +15,7 @@ import copy
 from oslo_config import cfg
 from oslo_log import log as logging
 
+from senlin.common import utils
 from senlin.engine import environment
 
 LOG = logging.getLogger(__name__)
@@ -28,6 +29,20 @@ class DriverBase(object):
     def __init__(self, params):
         self.conn_params = copy.deepcopy(params)
 
+    @property
+    def scope(self):
+        '''A tuple identifying the project and region the driver works in.
+
+        Drivers with the same scope see the same cloud resources.
+        '''
+        params = self.conn_params
+        if params.get('trust_id'):
+            owner = ('trust', utils.hashable(params['trust_id']))
+        else:
+            owner = tuple(params.get(k) for k in (
+                'user_id', 'username', 'project_id', 'project_name'))
+        return (params.get('auth_url'), params.get('region_name')) + owner
+
 
 class SenlinDriver(object):
     '''Generic driver class'''
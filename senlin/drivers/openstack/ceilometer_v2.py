@@ -19,7 +19,7 @@ class CeilometerClient(base.DriverBase):
 
     def __init__(self, params):
         super(CeilometerClient, self).__init__(params)
-        self.conn = sdk.create_connection(params)
+        self.conn = sdk.get_connection(params)
 
     @sdk.translate_exception
     def alarm_create(self, **attrs):
@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from senlin.common import poller
+from senlin.common import waiter
 from senlin.drivers import base
 from senlin.drivers.openstack import sdk
 
@@ -19,7 +21,7 @@ class HeatClient(base.DriverBase):
 
     def __init__(self, params):
         super(HeatClient, self).__init__(params)
-        self.conn = sdk.create_connection(params)
+        self.conn = sdk.get_connection(params)
 
     @sdk.translate_exception
     def stack_create(self, **params):
@@ -34,8 +36,8 @@ class HeatClient(base.DriverBase):
         return self.conn.orchestration.find_stack(name_or_id)
 
     @sdk.translate_exception
-    def stack_list(self):
-        return self.conn.orchestration.stacks()
+    def stack_list(self, **query):
+        return self.conn.orchestration.stacks(**query)
 
     @sdk.translate_exception
     def stack_update(self, stack_id, **params):
@@ -45,3 +47,31 @@ class HeatClient(base.DriverBase):
     def stack_delete(self, stack_id, ignore_missing=True):
         return self.conn.orchestration.delete_stack(stack_id,
                                                     ignore_missing)
+
+    def wait_for_stack(self, stack_id, check, timeout=None):
+        '''Wait for a stack to reach an expected state.
+
+        :param stack_id: The ID of the stack.
+        :param check: A callable taking the stack, or None if the stack was
+                      not found. It returns a true value when the wait is
+                      over, or raises an exception when the stack failed.
+        :param timeout: Seconds to wait, see `waiter.wait_for`.
+        :returns: The value returned by the check.
+        '''
+        resource = 'stack %s' % stack_id
+
+        # Stacks waited for by all threads are polled together if possible.
+        # A stack found missing is passed as None, as it is when deleted.
+        stack_poller = poller.get_poller(('stack',) + self.scope,
+                                         self._list_stacks, self.stack_find)
+        if stack_poller is not None:
+            return stack_poller.wait(stack_id, check, resource,
+                                     timeout=timeout)
+
+        return waiter.wait_for(lambda: check(self.stack_find(stack_id)),
+                               resource, timeout=timeout, interval=2,
+                               max_interval=20)
+
+    def _list_stacks(self, ids, since):
+        # Deleted stacks are included for waits on stack deletion
+        return self.conn.orchestration.stacks(id=ids, show_deleted=True)
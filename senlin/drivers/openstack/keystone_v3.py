@@ -13,20 +13,44 @@
 from oslo_config import cfg
 from oslo_log import log as logging
 
+from senlin.common import utils
 from senlin.drivers import base
 from senlin.drivers.openstack import sdk
 
 CONF = cfg.CONF
+CONF.import_opt('catalog_cache_ttl', 'senlin.common.config')
+CONF.import_opt('catalog_negative_cache_ttl', 'senlin.common.config')
 LOG = logging.getLogger(__name__)
 
+# Catalog data looked up by all clients in an engine, keyed by the trust or
+# the credential of the client.
+_catalog_cache = utils.ExpiringCache()
+
 
 class KeystoneClient(base.DriverBase):
     '''Keystone V3 driver.'''
 
     def __init__(self, params):
         super(KeystoneClient, self).__init__(params)
-        self.conn = sdk.create_connection(params)
+        self.conn = sdk.get_connection(params)
         self.session = self.conn.session
+        if params.get('trust_id'):
+            # Policies give the trust ID in a list
+            self._scope = ('trust', utils.hashable(params['trust_id']))
+        else:
+            self._scope = tuple(params.get(k) for k in (
+                'auth_url', 'user_id', 'username', 'project_id',
+                'project_name'))
+
+    def _cached(self, name, args, loader):
+        key = (self._scope, name, args)
+        return _catalog_cache.get(key, loader, CONF.catalog_cache_ttl,
+                                  CONF.catalog_negative_cache_ttl)
+
+    def refresh_catalog(self):
+        '''Drop the cached catalog data so it is looked up again.'''
+        scope = self._scope
+        _catalog_cache.invalidate(lambda key: key[0] == scope)
 
     @sdk.translate_exception
     def trust_list(self, **query):
@@ -58,16 +82,23 @@ class KeystoneClient(base.DriverBase):
         if interface:
             filters['interface'] = interface
 
-        endpoints = [e for e in self.conn.identity.endpoints(**filters)]
-        return endpoints[0] if endpoints else None
+        def load():
+            endpoints = [e for e in self.conn.identity.endpoints(**filters)]
+            return endpoints[0] if endpoints else None
+
+        return self._cached('endpoint', (service_id, region, interface),
+                            load)
 
     @sdk.translate_exception
     def service_get(self, service_type):
         '''Utility function to get service detail based on type.'''
-        services = [s for s in self.conn.identity.services()]
-        for service in services:
-            if service['type'] == service_type:
-                return service
+        def load():
+            services = [s for s in self.conn.identity.services()]
+            for service in services:
+                if service['type'] == service_type:
+                    return service
+
+        return self._cached('service', service_type, load)
 
     @sdk.translate_exception
     def trust_get_by_trustor(self, trustor, trustee=None, project=None):
@@ -129,7 +160,10 @@ class KeystoneClient(base.DriverBase):
 
     @sdk.translate_exception
     def region_list(self, **queries):
-        return self.conn.identity.regions(**queries)
+        def load():
+            return [r for r in self.conn.identity.regions(**queries)]
+
+        return self._cached('regions', tuple(sorted(queries.items())), load)
 
     @classmethod
     @sdk.translate_exception
@@ -139,6 +173,14 @@ class KeystoneClient(base.DriverBase):
         access_info = sdk.authenticate(**creds)
         return access_info['token']
 
+    @classmethod
+    @sdk.translate_exception
+    def get_token_info(cls, **creds):
+        '''Get token and its expiry time using given credential'''
+
+        access_info = sdk.authenticate(**creds)
+        return access_info['token'], access_info['expires_at']
+
     @classmethod
     @sdk.translate_exception
     def get_user_id(cls, **creds):
@@ -13,18 +13,27 @@
 import eventlet
 import six
 
+from oslo_config import cfg
 from oslo_context import context as oslo_context
 from oslo_log import log as logging
+from oslo_utils import netutils
 
 from senlin.common import exception
 from senlin.common.i18n import _
 from senlin.common.i18n import _LE
+from senlin.common import waiter
 from senlin.drivers import base
 from senlin.drivers.openstack import neutron_v2 as neutronclient
-from senlin.engine import event
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_opt('lb_member_concurrency', 'senlin.common.config')
+
+# Seconds during which a pool member change rejected because the
+# loadbalancer is busy with another change keeps being submitted again
+MEMBER_CHANGE_TIMEOUT = 60
+
 
 class LoadBalancerDriver(base.DriverBase):
     """Load-balancing driver based on Neutron LBaaS service."""
@@ -52,33 +61,28 @@ class LoadBalancerDriver(base.DriverBase):
         :param ignore_not_found: if set to True, nonexistent loadbalancer
             resource is also an acceptable result.
         """
-        waited = 0
-        while waited < timeout:
-            try:
-                lb = self.nc().loadbalancer_get(lb_id)
-            except exception.InternalError as ex:
-                msg = _LE('Failed in getting loadbalancer: %s.'
-                          ) % six.text_type(ex)
-                LOG.exception(msg)
-                event.warning(oslo_context.get_current(), self, 'LB_GET',
-                              'ERROR', msg)
-                return False
+        def _check():
+            lb = self.nc().loadbalancer_get(lb_id)
             if lb is None:
-                lb_ready = ignore_not_found
-            else:
-                lb_ready = ((lb.provisioning_status == 'ACTIVE') and
-                            (lb.operating_status == 'ONLINE'))
+                return ignore_not_found
 
-            if lb_ready is True:
-                return True
+            return ((lb.provisioning_status == 'ACTIVE') and
+                    (lb.operating_status == 'ONLINE'))
 
-            LOG.debug(_('Waiting for loadbalancer %(lb)s to become ready'),
-                      {'lb': lb_id})
-
-            eventlet.sleep(2)
-            waited += 2
+        try:
+            waiter.wait_for(_check, 'loadbalancer %s' % lb_id,
+                            timeout=timeout, interval=1, max_interval=5)
+        except (exception.ResourceTimeout,
+                exception.ResourceWaitCancelled) as ex:
+            LOG.error(six.text_type(ex))
+            return False
+        except exception.InternalError as ex:
+            msg = _LE('Failed in getting loadbalancer: %s.'
+                      ) % six.text_type(ex)
+            LOG.exception(msg)
+            return False
 
-        return False
+        return True
 
     def lb_create(self, vip, pool):
         """Create a LBaaS instance
@@ -98,8 +102,6 @@ class LoadBalancerDriver(base.DriverBase):
         except exception.InternalError as ex:
             msg = _LE('Failed in getting subnet: %s.') % six.text_type(ex)
             LOG.exception(msg)
-            event.warning(oslo_context.get_current(), self, 'SUBNET_GET',
-                          'ERROR', msg)
             return False, msg
         subnet_id = subnet.id
         try:
@@ -110,8 +112,6 @@ class LoadBalancerDriver(base.DriverBase):
             msg = _LE('Failed in creating loadbalancer: %s.'
                       ) % six.text_type(ex)
             LOG.exception(msg)
-            event.warning(oslo_context.get_current(), self, 'LB_CREATE',
-                          'ERROR', msg)
             return False, msg
         result['loadbalancer'] = lb.id
 
@@ -132,8 +132,6 @@ class LoadBalancerDriver(base.DriverBase):
             msg = _LE('Failed in creating lb listener: %s.'
                       ) % six.text_type(ex)
             LOG.exception(msg)
-            event.warning(oslo_context.get_current(), self, 'LISTENER_CREATE',
-                          'ERROR', msg)
             return False, msg
         result['listener'] = listener.id
         res = self._wait_for_lb_ready(lb.id)
@@ -151,8 +149,6 @@ class LoadBalancerDriver(base.DriverBase):
             msg = _LE('Failed in creating lb pool: %s.'
                       ) % six.text_type(ex)
             LOG.exception(msg)
-            event.warning(oslo_context.get_current(), self, 'POOL_CREATE',
-                          'ERROR', msg)
             return False, msg
         result['pool'] = pool.id
         res = self._wait_for_lb_ready(lb.id)
@@ -179,8 +175,6 @@ class LoadBalancerDriver(base.DriverBase):
                 msg = _LE('Failed in deleting healthmonitor: %s.'
                           ) % six.text_type(ex)
                 LOG.exception(msg)
-                event.warning(oslo_context.get_current(), self,
-                              'HEALTHMONITOR_DELETE', 'ERROR', msg)
                 return False, msg
             res = self._wait_for_lb_ready(lb_id)
             if res is False:
@@ -196,8 +190,6 @@ class LoadBalancerDriver(base.DriverBase):
                 msg = _LE('Failed in deleting lb pool: %s.'
                           ) % six.text_type(ex)
                 LOG.exception(msg)
-                event.warning(oslo_context.get_current(), self, 'POOL_DELETE',
-                              'ERROR', msg)
                 return False, msg
             res = self._wait_for_lb_ready(lb_id)
             if res is False:
@@ -212,8 +204,6 @@ class LoadBalancerDriver(base.DriverBase):
                 msg = _LE('Failed in deleting listener: %s.'
                           ) % six.text_type(ex)
                 LOG.exception(msg)
-                event.warning(oslo_context.get_current(), self,
-                              'LISTENER_DELETE', 'ERROR', msg)
                 return False, msg
             res = self._wait_for_lb_ready(lb_id)
             if res is False:
@@ -253,8 +243,6 @@ class LoadBalancerDriver(base.DriverBase):
             msg = _LE('Failed in getting %(resource)s: %(msg)s.'
                       ) % {'resource': resource, 'msg': six.text_type(ex)}
             LOG.exception(msg)
-            event.warning(oslo_context.get_current(), self,
-                          resource.upper()+'_GET', 'ERROR', msg)
             return None
         net_name = net.name
 
@@ -271,8 +259,6 @@ class LoadBalancerDriver(base.DriverBase):
             msg = _LE('Failed in creating lb pool member: %s.'
                       ) % six.text_type(ex)
             LOG.exception(msg)
-            event.warning(oslo_context.get_current(), self,
-                          'POOL_MEMBER_CREATE', 'ERROR', msg)
             return None
         res = self._wait_for_lb_ready(lb_id)
         if res is False:
@@ -296,8 +282,6 @@ class LoadBalancerDriver(base.DriverBase):
                       '%(ex)s') % {'m': member_id, 'p': pool_id,
                                    'ex': six.text_type(ex)}
             LOG.exception(msg)
-            event.warning(oslo_context.get_current(), self,
-                          'POOL_MEMBER_DELETE', 'ERROR', msg)
             return None
         res = self._wait_for_lb_ready(lb_id)
         if res is False:
@@ -306,6 +290,149 @@ class LoadBalancerDriver(base.DriverBase):
 
         return True
 
+    def _submit_member_change(self, lb_id, op, func, *args):
+        """Submit a pool member change, retrying when the lb is busy.
+
+        A loadbalancer rejects changes with a 409 error while it is applying
+        a previous one. As members are changed in parallel, a conflicting
+        change is submitted again, with a growing interval, until it is
+        accepted or `MEMBER_CHANGE_TIMEOUT` is reached.
+        """
+        result = []
+
+        def _submit():
+            try:
+                result.append(func(*args))
+            except exception.InternalError as ex:
+                if getattr(ex, 'code', None) != 409:
+                    raise
+                return False
+            return True
+
+        try:
+            waiter.wait_for(_submit, 'loadbalancer %s' % lb_id,
+                            timeout=MEMBER_CHANGE_TIMEOUT, interval=1,
+                            max_interval=5)
+        except exception.InternalError as ex:
+            msg = _LE('Failed in %(op)s lb pool member: %(ex)s.'
+                      ) % {'op': op, 'ex': six.text_type(ex)}
+            LOG.exception(msg)
+            raise
+
+        return result[0]
+
+    def _get_nodes_address(self, nodes, subnet_obj):
+        """Get IPv4 addresses of nodes in the specified subnet.
+
+        The addresses are found from the ports on the subnet's network, which
+        are retrieved with one request instead of one per node.
+
+        :returns: A dict mapping node IDs to addresses.
+        """
+        ports = self.nc().port_list(network_id=subnet_obj.network_id)
+        addresses = {}
+        for port in ports:
+            for fixed_ip in port.fixed_ips or []:
+                address = fixed_ip.get('ip_address')
+                if (fixed_ip.get('subnet_id') == subnet_obj.id and
+                        netutils.is_valid_ipv4(address)):
+                    addresses.setdefault(port.device_id, address)
+
+        return dict((node.id, addresses[node.physical_id]) for node in nodes
+                    if node.physical_id in addresses)
+
+    def members_add(self, nodes, lb_id, pool_id, port, subnet):
+        """Add a batch of nodes to the Neutron lbaas pool.
+
+        Members are created in parallel and the loadbalancer is waited for
+        only once, after all of them have been submitted.
+
+        :param nodes: A list of node objects to be added;
+        :param lb_id: The ID of the loadbalancer;
+        :param pool_id: The ID of lb pool the nodes are added to;
+        :param port: The port the nodes listen on;
+        :param subnet: The subnet the nodes are in;
+        :returns: A dict mapping the IDs of nodes added successfully to the
+                  IDs of their members. Members created are returned even
+                  if the loadbalancer then fails to become ready, so that
+                  they can still be found and removed.
+        """
+        if not nodes:
+            return {}
+
+        try:
+            subnet_obj = self.nc().subnet_get(subnet)
+            addresses = self._get_nodes_address(nodes, subnet_obj)
+        except exception.InternalError as ex:
+            msg = _LE('Failed in getting addresses in subnet %(s)s: %(ex)s.'
+                      ) % {'s': subnet, 'ex': six.text_type(ex)}
+            LOG.exception(msg)
+            return {}
+
+        owner = waiter.current_action()
+
+        def _add(node):
+            waiter.bind_action(owner)
+            address = addresses.get(node.id)
+            if address is None:
+                LOG.error(_LE('Node (%(n)s) does not have valid IPv4 address '
+                              'in subnet %(s)s.'), {'n': node.id, 's': subnet})
+                return node.id, None
+            try:
+                member = self._submit_member_change(
+                    lb_id, 'create', self.nc().pool_member_create,
+                    pool_id, address, port, subnet_obj.id)
+            except exception.InternalError:
+                return node.id, None
+            return node.id, member.id
+
+        pool = eventlet.GreenPool(max(CONF.lb_member_concurrency, 1))
+        members = dict((node_id, member_id)
+                       for node_id, member_id in pool.imap(_add, nodes)
+                       if member_id is not None)
+
+        if members and self._wait_for_lb_ready(lb_id) is False:
+            LOG.error(_LE('Loadbalancer %(lb)s not ready after creating '
+                          'pool members (%(m)s).'),
+                      {'lb': lb_id, 'm': list(members.values())})
+
+        return members
+
+    def members_remove(self, lb_id, pool_id, member_ids):
+        """Delete a batch of members from Neutron lbaas pool.
+
+        Members are deleted in parallel and the loadbalancer is waited for
+        only once, after all of them have been submitted.
+
+        :param lb_id: The ID of the loadbalancer the operation is targeted at;
+        :param pool_id: The ID of the pool from which the members are deleted;
+        :param member_ids: A list of IDs of the LB members.
+        :returns: A list of IDs of the members deleted successfully.
+        """
+        if not member_ids:
+            return []
+
+        owner = waiter.current_action()
+
+        def _remove(member_id):
+            waiter.bind_action(owner)
+            try:
+                self._submit_member_change(
+                    lb_id, 'delete', self.nc().pool_member_delete,
+                    pool_id, member_id)
+            except exception.InternalError:
+                return None
+            return member_id
+
+        pool = eventlet.GreenPool(max(CONF.lb_member_concurrency, 1))
+        removed = [m for m in pool.imap(_remove, member_ids) if m is not None]
+
+        if removed and self._wait_for_lb_ready(lb_id) is False:
+            LOG.error(_LE('Failed in deleting pool members (%s).'), removed)
+            return []
+
+        return removed
+
     def _get_node_address(self, node, version=4):
         """Get IP address of node with specific version"""
 
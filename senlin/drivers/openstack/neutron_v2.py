@@ -23,7 +23,7 @@ class NeutronClient(base.DriverBase):
 
     def __init__(self, params):
         super(NeutronClient, self).__init__(params)
-        self.conn = sdk.create_connection(params)
+        self.conn = sdk.get_connection(params)
 
     def network_get(self, name_or_id):
         network = self.conn.network.find_network(name_or_id)
@@ -33,6 +33,10 @@ class NeutronClient(base.DriverBase):
         subnet = self.conn.network.find_subnet(name_or_id)
         return subnet
 
+    def port_list(self, **query):
+        ports = [p for p in self.conn.network.ports(**query)]
+        return ports
+
     def loadbalancer_get(self, name_or_id):
         lb = self.conn.network.find_load_balancer(name_or_id)
         return lb
@@ -10,20 +10,30 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+import re
+
 from oslo_config import cfg
 
 from openstack.compute.v2 import server_metadata
 
+from senlin.common import exception
+from senlin.common import poller
+from senlin.common import waiter
 from senlin.drivers import base
 from senlin.drivers.openstack import sdk
 
+# Seconds the time since which changed servers are listed is moved back, to
+# allow for clock differences between senlin and nova
+CHANGES_SINCE_MARGIN = 300
+
 
 class NovaClient(base.DriverBase):
     '''Nova V2 driver.'''
 
     def __init__(self, params):
         super(NovaClient, self).__init__(params)
-        self.conn = sdk.create_connection(params)
+        self.conn = sdk.get_connection(params)
         self.session = self.conn.session
 
     @sdk.translate_exception
@@ -95,6 +105,27 @@ class NovaClient(base.DriverBase):
         server_obj = self.conn.compute.create_server(**attrs)
         return server_obj
 
+    @sdk.translate_exception
+    def server_create_many(self, count, **attrs):
+        '''Create identical servers with a single request.
+
+        The servers are found by the reservation ID nova returns for the
+        request. Nova names the servers after the name given followed by a
+        suffix, which is used to find them if no reservation ID is returned.
+
+        :param count: Maximum number of servers to create.
+        :returns: A list of the servers created, which may be fewer than
+                  requested.
+        '''
+        attrs.update(min_count=1, max_count=count, return_reservation_id=True)
+        reservation = self.conn.compute.create_server(**attrs)
+        reservation_id = getattr(reservation, 'reservation_id', None)
+        if reservation_id:
+            query = {'reservation_id': reservation_id}
+        else:
+            query = {'name': '^%s-' % re.escape(attrs['name'])}
+        return [s for s in self.conn.compute.servers(True, **query)]
+
     @sdk.translate_exception
     def wait_for_server(self, value, status='ACTIVE', failures=['ERROR'],
                         interval=2, timeout=None):
@@ -102,11 +133,35 @@ class NovaClient(base.DriverBase):
         if timeout is None:
             timeout = cfg.CONF.default_action_timeout
 
-        self.conn.compute.wait_for_server(value, status=status,
-                                          failures=failures,
-                                          interval=interval,
-                                          wait=timeout)
-        return
+        def _check(server):
+            if server is None:
+                return None
+            if server.status == status:
+                return server
+            if server.status in failures:
+                raise exception.ResourceStatusError(
+                    resource_id=server.id, status=server.status,
+                    reason='server entered a failure status')
+            return None
+
+        server_id = getattr(value, 'id', value)
+        resource = 'server %s' % server_id
+
+        # Servers waited for by all threads are polled together if possible
+        server_poller = poller.get_poller(('server',) + self.scope,
+                                          self._list_changed_servers,
+                                          self.server_get)
+        if server_poller is not None:
+            return server_poller.wait(server_id, _check, resource,
+                                      timeout=timeout)
+
+        return waiter.wait_for(lambda: _check(self.server_get(value)),
+                               resource, timeout=timeout, interval=interval)
+
+    def _list_changed_servers(self, ids, since):
+        since -= datetime.timedelta(seconds=CHANGES_SINCE_MARGIN)
+        return self.conn.compute.servers(details=True,
+                                         changes_since=since.isoformat())
 
     @sdk.translate_exception
     def server_get(self, value):
@@ -139,7 +194,12 @@ class NovaClient(base.DriverBase):
 
         server_obj = self.conn.compute.find_server(value, True)
         if server_obj:
-            self.conn.compute.wait_for_delete(server_obj, wait=timeout)
+            def _check():
+                return self.conn.compute.find_server(server_obj.id,
+                                                     True) is None
+
+            waiter.wait_for(_check, 'deletion of server %s' % server_obj.id,
+                            timeout=timeout, interval=2)
 
         return
 
@@ -13,7 +13,12 @@
 '''
 SDK Client
 '''
+import collections
 import functools
+import threading
+import time
+
+from oslo_config import cfg
 from oslo_log import log as logging
 import six
 
@@ -24,11 +29,17 @@ from oslo_serialization import jsonutils
 from requests import exceptions as req_exc
 
 from senlin.common import exception as senlin_exc
+from senlin.common.i18n import _LW
+from senlin.common import utils
 
 USER_AGENT = 'senlin'
 exc = sdk_exc
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_opt('connection_pool_size', 'senlin.common.config')
+CONF.import_opt('connection_idle_timeout', 'senlin.common.config')
+
 
 def parse_exception(ex):
     '''Parse exception code and yield useful information.'''
@@ -84,6 +95,9 @@ def translate_exception(func):
     def invoke_with_catch(driver, *args, **kwargs):
         try:
             return func(driver, *args, **kwargs)
+        except senlin_exc.SenlinException:
+            # Already translated, e.g. raised when waiting for a resource
+            raise
         except Exception as ex:
             LOG.exception(ex)
             raise parse_exception(ex)
@@ -114,6 +128,87 @@ def create_connection(params=None):
     return conn
 
 
+class ConnectionPool(object):
+    '''Connections shared by all drivers of an engine.
+
+    A connection is keyed by all its parameters, i.e. the identity service,
+    the trust or credential, the project and the region. The session of a
+    connection keeps its token, which is renewed when about to expire, and
+    the service catalog, so drivers getting a pooled connection don't need
+    to authenticate again. The least recently used connections are dropped
+    when the pool is full, as are those idle for too long.
+    '''
+
+    def __init__(self):
+        self._conns = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(params):
+        # Lists and dicts are turned into tuples, e.g. the list of trust IDs
+        # given to drivers by policies
+        key = utils.hashable(params)
+        try:
+            hash(key)
+        except TypeError:
+            LOG.warning(_LW('Connection parameters cannot be hashed, the '
+                            'connection is not pooled.'))
+            return None
+        return key
+
+    def _evict(self, now, size):
+        idle_timeout = CONF.connection_idle_timeout
+        if idle_timeout > 0:
+            # Connections are in the order they were last used
+            for key, (used, conn) in list(self._conns.items()):
+                if used + idle_timeout > now:
+                    break
+                del self._conns[key]
+        while len(self._conns) > size:
+            self._conns.popitem(last=False)
+
+    def get(self, params):
+        '''Get a connection, creating it if not in the pool.
+
+        :param params: A dict of the parameters of the connection.
+        :returns: A connection.
+        '''
+        size = CONF.connection_pool_size
+        key = self._key(params)
+        if size <= 0 or key is None:
+            return create_connection(dict(params))
+
+        with self._lock:
+            now = time.time()
+            self._evict(now, size)
+            entry = self._conns.pop(key, None)
+            if entry is not None:
+                self._conns[key] = (now, entry[1])
+                return entry[1]
+
+        # Creating the connection may switch green threads, so it is done
+        # out of the lock. A connection created meanwhile is replaced.
+        conn = create_connection(dict(params))
+        with self._lock:
+            now = time.time()
+            self._conns.pop(key, None)
+            self._conns[key] = (now, conn)
+            self._evict(now, size)
+        return conn
+
+    def clear(self):
+        with self._lock:
+            self._conns.clear()
+
+
+_pool = ConnectionPool()
+
+
+def get_connection(params):
+    '''Get a connection shared by the drivers using the same parameters.'''
+    return _pool.get(params or {})
+
+
 def authenticate(**kwargs):
     '''Authenticate using openstack sdk based on user credential'''
 
@@ -121,7 +216,8 @@ def authenticate(**kwargs):
     access_info = {
         'token': conn.session.get_token(),
         'user_id': conn.session.get_user_id(),
-        'project_id': conn.session.get_project_id()
+        'project_id': conn.session.get_project_id(),
+        'expires_at': conn.session.auth.get_access(conn.session).expires
     }
 
     return access_info
@@ -21,6 +21,7 @@ from senlin.common import context as req_context
 from senlin.common import exception
 from senlin.common.i18n import _
 from senlin.common.i18n import _LE
+from senlin.common import waiter
 from senlin.db import api as db_api
 from senlin.engine import cluster_policy as cp_mod
 from senlin.engine import event as EVENT
@@ -70,6 +71,15 @@ class Action(object):
         'CANCEL', 'SUSPEND', 'RESUME',
     )
 
+    # Actions are loaded in large numbers when listed, so we don't give them
+    # a per-instance __dict__. Subclasses must declare their own __slots__.
+    __slots__ = (
+        'id', 'name', 'context', 'description', 'action', 'target', 'cause',
+        'owner', 'interval', 'start_time', 'end_time', 'timeout', 'status',
+        'status_reason', 'inputs', 'outputs', 'depends_on', 'depended_by',
+        'created_time', 'updated_time', 'deleted_time', 'data',
+    )
+
     def __new__(cls, target, action, context=None, **kwargs):
         if (cls != Action):
             return super(Action, cls).__new__(cls)
@@ -485,6 +495,8 @@ def ActionProc(context, action_id):
 
     reason = 'Action completed'
     success = True
+    # Waits on cloud resources made by this thread are owned by the action
+    waiter.bind_action(action)
     try:
         # Step 2: execute the action
         result, reason = action.execute()
@@ -501,5 +513,6 @@ def ActionProc(context, action_id):
     finally:
         # NOTE: locks on action is eventually released here by status update
         action.set_status(result, reason)
+        waiter.bind_action(None)
 
     return success
@@ -14,28 +14,38 @@ import copy
 import eventlet
 import random
 
+from oslo_config import cfg
 from oslo_log import log as logging
+import six
 
 from senlin.common import consts
 from senlin.common import exception
 from senlin.common.i18n import _
+from senlin.common.i18n import _LW
 from senlin.common import scaleutils
 from senlin.db import api as db_api
 from senlin.engine.actions import base
 from senlin.engine import cluster as cluster_mod
 from senlin.engine import dispatcher
 from senlin.engine import event as EVENT
+from senlin.engine import fanout
 from senlin.engine import node as node_mod
 from senlin.engine import scheduler
 from senlin.engine import senlin_lock
 from senlin.policies import base as policy_mod
+from senlin.profiles import base as profile_base
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_opt('enable_bulk_create', 'senlin.common.config')
+
 
 class ClusterAction(base.Action):
     """An action that can be performed on a cluster."""
 
+    __slots__ = ('cluster',)
+
     ACTIONS = (
         CLUSTER_CREATE, CLUSTER_DELETE, CLUSTER_UPDATE,
         CLUSTER_ADD_NODES, CLUSTER_DEL_NODES,
@@ -66,11 +76,58 @@ class ClusterAction(base.Action):
         except Exception:
             self.cluster = None
 
-    def _wait_for_dependents(self):
+    def _start_dependents(self, action_ids, running=0):
+        """Start derived actions as far as the window of the cluster allows.
+
+        :param action_ids: IDs of derived actions not started yet. The IDs of
+                           the actions started are removed from the list.
+        :param running: Number of derived actions still running.
+        :returns: Number of derived actions running after the start.
+        """
+        window = fanout.sync_window(self.context, self.target)
+        active = running
+        if window.size > 0:
+            # Other actions on the cluster may have derived actions running
+            active = max(running, db_api.action_count_running_by_cluster(
+                self.context, self.target))
+        count = window.available(active)
+        if count is None:
+            count = len(action_ids)
+
+        for action_id in action_ids[:count]:
+            db_api.action_update(self.context, action_id,
+                                 {'status': self.READY})
+            dispatcher.start_action(action_id=action_id)
+
+        started = len(action_ids[:count])
+        del action_ids[:count]
+        return running + started
+
+    def _cancel_dependents(self, action_ids):
+        """Cancel derived actions which have not been started.
+
+        :param action_ids: IDs of derived actions not started yet.
+        """
+        for action_id in action_ids:
+            db_api.action_update(self.context, action_id,
+                                 {'status': self.CANCELLED,
+                                  'status_reason': _('Action not started.')})
+        del action_ids[:]
+
+    def _wait_for_dependents(self, pending=None):
         """Wait for dependent actions to complete.
 
+        :param pending: IDs of derived actions not started yet. They are
+                        started as the actions running complete, keeping the
+                        number of actions running within the window of the
+                        cluster.
         :returns: A tuple containing the result and the corresponding reason.
         """
+        if pending is None:
+            pending = []
+        window = fanout.get_window(self.target)
+        running = None
+
         status = self.get_status()
         reason = ''
         while status != self.READY:
@@ -78,6 +135,7 @@ class ClusterAction(base.Action):
                 reason = _('%(action)s [%(id)s] failed') % {
                     'action': self.action, 'id': self.id[:8]}
                 LOG.debug(reason)
+                self._cancel_dependents(pending)
                 return self.RES_ERROR, reason
 
             if self.is_cancelled():
@@ -86,6 +144,7 @@ class ClusterAction(base.Action):
                 reason = _('%(action)s [%(id)s] cancelled') % {
                     'action': self.action, 'id': self.id[:8]}
                 LOG.debug(reason)
+                self._cancel_dependents(pending)
                 return self.RES_CANCEL, reason
 
             if self.is_timeout():
@@ -93,8 +152,20 @@ class ClusterAction(base.Action):
                 reason = _('%(action)s [%(id)s] timeout') % {
                     'action': self.action, 'id': self.id[:8]}
                 LOG.debug(reason)
+                self._cancel_dependents(pending)
                 return self.RES_TIMEOUT, reason
 
+            if pending:
+                # All derived actions, started or not, are depended on until
+                # they complete, so the rest of them are still running.
+                action = db_api.action_get(self.context, self.id,
+                                           refresh=True)
+                depends_on = action.depends_on or []
+                still_running = max(len(depends_on) - len(pending), 0)
+                if running is not None and running > still_running:
+                    window.completed(running - still_running)
+                running = self._start_dependents(pending, still_running)
+
             # Continue waiting (with reschedule)
             scheduler.reschedule(self.id, 3)
             status = self.get_status()
@@ -114,6 +185,7 @@ class ClusterAction(base.Action):
         placement = self.data.get('placement', None)
 
         nodes = []
+        action_ids = []
         for m in range(count):
             index = db_api.cluster_next_index(self.context, self.cluster.id)
             kwargs = {
@@ -146,16 +218,17 @@ class ClusterAction(base.Action):
             action = base.Action(node.id, 'NODE_CREATE', **kwargs)
             action.store(self.context)
 
-            # Build dependency and make the new action ready
+            # Build dependency; the action is started when the window allows
             db_api.action_add_dependency(self.context, action.id, self.id)
-            db_api.action_update(self.context, action.id,
-                                 {'status': action.READY})
-
-            dispatcher.start_action(action_id=action.id)
+            action_ids.append(action.id)
 
         if count > 0:
+            if CONF.enable_bulk_create:
+                self._create_in_bulk(nodes)
+
             # Wait for cluster creation to complete
-            res, reason = self._wait_for_dependents()
+            self._start_dependents(action_ids)
+            res, reason = self._wait_for_dependents(action_ids)
             if res == self.RES_OK:
                 self.outputs['nodes_added'] = [n.id for n in nodes]
                 for node in nodes:
@@ -165,6 +238,40 @@ class ClusterAction(base.Action):
 
         return self.RES_OK, ''
 
+    def _create_in_bulk(self, nodes):
+        """Start creating the physical objects of new nodes in bulk.
+
+        Nodes sharing the same placement are handed to the profile together.
+        The NODE_CREATE actions of nodes assigned a physical object wait for
+        it, other nodes are created one by one as usual.
+
+        :param nodes: A list of nodes not created yet.
+        """
+        groups = {}
+        for node in nodes:
+            placement = node.data.get('placement') or {}
+            key = tuple(sorted(placement.items()))
+            groups.setdefault(key, []).append(node)
+
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            try:
+                created = profile_base.Profile.create_objects(self.context,
+                                                              group)
+            except Exception as ex:
+                LOG.warning(_LW('Failed in creating %(n)s nodes of cluster '
+                                '%(c)s in bulk: %(ex)s'),
+                            {'n': len(group), 'c': self.cluster.id,
+                             'ex': six.text_type(ex)})
+                continue
+
+            for node in group:
+                physical_id = created.get(node.id)
+                if physical_id:
+                    node.physical_id = physical_id
+                    node.store(self.context)
+
     def do_create(self):
         """Handler for CLUSTER_CREATE action.
 
@@ -203,9 +310,44 @@ class ClusterAction(base.Action):
 
         profile_id = self.inputs.get('new_profile_id')
 
-        for node in self.cluster.nodes:
+        # A batch policy, if attached, provides the batches of nodes to be
+        # updated and the pause between them. Otherwise all nodes are updated
+        # in a single batch.
+        pu = self.data.get('update', None)
+        if pu is not None:
+            plan = pu.get('plan', [])
+            pause_time = pu.get('pause_time', 0)
+        else:
+            plan = [self.cluster.node_ids]
+            pause_time = 0
+
+        batches = [batch for batch in plan if batch]
+        for index, batch in enumerate(batches):
+            if index > 0 and pause_time > 0:
+                scheduler.reschedule(self.id, pause_time)
+
+            result, new_reason = self._update_nodes(profile_id, batch)
+            if result != self.RES_OK:
+                self.cluster.set_status(self.context, self.cluster.WARNING,
+                                        new_reason)
+                return result, new_reason
+
+        reason = _('Cluster update completed.')
+        self.cluster.set_status(self.context, self.cluster.ACTIVE, reason,
+                                profile_id=profile_id)
+        return self.RES_OK, reason
+
+    def _update_nodes(self, profile_id, node_ids):
+        """Update a batch of nodes and wait for them to complete.
+
+        :param profile_id: ID of the new profile, or None.
+        :param node_ids: IDs of the nodes to update.
+        :returns: A tuple containing the result and the corresponding reason.
+        """
+        action_ids = []
+        for node_id in node_ids:
             kwargs = {
-                'name': 'node_update_%s' % node.id[:8],
+                'name': 'node_update_%s' % node_id[:8],
                 'cause': base.CAUSE_DERIVED,
                 'inputs': {
                     'new_profile_id': profile_id,
@@ -214,27 +356,14 @@ class ClusterAction(base.Action):
                 'project': self.context.project,
                 'domain': self.context.domain,
             }
-            action = base.Action(node.id, 'NODE_UPDATE', **kwargs)
+            action = base.Action(node_id, 'NODE_UPDATE', **kwargs)
             action.store(self.context)
 
             db_api.action_add_dependency(self.context, action.id, self.id)
-            db_api.action_update(self.context, action.id,
-                                 {'status': action.READY})
-            dispatcher.start_action(action_id=action.id)
-
-        # Wait for nodes to complete update
-        if len(self.cluster.nodes) > 0:
-            result, new_reason = self._wait_for_dependents()
-
-            if result != self.RES_OK:
-                self.cluster.set_status(self.context, self.cluster.WARNING,
-                                        new_reason)
-                return result, new_reason
+            action_ids.append(action.id)
 
-        reason = _('Cluster update completed.')
-        self.cluster.set_status(self.context, self.cluster.ACTIVE, reason,
-                                profile_id=profile_id)
-        return self.RES_OK, reason
+        self._start_dependents(action_ids)
+        return self._wait_for_dependents(action_ids)
 
     def _delete_nodes(self, node_ids):
         action_name = consts.NODE_DELETE
@@ -245,6 +374,7 @@ class ClusterAction(base.Action):
             if not destroy:
                 action_name = consts.NODE_LEAVE
 
+        action_ids = []
         for node_id in node_ids:
             kwargs = {
                 'name': 'node_delete_%s' % node_id[:8],
@@ -256,15 +386,13 @@ class ClusterAction(base.Action):
             action = base.Action(node_id, action_name, **kwargs)
             action.store(self.context)
 
-            # Build dependency and make the new action ready
+            # Build dependency; the action is started when the window allows
             db_api.action_add_dependency(self.context, action.id, self.id)
-            db_api.action_update(self.context, action.id,
-                                 {'status': action.READY})
-
-            dispatcher.start_action(action_id=action.id)
+            action_ids.append(action.id)
 
         if len(node_ids) > 0:
-            res, reason = self._wait_for_dependents()
+            self._start_dependents(action_ids)
+            res, reason = self._wait_for_dependents(action_ids)
             if res == self.RES_OK:
                 self.outputs['nodes_removed'] = node_ids
                 for node_id in node_ids:
@@ -284,7 +412,7 @@ class ClusterAction(base.Action):
         """
         reason = _('Deletion in progress.')
         self.cluster.set_status(self.context, self.cluster.DELETING, reason)
-        node_ids = [node.id for node in self.cluster.nodes]
+        node_ids = self.cluster.node_ids
 
         # For cluster delete, we delete the nodes
         data = {
@@ -299,6 +427,7 @@ class ClusterAction(base.Action):
             res = self.cluster.do_delete(self.context)
             if not res:
                 return self.RES_ERROR, _('Cannot delete cluster object.')
+            fanout.drop_window(self.cluster.id)
         elif result == self.RES_CANCEL:
             self.cluster.set_status(self.context, self.cluster.ACTIVE, reason)
         elif result in [self.RES_TIMEOUT, self.RES_ERROR]:
@@ -341,6 +470,7 @@ class ClusterAction(base.Action):
 
         reason = _('Completed adding nodes.')
 
+        action_ids = []
         for node in nodes:
             kwargs = {
                 'name': 'node_join_%s' % node.id[:8],
@@ -353,12 +483,11 @@ class ClusterAction(base.Action):
             action = base.Action(node.id, 'NODE_JOIN', **kwargs)
             action.store(self.context)
             db_api.action_add_dependency(self.context, action.id, self.id)
-            db_api.action_update(self.context, action.id,
-                                 {'status': action.READY})
-            dispatcher.start_action(action_id=action.id)
+            action_ids.append(action.id)
 
         # Wait for dependent action if any
-        result, new_reason = self._wait_for_dependents()
+        self._start_dependents(action_ids)
+        result, new_reason = self._wait_for_dependents(action_ids)
         if result != self.RES_OK:
             reason = new_reason
         else:
@@ -501,7 +630,7 @@ class ClusterAction(base.Action):
 
         # check provided params against current properties
         # desired is checked when strict is True
-        curr_size = len(self.cluster.nodes)
+        curr_size = len(self.cluster.node_ids)
         new_size = curr_size + count
 
         result = scaleutils.check_size_params(self.cluster, new_size,
@@ -547,7 +676,8 @@ class ClusterAction(base.Action):
 
         # check provided params against current properties
         # desired is checked when strict is True
-        curr_size = len(self.cluster.nodes)
+        node_ids = self.cluster.node_ids
+        curr_size = len(node_ids)
         if count > curr_size:
             LOG.warning(_('Triming count (%(count)s) to current cluster size '
                           '(%(curr)s) for scaling in'),
@@ -562,7 +692,7 @@ class ClusterAction(base.Action):
 
         # Choose victims randomly
         if len(candidates) == 0:
-            ids = [node.id for node in self.cluster.nodes]
+            ids = list(node_ids)
             i = count
             while i > 0:
                 r = random.randrange(len(ids))
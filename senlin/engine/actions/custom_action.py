@@ -15,6 +15,8 @@ from senlin.engine.actions import base
 
 
 class CustomAction(base.Action):
+    __slots__ = ()
+
     ACTIONS = (
         ACTION_EXECUTE,
     ) = (
@@ -27,6 +27,8 @@ LOG = logging.getLogger(__name__)
 class NodeAction(base.Action):
     """An action that can be performed on a cluster member (node)."""
 
+    __slots__ = ('node',)
+
     ACTIONS = (
         NODE_CREATE, NODE_DELETE, NODE_UPDATE,
         NODE_JOIN, NODE_LEAVE,
@@ -10,6 +10,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import timeutils
@@ -83,35 +85,31 @@ class Cluster(object):
         self.data = kwargs.get('data', {})
         self.metadata = kwargs.get('metadata') or {}
 
-        # rt is a dict for runtime data
-        # TODO(Qiming): nodes have to be reloaded when membership changes
+        # rt is a dict for runtime data, each entry of which is populated
+        # lazily on first access. Node membership is kept in a dict keyed by
+        # node ID so that membership changes can be applied incrementally.
         self.rt = {
             'profile': None,
-            'nodes': [],
-            'policies': []
+            'nodes': None,
+            'policies': None,
         }
+        self._context = context
 
-        if context is not None:
-            self._load_runtime_data(context)
+    def _runtime_loadable(self):
+        """Check whether runtime data can be retrieved from database."""
+        return (self._context is not None and self.id is not None and
+                self.deleted_time is None)
 
     def _load_runtime_data(self, context):
-        if self.id is None or self.deleted_time is not None:
-            return
-
-        policies = []
-        bindings = db_api.cluster_policy_get_all(context, self.id)
-        for b in bindings:
-            # Detect policy type conflicts
-            policy = policy_base.Policy.load(context, b.policy_id)
-            policies.append(policy)
+        """Reset runtime data so that it will be reloaded on demand.
 
+        :param context: The context to be used for subsequent DB accesses.
+        """
+        self._context = context
         self.rt = {
-            # TODO(Yanyan Hu): Use permission to control access privilege
-            # of profile.
-            'profile': profile_base.Profile.load(context, self.profile_id,
-                                                 project_safe=False),
-            'nodes': node_mod.Node.load_all(context, cluster_id=self.id),
-            'policies': policies
+            'profile': None,
+            'nodes': None,
+            'policies': None,
         }
 
     def store(self, context):
@@ -147,14 +145,17 @@ class Cluster(object):
             values['updated_time'] = timestamp
             db_api.cluster_update(context, self.id, values)
             event_mod.info(context, self, 'update')
+            # Membership is not affected by a store but profile may be.
+            self._context = context
+            self.rt['profile'] = None
         else:
             self.init_time = timestamp
             values['init_time'] = timestamp
             cluster = db_api.cluster_create(context, values)
             self.id = cluster.id
             event_mod.info(context, self, 'create')
+            self._load_runtime_data(context)
 
-        self._load_runtime_data(context)
         return self.id
 
     @classmethod
@@ -239,11 +240,11 @@ class Cluster(object):
             'status_reason': self.status_reason,
             'metadata': self.metadata,
             'data': self.data,
-            'nodes': [node.id for node in self.rt['nodes']],
-            'policies': [policy.id for policy in self.rt['policies']],
+            'nodes': self.node_ids,
+            'policies': [policy.id for policy in self.policies],
         }
-        if self.rt['profile']:
-            info['profile_name'] = self.rt['profile'].name
+        if self.profile:
+            info['profile_name'] = self.profile.name
         else:
             info['profile_name'] = None
 
@@ -287,6 +288,7 @@ class Cluster(object):
         if 'profile_id' in values:
             self.rt['profile'] = profile_base.Profile.load(context,
                                                            self.profile_id)
+            self._context = context
         db_api.cluster_update(context, self.id, values)
         return
 
@@ -332,7 +334,7 @@ class Cluster(object):
 
         policy = policy_base.Policy.load(ctx, policy_id)
         # Check if policy has already been attached
-        for existing in self.rt['policies']:
+        for existing in self.policies:
             # Policy already attached
             if existing.id == policy_id:
                 return True, _('Policy already attached.')
@@ -365,7 +367,7 @@ class Cluster(object):
         cp.store(ctx)
 
         # refresh cached runtime
-        self.rt['policies'].append(policy)
+        self.policies.append(policy)
 
         return True, _('Policy attached.')
 
@@ -432,30 +434,81 @@ class Cluster(object):
             return res, reason
 
         db_api.cluster_policy_detach(ctx, self.id, policy_id)
-        self.rt['policies'].remove(found)
+        self.policies.remove(found)
 
         return True, _('Policy detached.')
 
     @property
-    def nodes(self):
+    def profile(self):
+        """The profile object used by the cluster, loaded on demand."""
+        if self.rt['profile'] is None and self._runtime_loadable():
+            # TODO(Yanyan Hu): Use permission to control access privilege
+            # of profile.
+            self.rt['profile'] = profile_base.Profile.load(
+                self._context, self.profile_id, project_safe=False)
+        return self.rt['profile']
+
+    def _load_nodes(self):
+        """Get the membership dict of the cluster, loading it if needed.
+
+        :returns: An ordered dict of member nodes keyed by node ID.
+        """
+        if self.rt['nodes'] is None:
+            self.rt['nodes'] = collections.OrderedDict()
+            if self._runtime_loadable():
+                for node in node_mod.Node.load_all(self._context,
+                                                   cluster_id=self.id):
+                    self.rt['nodes'][node.id] = node
+
         return self.rt['nodes']
 
+    @property
+    def nodes(self):
+        return list(self._load_nodes().values())
+
+    @property
+    def node_ids(self):
+        """IDs of member nodes, without loading the node objects if possible.
+        """
+        if self.rt['nodes'] is None and self._runtime_loadable():
+            return db_api.node_ids_by_cluster(self._context, self.id)
+        return list(self._load_nodes().keys())
+
     def add_node(self, node):
         """Append specified node to the cluster cache.
 
+        Adding a node that is already cached refreshes its cache entry.
+        If membership data has not been loaded yet, this is a no-op because
+        the node will be found in database when membership is loaded.
+
         :param node: The node to become a new member of the cluster.
         """
-        self.rt['nodes'].append(node)
+        if self.rt['nodes'] is None and self._runtime_loadable():
+            return
+
+        self._load_nodes()[node.id] = node
 
     def remove_node(self, node_id):
         """Remove node with specified ID from cache.
 
         :param node_id: ID of the node to be removed from cache.
         """
-        for node in self.rt['nodes']:
-            if node.id == node_id:
-                self.rt['nodes'].remove(node)
+        if self.rt['nodes'] is None:
+            return
+
+        self.rt['nodes'].pop(node_id, None)
 
     @property
     def policies(self):
+        if self.rt['policies'] is None:
+            policies = []
+            if self._runtime_loadable():
+                bindings = db_api.cluster_policy_get_all(self._context,
+                                                         self.id)
+                for b in bindings:
+                    policy = policy_base.Policy.load(self._context,
+                                                     b.policy_id)
+                    policies.append(policy)
+            self.rt['policies'] = policies
+
         return self.rt['policies']
@@ -22,9 +22,9 @@ from senlin.common import messaging as rpc_messaging
 LOG = logging.getLogger(__name__)
 
 OPERATIONS = (
-    START_ACTION, CANCEL_ACTION, STOP
+    START_ACTION, CANCEL_ACTION, STOP,
 ) = (
-    'start_action', 'cancel_action', 'stop'
+    'start_action', 'cancel_action', 'stop',
 )
 
 
@@ -10,11 +10,16 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 import logging
 
+from oslo_config import cfg
 from oslo_log import log
 from oslo_utils import timeutils
+from oslo_utils import uuidutils
 
+from senlin.common import context as senlin_context
+from senlin.common import event_hub
 from senlin.common import exception
 from senlin.common import i18n
 from senlin.common import utils
@@ -28,10 +33,26 @@ _ = i18n._
 
 LOG = log.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_opt('event_min_level', 'senlin.common.config')
+CONF.import_opt('event_batch_size', 'senlin.common.config')
+CONF.import_opt('event_flush_interval', 'senlin.common.config')
+
+# The event writer of this engine, if any, see start_writer()
+_writer = None
+
 
 class Event(object):
     '''Class capturing an interesting happening in Senlin.'''
 
+    # Events are listed in large numbers, so we don't give them a
+    # per-instance __dict__.
+    __slots__ = (
+        'timestamp', 'level', 'id', 'user', 'project', 'domain', 'action',
+        'status', 'status_reason', 'deleted_time', 'obj_id', 'obj_type',
+        'obj_name', 'cluster_id', 'metadata',
+    )
+
     def __init__(self, timestamp, level, entity=None, **kwargs):
         self.timestamp = timestamp
         self.level = level
@@ -39,6 +60,7 @@ class Event(object):
         self.id = kwargs.get('id', None)
         self.user = kwargs.get('user', None)
         self.project = kwargs.get('project', None)
+        self.domain = kwargs.get('domain', None)
 
         self.action = kwargs.get('action', None)
         self.status = kwargs.get('status', None)
@@ -112,21 +134,22 @@ class Event(object):
     @classmethod
     def load_all(cls, context, filters=None, limit=None, marker=None,
                  sort_keys=None, sort_dir=None, project_safe=True,
-                 show_deleted=False):
+                 show_deleted=False, start_time=None, end_time=None):
         '''Retrieve all events from database.'''
 
         records = db_api.event_get_all(context, limit=limit, marker=marker,
                                        sort_keys=sort_keys, sort_dir=sort_dir,
                                        filters=filters,
                                        project_safe=project_safe,
-                                       show_deleted=show_deleted)
+                                       show_deleted=show_deleted,
+                                       start_time=start_time,
+                                       end_time=end_time)
 
         for record in records:
             yield cls.from_db_record(record)
 
-    def store(self, context):
-        '''Store the event into database and return its ID.'''
-        values = {
+    def _to_db_values(self):
+        return {
             'level': self.level,
             'timestamp': self.timestamp,
             'obj_id': self.obj_id,
@@ -142,7 +165,9 @@ class Event(object):
             'meta_data': self.metadata,
         }
 
-        event = db_api.event_create(context, values)
+    def store(self, context):
+        '''Store the event into database and return its ID.'''
+        event = db_api.event_create(context, self._to_db_values())
         self.id = event.id
 
         return self.id
@@ -173,13 +198,153 @@ class Event(object):
         return evt
 
 
+class EventWriter(object):
+    '''Write-behind buffer for saving events into database.
+
+    Events are queued in memory and written with one multi-row INSERT when
+    the queue is full or when flush() is invoked, which is expected to be
+    done periodically and when the engine stops. A producer that fills up
+    the queue does the flush itself, so the queue never grows beyond the
+    batch size. When the INSERT fails, e.g. because of a single bad event,
+    the events are saved one by one so that only failing ones are lost.
+    '''
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self._queue = collections.deque()
+        self.context = senlin_context.RequestContext(is_admin=True)
+
+    def put(self, event):
+        if event.id is None:
+            event.id = uuidutils.generate_uuid()
+        self._queue.append(event)
+
+        if len(self._queue) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        '''Write all queued events into database and publish them.'''
+        events = []
+        while self._queue:
+            events.append(self._queue.popleft())
+
+        if not events:
+            return
+
+        values_list = []
+        for event in events:
+            values = event._to_db_values()
+            values['id'] = event.id
+            values_list.append(values)
+
+        try:
+            db_api.event_create_batch(self.context, values_list)
+        except Exception as ex:
+            LOG.warning(_LW('Failed to save %(count)s events at once, saving '
+                            'them one by one: %(ex)s'),
+                        {'count': len(values_list), 'ex': ex})
+            events = self._save_each(events, values_list)
+            if not events:
+                return
+
+        _rollup(self.context, events)
+        _publish(self.context, events)
+
+    def _save_each(self, events, values_list):
+        '''Save events with one INSERT each, returning the events saved.'''
+        saved = []
+        for event, values in zip(events, values_list):
+            try:
+                db_api.event_create(self.context, values)
+            except Exception as ex:
+                LOG.error(_LE('Failed to save event %(id)s: %(ex)s'),
+                          {'id': event.id, 'ex': ex})
+                continue
+            saved.append(event)
+        return saved
+
+    def __len__(self):
+        return len(self._queue)
+
+
+def start_writer(tg):
+    '''Start buffering events for this engine.
+
+    :param tg: The thread group manager used for periodic flushing.
+    :returns: The event writer started, or None if buffering is disabled.
+    '''
+    global _writer
+
+    if CONF.event_batch_size <= 0:
+        return None
+
+    _writer = EventWriter(CONF.event_batch_size)
+    tg.add_timer(CONF.event_flush_interval, _writer.flush)
+    return _writer
+
+
+def stop_writer():
+    '''Stop buffering events and write the queued ones into database.'''
+    global _writer
+
+    writer, _writer = _writer, None
+    if writer is not None:
+        writer.flush()
+
+
+def _rollup(context, events):
+    '''Add saved events to the hourly event counts.'''
+    counts = collections.Counter()
+    for event in events:
+        bucket = event.timestamp.replace(minute=0, second=0, microsecond=0)
+        key = (bucket, event.project or '', event.cluster_id or '',
+               (event.action or '')[:36], int(event.level),
+               (event.status or '')[:36])
+        counts[key] += 1
+
+    keys = ('bucket', 'project', 'cluster_id', 'action', 'level', 'status')
+    values_list = []
+    for key, count in counts.items():
+        values = dict(zip(keys, key))
+        values['count'] = count
+        values_list.append(values)
+
+    try:
+        db_api.event_rollup_update(context, values_list)
+    except Exception as ex:
+        LOG.warning(_LW('Failed to update counts of %(count)s events: %(ex)s'),
+                    {'count': len(events), 'ex': ex})
+
+
+def _publish(context, events):
+    '''Notify event watchers on all engines of saved events.'''
+    try:
+        event_hub.publish_events(context, [e.to_dict() for e in events])
+    except Exception as ex:
+        LOG.warning(_LW('Failed to publish %(count)s events: %(ex)s'),
+                    {'count': len(events), 'ex': ex})
+
+
+def _dump(context, event):
+    '''Save an event unless its level is below the configured minimum.'''
+    if event.level < logging.getLevelName(CONF.event_min_level):
+        return
+
+    if _writer is not None:
+        _writer.put(event)
+    else:
+        event.store(context)
+        _rollup(context, [event])
+        _publish(context, [event])
+
+
 def critical(context, entity, action, status=None, status_reason=None,
              timestamp=None):
     timestamp = timestamp or timeutils.utcnow()
     event = Event(timestamp, logging.CRITICAL, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user, project=context.project)
-    event.store(context)
+    _dump(context, event)
     LOG.critical(_LC('%(name)s [%(id)s] - %(status)s: %(reason)s'),
                  {'name': event.obj_name,
                   'id': event.obj_id and event.obj_id[:8],
@@ -193,7 +358,7 @@ def error(context, entity, action, status=None, status_reason=None,
     event = Event(timestamp, logging.ERROR, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user, project=context.project)
-    event.store(context)
+    _dump(context, event)
     LOG.error(_LE('%(name)s [%(id)s] %(action)s - %(status)s: %(reason)s'),
               {'name': event.obj_name,
                'id': event.obj_id and event.obj_id[:8],
@@ -208,7 +373,7 @@ def warning(context, entity, action, status=None, status_reason=None,
     event = Event(timestamp, logging.WARNING, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user, project=context.project)
-    event.store(context)
+    _dump(context, event)
     LOG.warning(_LW('%(name)s [%(id)s] %(action)s - %(status)s: %(reason)s'),
                 {'name': event.obj_name,
                  'id': event.obj_id and event.obj_id[:8],
@@ -223,7 +388,7 @@ def info(context, entity, action, status=None, status_reason=None,
     event = Event(timestamp, logging.INFO, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user, project=context.project)
-    event.store(context)
+    _dump(context, event)
     LOG.info(_LI('%(name)s [%(id)s] %(action)s - %(status)s: %(reason)s'),
              {'name': event.obj_name,
               'id': event.obj_id and event.obj_id[:8],
@@ -238,7 +403,7 @@ def debug(context, entity, action, status=None, status_reason=None,
     event = Event(timestamp, logging.DEBUG, entity,
                   action=action, status=status, status_reason=status_reason,
                   user=context.user, project=context.project)
-    event.store(context)
+    _dump(context, event)
     LOG.debug(_('%(name)s [%(id)s] %(action)s - %(status)s: %(reason)s'),
               {'name': event.obj_name,
                'id': event.obj_id and event.obj_id[:8],
@@ -0,0 +1,308 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+import datetime
+import gzip
+import json
+import os
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import timeutils
+import six
+
+from senlin.common import consts
+from senlin.common import context as senlin_context
+from senlin.common import event_hub
+from senlin.common.i18n import _LI
+from senlin.db import api as db_api
+from senlin.engine import event as event_mod
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_opt('event_archive_dir', 'senlin.common.config')
+CONF.import_opt('event_archive_age', 'senlin.common.config')
+
+INDEX_FILE = 'index.json'
+
+# Number of events moved from database to archive in one round
+BATCH_SIZE = 1000
+
+DAY_FORMAT = '%Y-%m-%d'
+
+RECORD_KEYS = (
+    'id', 'timestamp', 'level', 'obj_id', 'obj_type', 'obj_name',
+    'cluster_id', 'user', 'project', 'action', 'status', 'status_reason',
+    'deleted_time', 'meta_data',
+)
+
+SORT_KEYS = (
+    consts.EVENT_TIMESTAMP, consts.EVENT_LEVEL, consts.EVENT_OBJ_TYPE,
+    consts.EVENT_OBJ_NAME, consts.EVENT_USER, consts.EVENT_ACTION,
+)
+
+
+def _dump_time(value):
+    return value.isoformat() if value else None
+
+
+def _load_time(value):
+    if not value:
+        return None
+    return timeutils.normalize_time(timeutils.parse_isotime(value))
+
+
+class EventArchive(object):
+    '''Day-partitioned archive of events on local disk.
+
+    Events of one day are saved into a gzip compressed JSON-lines segment
+    named after the day. An index file records the clusters covered by each
+    segment, so that a query only reads the segments that may contain
+    matching events. The index also records the horizon, i.e. the time
+    before which events have been moved out of database.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self.path, INDEX_FILE)) as f:
+                    self._index = json.load(f)
+            except IOError:
+                self._index = {'horizon': None, 'segments': {}}
+        return self._index
+
+    @property
+    def horizon(self):
+        return _load_time(self.index['horizon'])
+
+    def _save_index(self):
+        index_path = os.path.join(self.path, INDEX_FILE)
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.rename(tmp_path, index_path)
+
+    def _segment_path(self, day):
+        return os.path.join(self.path, '%s.jsonl.gz' % day)
+
+    def _write_segment(self, day, records):
+        # A gzip file can have multiple members, so a segment is appended to
+        # when more events of the same day are archived later.
+        with gzip.open(self._segment_path(day), 'ab') as f:
+            for record in records:
+                f.write(json.dumps(record).encode('utf-8') + b'\n')
+
+        segment = self.index['segments'].setdefault(
+            day, {'clusters': [], 'count': 0})
+        clusters = set(segment['clusters'])
+        clusters.update(r['cluster_id'] for r in records if r['cluster_id'])
+        segment['clusters'] = sorted(clusters)
+        segment['count'] += len(records)
+
+    def archive(self, context, before):
+        '''Move events generated before the given time into the archive.
+
+        :param context: The context used for DB operations.
+        :param before: A datetime in UTC.
+        :returns: The number of events archived.
+        '''
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+        count = 0
+        while True:
+            records = db_api.event_get_all(context, limit=BATCH_SIZE,
+                                           sort_keys=[consts.EVENT_TIMESTAMP],
+                                           sort_dir='asc',
+                                           project_safe=False,
+                                           show_deleted=True,
+                                           end_time=before)
+            if not records:
+                break
+
+            days = collections.OrderedDict()
+            for record in records:
+                values = dict((k, getattr(record, k)) for k in RECORD_KEYS)
+                values['timestamp'] = _dump_time(record.timestamp)
+                values['deleted_time'] = _dump_time(record.deleted_time)
+                day = record.timestamp.strftime(DAY_FORMAT)
+                days.setdefault(day, []).append(values)
+
+            for day, values_list in days.items():
+                self._write_segment(day, values_list)
+            self._save_index()
+
+            db_api.event_delete_by_ids(context, [r.id for r in records])
+            count += len(records)
+
+        horizon = self.horizon
+        if horizon is None or before > horizon:
+            self.index['horizon'] = _dump_time(before)
+            self._save_index()
+
+        LOG.info(_LI('Archived %(count)s events generated before %(time)s.'),
+                 {'count': count, 'time': before})
+        return count
+
+    def query(self, filters=None, start_time=None, end_time=None,
+              project=None, show_deleted=False, sort_dir=None):
+        '''Retrieve archived events.
+
+        :param filters: A dict of event properties to match.
+        :param start_time: Only events generated at or after this time are
+                           returned if specified.
+        :param end_time: Only events generated before this time are
+                         returned if specified.
+        :param project: Only events of this project are returned if
+                        specified.
+        :param show_deleted: Whether soft-deleted events are returned.
+        :param sort_dir: Either 'asc' or 'desc' for events sorted by time and
+                         ID. Segments are then read one at a time in this
+                         order, so that a caller can stop reading as soon as
+                         it has got enough events.
+        :returns: A generator of event objects.
+        '''
+        filters = filters or {}
+        cluster_ids = filters.get('cluster_id')
+        if cluster_ids is not None and not isinstance(cluster_ids, list):
+            cluster_ids = [cluster_ids]
+
+        one_day = datetime.timedelta(days=1)
+        segments = self.index['segments']
+        for day in sorted(segments, reverse=(sort_dir == 'desc')):
+            day_start = datetime.datetime.strptime(day, DAY_FORMAT)
+            if start_time is not None and day_start + one_day <= start_time:
+                continue
+            if end_time is not None and day_start >= end_time:
+                continue
+            if (cluster_ids is not None and
+                    not set(cluster_ids) & set(segments[day]['clusters'])):
+                continue
+
+            events = self._read_segment(day, filters, start_time, end_time,
+                                        project, show_deleted)
+            if sort_dir is not None:
+                # Events of a day are all in the segment of the day
+                events = sorted(events, key=lambda e: (e.timestamp, e.id),
+                                reverse=(sort_dir == 'desc'))
+            for event in events:
+                yield event
+
+    def _read_segment(self, day, filters, start_time, end_time, project,
+                      show_deleted):
+        with gzip.open(self._segment_path(day), 'rb') as f:
+            for line in f:
+                values = json.loads(line.decode('utf-8'))
+                event = self._match(values, filters, start_time, end_time,
+                                    project, show_deleted)
+                if event is not None:
+                    yield event
+
+    def _match(self, values, filters, start_time, end_time, project,
+               show_deleted):
+        if project is not None and values['project'] != project:
+            return None
+        if not show_deleted and values['deleted_time']:
+            return None
+        if not event_hub.match_filters(values, filters):
+            return None
+
+        timestamp = _load_time(values['timestamp'])
+        if start_time is not None and timestamp < start_time:
+            return None
+        if end_time is not None and timestamp >= end_time:
+            return None
+
+        return event_mod.Event(
+            timestamp, values['level'], id=values['id'],
+            obj_id=values['obj_id'], obj_type=values['obj_type'],
+            obj_name=values['obj_name'], cluster_id=values['cluster_id'],
+            user=values['user'], project=values['project'],
+            action=values['action'], status=values['status'],
+            status_reason=values['status_reason'],
+            deleted_time=_load_time(values['deleted_time']),
+            metadata=values['meta_data'])
+
+
+def get_archive():
+    '''Get the event archive, or None if archiving is not enabled.'''
+    if not CONF.event_archive_dir:
+        return None
+    return EventArchive(CONF.event_archive_dir)
+
+
+def archive_events(age=None):
+    '''Archive events older than the given number of days.
+
+    Events are archived by whole days, so the cut-off time is the start of
+    the day which is the given number of days ago.
+
+    :param age: Number of days; defaults to the event_archive_age option.
+    :returns: The number of events archived.
+    '''
+    archive = get_archive()
+    if archive is None:
+        return 0
+
+    if age is None:
+        age = CONF.event_archive_age
+    before = timeutils.utcnow() - datetime.timedelta(days=int(age))
+    before = before.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    context = senlin_context.RequestContext(is_admin=True)
+    return archive.archive(context, before)
+
+
+def _sort_keys(sort_keys):
+    if isinstance(sort_keys, six.string_types):
+        sort_keys = [sort_keys]
+    keys = [k for k in sort_keys or [] if k in SORT_KEYS]
+    return (keys or [consts.EVENT_TIMESTAMP]) + ['id']
+
+
+def sorted_by_time(sort_keys):
+    '''Check whether events sorted by the given keys are in time order.'''
+    return _sort_keys(sort_keys)[0] == consts.EVENT_TIMESTAMP
+
+
+def sort_events(events, limit=None, marker=None, sort_keys=None,
+                sort_dir=None):
+    '''Sort and paginate events the same way as the database does.
+
+    :param events: A list of event objects.
+    :returns: A list of event objects.
+    '''
+    keys = _sort_keys(sort_keys)
+
+    def sort_key(event):
+        return [(getattr(event, k) is not None, getattr(event, k))
+                for k in keys]
+
+    events = sorted(events, key=sort_key, reverse=(sort_dir == 'desc'))
+
+    if marker is not None:
+        for i, event in enumerate(events):
+            if event.id == marker:
+                events = events[i + 1:]
+                break
+
+    if limit is not None:
+        events = events[:limit]
+
+    return events
@@ -0,0 +1,130 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Windows of derived actions running at the same time on clusters.
+
+A window is kept in memory by the engine running the parent action. The
+derived NODE_* actions may run on other engines, so rate limits met by them
+are counted in the cluster record in database, from which the parent action
+picks them up each time it starts more derived actions. Derived actions of
+all parent actions on a cluster count against the window of each parent.
+'''
+
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from senlin.common.i18n import _LI
+from senlin.db import api as db_api
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_opt('max_actions_per_batch', 'senlin.common.config')
+
+# HTTP status codes with which cloud services reject requests for exceeding
+# their rate limits
+RATE_LIMIT_CODES = (413, 429)
+
+
+class Window(object):
+    '''Limit of derived actions running at the same time on a cluster.
+
+    The limit starts at `max_actions_per_batch`. It is halved each time a
+    driver is rate limited while working on the cluster and then grows back
+    by one for every limit's worth of actions completed.
+    '''
+
+    def __init__(self, size):
+        self.size = size
+        self.limit = size
+        self.credit = 0
+        # Number of rate limits recorded for the cluster when last synced
+        self.reported = None
+
+    def throttled(self):
+        self.limit = max(self.limit // 2, 1)
+        self.credit = 0
+
+    def completed(self, count=1):
+        if self.limit >= self.size:
+            return
+        self.credit += count
+        while self.credit >= self.limit and self.limit < self.size:
+            self.credit -= self.limit
+            self.limit += 1
+
+    def available(self, running):
+        '''Get the number of actions which can be started.
+
+        :param running: Number of actions still running.
+        :returns: The number of actions to start, or None if not limited.
+        '''
+        if self.size <= 0:
+            return None
+        return max(self.limit - running, 0)
+
+
+_windows = {}
+
+
+def get_window(cluster_id):
+    '''Get the window of derived actions for a cluster.
+
+    :param cluster_id: ID of the cluster.
+    :returns: A `Window` object shared by all actions on the cluster.
+    '''
+    size = CONF.max_actions_per_batch
+    window = _windows.get(cluster_id)
+    if window is None or window.size != size:
+        window = Window(size)
+        _windows[cluster_id] = window
+    return window
+
+
+def report_throttled(context, cluster_id):
+    '''Record that a driver has been rate limited working on a cluster.
+
+    :param context: The context for accessing the database.
+    :param cluster_id: ID of the cluster, or None for orphan nodes.
+    '''
+    if cluster_id:
+        db_api.cluster_throttled_add(context, cluster_id)
+
+
+def sync_window(context, cluster_id):
+    '''Shrink the window of a cluster if rate limits have been recorded.
+
+    The window is halved once however many rate limits have been recorded
+    since it was last synced, as they are likely caused by the same burst
+    of requests.
+
+    :param context: The context for accessing the database.
+    :param cluster_id: ID of the cluster.
+    :returns: The `Window` object of the cluster.
+    '''
+    window = get_window(cluster_id)
+    if window.size <= 0:
+        return window
+    count = db_api.cluster_throttled_get(context, cluster_id)
+    if window.reported is not None and count > window.reported:
+        window.throttled()
+        LOG.info(_LI('Derived actions on cluster %(c)s limited to %(n)s '
+                     'after being rate limited.'),
+                 {'c': cluster_id, 'n': window.limit})
+    window.reported = count
+    return window
+
+
+def drop_window(cluster_id):
+    '''Forget the window of a cluster, e.g. when the cluster is deleted.'''
+    _windows.pop(cluster_id, None)
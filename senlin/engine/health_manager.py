@@ -16,15 +16,35 @@ Health Manager class.
 Health Manager is responsible for monitoring the health of the clusters and
 take corresponding actions to recover the clusters based on the pre-defined
 health policies.
+
+Clusters with a health policy attached are registered in the health registry.
+Each engine claims the registrations nobody owns, or owned by engines no
+longer alive, and checks the nodes of its clusters on the interval given by
+the policy. The result of the latest check of each node is kept in the node
+health table so that only changes of the health status are reported.
 '''
 
+import random
+import time
+
+import eventlet
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging
 from oslo_service import service
+from oslo_utils import timeutils
+import six
 
 from senlin.common import consts
+from senlin.common import context
+from senlin.common.i18n import _
+from senlin.common.i18n import _LE
+from senlin.common.i18n import _LW
 from senlin.common import messaging as rpc_messaging
+from senlin.db import api as db_api
+from senlin.engine import event as event_mod
+from senlin.engine import node as node_mod
+from senlin.profiles import base as profile_base
 
 health_mgr_opts = [
     cfg.IntOpt('periodic_interval_max',
@@ -38,6 +58,10 @@ health_mgr_opts = [
                help='Range of seconds to randomly delay when starting the'
                     ' periodic task scheduler to reduce stampeding.'
                     ' (Disable by setting to 0)'),
+    cfg.IntOpt('health_check_concurrency',
+               default=50,
+               help='Maximum number of groups of nodes sharing a profile an'
+                    ' engine checks the health of at the same time.'),
 ]
 
 CONF = cfg.CONF
@@ -45,6 +69,20 @@ CONF.register_opts(health_mgr_opts)
 
 LOG = logging.getLogger(__name__)
 
+wallclock = time.time
+
+# Seconds between two scans for clusters due for health checking
+SCHEDULE_INTERVAL = 1
+
+HEALTH_STATUSES = (
+    HEALTHY, UNHEALTHY,
+) = (
+    'HEALTHY', 'UNHEALTHY',
+)
+
+# Detection types for which nodes are polled by the health manager
+POLLING_TYPES = ('NODE_STATUS_POLLING',)
+
 
 class Health_Manager(service.Service):
 
@@ -60,11 +98,163 @@ class Health_Manager(service.Service):
         self.periodic_enable = CONF.periodic_enable
         self.periodic_fuzzy_delay = CONF.periodic_fuzzy_delay
 
+        # Clusters checked by this engine, indexed by cluster ID
+        self.registries = {}
+        # Bounds the number of node groups checked at the same time
+        self.pool = eventlet.GreenPool(max(CONF.health_check_concurrency, 1))
+
     def periodic_tasks(self, raise_on_error=False):
         """Tasks to be run at a periodic interval."""
-        # TODO(anyone): iterate clusters and call their periodic_tasks
+        ctx = context.RequestContext(is_admin=True)
+        try:
+            self._load_registries(ctx)
+        except Exception as ex:
+            LOG.error(_LE('Failed in loading health registries: %s'),
+                      six.text_type(ex))
+            if raise_on_error:
+                raise
         return self.periodic_interval_max
 
+    def _load_registries(self, ctx):
+        '''Claim registrations and update the clusters checked.
+
+        Other engines owning registrations are checked at the same time, so
+        that dead engines don't each delay the claim by a timeout.
+        '''
+        engines = [engine_id for engine_id in db_api.registry_engines(ctx)
+                   if engine_id != self.engine_id]
+
+        def _is_alive(engine_id):
+            return notify(ctx, 'listening', engine_id)
+
+        pool = eventlet.GreenPool(max(len(engines), 1))
+        alive = list(pool.imap(_is_alive, engines))
+        dead_engines = [e for e, live in zip(engines, alive) if not live]
+        registries = db_api.registry_claim(
+            ctx, self.engine_id, dead_engines=dead_engines,
+            num_engines=len(engines) - len(dead_engines) + 1)
+
+        now = wallclock()
+        current = {}
+        for r in registries:
+            entry = self.registries.get(r.cluster_id)
+            if entry is None:
+                # Spread the first checks of new clusters over an interval
+                entry = {
+                    'next': now + random.uniform(0, r.interval or 0),
+                    'running': False,
+                }
+            entry.update({
+                'cluster_id': r.cluster_id,
+                'check_type': r.check_type,
+                'interval': r.interval,
+                'params': r.params,
+            })
+            current[r.cluster_id] = entry
+        self.registries = current
+
+    def _check_due(self):
+        '''Start checking the clusters whose interval has passed.'''
+        now = wallclock()
+        for entry in list(self.registries.values()):
+            if entry['check_type'] not in POLLING_TYPES:
+                continue
+            if entry['running'] or entry['next'] > now:
+                continue
+            entry['running'] = True
+            entry['next'] = now + max(entry['interval'] or 0, 1)
+            self.threadgroup.start(self._run_check, entry)
+
+    def _run_check(self, entry):
+        ctx = context.RequestContext(is_admin=True)
+        try:
+            self.check_cluster(ctx, entry['cluster_id'])
+        except Exception as ex:
+            LOG.error(_LE('Failed in checking health of cluster %(c)s: '
+                          '%(ex)s'), {'c': entry['cluster_id'],
+                                      'ex': six.text_type(ex)})
+        finally:
+            entry['running'] = False
+
+    def _check_nodes(self, profile, nodes):
+        '''Check the health of nodes sharing a profile.
+
+        :returns: A dict mapping node IDs to True if the node is healthy,
+                  False if it is not, or None if the check failed.
+        '''
+        try:
+            return profile.do_check_many(nodes)
+        except Exception as ex:
+            LOG.warning(_LW('Failed in checking health of nodes of profile '
+                            '%(p)s: %(ex)s'), {'p': profile.id,
+                                               'ex': six.text_type(ex)})
+            return {}
+
+    def check_cluster(self, ctx, cluster_id):
+        '''Check the health of the active nodes in a cluster.
+
+        Nodes sharing a profile are checked together by the profile, with at
+        most `health_check_concurrency` groups of nodes checked at the same
+        time by the engine. Only nodes whose health status has changed
+        produce events.
+
+        :param ctx: An admin context.
+        :param cluster_id: ID of the cluster.
+        '''
+        cluster = db_api.cluster_get(ctx, cluster_id, project_safe=False)
+        if cluster is None:
+            db_api.registry_delete(ctx, cluster_id)
+            self.registries.pop(cluster_id, None)
+            return
+
+        ctx = context.RequestContext(user=cluster.user,
+                                     project=cluster.project,
+                                     domain=cluster.domain, is_admin=True)
+        nodes = list(node_mod.Node.load_all(ctx, cluster_id=cluster_id))
+        members = set(node.id for node in nodes)
+        nodes = [node for node in nodes if node.status == node.ACTIVE]
+
+        groups = {}
+        for node in nodes:
+            groups.setdefault(node.profile_id, []).append(node)
+        profiles = {}
+        for profile_id in groups:
+            profiles[profile_id] = profile_base.Profile.load(ctx, profile_id)
+
+        results = {}
+        for res in self.pool.imap(
+                lambda p: self._check_nodes(profiles[p], groups[p]), groups):
+            results.update(res)
+
+        records = db_api.node_health_get_all(ctx, cluster_id)
+        checked = []
+        changes = {}
+        for node in nodes:
+            healthy = results.get(node.id)
+            if healthy is None:
+                continue
+            status = HEALTHY if healthy else UNHEALTHY
+            record = records.get(node.id)
+            if record is not None and record.status == status:
+                checked.append(node.id)
+                continue
+
+            if status == UNHEALTHY:
+                reason = _('Node failed health check.')
+                event_mod.warning(ctx, node, 'HEALTH_CHECK', status, reason)
+            else:
+                reason = _('Node passed health check.')
+                # A node found healthy at its first check is not news
+                if record is not None:
+                    event_mod.info(ctx, node, 'HEALTH_CHECK', status, reason)
+            changes[node.id] = (status, reason)
+
+        db_api.node_health_update(ctx, cluster_id, checked, changes,
+                                  timeutils.utcnow())
+        # Forget nodes no longer in the cluster
+        db_api.node_health_delete(ctx, [node_id for node_id in records
+                                        if node_id not in members])
+
     def start(self):
         super(Health_Manager, self).start()
         self.target = oslo_messaging.Target(server=self.engine_id,
@@ -81,12 +271,20 @@ class Health_Manager(service.Service):
 
             self.threadgroup.add_timer(self.periodic_interval_max,
                                        self.periodic_tasks)
+            self.threadgroup.add_timer(SCHEDULE_INTERVAL, self._check_due)
 
     def listening(self, context):
         '''Respond to confirm that the engine is still alive.'''
         return True
 
     def stop(self):
+        # Let other engines take over the clusters checked by this engine
+        try:
+            db_api.registry_release(context.RequestContext(is_admin=True),
+                                    self.engine_id)
+        except Exception as ex:
+            LOG.error(_LE('Failed in releasing health registries: %s'),
+                      six.text_type(ex))
         super(Health_Manager, self).stop()
 
 
@@ -0,0 +1,197 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Listener of the notifications sent by the compute and orchestration services.
+
+Servers and stacks changed outside of Senlin, e.g. deleted or gone into error,
+are reflected in the status of the nodes backed by them. Notifications are
+received in batches. Only the last state of each resource in a batch is kept,
+then the nodes are looked up and updated with a few queries per batch.
+'''
+
+from oslo_config import cfg
+from oslo_log import log as logging
+import oslo_messaging
+import six
+
+from senlin.common import context
+from senlin.common.i18n import _
+from senlin.common.i18n import _LE
+from senlin.common.i18n import _LI
+from senlin.common import messaging as rpc_messaging
+from senlin.db import api as db_api
+from senlin.engine import event as event_mod
+from senlin.engine import node as node_mod
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+CONF.import_opt('notification_topic', 'senlin.common.config')
+CONF.import_opt('notification_batch_size', 'senlin.common.config')
+CONF.import_opt('notification_batch_timeout', 'senlin.common.config')
+
+# Exchanges to which the compute and orchestration services send
+# notifications
+EXCHANGES = ('nova', 'heat')
+
+# Name of the pool shared by the listeners of all engines, so that each
+# notification is processed once and not taken from other consumers
+LISTENER_POOL = 'senlin-engine'
+
+# Node statuses changed by notifications. Nodes in other statuses are being
+# operated by Senlin, which sets their status when done.
+MUTABLE_STATUSES = (
+    node_mod.Node.ACTIVE, node_mod.Node.ERROR, node_mod.Node.WARNING,
+)
+
+
+def server_status(payload):
+    '''Get the node status matching a compute instance notification.
+
+    :returns: A tuple of the physical ID, the node status and its reason, or
+              None if the notification doesn't tell a settled state.
+    '''
+    server_id = payload.get('instance_id')
+    state = payload.get('state')
+    # A task still in progress on the server
+    if not server_id or not state or payload.get('state_description'):
+        return None
+
+    if state == 'active':
+        return server_id, node_mod.Node.ACTIVE, _('Server is active.')
+    if state == 'error':
+        return server_id, node_mod.Node.ERROR, _('Server is in error.')
+    if state in ('deleted', 'soft-delete'):
+        return server_id, node_mod.Node.ERROR, _('Server was deleted.')
+    if state == 'building':
+        return None
+    return (server_id, node_mod.Node.WARNING,
+            _('Server is %s.') % state)
+
+
+def stack_status(payload):
+    '''Get the node status matching an orchestration stack notification.
+
+    :returns: A tuple of the physical ID, the node status and its reason, or
+              None if the notification doesn't tell a settled state.
+    '''
+    identity = payload.get('stack_identity')
+    state = payload.get('state')
+    if not identity or not state or state.endswith('_IN_PROGRESS'):
+        return None
+
+    # The stack identity is an ARN ending with the stack ID
+    stack_id = identity.rsplit('/', 1)[-1]
+    if state == 'DELETE_COMPLETE':
+        return stack_id, node_mod.Node.ERROR, _('Stack was deleted.')
+    if state.endswith('_FAILED'):
+        reason = payload.get('state_reason') or _('Stack is %s.') % state
+        return stack_id, node_mod.Node.ERROR, reason
+    return stack_id, node_mod.Node.ACTIVE, _('Stack is %s.') % state
+
+
+class NotificationEndpoint(object):
+    '''Endpoint receiving batches of notifications of a service.'''
+
+    def __init__(self, listener, parse, event_type):
+        self.listener = listener
+        self.parse = parse
+        self.filter_rule = oslo_messaging.NotificationFilter(
+            event_type=event_type)
+
+    def _process(self, messages):
+        self.listener.process(self.parse(m['payload'] or {})
+                              for m in messages)
+
+    def info(self, messages):
+        self._process(messages)
+
+    def error(self, messages):
+        self._process(messages)
+
+
+class NotificationListener(object):
+    '''Update the status of nodes from compute and stack notifications.'''
+
+    def __init__(self):
+        self._server = None
+        self.endpoints = [
+            NotificationEndpoint(self, server_status, r'^compute\.instance\.'),
+            NotificationEndpoint(self, stack_status,
+                                 r'^orchestration\.stack\.'),
+        ]
+
+    def start(self):
+        targets = [oslo_messaging.Target(topic=CONF.notification_topic,
+                                         exchange=exchange)
+                   for exchange in EXCHANGES]
+        self._server = rpc_messaging.get_notification_listener(
+            targets, self.endpoints, pool=LISTENER_POOL,
+            batch_size=CONF.notification_batch_size,
+            batch_timeout=CONF.notification_batch_timeout)
+        self._server.start()
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.stop()
+        self._server.wait()
+        self._server = None
+
+    def process(self, updates):
+        '''Update the nodes backed by resources whose state has changed.
+
+        :param updates: An iterable of tuples of a physical ID, the node
+                        status and its reason, or None for notifications to
+                        be ignored.
+        :returns: The number of nodes updated.
+        '''
+        # Only the last state of a resource matters
+        latest = dict((u[0], u[1:]) for u in updates if u is not None)
+        if not latest:
+            return 0
+
+        ctx = context.RequestContext(is_admin=True)
+        try:
+            nodes = db_api.node_get_all_by_physical_id(
+                ctx, list(latest), project_safe=False)
+            changes = {}
+            for node in nodes:
+                change = latest[node.physical_id]
+                if (node.status in MUTABLE_STATUSES and
+                        node.status != change[0]):
+                    changes[node.id] = (node, change)
+            if not changes:
+                return 0
+
+            count = db_api.node_status_update(
+                ctx, dict((k, v[1]) for k, v in changes.items()),
+                statuses=MUTABLE_STATUSES)
+        except Exception as ex:
+            LOG.error(_LE('Failed in updating nodes from notifications: %s'),
+                      six.text_type(ex))
+            return 0
+
+        for node, (status, reason) in changes.values():
+            node_ctx = context.RequestContext(user=node.user,
+                                              project=node.project,
+                                              domain=node.domain,
+                                              is_admin=True)
+            if status == node_mod.Node.ACTIVE:
+                event_mod.info(node_ctx, node, 'NOTIFICATION', status, reason)
+            else:
+                event_mod.warning(node_ctx, node, 'NOTIFICATION', status,
+                                  reason)
+        LOG.info(_LI('Updated the status of %s nodes from notifications.'),
+                 count)
+        return count
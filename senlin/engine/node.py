@@ -21,6 +21,7 @@ from senlin.common.i18n import _LE
 from senlin.common import utils
 from senlin.db import api as db_api
 from senlin.engine import event as event_mod
+from senlin.engine import fanout
 from senlin.profiles import base as profile_base
 
 LOG = logging.getLogger(__name__)
@@ -42,6 +43,15 @@ class Node(object):
         'CREATING', 'UPDATING', 'DELETING',
     )
 
+    # Node objects are created in large numbers when a cluster is loaded or
+    # nodes are listed, so we don't give them a per-instance __dict__.
+    __slots__ = (
+        'id', 'name', 'physical_id', 'profile_id', 'user', 'project',
+        'domain', 'cluster_id', 'index', 'role', 'init_time', 'created_time',
+        'updated_time', 'deleted_time', 'status', 'status_reason', 'data',
+        'metadata', 'rt',
+    )
+
     def __init__(self, name, profile_id, cluster_id, context=None, **kwargs):
         self.id = kwargs.get('id', None)
         if name:
@@ -78,12 +88,29 @@ class Node(object):
                 self.domain = context.domain
             self._load_runtime_data(context)
 
-    def _load_runtime_data(self, context):
-        self.rt = {
+    def _load_runtime_data(self, context, profiles=None):
+        """Load runtime data of the node.
+
+        :param context: The context used for DB operations.
+        :param profiles: An optional dict of profile objects keyed by profile
+                         ID. Profiles found in it are shared rather than
+                         loaded again, and loaded profiles are added to it.
+                         A shared profile object must be treated read-only.
+        """
+        profile = None
+        if profiles is not None:
+            profile = profiles.get(self.profile_id, None)
+
+        if profile is None:
             # TODO(Yanyan Hu): Use permission to control access privilege
             # of profile.
-            'profile': profile_base.Profile.load(context, self.profile_id,
-                                                 project_safe=False),
+            profile = profile_base.Profile.load(context, self.profile_id,
+                                                project_safe=False)
+            if profiles is not None:
+                profiles[self.profile_id] = profile
+
+        self.rt = {
+            'profile': profile,
         }
 
     def store(self, context):
@@ -128,11 +155,12 @@ class Node(object):
         return self.id
 
     @classmethod
-    def _from_db_record(cls, context, record):
+    def _from_db_record(cls, context, record, profiles=None):
         '''Construct a node object from database record.
 
         :param context: the context used for DB operations;
         :param record: a DB node object that contains all fields;
+        :param profiles: an optional dict of profile objects to be shared;
         '''
         kwargs = {
             'id': record.id,
@@ -152,8 +180,14 @@ class Node(object):
             'metadata': record.meta_data,
         }
 
-        return cls(record.name, record.profile_id, record.cluster_id,
-                   context=context, **kwargs)
+        if profiles is None:
+            return cls(record.name, record.profile_id, record.cluster_id,
+                       context=context, **kwargs)
+
+        node = cls(record.name, record.profile_id, record.cluster_id,
+                   **kwargs)
+        node._load_runtime_data(context, profiles)
+        return node
 
     @classmethod
     def load(cls, context, node_id=None, node=None, show_deleted=False,
@@ -181,7 +215,10 @@ class Node(object):
                                       filters=filters,
                                       project_safe=project_safe)
 
-        return [cls._from_db_record(context, record) for record in records]
+        # Nodes created from the same profile share one profile object
+        profiles = {}
+        return [cls._from_db_record(context, record, profiles)
+                for record in records]
 
     def to_dict(self):
         node_dict = {
@@ -234,7 +271,12 @@ class Node(object):
     def _handle_exception(self, context, action, status, exception):
         msg = six.text_type(exception)
         event_mod.warning(context, self, action, status, msg)
-        self.physical_id = exception.kwargs.get('resource_id', None)
+        if exception.kwargs.get('code') in fanout.RATE_LIMIT_CODES:
+            fanout.report_throttled(context, self.cluster_id)
+        # Errors such as timeouts don't carry the ID of the resource, which
+        # must not be forgotten then
+        self.physical_id = exception.kwargs.get('resource_id',
+                                                self.physical_id) or None
         if self.physical_id:
             reason = _('Profile failed in %(action)s resource (%(id)s) due '
                        'to: %(msg)s') % {'action': action[:-1] + 'ing',
@@ -278,7 +320,7 @@ class Node(object):
         event_mod.info(context, self, 'delete')
         try:
             res = profile_base.Profile.delete_object(context, self)
-        except exception.ResourceStatusError as ex:
+        except exception.InternalError as ex:
             self._handle_exception(context, 'delete', self.ERROR, ex)
             res = False
 
@@ -306,7 +348,7 @@ class Node(object):
         try:
             res = profile_base.Profile.update_object(
                 context, self, new_profile_id, **params)
-        except exception.ResourceStatusError as ex:
+        except exception.InternalError as ex:
             self._handle_exception(context, 'update', self.ERROR, ex)
             res = False
 
@@ -336,7 +378,11 @@ class Node(object):
         self.updated_time = timestamp
         self.index = db_node.index
 
+        placement = self.data.get('placement', None)
         profile_base.Profile.join_cluster(context, self, cluster_id)
+        # The profile may have recorded where the node is placed
+        if self.data.get('placement', None) != placement:
+            db_api.node_update(context, self.id, {'data': self.data})
         return True
 
     def do_leave(self, context):
@@ -10,7 +10,9 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
 import functools
+import itertools
 import uuid
 
 from oslo_config import cfg
@@ -18,6 +20,7 @@ from oslo_log import log as logging
 import oslo_messaging
 from oslo_serialization import jsonutils
 from oslo_service import service
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 import six
 
@@ -37,7 +40,9 @@ from senlin.engine import cluster_policy
 from senlin.engine import dispatcher
 from senlin.engine import environment
 from senlin.engine import event as event_mod
+from senlin.engine import event_archive
 from senlin.engine import health_manager
+from senlin.engine import listener
 from senlin.engine import node as node_mod
 from senlin.engine import receiver as receiver_mod
 from senlin.engine import scheduler
@@ -49,6 +54,16 @@ LOG = logging.getLogger(__name__)
 
 CONF = cfg.CONF
 
+EVENT_AGGREGATE_KEYS = ('cluster_id', 'action', 'level', 'status')
+
+EVENT_LEVELS = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL,
+}
+
 
 def request_context(func):
     @functools.wraps(func)
@@ -87,6 +102,7 @@ class EngineService(service.Service):
         self.TG = None
         self.target = None
         self._rpc_server = None
+        self.listener = None
 
         # Intialize the global environment
         environment.initialize()
@@ -98,6 +114,9 @@ class EngineService(service.Service):
         self.engine_id = str(uuid.uuid4())
         self.init_tgm()
 
+        # buffer events generated by this engine
+        event_mod.start_writer(self.TG)
+
         # create a dispatcher greenthread for this engine.
         self.dispatcher = dispatcher.Dispatcher(self,
                                                 self.dispatcher_topic,
@@ -114,6 +133,13 @@ class EngineService(service.Service):
         LOG.info(_LI("Starting health manager for engine %s"), self.engine_id)
         self.health_mgr.start()
 
+        # update node status from the notifications of other services
+        if cfg.CONF.enable_notification_listener:
+            self.listener = listener.NotificationListener()
+            LOG.info(_LI("Starting notification listener for engine %s"),
+                     self.engine_id)
+            self.listener.start()
+
         target = oslo_messaging.Target(version=consts.RPC_API_VERSION,
                                        server=self.host,
                                        topic=self.topic)
@@ -144,7 +170,13 @@ class EngineService(service.Service):
         LOG.info(_LI("Stopping health manager for engine %s"), self.engine_id)
         self.health_mgr.stop()
 
+        if self.listener is not None:
+            self.listener.stop()
+
         self.TG.stop()
+
+        # write the remaining buffered events into database
+        event_mod.stop_writer()
         super(EngineService, self).stop()
 
     @request_context
@@ -1827,16 +1859,214 @@ class EngineService(service.Service):
     @request_context
     def event_list(self, context, filters=None, limit=None, marker=None,
                    sort_keys=None, sort_dir=None, project_safe=True,
-                   show_deleted=False):
-        all_events = event_mod.Event.load_all(context, filters=filters,
-                                              limit=limit, marker=marker,
-                                              sort_keys=sort_keys,
-                                              sort_dir=sort_dir,
-                                              project_safe=project_safe,
-                                              show_deleted=show_deleted)
-
-        results = [event.to_dict() for event in all_events]
-        return results
+                   show_deleted=False, start_time=None, end_time=None):
+        '''List events in database and in the archive.
+
+        Events sorted by time are read from the archive only as far as the
+        page needs. Events sorted by other keys are merged with archived
+        ones only for a time range starting before the archive horizon,
+        otherwise only events in database are listed.
+        '''
+        start_time = self._parse_time('start_time', start_time)
+        end_time = self._parse_time('end_time', end_time)
+        load_all = functools.partial(event_mod.Event.load_all, context,
+                                     filters=filters, sort_keys=sort_keys,
+                                     sort_dir=sort_dir,
+                                     project_safe=project_safe,
+                                     show_deleted=show_deleted,
+                                     start_time=start_time,
+                                     end_time=end_time)
+
+        archive = event_archive.get_archive()
+        horizon = archive and archive.horizon
+        if (horizon is None or
+                (start_time is not None and start_time >= horizon)):
+            all_events = load_all(limit=limit, marker=marker)
+        elif event_archive.sorted_by_time(sort_keys):
+            all_events = self._event_list_by_time(context, archive, load_all,
+                                                  filters, limit, marker,
+                                                  sort_dir, project_safe,
+                                                  show_deleted, start_time,
+                                                  end_time)
+        elif start_time is None:
+            # Not reading the whole archive for every page
+            all_events = load_all(limit=limit, marker=marker)
+        else:
+            all_events = self._event_list_merged(context, archive, load_all,
+                                                 filters, limit, marker,
+                                                 sort_keys, sort_dir,
+                                                 project_safe, show_deleted,
+                                                 start_time, end_time)
+        return [event.to_dict() for event in all_events]
+
+    def _event_list_by_time(self, context, archive, load_all, filters, limit,
+                            marker, sort_dir, project_safe, show_deleted,
+                            start_time, end_time):
+        '''List events in time order from database and the archive.
+
+        Archived events are older than those in database, so a page is made
+        of the end of one and the start of the other.
+        '''
+        desc = sort_dir == 'desc'
+        archived = marker is not None and db_api.event_get(
+            context, marker, project_safe=project_safe) is None
+        events = []
+        if not archived and (desc or marker is not None):
+            events = list(load_all(limit=limit, marker=marker))
+            if not desc:
+                # Archived events are all before the marker
+                return events
+            marker = None
+        if limit is not None and len(events) >= limit:
+            return events
+
+        stream = archive.query(filters=filters, start_time=start_time,
+                               end_time=end_time,
+                               project=(context.project if project_safe
+                                        else None),
+                               show_deleted=show_deleted,
+                               sort_dir='desc' if desc else 'asc')
+        if archived:
+            stream = itertools.dropwhile(lambda e: e.id != marker, stream)
+            if next(stream, None) is None:
+                # Marker not found
+                return []
+        count = None if limit is None else limit - len(events)
+        events.extend(itertools.islice(stream, count))
+
+        if not desc and (limit is None or len(events) < limit):
+            # Events in database are all after the archived ones
+            count = None if limit is None else limit - len(events)
+            events.extend(load_all(limit=count, marker=None))
+        return events
+
+    def _event_list_merged(self, context, archive, load_all, filters, limit,
+                           marker, sort_keys, sort_dir, project_safe,
+                           show_deleted, start_time, end_time):
+        '''List events of a time range merged with archived events.
+
+        The archived events of the time range are all read, while only one
+        page of events is loaded from database, starting after the marker.
+        '''
+        project = context.project if project_safe else None
+        all_events = list(archive.query(filters=filters,
+                                        start_time=start_time,
+                                        end_time=end_time, project=project,
+                                        show_deleted=show_deleted))
+        db_marker = marker
+        if marker is not None:
+            marker_event, db_marker = self._event_marker(context, all_events,
+                                                         marker, project)
+            # The marker is kept in the list for paginating after it
+            if (marker_event is not None and
+                    marker not in [e.id for e in all_events]):
+                all_events.append(marker_event)
+        all_events.extend(load_all(limit=limit, marker=db_marker))
+        return event_archive.sort_events(all_events, limit=limit,
+                                         marker=marker, sort_keys=sort_keys,
+                                         sort_dir=sort_dir)
+
+    def _event_marker(self, context, archived, marker, project):
+        '''Find the marker of a list of events merged with archived ones.
+
+        :param archived: A list of archived events of the time range listed.
+        :returns: A tuple of the marker event, or None if not found, and the
+                  marker for querying events in database. The latter is the
+                  values of the sort keys of the event if it was archived.
+        '''
+        record = db_api.event_get(context, marker,
+                                  project_safe=project is not None)
+        if record is not None:
+            return event_mod.Event.from_db_record(record), marker
+
+        for event in archived:
+            if event.id == marker:
+                values = dict((k, getattr(event, k))
+                              for k in event_archive.SORT_KEYS + ('id',))
+                return event, values
+        return None, marker
+
+    def _parse_time(self, name, value):
+        if value is None:
+            return None
+        try:
+            return timeutils.normalize_time(timeutils.parse_isotime(value))
+        except ValueError:
+            raise exception.InvalidParameter(name=name, value=value)
+
+    @request_context
+    def event_aggregate(self, context, group_by=None, bucket=None,
+                        filters=None, start_time=None, end_time=None,
+                        project_safe=True):
+        '''Count events grouped by time and the given properties.
+
+        :param context: An instance of the request context.
+        :param group_by: A list of event properties to group events by, which
+                         can be 'cluster_id', 'action', 'level' and 'status'.
+        :param bucket: The time span to group events by, which can be 'hour'
+                       or 'day'. Events are not grouped by time if omitted.
+        :param filters: A dict of event properties to match.
+        :param start_time: Only events generated at or after the start of
+                           the hour of this time are counted if specified.
+        :param end_time: Only events generated before this time are counted
+                         if specified.
+        :param project_safe: Whether only events of the requesting project
+                             are counted.
+        :returns: A list of dicts containing the group_by properties, the
+                  'bucket' if required and the 'count' of events.
+        '''
+        group_by = group_by or []
+        for key in group_by:
+            if key not in EVENT_AGGREGATE_KEYS:
+                raise exception.InvalidParameter(name='group_by', value=key)
+        if bucket not in (None, 'hour', 'day'):
+            raise exception.InvalidParameter(name='bucket', value=bucket)
+
+        filters = dict(filters or {})
+        for key in filters:
+            if key not in EVENT_AGGREGATE_KEYS:
+                raise exception.InvalidParameter(name=key, value=filters[key])
+        if 'level' in filters:
+            filters['level'] = self._parse_levels(filters['level'])
+
+        start_time = self._parse_time('start_time', start_time)
+        end_time = self._parse_time('end_time', end_time)
+
+        rows = db_api.event_rollup_get(context, group_by=group_by,
+                                       filters=filters or None,
+                                       start_time=start_time,
+                                       end_time=end_time,
+                                       project_safe=project_safe)
+
+        aggregates = collections.OrderedDict()
+        for row in rows:
+            key = tuple(row[k] for k in group_by)
+            if bucket == 'hour':
+                key += (row['bucket'],)
+            elif bucket == 'day':
+                key += (row['bucket'].replace(hour=0),)
+            aggregates[key] = aggregates.get(key, 0) + row['count']
+
+        result = []
+        for key, count in aggregates.items():
+            item = dict(zip(group_by, key))
+            if bucket is not None:
+                item['bucket'] = utils.format_time(key[-1])
+            item['count'] = int(count)
+            result.append(item)
+        return result
+
+    def _parse_levels(self, value):
+        values = value if isinstance(value, list) else [value]
+        levels = []
+        for level in values:
+            try:
+                levels.append(int(level))
+            except ValueError:
+                if level.upper() not in EVENT_LEVELS:
+                    raise exception.InvalidParameter(name='level', value=level)
+                levels.append(EVENT_LEVELS[level.upper()])
+        return levels
 
     @request_context
     def event_get(self, context, identity):
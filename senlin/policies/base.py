@@ -288,7 +288,7 @@ class Policy(object):
         if self.PROFILE_TYPE == ['ANY']:
             return True, None
 
-        profile = cluster.rt['profile']
+        profile = cluster.profile
         if profile.type not in self.PROFILE_TYPE:
             error = _('Policy not applicable on profile type: '
                       '%s') % profile.type
@@ -34,11 +34,16 @@ Output:
       ]
     }
   }
+
+The cluster action updates the nodes of one batch at a time, waiting for the
+batch to complete and then for 'pause_time' seconds before updating the next
+batch.
 """
 
 from senlin.common import consts
 from senlin.common.i18n import _
 from senlin.common import schema
+from senlin.db import api as db_api
 from senlin.policies import base
 
 
@@ -84,13 +89,39 @@ class BatchPolicy(base.Policy):
         self.max_batch_size = self.properties[self.MAX_BATCH_SIZE]
         self.pause_time = self.properties[self.PAUSE_TIME]
 
+    def _get_batch_size(self, total):
+        """Get the number of nodes to update at the same time.
+
+        :param total: Total number of nodes to update.
+        :returns: The size of a batch, which is at least 1.
+        """
+        # Keep at least 'min_in_service' nodes out of the batch, unless
+        # there are not enough nodes, in which case update one at a time.
+        size = total - self.min_in_service
+        if self.max_batch_size > 0:
+            size = min(size, self.max_batch_size)
+        return max(size, 1)
+
+    def _create_plan(self, node_ids):
+        """Split the nodes into batches.
+
+        :param node_ids: IDs of nodes to update.
+        :returns: A list of batches, each being a list of node IDs.
+        """
+        size = self._get_batch_size(len(node_ids))
+        return [node_ids[i:i + size] for i in range(0, len(node_ids), size)]
+
     def pre_op(self, cluster_id, action):
-        # TODO(anyone): compute batches
-        action.data['candidates'] = []
+        node_ids = db_api.node_ids_by_cluster(action.context, cluster_id)
+        action.data['update'] = {
+            'pause_time': self.pause_time,
+            'plan': self._create_plan(node_ids),
+        }
         action.store(action.context)
 
         return True
 
     def post_op(self, cluster_id, action):
-        # TODO(anyone): handle pause_time here
+        # NOTE: The pauses between batches are taken by the cluster action
+        # as it updates the batches planned above.
         return True
@@ -35,6 +35,7 @@ Output: stored in action.data
   }
 """
 
+import heapq
 import random
 
 from senlin.common import constraints
@@ -116,8 +117,9 @@ class DeletionPolicy(base.Policy):
         random.seed()
 
     def _select_candidates(self, context, cluster_id, count):
-        candidates = []
-        nodes = db_api.node_get_all_by_cluster(context, cluster_id)
+        # All the data needed is retrieved with one query, no matter how
+        # many nodes there are in the cluster.
+        nodes = db_api.node_brief_by_cluster(context, cluster_id)
         if count > len(nodes):
             count = len(nodes)
 
@@ -126,40 +128,27 @@ class DeletionPolicy(base.Policy):
         if count <= len(err_nodes):
             return [n.id for n in err_nodes[:count]]
 
-        candidates.extend([n.id for n in err_nodes])
+        candidates = [n.id for n in err_nodes]
         count -= len(err_nodes)
 
         # Random selection
         if self.criteria == self.RANDOM:
-            i = count
-            while i > 0:
-                rand = random.randrange(len(nodes))
-                candidates.append(nodes[rand].id)
-                nodes.remove(nodes[rand])
-                i = i - 1
-
-            return candidates
+            selected = random.sample(nodes, count)
 
         # Node age based selection
-        if self.criteria in [self.OLDEST_FIRST, self.YOUNGEST_FIRST]:
-            sorted_list = sorted(nodes, key=lambda r: (r.created_time, r.name))
-            for i in range(count):
-                if self.criteria == self.OLDEST_FIRST:
-                    candidates.append(sorted_list[i].id)
-                else:  # YOUNGEST_FIRST
-                    candidates.append(sorted_list[-1-i].id)
-            return candidates
+        elif self.criteria == self.OLDEST_FIRST:
+            selected = heapq.nsmallest(
+                count, nodes, key=lambda n: (n.created_time, n.name))
+        elif self.criteria == self.YOUNGEST_FIRST:
+            selected = heapq.nlargest(
+                count, nodes, key=lambda n: (n.created_time, n.name))
 
         # Node profile based selection
-        node_map = []
-        for node in nodes:
-            profile = db_api.profile_get(context, node.profile_id)
-            created_at = profile.created_time
-            node_map.append({'id': node.id, 'created_at': created_at})
-        sorted_map = sorted(node_map, key=lambda m: m['created_at'])
-        for i in range(count):
-            candidates.append(sorted_map[i]['id'])
+        else:
+            selected = heapq.nsmallest(
+                count, nodes, key=lambda n: n.profile_created_time)
 
+        candidates.extend(n.id for n in selected)
         return candidates
 
     def pre_op(self, cluster_id, action):
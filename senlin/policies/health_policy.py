@@ -10,12 +10,13 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-from oslo_service import periodic_task
+from oslo_context import context as oslo_context
 
 from senlin.common import constraints
 from senlin.common import consts
 from senlin.common.i18n import _
 from senlin.common import schema
+from senlin.db import api as db_api
 from senlin.policies import base
 
 
@@ -125,16 +126,18 @@ class HealthPolicy(base.Policy):
     }
 
     def __init__(self, name, spec, **kwargs):
-        super(HealthPolicy, self).__init__(name, spec, kwargs)
+        super(HealthPolicy, self).__init__(name, spec, **kwargs)
 
         self.check_type = self.properties[self.DETECTION][self.DETECTION_TYPE]
         options = self.properties[self.DETECTION][self.DETECTION_OPTIONS]
         self.interval = options[self.DETECTION_INTERVAL]
+        recovery = self.properties[self.RECOVERY] or {}
+        self.recovery_actions = recovery.get(self.RECOVERY_ACTIONS) or []
 
     def attach(self, cluster):
         '''Hook for policy attach.
 
-        Initialize the health check mechanism for existing nodes in cluster.
+        Register the cluster for health checking by the health managers.
         '''
         data = {
             'type': self.check_type,
@@ -142,15 +145,17 @@ class HealthPolicy(base.Policy):
             'counter': 0,
         }
 
-        # TODO(anyone): register cluster for periodic checking
+        params = {'recovery_actions': self.recovery_actions}
+        db_api.registry_create(oslo_context.get_current(), cluster.id,
+                               self.check_type, self.interval, params)
         return True, self._build_policy_data(data)
 
     def detach(self, cluster):
         '''Hook for policy detach.
 
-        Deinitialize the health check mechanism (for the cluster).
+        Deregister the cluster from health checking.
         '''
-        # TODO(anyone): deregister cluster from periodic checking
+        db_api.registry_delete(oslo_context.get_current(), cluster.id)
         return True, ''
 
     def pre_op(self, cluster_id, action, **args):
@@ -159,8 +164,8 @@ class HealthPolicy(base.Policy):
                           consts.CLUSTER_DEL_NODES):
             return True
 
-        # TODO(anyone): Unsubscribe nodes from backend health monitoring
-        #               infrastructure
+        # NOTE: Nodes are polled as members of the cluster, so nodes removed
+        # are no longer checked after the next round.
         return True
 
     def post_op(self, cluster_id, action, **args):
@@ -169,26 +174,6 @@ class HealthPolicy(base.Policy):
                           consts.CLUSTER_ADD_NODES):
             return True
 
-        # TODO(anyone): subscribe to vm-lifecycle-events for the specified VM
-        #               or add vm to the list of VM status polling
+        # NOTE: Nodes are polled as members of the cluster, so nodes added
+        # are checked from the next round.
         return True
-
-    @periodic_task.periodic_task
-    def health_check(self):
-        if not self.detect_enabled:
-            return
-
-        if (self.detect_counter < self.detect_interval):
-            self.detect_counter += 1
-            return
-        self.detect_counter = 0
-
-        failures = 0
-        for n in self.rt['nodes']:
-            if(n.rt.profile.do_check(n)):
-                continue
-
-            failures += 1
-
-        # TODO(Anyone): How to enforce the HA policy?
-        pass
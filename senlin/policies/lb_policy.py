@@ -21,6 +21,7 @@ from senlin.common import schema
 from senlin.db import api as db_api
 from senlin.drivers import base as driver_base
 from senlin.engine import cluster_policy
+from senlin.engine import event as event_mod
 from senlin.engine import node as node_mod
 from senlin.policies import base
 
@@ -209,26 +210,31 @@ class LoadBalancingPolicy(base.Policy):
         params = self._build_conn_params(cluster)
         lb_driver = driver_base.SenlinDriver().loadbalancing(params)
 
+        ctx = oslo_context.get_current()
         res, data = lb_driver.lb_create(self.vip_spec, self.pool_spec)
         if res is False:
+            event_mod.warning(ctx, cluster, 'LB_CREATE', 'ERROR', data)
             return False, data
 
         port = self.pool_spec.get(self.POOL_PROTOCOL_PORT)
         subnet = self.pool_spec.get(self.POOL_SUBNET)
 
+        members = lb_driver.members_add(nodes, data['loadbalancer'],
+                                        data['pool'], port, subnet)
+        if len(members) != len(nodes):
+            # When failed in adding member, remove all lb resources that
+            # were created and return the failure reason.
+            # TODO(Yanyan Hu): Maybe we should tolerate member adding
+            # failure and allow policy attaching to succeed without
+            # all nodes being added into lb pool?
+            reason = _('Failed in adding node into lb pool')
+            event_mod.warning(ctx, cluster, 'POOL_MEMBER_CREATE', 'ERROR',
+                              reason)
+            lb_driver.lb_delete(**data)
+            return False, reason
+
         for node in nodes:
-            member_id = lb_driver.member_add(node, data['loadbalancer'],
-                                             data['pool'], port, subnet)
-            if member_id is None:
-                # When failed in adding member, remove all lb resources that
-                # were created and return the failure reason.
-                # TODO(Yanyan Hu): Maybe we should tolerate member adding
-                # failure and allow policy attaching to succeed without
-                # all nodes being added into lb pool?
-                lb_driver.lb_delete(**data)
-                return False, 'Failed in adding node into lb pool'
-
-            node.data.update({'lb_member': member_id})
+            node.data.update({'lb_member': members[node.id]})
             node.store(oslo_context.get_current())
 
         policy_data = self._build_policy_data(data)
@@ -257,6 +263,8 @@ class LoadBalancingPolicy(base.Policy):
 
         res, reason = lb_driver.lb_delete(**policy_data)
         if res is False:
+            event_mod.warning(oslo_context.get_current(), cluster,
+                              'LB_DELETE', 'ERROR', reason)
             return False, reason
 
         nodes = node_mod.Node.load_all(oslo_context.get_current(),
@@ -295,42 +303,65 @@ class LoadBalancingPolicy(base.Policy):
         port = self.pool_spec.get(self.POOL_PROTOCOL_PORT)
         subnet = self.pool_spec.get(self.POOL_SUBNET)
 
+        nodes = node_mod.Node.load_all(
+            action.context, filters={'id': nodes_removed + nodes_added},
+            show_deleted=True)
+        nodes = dict((node.id, node) for node in nodes)
+
         # Remove nodes that have been deleted from lb pool
+        member_ids = []
         for node_id in nodes_removed:
-            node = node_mod.Node.load(action.context, node_id=node_id,
-                                      show_deleted=True)
-            member_id = node.data.get('lb_member', None)
+            node = nodes.get(node_id, None)
+            member_id = node.data.get('lb_member', None) if node else None
             if member_id is None:
                 LOG.warning(_LW('Node %(n)s not found in lb pool %(p)s.'),
                             {'n': node_id, 'p': pool_id})
                 continue
-
-            res = lb_driver.member_remove(lb_id, pool_id, member_id)
-            if res is not True:
-                action.data['status'] = base.CHECK_ERROR
-                action.data['reason'] = _('Failed in removing deleted '
-                                          'node(s) from lb pool.')
-                return
+            member_ids.append(member_id)
+
+        if member_ids:
+            res = lb_driver.members_remove(lb_id, pool_id, member_ids)
+        else:
+            res = []
+        if len(res) != len(member_ids):
+            action.data['status'] = base.CHECK_ERROR
+            action.data['reason'] = _('Failed in removing deleted '
+                                      'node(s) from lb pool.')
+            event_mod.warning(action.context, db_cluster,
+                              'POOL_MEMBER_DELETE', 'ERROR',
+                              action.data['reason'])
+            return
 
         # Add new nodes to lb pool
+        new_nodes = []
         for node_id in nodes_added:
-            node = node_mod.Node.load(action.context, node_id=node_id,
-                                      show_deleted=True)
-            member_id = node.data.get('lb_member', None)
-            if member_id:
+            node = nodes.get(node_id, None)
+            if node is None:
+                LOG.warning(_LW('Node %(n)s not found.'), {'n': node_id})
+                continue
+            if node.data.get('lb_member', None):
                 LOG.warning(_LW('Node %(n)s already in lb pool %(p)s.'),
                             {'n': node_id, 'p': pool_id})
                 continue
+            new_nodes.append(node)
 
-            member_id = lb_driver.member_add(node, lb_id, pool_id, port,
-                                             subnet)
-            if member_id is None:
-                action.data['status'] = base.CHECK_ERROR
-                action.data['reason'] = _('Failed in adding new node(s) '
-                                          'into lb pool.')
-                return
+        if not new_nodes:
+            return
 
-            node.data.update({'lb_member': member_id})
-            node.store(action.context)
+        members = lb_driver.members_add(new_nodes, lb_id, pool_id, port,
+                                        subnet)
+        for node in new_nodes:
+            if node.id in members:
+                node.data.update({'lb_member': members[node.id]})
+                node.store(action.context)
+
+        if len(members) != len(new_nodes):
+            action.data['status'] = base.CHECK_ERROR
+            action.data['reason'] = _('Failed in adding new node(s) '
+                                      'into lb pool.')
+            event_mod.warning(action.context, db_cluster,
+                              'POOL_MEMBER_CREATE', 'ERROR',
+                              action.data['reason'])
+            return
 
         return
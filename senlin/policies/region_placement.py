@@ -46,6 +46,7 @@ from senlin.common.i18n import _
 from senlin.common.i18n import _LE
 from senlin.common.i18n import _LW
 from senlin.common import schema
+from senlin.db import api as db_api
 
 from senlin.drivers import base as driver_base
 from senlin.engine import cluster as cluster_mod
@@ -136,6 +137,7 @@ class RegionPlacementPolicy(base.Policy):
         :param cluster: the cluster object that policy attached to.
         :returns: A list of regions that are found available on Nova.
         """
+        # The regions are cached by the identity driver
         known_regions = [r['id'] for r in self.keystone(cluster).region_list()]
 
         regions = {}
@@ -147,20 +149,21 @@ class RegionPlacementPolicy(base.Policy):
 
         return regions
 
-    def _get_current_dist(self, regions, nodes):
+    def _get_current_dist(self, ctx, regions, cluster):
         """Calculate the region distribution for exiting nodes.
 
+        :param ctx: context used to access node data.
         :param regions: list of regions to check.
-        :param nodes: the nodes for which the distribution is checked.
+        :param cluster: the cluster for which the distribution is checked.
 
         :returns: a dict containing region-count pairs.
         """
         dist = dict.fromkeys(regions.keys(), 0)
 
-        for node in nodes:
-            placement = node.data.get('placement', {})
-            if placement and 'region_name' in placement:
-                region = placement['region_name']
+        for node_id, placement in db_api.node_placements_by_cluster(
+                ctx, cluster.id):
+            region = placement.get('region_name', None)
+            if region in dist:
                 dist[region] += 1
 
         return dist
@@ -236,7 +239,8 @@ class RegionPlacementPolicy(base.Policy):
             return
 
         # Calculate AZ distribution for exiting nodes
-        current_dist = self._get_current_dist(regions, cluster.nodes)
+        current_dist = self._get_current_dist(action.context, regions,
+                                              cluster)
 
         # Calculate placement plan for new nodes
         plan = self._create_plan(current_dist, regions, count)
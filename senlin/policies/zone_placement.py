@@ -40,6 +40,7 @@ Output:
 
 import math
 import operator
+from oslo_config import cfg
 from oslo_log import log as logging
 
 from senlin.common import consts
@@ -47,14 +48,23 @@ from senlin.common.i18n import _
 from senlin.common.i18n import _LE
 from senlin.common.i18n import _LW
 from senlin.common import schema
+from senlin.common import utils
+from senlin.db import api as db_api
 
 from senlin.drivers import base as driver_base
 from senlin.engine import cluster as cluster_mod
+from senlin.engine import node as node_mod
 
 from senlin.policies import base
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_opt('placement_cache_ttl', 'senlin.common.config')
+
+# Availability zones found available, shared by all zone placement policies
+_zone_cache = utils.ExpiringCache()
+
 
 class ZonePlacementPolicy(base.Policy):
     """Policy for placing members of a cluster across availability zones."""
@@ -127,8 +137,13 @@ class ZonePlacementPolicy(base.Policy):
         :param cluster: the cluster object that policy attached to.
         :returns: A list of zones that are found available on Nova.
         """
-        azs = self.nova(cluster).availability_zone_list()
-        azs = [az['zoneName'] for az in azs if az['zoneState']['available']]
+        def load():
+            azs = self.nova(cluster).availability_zone_list()
+            return [az['zoneName'] for az in azs
+                    if az['zoneState']['available']]
+
+        azs = _zone_cache.get((cluster.user, cluster.project), load,
+                              CONF.placement_cache_ttl)
 
         avail = {}
         for name in self.zones:
@@ -143,21 +158,44 @@ class ZonePlacementPolicy(base.Policy):
     def _get_current_dist(self, ctx, zones, cluster):
         """Calculate the availability zone distribution for exiting nodes.
 
-        :param ctx: context used to access node details.
-        :param zone_names: list of zone names to check.
+        The zone of a node is recorded in its placement data when the node is
+        created or joins the cluster, so no node details are retrieved unless
+        the zone of a node has never been recorded.
+
+        :param ctx: context used to access node data.
+        :param zones: dict of zones to check.
         :param cluster: the cluster for which the distribution is checked.
         :returns: a dict containing zone-count pairs.
         """
         dist = dict.fromkeys(zones.keys(), 0)
 
-        for node in cluster.nodes:
-            details = node.get_details(ctx)
-            zname = details.get('OS-EXT-AZ:availability_zone', None)
+        for node_id, placement in db_api.node_placements_by_cluster(
+                ctx, cluster.id):
+            zname = placement.get('zone', None)
+            if zname is None:
+                zname = self._record_zone(ctx, node_id)
             if zname and zname in dist:
                 dist[zname] += 1
 
         return dist
 
+    def _record_zone(self, ctx, node_id):
+        """Look up the availability zone of a node and record it.
+
+        :param ctx: context used to access node details.
+        :param node_id: ID of the node.
+        :returns: Name of the zone, or None if it is unknown.
+        """
+        node = node_mod.Node.load(ctx, node_id=node_id)
+        details = node.get_details(ctx)
+        zname = details.get('OS-EXT-AZ:availability_zone', None)
+        if zname:
+            placement = dict(node.data.get('placement') or {})
+            placement['zone'] = zname
+            node.data['placement'] = placement
+            db_api.node_update(ctx, node_id, {'data': node.data})
+        return zname
+
     def _create_plan(self, existing_dist, zones, count):
         """Compute a placement plan based on the weights of AZs.
 
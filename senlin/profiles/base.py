@@ -12,13 +12,16 @@
 
 import copy
 
+import eventlet
 from oslo_context import context as oslo_context
 from oslo_log import log as logging
 from oslo_utils import timeutils
+import six
 
 from senlin.common import context
 from senlin.common import exception
 from senlin.common.i18n import _
+from senlin.common.i18n import _LW
 from senlin.common import schema
 from senlin.common import utils
 from senlin.db import api as db_api
@@ -26,6 +29,10 @@ from senlin.engine import environment
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of nodes checked at the same time by the default
+# implementation of `do_check_many`
+CHECK_CONCURRENCY = 10
+
 
 class Profile(object):
     '''Base class for profiles.'''
@@ -194,6 +201,11 @@ class Profile(object):
         profile = cls.load(ctx, obj.profile_id)
         return profile.do_create(obj)
 
+    @classmethod
+    def create_objects(cls, ctx, objs):
+        profile = cls.load(ctx, objs[0].profile_id)
+        return profile.do_create_many(objs)
+
     @classmethod
     def delete_object(cls, ctx, obj):
         profile = cls.load(ctx, obj.profile_id)
@@ -207,6 +219,11 @@ class Profile(object):
             new_profile = cls.load(ctx, new_profile_id)
         return profile.do_update(obj, new_profile, **params)
 
+    @classmethod
+    def check_object(cls, ctx, obj):
+        profile = cls.load(ctx, obj.profile_id)
+        return profile.do_check(obj)
+
     @classmethod
     def get_details(cls, ctx, obj):
         profile = cls.load(ctx, obj.profile_id)
@@ -272,6 +289,20 @@ class Profile(object):
 
         return NotImplemented
 
+    def do_create_many(self, objs):
+        '''Start creating the physical objects of many nodes at once.
+
+        For subclasses able to create many objects with a single request to
+        override. A node assigned a physical ID here is expected to be
+        completed by `do_create`, other nodes are created by `do_create`
+        alone.
+
+        :param objs: A list of nodes using this profile.
+        :returns: A dict mapping node IDs to the physical IDs of the objects
+                  started for them.
+        '''
+        return {}
+
     def do_delete(self, obj):
         '''For subclass to override.'''
 
@@ -286,6 +317,30 @@ class Profile(object):
         '''For subclass to override.'''
         return NotImplemented
 
+    def do_check_many(self, objs):
+        '''Check the health of many objects created from this profile.
+
+        Subclasses able to query the status of many objects at once should
+        override this. By default the objects are checked one by one with
+        `do_check`, a few at a time.
+
+        :param objs: A list of nodes using this profile.
+        :returns: A dict mapping the ID of each node to True if it is
+                  healthy, False if it is not, or None if it couldn't be
+                  checked.
+        '''
+        def _check(obj):
+            try:
+                return obj.id, bool(self.do_check(obj))
+            except Exception as ex:
+                LOG.warning(_LW('Failed in checking health of node %(n)s: '
+                                '%(ex)s'), {'n': obj.id,
+                                            'ex': six.text_type(ex)})
+                return obj.id, None
+
+        pool = eventlet.GreenPool(CHECK_CONCURRENCY)
+        return dict(pool.imap(_check, objs))
+
     def do_get_details(self, obj):
         '''For subclass to override.'''
         return NotImplemented
@@ -19,11 +19,13 @@ from senlin.common.i18n import _
 from senlin.common import schema
 from senlin.common import utils
 from senlin.drivers import base as driver_base
-from senlin.engine import scheduler
 from senlin.profiles import base
 
 LOG = logging.getLogger(__name__)
 
+# Maximum number of stack IDs used to filter a single stack list
+STACK_LIST_BATCH = 100
+
 
 class StackProfile(base.Profile):
     '''Profile for an OpenStack Heat stack.
@@ -112,6 +114,13 @@ class StackProfile(base.Profile):
 
     def _check_action_complete(self, obj, action):
         stack = self.heat(obj).stack_get(self.stack_id)
+        return self._check_stack_status(stack, action)
+
+    def _check_stack_status(self, stack, action):
+        if stack is None:
+            # A stack being deleted may be gone before it is seen completed
+            return action == 'DELETE'
+
         status = stack.status.split('_', 1)
 
         if status[0] == action:
@@ -127,6 +136,21 @@ class StackProfile(base.Profile):
         else:
             return False
 
+    def _wait_for_action(self, obj, action):
+        '''Wait for a stack action to complete.
+
+        The stack timeout is used as the deadline if specified, otherwise
+        the wait is only limited by the action owning it.
+        '''
+        timeout = self.properties[self.TIMEOUT]
+        if timeout is not None:
+            timeout *= 60
+
+        def _check(stack):
+            return self._check_stack_status(stack, action)
+
+        self.heat(obj).wait_for_stack(self.stack_id, _check, timeout=timeout)
+
     def do_create(self, obj):
         '''Create a stack using the given profile.'''
 
@@ -145,8 +169,7 @@ class StackProfile(base.Profile):
         self.stack_id = stack.id
 
         # Wait for action to complete/fail
-        while not self._check_action_complete(obj, 'CREATE'):
-            scheduler.sleep(1)
+        self._wait_for_action(obj, 'CREATE')
 
         return stack.id
 
@@ -159,8 +182,7 @@ class StackProfile(base.Profile):
             raise ex
 
         # Wait for action to complete/fail
-        while not self._check_action_complete(obj, 'DELETE'):
-            scheduler.sleep(1)
+        self._wait_for_action(obj, 'DELETE')
 
         return True
 
@@ -190,8 +212,7 @@ class StackProfile(base.Profile):
         self.heat(obj).stack_update(self.stack_id, **fields)
 
         # Wait for action to complete/fail
-        while not self._check_action_complete(obj, 'UPDATE'):
-            scheduler.sleep(1)
+        self._wait_for_action(obj, 'UPDATE')
 
         return True
 
@@ -209,14 +230,41 @@ class StackProfile(base.Profile):
         except Exception:
             return False
 
+        def _check_complete(stack):
+            if stack is None or stack.status == 'CHECK_IN_PROGRESS':
+                return None
+            return stack.status
+
         status = stack.status
-        while status == 'CHECK_IN_PROGRESS':
-            status = hc.stack_get(obj.physical_id).status
+        if status == 'CHECK_IN_PROGRESS':
+            status = hc.wait_for_stack(obj.physical_id, _check_complete)
         if status == 'CHECK_COMPLETE':
             return True
         else:
             return False
 
+    def do_check_many(self, objs):
+        '''Check the health of many stacks with a stack list.
+
+        Unlike `do_check`, no stack check is started. A stack is considered
+        healthy unless its last operation has failed or it has been deleted.
+        '''
+        result = {}
+        objs = list(objs)
+        stack_ids = [obj.physical_id for obj in objs if obj.physical_id]
+        stacks = {}
+        for start in range(0, len(stack_ids), STACK_LIST_BATCH):
+            ids = stack_ids[start:start + STACK_LIST_BATCH]
+            for stack in self.heat(objs[0]).stack_list(id=ids):
+                stacks[stack.id] = stack.status
+
+        for obj in objs:
+            status = stacks.get(obj.physical_id)
+            result[obj.id] = (status is not None and
+                              not status.startswith('DELETE_') and
+                              not status.endswith('_FAILED'))
+        return result
+
     def do_get_details(self, obj):
         if obj.physical_id is None or obj.physical_id == '':
             return {}
@@ -13,12 +13,14 @@
 import base64
 import copy
 
+from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import encodeutils
 import six
 
 from senlin.common import exception
 from senlin.common.i18n import _
+from senlin.common.i18n import _LW
 from senlin.common import schema
 from senlin.common import utils
 from senlin.drivers import base as driver_base
@@ -26,6 +28,14 @@ from senlin.profiles import base
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+CONF.import_opt('reference_cache_ttl', 'senlin.common.config')
+CONF.import_opt('reference_negative_cache_ttl', 'senlin.common.config')
+
+# IDs of the images, flavors and networks referenced by server profiles,
+# keyed by the profile, the credential used and the reference.
+_reference_cache = utils.ExpiringCache()
+
 
 class ServerProfile(base.Profile):
     '''Profile for an OpenStack Nova server.'''
@@ -269,12 +279,48 @@ class ServerProfile(base.Profile):
         self._neutronclient = driver_base.SenlinDriver().network(params)
         return self._neutronclient
 
+    def _resolve(self, obj, kind, name_or_id, finder):
+        '''Get the ID of an image, flavor or network from its name or ID.
+
+        Lookups are cached per profile and credential, including those
+        finding nothing, so that nodes created from the same profile don't
+        repeat them.
+
+        :param kind: Type of the resource referenced.
+        :param name_or_id: Name or ID of the resource.
+        :param finder: Function called with the name or ID to look up the
+                       resource, returning None if it is not found.
+        :returns: The ID of the resource.
+        '''
+        def load():
+            res = finder(name_or_id)
+            return res.id if res is not None else None
+
+        key = (self.id, obj.user, obj.project, kind, name_or_id)
+        res_id = _reference_cache.get(key, load, CONF.reference_cache_ttl,
+                                      CONF.reference_negative_cache_ttl)
+        if res_id is None:
+            raise exception.ResourceNotFound(resource=name_or_id)
+        return res_id
+
+    def _image_id(self, obj, name_or_id):
+        return self._resolve(obj, 'image', name_or_id,
+                             lambda n: self.nova(obj).image_find(n, True))
+
+    def _flavor_id(self, obj, name_or_id):
+        return self._resolve(obj, 'flavor', name_or_id,
+                             lambda n: self.nova(obj).flavor_find(n, True))
+
+    def _network_id(self, obj, name_or_id):
+        return self._resolve(obj, 'network', name_or_id,
+                             lambda n: self.neutron(obj).network_get(n))
+
     def do_validate(self, obj):
         '''Validate if the spec has provided valid info for server creation.'''
         return True
 
-    def do_create(self, obj):
-        '''Create a server using the given profile.'''
+    def _create_params(self, obj):
+        '''Build the parameters for creating servers for a node.'''
         kwargs = {}
         for key in self.KEYS:
             # context is treated as connection parameters
@@ -286,20 +332,19 @@ class ServerProfile(base.Profile):
 
         name_or_id = self.properties[self.IMAGE]
         if name_or_id is not None:
-            image = self.nova(obj).image_find(name_or_id)
             # wait for new version of openstacksdk to fix this
             kwargs.pop(self.IMAGE)
-            kwargs['imageRef'] = image.id
+            kwargs['imageRef'] = self._image_id(obj, name_or_id)
 
         flavor_id = self.properties[self.FLAVOR]
-        flavor = self.nova(obj).flavor_find(flavor_id, False)
 
         # wait for new verson of openstacksdk to fix this
         kwargs.pop(self.FLAVOR)
-        kwargs['flavorRef'] = flavor.id
+        kwargs['flavorRef'] = self._flavor_id(obj, flavor_id)
 
-        if obj.name is not None:
-            kwargs[self.NAME] = obj.name + '-' + utils.random_name(8)
+        name = self._server_name(obj)
+        if name is not None:
+            kwargs[self.NAME] = name
 
         metadata = self.properties[self.METADATA] or {}
         if obj.cluster_id is not None:
@@ -324,8 +369,7 @@ class ServerProfile(base.Profile):
             for network in networks:
                 net_name_id = network.get(self.NETWORK)
                 if net_name_id:
-                    res = self.neutron(obj).network_get(net_name_id)
-                    network['uuid'] = res.id
+                    network['uuid'] = self._network_id(obj, net_name_id)
                     del network[self.NETWORK]
                     if network['port'] is None:
                         del network['port']
@@ -336,13 +380,87 @@ class ServerProfile(base.Profile):
         if 'placement' in obj.data:
             kwargs['availability_zone'] = obj.data['placement']['zone']
 
+        return kwargs
+
+    def do_create(self, obj):
+        '''Create a server using the given profile.'''
+        if obj.physical_id:
+            # The server has been started by do_create_many
+            try:
+                created = self.nova(obj).wait_for_server(obj.physical_id)
+            except exception.InternalError as ex:
+                LOG.warning(_LW('Server %(s)s created in bulk failed, '
+                                'creating another one: %(ex)s'),
+                            {'s': obj.physical_id, 'ex': six.text_type(ex)})
+                self.nova(obj).server_delete(obj.physical_id)
+                obj.physical_id = None
+            else:
+                self.server_id = obj.physical_id
+                self._rename_server(obj)
+                self._record_zone(obj, created)
+                return obj.physical_id
+
+        kwargs = self._create_params(obj)
         LOG.info('Creating server: %s' % kwargs)
         server = self.nova(obj).server_create(**kwargs)
-        self.nova(obj).wait_for_server(server)
+        created = self.nova(obj).wait_for_server(server)
         self.server_id = server.id
+        self._record_zone(obj, created)
 
         return server.id
 
+    def do_create_many(self, objs):
+        '''Start creating the servers of many nodes with a single request.
+
+        The nodes are expected to share the same placement. Each server
+        created is assigned to a node and waited for by `do_create`, which
+        creates a server of its own for a node left without one.
+        '''
+        if len(objs) < 2:
+            return {}
+
+        # Servers are named after the first node until assigned to theirs
+        kwargs = self._create_params(objs[0])
+        LOG.info('Creating %(n)s servers: %(kw)s',
+                 {'n': len(objs), 'kw': kwargs})
+        servers = self.nova(objs[0]).server_create_many(len(objs), **kwargs)
+        return dict((obj.id, server.id) for obj, server in zip(objs, servers))
+
+    def _server_name(self, obj):
+        if obj.name is None:
+            return None
+        return obj.name + '-' + utils.random_name(8)
+
+    def _rename_server(self, obj):
+        '''Name a server created in bulk after the node it is assigned to.'''
+        name = self._server_name(obj)
+        if name is None:
+            return
+        try:
+            self.nova(obj).server_update(obj.physical_id, name=name)
+        except exception.InternalError as ex:
+            LOG.warning(_LW('Failed in renaming server %(s)s: %(ex)s'),
+                        {'s': obj.physical_id, 'ex': six.text_type(ex)})
+
+    def _record_zone(self, obj, server):
+        '''Record the availability zone of a server into node data.
+
+        Placement policies count nodes per zone based on the zone recorded,
+        which saves them from retrieving the details of every node.
+
+        :param obj: The node object the server belongs to.
+        :param server: The server retrieved from nova.
+        '''
+        if server is None:
+            return
+        zone = server.to_dict().get('OS-EXT-AZ:availability_zone', None)
+        if not isinstance(zone, six.string_types) or not zone:
+            return
+
+        placement = dict(obj.data.get('placement', None) or {})
+        placement['zone'] = zone
+        obj.data['placement'] = placement
+
     def do_delete(self, obj):
         self.server_id = obj.physical_id
 
@@ -416,15 +534,13 @@ class ServerProfile(base.Profile):
         '''Updating server image'''
 
         if old_image:
-            res = self.nova(obj).image_find(old_image)
-            image_id = res.id
+            image_id = self._image_id(obj, old_image)
         else:
             server = self.nova(obj).server_get(obj.physical_id)
             image_id = server.image['id']
 
         if new_image:
-            res = self.nova(obj).image_find(new_image)
-            new_image_id = res.id
+            new_image_id = self._image_id(obj, new_image)
             if new_image_id != image_id:
                 # (Jun Xu): Not update name here if name changed,
                 # it should be updated  in do_update
@@ -459,15 +575,13 @@ class ServerProfile(base.Profile):
                     if p['port_id'] == n['port']:
                         ports.remove(p)
                         break
-                res = self.nova(obj).server_interface_delete(n['port'],
-                                                             server)
+                self.nova(obj).server_interface_delete(n['port'], server)
             elif n['fixed-ip'] is not None:
-                res = self.neutron(obj).network_get(n['network'])
-                net_id = res.id
+                net_id = self._network_id(obj, n['network'])
                 for p in ports:
                     if (n['fixed-ip'] in p['fixed_ips']) and (
                             p['net_id'] == net_id):
-                        res = self.nova(obj).server_interface_delete(
+                        self.nova(obj).server_interface_delete(
                             p['port_id'], server)
                         ports.remove(p)
                         break
@@ -475,11 +589,10 @@ class ServerProfile(base.Profile):
         # Step2. Fuzzy search port with net_id
         for n in networks_delete:
             if n['port'] is None and n['fixed-ip'] is None:
-                res = self.neutron(obj).network_get(n['network'])
-                net_id = res.id
+                net_id = self._network_id(obj, n['network'])
                 for p in ports:
                     if p['net_id'] == net_id:
-                        res = self.nova(obj).server_interface_delete(
+                        self.nova(obj).server_interface_delete(
                             p['port_id'], server)
                         ports.remove(p)
                         break
@@ -488,8 +601,7 @@ class ServerProfile(base.Profile):
         for n in networks_create:
             net_name_id = n.get(self.NETWORK, None)
             if net_name_id:
-                res = self.neutron(obj).network_get(net_name_id)
-                n['net_id'] = res.id
+                n['net_id'] = self._network_id(obj, net_name_id)
                 if n['fixed-ip'] is not None:
                     n['fixed_ips'] = [
                         {'ip_address': n['fixed-ip']}]
@@ -503,8 +615,46 @@ class ServerProfile(base.Profile):
         return
 
     def do_check(self, obj):
-        # TODO(anyone): Check server status
-        return True
+        if not obj.physical_id:
+            return False
+
+        try:
+            server = self.nova(obj).server_get(obj.physical_id)
+        except exception.InternalError as ex:
+            if getattr(ex, 'code', None) == 404:
+                return False
+            raise
+
+        return server is not None and server.status == 'ACTIVE'
+
+    def do_check_many(self, objs):
+        '''Check the health of many servers with a single server list.
+
+        The servers of the project are listed once. Servers not found in the
+        list are checked one by one so that a server can't be reported as
+        unhealthy just because the listing missed it.
+        '''
+        result = {}
+        objs = list(objs)
+        for obj in objs:
+            if not obj.physical_id:
+                result[obj.id] = False
+        objs = [obj for obj in objs if obj.physical_id]
+        if not objs:
+            return result
+
+        servers = dict((s.id, s.status)
+                       for s in self.nova(objs[0]).server_list())
+        missing = []
+        for obj in objs:
+            if obj.physical_id in servers:
+                result[obj.id] = servers[obj.physical_id] == 'ACTIVE'
+            else:
+                missing.append(obj)
+
+        if missing:
+            result.update(super(ServerProfile, self).do_check_many(missing))
+        return result
 
     def do_get_details(self, obj):
         known_keys = {
@@ -596,7 +746,11 @@ class ServerProfile(base.Profile):
         metadata = self.nova(obj).server_metadata_get(
             server_id=obj.physical_id) or {}
         metadata['cluster'] = cluster_id
-        return self.nova(obj).server_metadata_update(**metadata)
+        res = self.nova(obj).server_metadata_update(**metadata)
+
+        if 'zone' not in (obj.data.get('placement', None) or {}):
+            self._record_zone(obj, self.nova(obj).server_get(obj.physical_id))
+        return res
 
     def do_leave(self, obj):
         if not obj.physical_id:
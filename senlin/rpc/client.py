@@ -361,17 +361,28 @@ class EngineClient(object):
 
     def event_list(self, ctxt, filters=None, limit=None, marker=None,
                    sort_keys=None, sort_dir=None, project_safe=True,
-                   show_deleted=False):
+                   show_deleted=False, start_time=None, end_time=None):
         return self.call(ctxt,
                          self.make_msg('event_list', filters=filters,
                                        limit=limit, marker=marker,
                                        sort_keys=sort_keys, sort_dir=sort_dir,
                                        project_safe=project_safe,
-                                       show_deleted=show_deleted))
+                                       show_deleted=show_deleted,
+                                       start_time=start_time,
+                                       end_time=end_time))
 
     def event_get(self, ctxt, identity):
         return self.call(ctxt,
                          self.make_msg('event_get', identity=identity))
 
+    def event_aggregate(self, ctxt, group_by=None, bucket=None, filters=None,
+                        start_time=None, end_time=None, project_safe=True):
+        return self.call(ctxt,
+                         self.make_msg('event_aggregate', group_by=group_by,
+                                       bucket=bucket, filters=filters,
+                                       start_time=start_time,
+                                       end_time=end_time,
+                                       project_safe=project_safe))
+
     def get_revision(self, ctxt):
         return self.call(ctxt, self.make_msg('get_revision'))
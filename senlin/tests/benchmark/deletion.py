@@ -0,0 +1,72 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Benchmark for choosing victims with the deletion policy.
+
+Usage: python -m senlin.tests.benchmark.deletion [--nodes N] [--count N]
+
+Victims are chosen from a cluster of the given size with each criteria of
+the deletion policy. The time spent and the number of SQL statements issued
+are printed as a JSON document.
+'''
+
+import argparse
+import json
+import time
+
+from senlin.policies import deletion_policy as dp
+from senlin.tests.benchmark import utils as bench_utils
+from senlin.tests.unit.common import utils
+
+
+def run(nodes, count):
+    utils.setup_dummy_db()
+    ctx = utils.dummy_context()
+    # one node out of a hundred is in error
+    cluster = bench_utils.create_cluster(
+        ctx, nodes, lambda i: 'ERROR' if i % 100 == 99 else 'ACTIVE')
+
+    results = []
+    for criteria in dp.DeletionPolicy.CRITERIA_VALUES:
+        spec = {
+            'type': 'senlin.policy.deletion',
+            'version': '1.0',
+            'properties': {'criteria': criteria},
+        }
+        policy = dp.DeletionPolicy('bench-policy', spec)
+        with bench_utils.count_queries() as queries:
+            start = time.time()
+            candidates = policy._select_candidates(ctx, cluster.id, count)
+            elapsed = time.time() - start
+        results.append({
+            'criteria': criteria,
+            'nodes': nodes,
+            'candidates': len(candidates),
+            'queries': len(queries),
+            'wall_time': elapsed,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Senlin deletion benchmark')
+    parser.add_argument('--nodes', type=int, default=10000,
+                        help='number of nodes in the cluster')
+    parser.add_argument('--count', type=int, default=200,
+                        help='number of nodes to delete')
+    args = parser.parse_args()
+    print(json.dumps(run(args.nodes, args.count), sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+End-to-end benchmark of the engine service.
+
+Usage: python -m senlin.tests.benchmark.engine [--nodes N] [--bursts N]
+           [--step N] [--webhooks N] [--resizes N] [--latency SECONDS]
+           [--build-time SECONDS] [--scenario NAME ...]
+
+An engine service is started in this process with the fake messaging
+transport, an in-memory SQLite database and the fake cloud backend. Requests
+are sent to it through the RPC client as the API service would do, then the
+benchmark waits for the actions started to complete. For each scenario, the
+wall time, the number of actions run, SQL statements, RPC messages and cloud
+requests, and the peak RSS of the process are printed as a JSON document.
+'''
+
+import eventlet
+eventlet.monkey_patch()
+
+import argparse  # noqa
+import collections  # noqa
+import json  # noqa
+import time  # noqa
+
+from oslo_config import cfg  # noqa
+
+from senlin.common import consts  # noqa
+from senlin.common import messaging  # noqa
+from senlin.db import api as db_api  # noqa
+from senlin.engine import environment  # noqa
+from senlin.engine import service  # noqa
+from senlin.rpc import client as rpc_client  # noqa
+from senlin.tests.benchmark import memory  # noqa
+from senlin.tests.benchmark import utils as bench_utils  # noqa
+from senlin.tests.drivers import fake  # noqa
+from senlin.tests.drivers.fake import cloud  # noqa
+from senlin.tests.unit.common import utils  # noqa
+
+SCENARIOS = ('create', 'scale_out', 'scale_in', 'webhook_storm', 'resize',
+             'list')
+
+DONE_STATUSES = (consts.ACTION_SUCCEEDED, consts.ACTION_FAILED,
+                 consts.ACTION_CANCELLED)
+
+
+class Bench(object):
+    '''An engine service and the client driving it.'''
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.ctx = utils.dummy_context()
+        self.client = rpc_client.EngineClient()
+        self.engine = service.EngineService(cfg.CONF.host,
+                                            consts.ENGINE_TOPIC)
+        self.messages = collections.Counter()
+
+    def start(self):
+        environment.global_env().register_driver('fake', fake)
+        # Count all messages going through the transport
+        driver = messaging.TRANSPORT._driver
+        send = driver.send
+
+        def counted_send(target, ctxt, message, *args, **kwargs):
+            self.messages[message.get('method')] += 1
+            return send(target, ctxt, message, *args, **kwargs)
+
+        driver.send = counted_send
+        db_api.cred_create(self.ctx, {
+            'user': self.ctx.user,
+            'project': self.ctx.project,
+            'cred': {'openstack': {'trust': 'bench-trust'}},
+        })
+        self.engine.start()
+
+    def stop(self):
+        self.engine.stop()
+
+    def profile(self):
+        spec = {
+            'type': 'os.nova.server',
+            'version': '1.0',
+            'properties': {
+                'name': 'bench-server',
+                'flavor': 'm1.small',
+                'image': 'cirros',
+                'networks': [{'network': 'private'}],
+            }
+        }
+        return self.client.profile_create(self.ctx, 'bench-profile', spec,
+                                          None, None)
+
+    def wait(self, action_ids):
+        '''Wait for the given actions to complete.
+
+        :returns: A dict of the number of actions in each status.
+        '''
+        deadline = time.time() + self.timeout
+        pending = set(action_ids)
+        statuses = collections.Counter()
+        while pending and time.time() < deadline:
+            for action_id in list(pending):
+                action = db_api.action_get(self.ctx, action_id, refresh=True)
+                if action.status in DONE_STATUSES:
+                    statuses[action.status] += 1
+                    pending.remove(action_id)
+            if pending:
+                eventlet.sleep(0.05)
+        if pending:
+            statuses['TIMEOUT'] = len(pending)
+        return dict(statuses)
+
+    def measure(self, name, func):
+        '''Run a scenario and collect its metrics.
+
+        :param name: Name of the scenario.
+        :param func: A function running the scenario, which returns the IDs
+                     of the actions to wait for.
+        :returns: A dict of the metrics of the scenario.
+        '''
+        self.messages.clear()
+        requests = sum(cloud.get_cloud().requests.values())
+        actions = len(db_api.action_get_all(self.ctx))
+        with bench_utils.count_queries() as queries:
+            start = time.time()
+            action_ids = func()
+            statuses = self.wait(action_ids)
+            elapsed = time.time() - start
+        # Child actions of the nodes are counted as well
+        actions = len(db_api.action_get_all(self.ctx)) - actions
+        return {
+            'scenario': name,
+            'wall_time': elapsed,
+            'actions': actions,
+            'statuses': statuses,
+            'queries': len(queries),
+            'queries_per_action': (float(len(queries)) / actions
+                                   if actions else None),
+            'rpc_messages': sum(self.messages.values()),
+            'rpc_by_method': dict(self.messages),
+            'cloud_requests': (sum(cloud.get_cloud().requests.values()) -
+                               requests),
+            'peak_rss_kb': memory._peak_rss(),
+        }
+
+    def concurrently(self, func, args_list):
+        '''Send requests at once from many green threads.'''
+        pool = eventlet.GreenPool(len(args_list) or 1)
+        return [r['action'] for r in pool.starmap(func, args_list)]
+
+
+def run(nodes, bursts, step, webhooks, resizes, scenarios, timeout=600):
+    utils.setup_dummy_db()
+    messaging.setup('fake://')
+    bench = Bench(timeout)
+    bench.start()
+    ctx = bench.ctx
+    client = bench.client
+    profile = bench.profile()
+    state = {}
+
+    def create():
+        cluster = client.cluster_create(ctx, 'bench-cluster', nodes,
+                                        profile['id'])
+        state['cluster'] = cluster['id']
+        filters = {'target': cluster['id'], 'action': consts.CLUSTER_CREATE}
+        return [a.id for a in db_api.action_get_all(ctx, filters=filters)]
+
+    def scale_out():
+        return bench.concurrently(
+            client.cluster_scale_out,
+            [(ctx, state['cluster'], step)] * bursts)
+
+    def scale_in():
+        return bench.concurrently(
+            client.cluster_scale_in,
+            [(ctx, state['cluster'], step)] * bursts)
+
+    def webhook_storm():
+        webhook = client.webhook_create(
+            ctx, 'bench-webhook', state['cluster'], 'cluster',
+            consts.CLUSTER_SCALE_OUT, {'trust_id': ['bench-trust']},
+            {'count': 1})
+        return bench.concurrently(client.webhook_trigger,
+                                  [(ctx, webhook['id'])] * webhooks)
+
+    def resize():
+        return bench.concurrently(
+            client.cluster_resize,
+            [(ctx, state['cluster'], consts.EXACT_CAPACITY, nodes + i)
+             for i in range(resizes)])
+
+    def listing():
+        client.event_list(ctx)
+        client.node_list(ctx, cluster_id=state['cluster'])
+        return []
+
+    funcs = {
+        'create': create,
+        'scale_out': scale_out,
+        'scale_in': scale_in,
+        'webhook_storm': webhook_storm,
+        'resize': resize,
+        'list': listing,
+    }
+    results = []
+    try:
+        for name in SCENARIOS:
+            # The cluster is created by the first scenario in any case
+            if name in scenarios or name == 'create':
+                result = bench.measure(name, funcs[name])
+                result['nodes'] = len(db_api.node_get_all_by_cluster(
+                    ctx, state['cluster']))
+                if name in scenarios:
+                    results.append(result)
+    finally:
+        bench.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Senlin engine benchmark')
+    parser.add_argument('--nodes', type=int, default=1000,
+                        help='number of nodes in the cluster created')
+    parser.add_argument('--bursts', type=int, default=10,
+                        help='number of concurrent scaling requests')
+    parser.add_argument('--step', type=int, default=10,
+                        help='number of nodes added or removed by each '
+                             'scaling request')
+    parser.add_argument('--webhooks', type=int, default=100,
+                        help='number of concurrent webhook triggers')
+    parser.add_argument('--resizes', type=int, default=10,
+                        help='number of concurrent resizes of the cluster')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='mean seconds taken by cloud requests')
+    parser.add_argument('--build-time', type=float, default=0.0,
+                        help='seconds servers take to become active')
+    parser.add_argument('--timeout', type=int, default=600,
+                        help='seconds to wait for the actions of a scenario')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='scenario to run, all by default')
+    args = parser.parse_args()
+
+    cfg.CONF([], project='senlin')
+    cfg.CONF.set_override('cloud_backend', 'fake')
+    cfg.CONF.set_override('status_poll_interval', 1)
+    cfg.CONF.set_override('latency', args.latency, group='fake_cloud')
+    cfg.CONF.set_override('build_time', args.build_time, group='fake_cloud')
+    results = run(args.nodes, args.bursts, args.step, args.webhooks,
+                  args.resizes, args.scenario or SCENARIOS, args.timeout)
+    print(json.dumps(results, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
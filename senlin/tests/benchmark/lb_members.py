@@ -0,0 +1,123 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Benchmark for adding nodes to a load-balancer pool.
+
+Usage: python -m senlin.tests.benchmark.lb_members [--nodes N]
+
+All nodes of a cluster are added to a pool one by one and then as a batch,
+using a fake neutron client whose load-balancer goes through PENDING_UPDATE
+after each member change. Sleeps while waiting for the load-balancer are
+recorded rather than taken. The result is printed as a JSON document.
+'''
+
+import argparse
+import json
+
+import eventlet
+import mock
+
+from senlin.drivers.openstack import lbaas
+from senlin.engine import node as node_mod
+from senlin.tests.benchmark import utils as bench_utils
+from senlin.tests.unit.common import utils
+
+
+class FakeNeutronClient(object):
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.pending = False
+        self.calls = 0
+
+    def _address(self, index):
+        return '10.0.%s.%s' % (index // 250, index % 250 + 1)
+
+    def subnet_get(self, name_or_id):
+        self.calls += 1
+        return mock.Mock(id='SUBNET', network_id='NETWORK')
+
+    def network_get(self, name_or_id):
+        self.calls += 1
+        net = mock.Mock(id='NETWORK')
+        net.name = 'private'
+        return net
+
+    def port_list(self, **query):
+        self.calls += 1
+        return [mock.Mock(device_id=node.physical_id,
+                          fixed_ips=[{'subnet_id': 'SUBNET',
+                                      'ip_address': self._address(i)}])
+                for i, node in enumerate(self.nodes)]
+
+    def pool_member_create(self, pool_id, address, port, subnet_id):
+        self.calls += 1
+        self.pending = True
+        return mock.Mock(id='member-' + address)
+
+    def loadbalancer_get(self, lb_id):
+        self.calls += 1
+        status = 'PENDING_UPDATE' if self.pending else 'ACTIVE'
+        self.pending = False
+        return mock.Mock(provisioning_status=status, operating_status='ONLINE')
+
+    def get_details(self, node, ctx):
+        self.calls += 1
+        index = self.nodes.index(node)
+        return {'addresses': {'private': [{'version': 4,
+                                           'addr': self._address(index)}]}}
+
+
+def run(nodes):
+    utils.setup_dummy_db()
+    ctx = utils.dummy_context()
+    cluster = bench_utils.create_cluster(ctx, nodes)
+    objs = node_mod.Node.load_all(ctx, cluster_id=cluster.id)
+
+    results = []
+    for mode in ('serial', 'batch'):
+        nc = FakeNeutronClient(objs)
+        driver = lbaas.LoadBalancerDriver({})
+        driver._nc = nc
+        sleeps = []
+        with mock.patch.object(eventlet, 'sleep', side_effect=sleeps.append):
+            with mock.patch.object(node_mod.Node, 'get_details', autospec=True,
+                                   side_effect=nc.get_details):
+                if mode == 'serial':
+                    members = [driver.member_add(node, 'LB', 'POOL', 80,
+                                                 'SUBNET') for node in objs]
+                else:
+                    members = driver.members_add(objs, 'LB', 'POOL', 80,
+                                                 'SUBNET')
+
+        results.append({
+            'mode': mode,
+            'nodes': nodes,
+            'members': len([m for m in members if m]),
+            'cloud_calls': nc.calls,
+            'lb_wait_seconds': sum(sleeps),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Senlin load-balancer membership benchmark')
+    parser.add_argument('--nodes', type=int, default=200,
+                        help='number of nodes to add to the pool')
+    args = parser.parse_args()
+    print(json.dumps(run(args.nodes), sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
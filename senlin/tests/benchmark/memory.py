@@ -0,0 +1,76 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Memory benchmark for loading and listing nodes.
+
+Usage: python -m senlin.tests.benchmark.memory [--nodes N] [--mode MODE]
+
+Each mode should be run in a separate process because peak RSS can only grow
+within a process. The result is printed as a JSON document.
+'''
+
+import argparse
+import gc
+import json
+import resource
+import time
+
+from senlin.engine import node as node_mod
+from senlin.tests.benchmark import utils as bench_utils
+from senlin.tests.unit.common import utils
+
+MODES = ('load', 'list')
+
+
+def _peak_rss():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(count, mode):
+    utils.setup_dummy_db()
+    ctx = utils.dummy_context()
+    cluster = bench_utils.create_cluster(ctx, count)
+    gc.collect()
+
+    baseline = _peak_rss()
+    start = time.time()
+    if mode == 'load':
+        nodes = node_mod.Node.load_all(ctx, cluster_id=cluster.id)
+    else:
+        nodes = [n.to_dict() for n in node_mod.Node.load_all(ctx)]
+    elapsed = time.time() - start
+    peak = _peak_rss()
+
+    return {
+        'mode': mode,
+        'nodes': len(nodes),
+        'wall_time': elapsed,
+        'baseline_rss_kb': baseline,
+        'peak_rss_kb': peak,
+        'delta_rss_kb': peak - baseline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Senlin memory benchmark')
+    parser.add_argument('--nodes', type=int, default=10000,
+                        help='number of nodes to create')
+    parser.add_argument('--mode', choices=MODES, default='load',
+                        help='load nodes as objects or list them as dicts')
+    args = parser.parse_args()
+    print(json.dumps(run(args.nodes, args.mode), sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Benchmark for planning node placement across availability zones.
+
+Usage: python -m senlin.tests.benchmark.placement [--nodes N] [--count N]
+
+A scale-out of a cluster is planned by the zone placement policy, with the
+cloud calls counted by a fake nova client. The result is printed as a JSON
+document.
+'''
+
+import argparse
+import json
+import time
+
+import mock
+
+from senlin.engine import node as node_mod
+from senlin.policies import zone_placement as zp
+from senlin.tests.benchmark import utils as bench_utils
+from senlin.tests.unit.common import utils
+
+ZONES = ['AZ1', 'AZ2', 'AZ3']
+
+
+def run(nodes, count):
+    utils.setup_dummy_db()
+    ctx = utils.dummy_context()
+    cluster = bench_utils.create_cluster(
+        ctx, nodes,
+        data_of=lambda i: {'placement': {'zone': ZONES[i % len(ZONES)]}})
+
+    nc = mock.Mock()
+    nc.availability_zone_list.return_value = [
+        {'zoneName': z, 'zoneState': {'available': True}} for z in ZONES]
+    spec = {
+        'type': 'senlin.policy.zone_placement',
+        'version': '1.0',
+        'properties': {'zones': [{'name': z} for z in ZONES]},
+    }
+
+    results = []
+    with mock.patch.object(node_mod.Node, 'get_details') as mock_details:
+        for attempt in ('first', 'second'):
+            policy = zp.ZonePlacementPolicy('bench-policy', spec)
+            policy._novaclient = nc
+            action = mock.Mock(context=ctx, data={}, inputs={'count': count})
+            nc.reset_mock()
+            mock_details.reset_mock()
+
+            with bench_utils.count_queries() as queries:
+                start = time.time()
+                policy.pre_op(cluster.id, action)
+                elapsed = time.time() - start
+
+            results.append({
+                'scale_out': attempt,
+                'nodes': nodes,
+                'placements': len(action.data['placement']['placements']),
+                'cloud_calls': len(nc.method_calls),
+                'node_detail_calls': mock_details.call_count,
+                'queries': len(queries),
+                'wall_time': elapsed,
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Senlin placement benchmark')
+    parser.add_argument('--nodes', type=int, default=1000,
+                        help='number of nodes in the cluster')
+    parser.add_argument('--count', type=int, default=10,
+                        help='number of nodes to add')
+    args = parser.parse_args()
+    print(json.dumps(run(args.nodes, args.count), sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+Benchmark for spec validation and resolution.
+
+Usage: python -m senlin.tests.benchmark.spec [--iterations N]
+
+For each spec, a Spec object is created, validated and all its items are
+read, which is what happens when a profile or a policy is constructed and
+used. The result is printed as a JSON document.
+'''
+
+import argparse
+import json
+import timeit
+
+from senlin.common import schema
+from senlin.policies import lb_policy
+from senlin.profiles.os.nova import server
+
+SPECS = {
+    'os.nova.server': (server.ServerProfile.properties_schema, {
+        'context': {},
+        'adminPass': 'adminpass',
+        'auto_disk_config': True,
+        'availability_zone': 'FAKE_AZ',
+        'block_device_mapping': [{
+            'device_name': 'FAKE_NAME',
+            'volume_size': 1000,
+        }],
+        'config_drive': False,
+        'flavor': 'FLAV',
+        'image': 'FAKE_IMAGE',
+        'key_name': 'FAKE_KEYNAME',
+        'metadata': {'meta var': 'meta val'},
+        'name': 'FAKE_SERVER_NAME',
+        'networks': [{
+            'port': 'FAKE_PORT',
+            'fixed-ip': 'FAKE_IP',
+            'network': 'FAKE_NET',
+        }],
+        'personality': [{
+            'path': '/etc/motd',
+            'contents': 'foo',
+        }],
+        'scheduler_hints': {'same_host': 'HOST_ID'},
+        'security_groups': ['HIGH_SECURITY_GROUP'],
+        'user_data': 'FAKE_USER_DATA',
+    }),
+    'senlin.policy.loadbalance': (
+        lb_policy.LoadBalancingPolicy.properties_schema, {
+            'pool': {
+                'protocol': 'HTTP',
+                'protocol_port': 80,
+                'subnet': 'test-subnet',
+                'lb_method': 'ROUND_ROBIN',
+                'admin_state_up': True,
+                'session_persistence': {
+                    'type': 'SOURCE_IP',
+                    'cookie_name': 'whatever'
+                }
+            },
+            'vip': {
+                'address': '192.168.1.100',
+                'subnet': 'test-subnet',
+                'connection_limit': 500,
+                'protocol': 'HTTP',
+                'protocol_port': 80,
+                'admin_state_up': True,
+            }
+        }),
+}
+
+
+def _use_spec(spec_schema, data):
+    spec = schema.Spec(spec_schema, data)
+    spec.validate()
+    for key in spec:
+        spec[key]
+    # Read the items again, as plugins do when they are used
+    for key in spec:
+        spec[key]
+
+
+def run(iterations):
+    results = []
+    for name, (spec_schema, data) in sorted(SPECS.items()):
+        elapsed = timeit.timeit(lambda: _use_spec(spec_schema, data),
+                                number=iterations)
+        results.append({
+            'spec': name,
+            'iterations': iterations,
+            'wall_time': elapsed,
+            'usec_per_spec': elapsed * 1000000 / iterations,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Senlin spec benchmark')
+    parser.add_argument('--iterations', type=int, default=10000,
+                        help='number of specs to validate')
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import contextlib
+import datetime
+
+from oslo_utils import timeutils
+import sqlalchemy
+
+from senlin.db import api as db_api
+from senlin.db.sqlalchemy import api as db_impl
+from senlin.engine import environment
+from senlin.tests.unit import fakes
+
+
+def create_cluster(ctx, count, status_of=None, data_of=None):
+    '''Create a cluster with the given number of nodes in database.
+
+    :param ctx: The request context.
+    :param count: Number of nodes to create.
+    :param status_of: An optional function returning the status of the i-th
+                      node, which defaults to 'ACTIVE'.
+    :param data_of: An optional function returning the data of the i-th
+                    node, which defaults to an empty dict.
+    :returns: The cluster DB record.
+    '''
+    environment.global_env().register_profile('TestProfile',
+                                              fakes.TestProfile)
+    profile = db_api.profile_create(ctx, {
+        'name': 'bench-profile',
+        'type': 'TestProfile-1.0',
+        'spec': {'type': 'TestProfile', 'version': '1.0',
+                 'properties': {'INT': 1}},
+        'user': ctx.user,
+        'project': ctx.project,
+    })
+    cluster = db_api.cluster_create(ctx, {
+        'name': 'bench-cluster',
+        'profile_id': profile.id,
+        'user': ctx.user,
+        'project': ctx.project,
+        'next_index': count + 1,
+        'status': 'ACTIVE',
+    })
+    now = timeutils.utcnow()
+    for i in range(count):
+        db_api.node_create(ctx, {
+            'name': 'node-%s' % i,
+            'profile_id': profile.id,
+            'cluster_id': cluster.id,
+            'physical_id': 'physical-%s' % i,
+            'index': i + 1,
+            'user': ctx.user,
+            'project': ctx.project,
+            'status': status_of(i) if status_of else 'ACTIVE',
+            'created_time': now - datetime.timedelta(seconds=count - i),
+            'data': data_of(i) if data_of else {},
+            'meta_data': {},
+        })
+    return cluster
+
+
+@contextlib.contextmanager
+def count_queries():
+    '''Count SQL statements executed within the block.
+
+    :returns: A list whose length is the number of statements executed.
+    '''
+    statements = []
+    engine = db_impl.get_engine()
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sqlalchemy.event.listen(engine, 'before_cursor_execute', before_execute)
+    try:
+        yield statements
+    finally:
+        sqlalchemy.event.remove(engine, 'before_cursor_execute',
+                                before_execute)
@@ -0,0 +1,872 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+'''
+In-memory cloud behind the drivers of the fake backend.
+
+The cloud plays the SDK connections the OpenStack drivers talk to, so the
+engine can manage thousands of nodes on a single machine. Every request can
+be delayed, rejected when over a rate limit or failed at random, and new
+resources take some time to become active and may end up in error, all as
+configured in the [fake_cloud] section.
+'''
+
+import collections
+import datetime
+import functools
+import itertools
+import random
+import re
+import time
+import uuid
+
+import eventlet
+from openstack import exceptions as sdk_exc
+from oslo_config import cfg
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
+
+fake_cloud_group = cfg.OptGroup('fake_cloud')
+fake_cloud_opts = [
+    cfg.FloatOpt('latency',
+                 default=0.0,
+                 help='Mean seconds taken by a request to the fake cloud.'),
+    cfg.StrOpt('latency_distribution',
+               default='constant',
+               choices=['constant', 'uniform', 'normal', 'exponential'],
+               help='Distribution of the latency of requests.'),
+    cfg.FloatOpt('latency_spread',
+                 default=0.0,
+                 help='Half width of the uniform distribution or standard '
+                      'deviation of the normal distribution of latency.'),
+    cfg.FloatOpt('failure_rate',
+                 default=0.0,
+                 help='Probability of a request failing with an internal '
+                      'error.'),
+    cfg.FloatOpt('build_failure_rate',
+                 default=0.0,
+                 help='Probability of a server or stack ending up in error '
+                      'once built.'),
+    cfg.IntOpt('rate_limit',
+               default=0,
+               help='Requests per second accepted by each service, others '
+                    'are rejected with a 429 error. Set to 0 to accept all.'),
+    cfg.FloatOpt('build_time',
+                 default=0.0,
+                 help='Seconds servers, stacks and load-balancers take to '
+                      'become active.'),
+    cfg.FloatOpt('update_time',
+                 default=0.0,
+                 help='Seconds resources take to be updated or deleted.'),
+    cfg.ListOpt('availability_zones',
+                default=['nova'],
+                help='Availability zones servers are spread over.'),
+    cfg.ListOpt('regions',
+                default=['RegionOne'],
+                help='Regions of the fake cloud.'),
+    cfg.IntOpt('seed',
+               help='Seed of the random choices, for repeatable runs.'),
+]
+cfg.CONF.register_group(fake_cloud_group)
+cfg.CONF.register_opts(fake_cloud_opts, group=fake_cloud_group)
+CONF = cfg.CONF
+
+NETWORK_ID = 'a1f8e5bc-4c63-4a8e-b2d9-5d3d5c1d0001'
+SUBNET_ID = 'a1f8e5bc-4c63-4a8e-b2d9-5d3d5c1d0002'
+IMAGE_ID = 'a1f8e5bc-4c63-4a8e-b2d9-5d3d5c1d0003'
+
+_cloud = None
+
+
+def get_cloud():
+    '''Get the cloud shared by all drivers of the fake backend.'''
+    global _cloud
+    if _cloud is None:
+        _cloud = Cloud()
+    return _cloud
+
+
+def reset():
+    '''Drop all resources of the fake cloud and its statistics.'''
+    global _cloud
+    _cloud = None
+
+
+def _error(cls, code, message):
+    ex = cls(message=message)
+    ex.status_code = code
+    ex.http_status = code
+    return ex
+
+
+def _not_found(kind, value):
+    return _error(sdk_exc.ResourceNotFound, 404,
+                  'No %s found for %s' % (kind, value))
+
+
+def _id_of(value):
+    return getattr(value, 'id', value)
+
+
+class Resource(dict):
+    '''A snapshot of a resource, read like the resources of the SDK.'''
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def to_dict(self):
+        return dict(self)
+
+
+class Cloud(object):
+    '''Resources of the fake cloud and the simulation of requests.'''
+
+    def __init__(self):
+        self.random = random.Random(CONF.fake_cloud.seed)
+        self.requests = collections.Counter()
+        self.rejected = collections.Counter()
+        self._buckets = {}
+        self._addresses = itertools.count(1)
+
+        self.servers = {}
+        self.ports = {}
+        self.stacks = {}
+        self.loadbalancers = {}
+        self.listeners = {}
+        self.pools = {}
+        self.members = {}
+        self.healthmonitors = {}
+        self.trusts = {}
+        self.alarms = {}
+        self.networks = {
+            NETWORK_ID: {'id': NETWORK_ID, 'name': 'private',
+                         'status': 'ACTIVE', 'subnets': [SUBNET_ID]},
+        }
+        self.subnets = {
+            SUBNET_ID: {'id': SUBNET_ID, 'name': 'private-subnet',
+                        'network_id': NETWORK_ID, 'ip_version': 4,
+                        'cidr': '10.0.0.0/8'},
+        }
+        self.images = {
+            IMAGE_ID: {'id': IMAGE_ID, 'name': 'cirros', 'status': 'ACTIVE'},
+        }
+        self.flavors = dict(
+            (str(i), {'id': str(i), 'name': name, 'vcpus': vcpus,
+                      'ram': ram, 'disk': disk})
+            for i, (name, vcpus, ram, disk) in enumerate([
+                ('m1.tiny', 1, 512, 1), ('m1.small', 1, 2048, 20),
+                ('m1.medium', 2, 4096, 40), ('m1.large', 4, 8192, 80),
+            ], 1))
+        self.keypairs = {}
+
+    # Simulation of requests
+
+    def request(self, service):
+        '''Simulate the handling of a request by a service.
+
+        :param service: Name of the service receiving the request.
+        :raises: An HttpException when the request is over the rate limit
+                 or picked to fail.
+        '''
+        self.requests[service] += 1
+        self._limit(service)
+
+        delay = self._latency()
+        if delay > 0:
+            eventlet.sleep(delay)
+
+        if self.random.random() < CONF.fake_cloud.failure_rate:
+            raise _error(sdk_exc.HttpException, 500, 'Injected failure')
+
+    def _limit(self, service):
+        rate = CONF.fake_cloud.rate_limit
+        if rate <= 0:
+            return
+
+        # A token bucket refilled at the rate allowed, holding at most one
+        # second worth of requests
+        now = time.time()
+        tokens, last = self._buckets.get(service, (rate, now))
+        tokens = min(rate, tokens + (now - last) * rate)
+        if tokens < 1:
+            self._buckets[service] = (tokens, now)
+            self.rejected[service] += 1
+            raise _error(sdk_exc.HttpException, 429, 'Rate limit exceeded')
+        self._buckets[service] = (tokens - 1, now)
+
+    def _latency(self):
+        mean = CONF.fake_cloud.latency
+        spread = CONF.fake_cloud.latency_spread
+        distribution = CONF.fake_cloud.latency_distribution
+        if mean <= 0:
+            return 0
+        if distribution == 'uniform':
+            value = self.random.uniform(mean - spread, mean + spread)
+        elif distribution == 'normal':
+            value = self.random.normalvariate(mean, spread)
+        elif distribution == 'exponential':
+            value = self.random.expovariate(1.0 / mean)
+        else:
+            value = mean
+        return max(value, 0)
+
+    def build_result(self, good, bad):
+        '''Pick the status a resource ends up in once built.'''
+        if self.random.random() < CONF.fake_cloud.build_failure_rate:
+            return bad
+        return good
+
+    # Life cycle of resources
+
+    def schedule(self, record, delay, **changes):
+        '''Change a resource after some time.
+
+        Changes are applied when the resource is next read. A resource
+        changed with `_deleted` set to True is dropped, unless kept by the
+        service for listing deleted resources.
+        '''
+        ready_at = time.time() + delay
+        if delay > 0:
+            record['_pending'] = (ready_at, changes)
+        else:
+            record.pop('_pending', None)
+            self._apply(record, ready_at, changes)
+
+    def _apply(self, record, ready_at, changes):
+        record.update(changes)
+        record['updated_at'] = datetime.datetime.utcfromtimestamp(ready_at)
+
+    def settle(self, store, record_id):
+        '''Get a resource record with the changes due applied.
+
+        :returns: The record, or None if it is not found or deleted.
+        '''
+        record = store.get(record_id)
+        if record is None:
+            return None
+        pending = record.get('_pending')
+        if pending is not None and pending[0] <= time.time():
+            del record['_pending']
+            self._apply(record, pending[0], pending[1])
+        if record.get('_deleted') and not record.get('_keep'):
+            del store[record_id]
+            return None
+        return record
+
+    def all(self, store):
+        return [r for r in (self.settle(store, k) for k in list(store))
+                if r is not None]
+
+    def next_address(self):
+        n = next(self._addresses)
+        return '10.%d.%d.%d' % ((n >> 16) & 255, (n >> 8) & 255, n & 255)
+
+
+def snapshot(record):
+    '''Build the resource returned to clients from a record.'''
+    if record is None:
+        return None
+    return Resource((k, v) for k, v in record.items() if not k.startswith('_'))
+
+
+def find(cloud, store, name_or_id, name_key='name'):
+    record = cloud.settle(store, name_or_id)
+    if record is not None:
+        return record
+    for record in cloud.all(store):
+        if record.get(name_key) == name_or_id:
+            return record
+    return None
+
+
+def request(func):
+    '''Decorator simulating the request handled by a proxy method.'''
+
+    @functools.wraps(func)
+    def invoke(proxy, *args, **kwargs):
+        proxy.cloud.request(proxy.service)
+        return func(proxy, *args, **kwargs)
+
+    return invoke
+
+
+class Proxy(object):
+
+    service = None
+
+    def __init__(self, cloud, params):
+        self.cloud = cloud
+        self.params = params
+
+    def _find(self, kind, store, name_or_id, ignore_missing=True,
+              name_key='name'):
+        record = find(self.cloud, store, name_or_id, name_key)
+        if record is None and not ignore_missing:
+            raise _not_found(kind, name_or_id)
+        return snapshot(record)
+
+    def _get(self, kind, store, value):
+        record = self.cloud.settle(store, _id_of(value))
+        if record is None:
+            raise _not_found(kind, _id_of(value))
+        return record
+
+    def _delete(self, kind, store, value, ignore_missing, **changes):
+        record = self.cloud.settle(store, _id_of(value))
+        if record is None:
+            if not ignore_missing:
+                raise _not_found(kind, _id_of(value))
+            return None
+        changes['_deleted'] = True
+        self.cloud.schedule(record, CONF.fake_cloud.update_time, **changes)
+        return record
+
+
+class ComputeProxy(Proxy):
+
+    service = 'compute'
+
+    @request
+    def find_flavor(self, name_or_id, ignore_missing=True):
+        return self._find('flavor', self.cloud.flavors, name_or_id,
+                          ignore_missing)
+
+    @request
+    def get_flavor(self, value):
+        return snapshot(self._get('flavor', self.cloud.flavors, value))
+
+    @request
+    def flavors(self, details=True, **query):
+        return [snapshot(f) for f in self.cloud.all(self.cloud.flavors)]
+
+    @request
+    def find_image(self, name_or_id, ignore_missing=True):
+        return self._find('image', self.cloud.images, name_or_id,
+                          ignore_missing)
+
+    @request
+    def get_image(self, value):
+        return snapshot(self._get('image', self.cloud.images, value))
+
+    @request
+    def images(self, details=True, **query):
+        return [snapshot(i) for i in self.cloud.all(self.cloud.images)]
+
+    @request
+    def create_keypair(self, **attrs):
+        keypair = dict(attrs, id=attrs['name'])
+        self.cloud.keypairs[keypair['id']] = keypair
+        return snapshot(keypair)
+
+    @request
+    def find_keypair(self, name_or_id, ignore_missing=True):
+        return self._find('keypair', self.cloud.keypairs, name_or_id,
+                          ignore_missing)
+
+    @request
+    def get_keypair(self, value):
+        return snapshot(self._get('keypair', self.cloud.keypairs, value))
+
+    @request
+    def keypairs(self, **query):
+        return [snapshot(k) for k in self.cloud.all(self.cloud.keypairs)]
+
+    @request
+    def delete_keypair(self, value, ignore_missing=True):
+        self._delete('keypair', self.cloud.keypairs, value, ignore_missing)
+
+    @request
+    def availability_zones(self, **query):
+        return [Resource(zoneName=z, zoneState={'available': True})
+                for z in CONF.fake_cloud.availability_zones]
+
+    def _new_server(self, name, attrs):
+        cloud = self.cloud
+        server_id = uuidutils.generate_uuid()
+        zone = (attrs.get('availability_zone') or
+                cloud.random.choice(CONF.fake_cloud.availability_zones))
+
+        addresses = {}
+        for net in attrs.get('networks') or [{'uuid': NETWORK_ID}]:
+            network = cloud.networks.get(net.get('uuid'),
+                                         cloud.networks[NETWORK_ID])
+            address = net.get('fixed-ip') or cloud.next_address()
+            addresses.setdefault(network['name'], []).append(
+                {'addr': address, 'version': 4})
+            port_id = uuidutils.generate_uuid()
+            cloud.ports[port_id] = {
+                'id': port_id,
+                'network_id': network['id'],
+                'device_id': server_id,
+                'fixed_ips': [{'subnet_id': network['subnets'][0],
+                               'ip_address': address}],
+            }
+
+        now = timeutils.utcnow()
+        server = {
+            'id': server_id,
+            'name': name,
+            'status': 'BUILD',
+            'image': {'id': attrs.get('imageRef')},
+            'flavor': {'id': attrs.get('flavorRef')},
+            'metadata': dict(attrs.get('metadata') or {}),
+            'addresses': addresses,
+            'availability_zone': zone,
+            'OS-EXT-AZ:availability_zone': zone,
+            'project_id': self.params.get('project_id'),
+            'created_at': now,
+            'updated_at': now,
+        }
+        cloud.servers[server_id] = server
+        cloud.schedule(server, CONF.fake_cloud.build_time,
+                       status=cloud.build_result('ACTIVE', 'ERROR'))
+        return server
+
+    @request
+    def create_server(self, **attrs):
+        count = attrs.pop('max_count', 1)
+        attrs.pop('min_count', None)
+        if count == 1:
+            return snapshot(self._new_server(attrs.get('name'), attrs))
+
+        servers = [self._new_server('%s-%s' % (attrs.get('name'), i), attrs)
+                   for i in range(1, count + 1)]
+        return snapshot(servers[0])
+
+    @request
+    def servers(self, details=True, **query):
+        since = query.pop('changes_since', None)
+        if since is not None:
+            since = timeutils.normalize_time(timeutils.parse_isotime(since))
+        name = query.pop('name', None)
+        pattern = re.compile(name) if name else None
+        status = query.pop('status', None)
+
+        result = []
+        for server in self.cloud.all(self.cloud.servers):
+            if since is not None and server['updated_at'] < since:
+                continue
+            if pattern is not None and not pattern.search(server['name']):
+                continue
+            if status is not None and server['status'] != status:
+                continue
+            result.append(snapshot(server))
+        return result
+
+    @request
+    def get_server(self, value):
+        return snapshot(self._get('server', self.cloud.servers, value))
+
+    @request
+    def find_server(self, name_or_id, ignore_missing=True):
+        return self._find('server', self.cloud.servers, name_or_id,
+                          ignore_missing)
+
+    @request
+    def update_server(self, value, **attrs):
+        server = self._get('server', self.cloud.servers, value)
+        server.update(attrs)
+        server['updated_at'] = timeutils.utcnow()
+        return snapshot(server)
+
+    @request
+    def rebuild_server(self, value, image, name=None, admin_password=None,
+                       **attrs):
+        server = self._get('server', self.cloud.servers, value)
+        server.update(status='REBUILD', image={'id': _id_of(image)})
+        if name is not None:
+            server['name'] = name
+        self.cloud.schedule(server, CONF.fake_cloud.build_time,
+                            status=self.cloud.build_result('ACTIVE', 'ERROR'))
+        return snapshot(server)
+
+    @request
+    def delete_server(self, value, ignore_missing=True):
+        server = self._delete('server', self.cloud.servers, value,
+                              ignore_missing)
+        if server is None:
+            return
+        server['status'] = 'DELETED'
+        for port in list(self.cloud.ports.values()):
+            if port['device_id'] == server['id']:
+                del self.cloud.ports[port['id']]
+
+    @request
+    def get_server_metadata(self, value):
+        server = self._get('server', self.cloud.servers, value)
+        return dict(server['metadata'])
+
+    @request
+    def set_server_metadata(self, value, **metadata):
+        server = self._get('server', self.cloud.servers, value)
+        server['metadata'] = metadata
+        return dict(metadata)
+
+    @request
+    def server_interfaces(self, server, **query):
+        server_id = _id_of(server)
+        return [Resource(port_id=p['id'], net_id=p['network_id'],
+                         fixed_ips=p['fixed_ips'])
+                for p in self.cloud.ports.values()
+                if p['device_id'] == server_id]
+
+
+class NetworkProxy(Proxy):
+
+    service = 'network'
+
+    @request
+    def find_network(self, name_or_id, ignore_missing=True):
+        return self._find('network', self.cloud.networks, name_or_id,
+                          ignore_missing)
+
+    @request
+    def find_subnet(self, name_or_id, ignore_missing=True):
+        return self._find('subnet', self.cloud.subnets, name_or_id,
+                          ignore_missing)
+
+    @request
+    def ports(self, **query):
+        return [Resource(p) for p in self.cloud.ports.values()
+                if all(p.get(k) == v for k, v in query.items())]
+
+    def _lb_of(self, listener_id=None, pool_id=None):
+        if pool_id is not None:
+            listener_id = self._get('pool', self.cloud.pools,
+                                    pool_id)['listener_id']
+        return self._get('listener', self.cloud.listeners,
+                         listener_id)['loadbalancer_id']
+
+    def _update_lb(self, lb_id):
+        '''Make a load-balancer busy while its children are changed.'''
+        lb = self._get('loadbalancer', self.cloud.loadbalancers, lb_id)
+        if lb['provisioning_status'] != 'ACTIVE':
+            raise _error(sdk_exc.HttpException, 409,
+                         'Load balancer %s is immutable' % lb_id)
+        lb['provisioning_status'] = 'PENDING_UPDATE'
+        self.cloud.schedule(lb, CONF.fake_cloud.update_time,
+                            provisioning_status='ACTIVE')
+
+    def _create(self, kind, store, lb_id, attrs):
+        if lb_id is not None:
+            self._update_lb(lb_id)
+        record = dict(attrs, id=uuidutils.generate_uuid())
+        store[record['id']] = record
+        return snapshot(record)
+
+    def _remove(self, kind, store, value, ignore_missing, lb_of):
+        record = self.cloud.settle(store, _id_of(value))
+        if record is None:
+            if not ignore_missing:
+                raise _not_found(kind, _id_of(value))
+            return
+        self._update_lb(lb_of(record))
+        del store[record['id']]
+
+    @request
+    def find_load_balancer(self, name_or_id, ignore_missing=True):
+        return self._find('loadbalancer', self.cloud.loadbalancers,
+                          name_or_id, ignore_missing)
+
+    @request
+    def load_balancers(self):
+        return [snapshot(lb)
+                for lb in self.cloud.all(self.cloud.loadbalancers)]
+
+    @request
+    def create_load_balancer(self, **attrs):
+        lb = dict(attrs, id=uuidutils.generate_uuid(),
+                  vip_address=attrs.get('vip_address') or
+                  self.cloud.next_address(),
+                  provisioning_status='PENDING_CREATE',
+                  operating_status='OFFLINE')
+        self.cloud.loadbalancers[lb['id']] = lb
+        self.cloud.schedule(lb, CONF.fake_cloud.build_time,
+                            provisioning_status='ACTIVE',
+                            operating_status='ONLINE')
+        return snapshot(lb)
+
+    @request
+    def delete_load_balancer(self, value, ignore_missing=True):
+        lb = self._delete('loadbalancer', self.cloud.loadbalancers, value,
+                          ignore_missing)
+        if lb is not None and not lb.get('_deleted'):
+            lb['provisioning_status'] = 'PENDING_DELETE'
+
+    @request
+    def find_listener(self, name_or_id, ignore_missing=True):
+        return self._find('listener', self.cloud.listeners, name_or_id,
+                          ignore_missing)
+
+    @request
+    def listeners(self):
+        return [snapshot(i) for i in self.cloud.all(self.cloud.listeners)]
+
+    @request
+    def create_listener(self, **attrs):
+        return self._create('listener', self.cloud.listeners,
+                            attrs['loadbalancer_id'], attrs)
+
+    @request
+    def delete_listener(self, value, ignore_missing=True):
+        self._remove('listener', self.cloud.listeners, value, ignore_missing,
+                     lambda r: r['loadbalancer_id'])
+
+    @request
+    def find_pool(self, name_or_id, ignore_missing=True):
+        return self._find('pool', self.cloud.pools, name_or_id,
+                          ignore_missing)
+
+    @request
+    def pools(self):
+        return [snapshot(p) for p in self.cloud.all(self.cloud.pools)]
+
+    @request
+    def create_pool(self, **attrs):
+        return self._create('pool', self.cloud.pools,
+                            self._lb_of(listener_id=attrs['listener_id']),
+                            attrs)
+
+    @request
+    def delete_pool(self, value, ignore_missing=True):
+        self._remove('pool', self.cloud.pools, value, ignore_missing,
+                     lambda r: self._lb_of(listener_id=r['listener_id']))
+
+    @request
+    def find_pool_member(self, name_or_id, pool, ignore_missing=True):
+        member = find(self.cloud, self.cloud.members, name_or_id)
+        if member is None or member['pool_id'] != _id_of(pool):
+            if not ignore_missing:
+                raise _not_found('member', name_or_id)
+            return None
+        return snapshot(member)
+
+    @request
+    def pool_members(self, pool, **query):
+        pool_id = _id_of(pool)
+        return [snapshot(m) for m in self.cloud.all(self.cloud.members)
+                if m['pool_id'] == pool_id]
+
+    @request
+    def create_pool_member(self, **attrs):
+        return self._create('member', self.cloud.members,
+                            self._lb_of(pool_id=attrs['pool_id']), attrs)
+
+    @request
+    def delete_pool_member(self, value, pool, ignore_missing=True):
+        self._remove('member', self.cloud.members, value, ignore_missing,
+                     lambda r: self._lb_of(pool_id=r['pool_id']))
+
+    @request
+    def find_health_monitor(self, name_or_id, ignore_missing=True):
+        return self._find('healthmonitor', self.cloud.healthmonitors,
+                          name_or_id, ignore_missing)
+
+    @request
+    def health_monitors(self):
+        return [snapshot(hm)
+                for hm in self.cloud.all(self.cloud.healthmonitors)]
+
+    @request
+    def create_health_monitor(self, **attrs):
+        return self._create('healthmonitor', self.cloud.healthmonitors,
+                            self._lb_of(pool_id=attrs['pool_id']), attrs)
+
+    @request
+    def delete_health_monitor(self, value, ignore_missing=True):
+        self._remove('healthmonitor', self.cloud.healthmonitors, value,
+                     ignore_missing,
+                     lambda r: self._lb_of(pool_id=r['pool_id']))
+
+
+class OrchestrationProxy(Proxy):
+
+    service = 'orchestration'
+
+    def _run(self, stack, operation, delay):
+        stack.update(status='%s_IN_PROGRESS' % operation,
+                     status_reason='Stack %s started' % operation)
+        status = self.cloud.build_result('COMPLETE', 'FAILED')
+        self.cloud.schedule(stack, delay,
+                            status='%s_%s' % (operation, status),
+                            status_reason='Stack %s %s' % (operation,
+                                                           status.lower()))
+
+    @request
+    def create_stack(self, **params):
+        now = timeutils.utcnow()
+        stack = dict(params, id=uuidutils.generate_uuid(),
+                     name=params.get('stack_name'),
+                     project_id=self.params.get('project_id'),
+                     created_at=now, updated_at=now, _keep=True)
+        self.cloud.stacks[stack['id']] = stack
+        self._run(stack, 'CREATE', CONF.fake_cloud.build_time)
+        return snapshot(stack)
+
+    @request
+    def get_stack(self, value):
+        return snapshot(self._get('stack', self.cloud.stacks, value))
+
+    @request
+    def find_stack(self, name_or_id, ignore_missing=True):
+        stack = find(self.cloud, self.cloud.stacks, name_or_id)
+        if stack is not None and stack['status'] == 'DELETE_COMPLETE':
+            stack = None
+        if stack is None and not ignore_missing:
+            raise _not_found('stack', name_or_id)
+        return snapshot(stack)
+
+    @request
+    def stacks(self, **query):
+        ids = query.pop('id', None)
+        if ids is not None and not isinstance(ids, (list, tuple, set)):
+            ids = [ids]
+        show_deleted = query.pop('show_deleted', False)
+        name = query.pop('name', None)
+
+        if ids is not None:
+            stacks = [s for s in (self.cloud.settle(self.cloud.stacks, i)
+                                  for i in ids) if s is not None]
+        else:
+            stacks = self.cloud.all(self.cloud.stacks)
+        return [snapshot(s) for s in stacks
+                if (show_deleted or s['status'] != 'DELETE_COMPLETE') and
+                (name is None or s['name'] == name)]
+
+    @request
+    def update_stack(self, value, **params):
+        stack = self._get('stack', self.cloud.stacks, value)
+        stack.update(params)
+        self._run(stack, 'UPDATE', CONF.fake_cloud.update_time)
+        return snapshot(stack)
+
+    @request
+    def delete_stack(self, value, ignore_missing=True):
+        stack = self.cloud.settle(self.cloud.stacks, _id_of(value))
+        if stack is None or stack['status'] == 'DELETE_COMPLETE':
+            if not ignore_missing:
+                raise _not_found('stack', _id_of(value))
+            return
+        stack.update(status='DELETE_IN_PROGRESS',
+                     status_reason='Stack DELETE started')
+        self.cloud.schedule(stack, CONF.fake_cloud.update_time,
+                            status='DELETE_COMPLETE',
+                            status_reason='Stack DELETE completed')
+
+
+class IdentityProxy(Proxy):
+
+    service = 'identity'
+
+    SERVICES = ('clustering', 'compute', 'network', 'orchestration',
+                'identity', 'metering')
+
+    @request
+    def authenticate(self, **creds):
+        '''Issue a token, like `sdk.authenticate` does.'''
+        user_id = creds.get('user_id') or 'user-%s' % creds.get('username')
+        return {
+            'token': uuid.uuid4().hex,
+            'user_id': user_id,
+            'project_id': creds.get('project_id'),
+            'expires_at': timeutils.utcnow() + datetime.timedelta(hours=1),
+        }
+
+    @request
+    def trusts(self, **query):
+        return [snapshot(t) for t in self.cloud.all(self.cloud.trusts)
+                if all(t.get(k) == v for k, v in query.items())]
+
+    @request
+    def create_trust(self, **attrs):
+        trust = dict(attrs, id=uuid.uuid4().hex)
+        self.cloud.trusts[trust['id']] = trust
+        return snapshot(trust)
+
+    @request
+    def delete_trust(self, value, ignore_missing=True):
+        self._delete('trust', self.cloud.trusts, value, ignore_missing)
+
+    @request
+    def find_user(self, name_or_id, ignore_missing=True):
+        return Resource(id=name_or_id, name=name_or_id)
+
+    @request
+    def services(self):
+        return [Resource(id=s, type=s, name=s) for s in self.SERVICES]
+
+    @request
+    def endpoints(self, service_id=None, region=None, interface=None):
+        return [Resource(id='%s-%s' % (service_id, r), service_id=service_id,
+                         region=r, interface=interface or 'public',
+                         url='http://fake-cloud/%s' % service_id)
+                for r in CONF.fake_cloud.regions
+                if region is None or region == r]
+
+    @request
+    def regions(self, **query):
+        return [Resource(id=r, description='', parent_region_id=None)
+                for r in CONF.fake_cloud.regions]
+
+
+class TelemetryProxy(Proxy):
+
+    service = 'telemetry'
+
+    @request
+    def create_alarm(self, **attrs):
+        alarm = dict(attrs, id=uuidutils.generate_uuid())
+        self.cloud.alarms[alarm['id']] = alarm
+        return snapshot(alarm)
+
+    @request
+    def get_alarm(self, value):
+        return snapshot(self._get('alarm', self.cloud.alarms, value))
+
+    @request
+    def find_alarm(self, name_or_id, ignore_missing=True):
+        return self._find('alarm', self.cloud.alarms, name_or_id,
+                          ignore_missing)
+
+    @request
+    def alarms(self, **query):
+        return [snapshot(a) for a in self.cloud.all(self.cloud.alarms)]
+
+    @request
+    def update_alarm(self, value, **attrs):
+        alarm = self._get('alarm', self.cloud.alarms, value)
+        alarm.update(attrs)
+        return snapshot(alarm)
+
+    @request
+    def delete_alarm(self, value, ignore_missing=True):
+        self._delete('alarm', self.cloud.alarms, value, ignore_missing)
+
+    @request
+    def create_sample(self, **attrs):
+        return Resource(attrs)
+
+
+class Connection(object):
+    '''A connection to the fake cloud, in place of an SDK connection.'''
+
+    def __init__(self, params):
+        cloud = get_cloud()
+        self.session = None
+        self.compute = ComputeProxy(cloud, params)
+        self.network = NetworkProxy(cloud, params)
+        self.orchestration = OrchestrationProxy(cloud, params)
+        self.identity = IdentityProxy(cloud, params)
+        self.telemetry = TelemetryProxy(cloud, params)
@@ -0,0 +1,22 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from senlin.drivers.openstack import heat_v1
+from senlin.tests.drivers.fake import cloud
+
+
+class HeatClient(heat_v1.HeatClient):
+    '''Heat V1 driver of the fake cloud.'''
+
+    def __init__(self, params):
+        super(heat_v1.HeatClient, self).__init__(params)
+        self.conn = cloud.Connection(params)
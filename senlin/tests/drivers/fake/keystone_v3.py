@@ -0,0 +1,41 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from senlin.drivers.openstack import keystone_v3
+from senlin.tests.drivers.fake import cloud
+
+
+class KeystoneClient(keystone_v3.KeystoneClient):
+    '''Keystone V3 driver of the fake cloud.'''
+
+    def __init__(self, params):
+        super(keystone_v3.KeystoneClient, self).__init__(params)
+        self.conn = cloud.Connection(params)
+        self.session = self.conn.session
+        self._scope = self.scope
+
+    @classmethod
+    def _authenticate(cls, **creds):
+        return cloud.Connection(creds).identity.authenticate(**creds)
+
+    @classmethod
+    def get_token(cls, **creds):
+        return cls._authenticate(**creds)['token']
+
+    @classmethod
+    def get_token_info(cls, **creds):
+        access_info = cls._authenticate(**creds)
+        return access_info['token'], access_info['expires_at']
+
+    @classmethod
+    def get_user_id(cls, **creds):
+        return cls._authenticate(**creds)['user_id']
@@ -0,0 +1,33 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from senlin.drivers.openstack import nova_v2
+from senlin.tests.drivers.fake import cloud
+
+
+class NovaClient(nova_v2.NovaClient):
+    '''Nova V2 driver of the fake cloud.'''
+
+    def __init__(self, params):
+        super(nova_v2.NovaClient, self).__init__(params)
+        self.conn = cloud.Connection(params)
+        self.session = self.conn.session
+
+    def server_metadata_get(self, **params):
+        server_id = params.pop('server_id')
+        metadata = self.conn.compute.get_server_metadata(server_id)
+        metadata['server_id'] = server_id
+        return metadata
+
+    def server_metadata_update(self, **params):
+        server_id = params.pop('server_id')
+        return self.conn.compute.set_server_metadata(server_id, **params)
@@ -16,6 +16,7 @@ from webob import exc
 
 from senlin.api.middleware import fault
 from senlin.api.openstack.v1 import events
+from senlin.common import event_hub
 from senlin.common import exception as senlin_exc
 from senlin.common import policy
 from senlin.rpc import client as rpc_client
@@ -70,7 +71,8 @@ class EventControllerTest(shared.ControllerTest, base.SenlinTestCase):
 
         kwargs = {'limit': None, 'marker': None, 'filters': None,
                   'sort_keys': None, 'sort_dir': None,
-                  'project_safe': True, 'show_deleted': False}
+                  'project_safe': True, 'show_deleted': False,
+                  'start_time': None, 'end_time': None}
         mock_call.assert_called_once_with(req.context,
                                           ('event_list', kwargs))
         self.assertEqual(resp, {'events': engine_resp})
@@ -85,6 +87,8 @@ class EventControllerTest(shared.ControllerTest, base.SenlinTestCase):
             'filters': 'fake filters',
             'global_project': False,
             'show_deleted': False,
+            'start_time': '2016-01-01T00:00:00',
+            'end_time': '2016-01-02T00:00:00',
             'balrog': 'you shall not pass!'
         }
         req = self._get('/events', params=params)
@@ -97,7 +101,9 @@ class EventControllerTest(shared.ControllerTest, base.SenlinTestCase):
         rpc_call_args, w = mock_call.call_args
         engine_args = rpc_call_args[1][1]
 
-        self.assertEqual(7, len(engine_args))
+        self.assertEqual(9, len(engine_args))
+        self.assertIn('start_time', engine_args)
+        self.assertIn('end_time', engine_args)
         self.assertIn('limit', engine_args)
         self.assertIn('marker', engine_args)
         self.assertIn('sort_keys', engine_args)
@@ -159,6 +165,156 @@ class EventControllerTest(shared.ControllerTest, base.SenlinTestCase):
                          six.text_type(ex))
         self.assertFalse(mock_call.called)
 
+    def _hub(self, *events):
+        hub = event_hub.EventHub(10)
+        self.patchobject(event_hub, 'global_hub', return_value=hub)
+        hub.publish([self._event(*e) for e in events])
+        return hub
+
+    def _event(self, event_id, obj_id, project='PROJ'):
+        return {'id': event_id, 'obj_id': obj_id, 'project': project}
+
+    def _watch(self, **params):
+        req = self._get('/events/watch', params=params)
+        return self.controller.watch(req)
+
+    def _watch_hub(self):
+        return self._hub(('E1', 'N1'), ('E2', 'N2'), ('E3', 'N1', 'OTHER'),
+                         ('E4', 'N1'))
+
+    def test_event_watch(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'watch', True)
+        self._watch_hub()
+        mock_call = self.patchobject(rpc_client.EngineClient, 'call')
+
+        resp = self._watch(cursor='E1', timeout='0',
+                           balrog='you shall not pass!')
+
+        self.assertEqual(['E2', 'E4'], [e['id'] for e in resp['events']])
+        self.assertEqual('E4', resp['cursor'])
+        # The engine is not involved in waiting for events
+        self.assertFalse(mock_call.called)
+
+    def test_event_watch_filtered(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'watch', True)
+        self._watch_hub()
+
+        resp = self._watch(cursor='E1', timeout='0', obj_id='N1')
+
+        self.assertEqual(['E4'], [e['id'] for e in resp['events']])
+        self.assertEqual('E4', resp['cursor'])
+
+    def test_event_watch_global_project(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'watch', True)
+        self._watch_hub()
+
+        resp = self._watch(cursor='E1', timeout='0', obj_id='N1',
+                           global_project='true')
+
+        self.assertEqual(['E3', 'E4'], [e['id'] for e in resp['events']])
+
+    def test_event_watch_timeout(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'watch', True)
+        hub = self._hub(('E1', 'N1'))
+        mock_watch = self.patchobject(hub, 'watch', return_value=([], 'E1'))
+
+        resp = self._watch(cursor='E1', timeout='1000')
+
+        self.assertEqual({'events': [], 'cursor': 'E1'}, resp)
+        mock_watch.assert_called_once_with('E1', mock.ANY, 30)
+
+    def test_event_watch_resume_from_db(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'watch', True)
+        self._hub(('E2', 'N1'))
+        mock_call = self.patchobject(
+            rpc_client.EngineClient, 'call',
+            return_value=[self._event('E3', 'N1')])
+
+        resp = self._watch(cursor='E1', timeout='0', obj_id='N1')
+
+        self.assertEqual({'events': [self._event('E3', 'N1')],
+                          'cursor': 'E3'}, resp)
+        kwargs = {
+            'filters': {'obj_id': 'N1'},
+            'limit': 1000,
+            'marker': 'E1',
+            'sort_keys': ['timestamp'],
+            'sort_dir': 'asc',
+            'project_safe': True,
+            'show_deleted': False,
+            'start_time': None,
+            'end_time': None,
+        }
+        mock_call.assert_called_once_with(mock.ANY, ('event_list', kwargs))
+
+    def test_event_watch_resume_from_db_race(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'watch', True)
+        hub = self._hub(('E2', 'N1'))
+
+        # The event is published while the database is queried
+        def event_list(*args, **kwargs):
+            hub.publish([self._event('E3', 'N1')])
+            return []
+
+        self.patchobject(rpc_client.EngineClient, 'event_list',
+                         side_effect=event_list)
+
+        resp = self._watch(cursor='E1', timeout='0')
+
+        self.assertEqual({'events': [self._event('E3', 'N1')],
+                          'cursor': 'E3'}, resp)
+
+    def test_event_watch_timeout_not_int(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'watch', True)
+        params = {'timeout': 'not-int'}
+        req = self._get('/events/watch', params=params)
+
+        mock_call = self.patchobject(rpc_client.EngineClient, 'call')
+        ex = self.assertRaises(senlin_exc.InvalidParameter,
+                               self.controller.watch, req)
+
+        self.assertEqual("Invalid value 'not-int' specified for 'timeout'",
+                         six.text_type(ex))
+        self.assertFalse(mock_call.called)
+
+    def test_event_aggregate(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'aggregate', True)
+        params = {
+            'cluster_id': 'FAKE_CLUSTER',
+            'level': 'ERROR',
+            'group_by': 'action',
+            'bucket': 'day',
+            'start_time': '2016-01-01T00:00:00',
+            'global_project': 'True',
+            'balrog': 'you shall not pass!'
+        }
+        req = self._get('/events/aggregate', params=params)
+        engine_resp = [{'action': 'NODE_CREATE', 'count': 2,
+                        'bucket': '2016-01-01T00:00:00'}]
+        mock_call = self.patchobject(rpc_client.EngineClient, 'call',
+                                     return_value=engine_resp)
+
+        resp = self.controller.aggregate(req)
+
+        kwargs = {'filters': {'cluster_id': 'FAKE_CLUSTER', 'level': 'ERROR'},
+                  'group_by': ['action'], 'bucket': 'day',
+                  'start_time': '2016-01-01T00:00:00', 'end_time': None,
+                  'project_safe': False}
+        mock_call.assert_called_once_with(req.context,
+                                          ('event_aggregate', kwargs))
+        self.assertEqual({'aggregates': engine_resp}, resp)
+
+    def test_event_aggregate_denied_policy(self, mock_enforce):
+        self._mock_enforce_setup(mock_enforce, 'aggregate', False)
+        req = self._get('/events/aggregate')
+
+        resp = shared.request_with_middleware(fault.FaultWrapper,
+                                              self.controller.aggregate,
+                                              req)
+
+        self.assertEqual(403, resp.status_int)
+        self.assertIn('403 Forbidden', six.text_type(resp))
+
     def test_event_index_whitelist_filter_params(self, mock_enforce):
         self._mock_enforce_setup(mock_enforce, 'index', True)
         params = {
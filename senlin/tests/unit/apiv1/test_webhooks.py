@@ -16,6 +16,7 @@ import six
 from webob import exc
 
 from senlin.api.middleware import fault
+from senlin.api.middleware import webhook as webhook_middleware
 from senlin.api.openstack.v1 import webhooks
 from senlin.common import exception as senlin_exc
 from senlin.common.i18n import _
@@ -607,12 +608,14 @@ class WebhookControllerTest(shared.ControllerTest, base.SenlinTestCase):
 
         mock_call = self.patchobject(rpc_client.EngineClient, 'call',
                                      return_value=None)
+        mock_invalidate = self.patchobject(webhook_middleware, 'invalidate')
 
         self.controller.delete(req, webhook_id=wid)
 
         mock_call.assert_called_with(
             req.context,
             ('webhook_delete', {'identity': wid}))
+        mock_invalidate.assert_called_once_with(wid)
 
     def test_webhook_delete_not_found(self, mock_enforce):
         self._mock_enforce_setup(mock_enforce, 'delete', True)
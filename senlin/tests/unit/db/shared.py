@@ -145,3 +145,21 @@ def create_action(ctx, **kwargs):
     }
     values.update(kwargs)
     return db_api.action_create(ctx, values)
+
+
+def create_event(ctx, **kwargs):
+    values = {
+        'timestamp': kwargs.get('timestamp'),
+        'level': 20,
+        'obj_id': kwargs.get('obj_id'),
+        'obj_type': kwargs.get('obj_type'),
+        'obj_name': kwargs.get('obj_name'),
+        'cluster_id': kwargs.get('cluster_id'),
+        'user': ctx.user,
+        'project': ctx.project,
+        'action': kwargs.get('action'),
+        'status': 'ACTIVE',
+        'status_reason': 'Event reason',
+    }
+    values.update(kwargs)
+    return db_api.event_create(ctx, values)
@@ -120,6 +120,28 @@ class DBAPIActionTest(base.SenlinTestCase):
         for spec in ['action_001', 'action_003']:
             self.assertIn(spec, names)
 
+    def test_action_count_running_by_cluster(self):
+        profile = shared.create_profile(self.ctx)
+        cluster = shared.create_cluster(self.ctx, profile)
+        other = shared.create_cluster(self.ctx, profile)
+        node1 = shared.create_node(self.ctx, cluster, profile)
+        node2 = shared.create_node(self.ctx, cluster, profile)
+        node3 = shared.create_node(self.ctx, other, profile)
+        specs = [
+            {'target': node1.id, 'status': consts.ACTION_RUNNING},
+            {'target': node2.id, 'status': consts.ACTION_READY},
+            {'target': node2.id, 'status': consts.ACTION_WAITING},
+            {'target': node1.id, 'status': consts.ACTION_SUCCEEDED},
+            {'target': node3.id, 'status': consts.ACTION_RUNNING},
+            {'target': cluster.id, 'status': consts.ACTION_RUNNING},
+        ]
+        for spec in specs:
+            _create_action(self.ctx, **spec)
+
+        res = db_api.action_count_running_by_cluster(self.ctx, cluster.id)
+
+        self.assertEqual(2, res)
+
     def test_action_get_all(self):
         specs = [
             {'name': 'action_001', 'target': 'cluster_001'},
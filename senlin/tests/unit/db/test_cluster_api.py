@@ -351,6 +351,19 @@ class DBAPIClusterTest(base.SenlinTestCase):
         res = db_api.cluster_get(self.ctx, cluster_id)
         self.assertEqual(3, res.next_index)
 
+    def test_cluster_throttled(self):
+        cluster = shared.create_cluster(self.ctx, self.profile)
+        self.assertEqual(0, cluster.throttled)
+        self.assertEqual(0, db_api.cluster_throttled_get(self.ctx,
+                                                         cluster.id))
+
+        db_api.cluster_throttled_add(self.ctx, cluster.id)
+        db_api.cluster_throttled_add(self.ctx, cluster.id)
+
+        self.assertEqual(2, db_api.cluster_throttled_get(self.ctx,
+                                                         cluster.id))
+        self.assertEqual(0, db_api.cluster_throttled_get(self.ctx, 'BOGUS'))
+
     def test_cluster_count_all(self):
         clusters = [shared.create_cluster(self.ctx, self.profile)
                     for i in range(3)]
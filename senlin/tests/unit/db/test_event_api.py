@@ -10,8 +10,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
 import logging
 
+import mock
 from oslo_utils import timeutils as tu
 
 from senlin.db.sqlalchemy import api as db_api
@@ -85,6 +87,38 @@ class DBAPIEventTest(base.SenlinTestCase):
         self.assertEqual(self.ctx.user, ret_event.user)
         self.assertEqual(self.ctx.project, ret_event.project)
 
+    def test_event_create_batch(self):
+        values_list = []
+        for i in range(3):
+            values_list.append({
+                'id': 'EVENT_%s' % i,
+                'timestamp': tu.utcnow(),
+                'level': logging.INFO,
+                'obj_id': 'OBJ_%s' % i,
+                'obj_name': 'obj-%s' % i,
+                'obj_type': 'NODE',
+                'cluster_id': '',
+                'action': 'NODE_CREATE',
+                'status': 'ACTIVE',
+                'status_reason': 'Creation succeeded',
+                'user': self.ctx.user,
+                'project': self.ctx.project,
+                'deleted_time': None,
+                'meta_data': {'k': i},
+            })
+
+        db_api.event_create_batch(self.ctx, values_list)
+
+        for i in range(3):
+            event = db_api.event_get(self.ctx, 'EVENT_%s' % i)
+            self.assertIsNotNone(event)
+            self.assertEqual('OBJ_%s' % i, event.obj_id)
+            self.assertEqual({'k': i}, event.meta_data)
+
+    def test_event_create_batch_empty(self):
+        db_api.event_create_batch(self.ctx, [])
+        self.assertEqual([], db_api.event_get_all(self.ctx))
+
     def test_event_get_diff_project(self):
         event = self.create_event(self.ctx)
         new_ctx = utils.dummy_context(project='a-different-project')
@@ -267,6 +301,40 @@ class DBAPIEventTest(base.SenlinTestCase):
         self.assertIn(cluster2.id, obj_ids)
         self.assertIn(cluster2.name, obj_names)
 
+    def test_event_get_all_time_range(self):
+        ts = tu.parse_strtime('2016-01-01 12:00:00.000000',
+                              '%Y-%m-%d %H:%M:%S.%f')
+        e1 = self.create_event(self.ctx, timestamp=ts)
+        e2 = self.create_event(self.ctx,
+                               timestamp=ts + datetime.timedelta(hours=1))
+        e3 = self.create_event(self.ctx,
+                               timestamp=ts + datetime.timedelta(hours=2))
+
+        events = db_api.event_get_all(
+            self.ctx, start_time=ts + datetime.timedelta(hours=1))
+        self.assertEqual([e2.id, e3.id], [e.id for e in events])
+
+        events = db_api.event_get_all(
+            self.ctx, end_time=ts + datetime.timedelta(hours=1))
+        self.assertEqual([e1.id], [e.id for e in events])
+
+        events = db_api.event_get_all(
+            self.ctx, start_time=ts,
+            end_time=ts + datetime.timedelta(hours=2))
+        self.assertEqual([e1.id, e2.id], [e.id for e in events])
+
+    def test_event_delete_by_ids(self):
+        e1 = self.create_event(self.ctx)
+        e2 = self.create_event(self.ctx)
+        e3 = self.create_event(self.ctx)
+
+        res = db_api.event_delete_by_ids(self.ctx, [e1.id, e3.id])
+
+        self.assertEqual(2, res)
+        events = db_api.event_get_all(self.ctx)
+        self.assertEqual([e2.id], [e.id for e in events])
+        self.assertEqual(0, db_api.event_delete_by_ids(self.ctx, []))
+
     def test_event_get_all_by_cluster(self):
         cluster1 = shared.create_cluster(self.ctx, self.profile)
         cluster2 = shared.create_cluster(self.ctx, self.profile)
@@ -447,3 +515,93 @@ class DBAPIEventTest(base.SenlinTestCase):
                                                  limit=1, marker=marker)
         self.assertEqual(1, len(events))
         self.assertEqual(expected, events[0].id)
+
+
+class DBAPIEventRollupTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(DBAPIEventRollupTest, self).setUp()
+        self.ctx = utils.dummy_context()
+
+    def _counts(self, bucket, count, project=None, cluster_id='C1',
+                action='NODE_CREATE', level=logging.INFO, status='ACTIVE'):
+        return {
+            'bucket': bucket,
+            'project': project or self.ctx.project,
+            'cluster_id': cluster_id,
+            'action': action,
+            'level': level,
+            'status': status,
+            'count': count,
+        }
+
+    def test_event_rollup_update(self):
+        t1 = datetime.datetime(2015, 3, 1, 10)
+
+        db_api.event_rollup_update(self.ctx, [self._counts(t1, 2)])
+        db_api.event_rollup_update(self.ctx, [self._counts(t1, 3),
+                                              self._counts(t1, 1,
+                                                           cluster_id='C2')])
+
+        rows = db_api.event_rollup_get(self.ctx, group_by=['cluster_id'])
+        self.assertEqual([
+            {'bucket': t1, 'cluster_id': 'C1', 'count': 5},
+            {'bucket': t1, 'cluster_id': 'C2', 'count': 1},
+        ], rows)
+
+    def test_event_rollup_update_duplicate(self):
+        t1 = datetime.datetime(2015, 3, 1, 10)
+        db_api.event_rollup_update(self.ctx, [self._counts(t1, 2)])
+
+        # The row is not found by the first update, as if it was inserted
+        # by another engine right after, so the insert fails.
+        session = self.ctx.session
+        execute = session.execute
+        missed = []
+
+        def fake_execute(statement, *args, **kwargs):
+            if not missed and str(statement).startswith('UPDATE'):
+                missed.append(statement)
+                return mock.Mock(rowcount=0)
+            return execute(statement, *args, **kwargs)
+
+        self.patchobject(session, 'execute', side_effect=fake_execute)
+
+        db_api.event_rollup_update(self.ctx, [self._counts(t1, 3)])
+
+        self.assertEqual(1, len(missed))
+        rows = db_api.event_rollup_get(self.ctx)
+        self.assertEqual([(t1, 5)], [(r['bucket'], r['count']) for r in rows])
+
+    def test_event_rollup_get(self):
+        t1 = datetime.datetime(2015, 3, 1, 10)
+        t2 = datetime.datetime(2015, 3, 1, 11)
+        t3 = datetime.datetime(2015, 3, 2, 9)
+        db_api.event_rollup_update(self.ctx, [
+            self._counts(t1, 1),
+            self._counts(t1, 2, level=logging.ERROR, status='ERROR'),
+            self._counts(t2, 4),
+            self._counts(t3, 8, cluster_id='C2'),
+            self._counts(t3, 16, project='OTHER'),
+        ])
+
+        rows = db_api.event_rollup_get(self.ctx)
+        self.assertEqual([(t1, 3), (t2, 4), (t3, 8)],
+                         [(r['bucket'], r['count']) for r in rows])
+
+        rows = db_api.event_rollup_get(self.ctx, project_safe=False)
+        self.assertEqual(24, rows[-1]['count'])
+
+        rows = db_api.event_rollup_get(self.ctx, group_by=['level'],
+                                       filters={'cluster_id': 'C1'})
+        self.assertEqual([(t1, logging.INFO, 1), (t1, logging.ERROR, 2),
+                          (t2, logging.INFO, 4)],
+                         [(r['bucket'], r['level'], r['count'])
+                          for r in rows])
+
+        # start time is rounded down to the hour
+        rows = db_api.event_rollup_get(
+            self.ctx, start_time=datetime.datetime(2015, 3, 1, 10, 30),
+            end_time=t3)
+        self.assertEqual([(t1, 3), (t2, 4)],
+                         [(r['bucket'], r['count']) for r in rows])
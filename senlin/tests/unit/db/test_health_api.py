@@ -0,0 +1,148 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+from oslo_utils import timeutils as tu
+
+from senlin.db.sqlalchemy import api as db_api
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+
+
+class DBAPIHealthRegistryTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(DBAPIHealthRegistryTest, self).setUp()
+        self.ctx = utils.dummy_context()
+
+    def _create(self, cluster_id, engine_id=None):
+        return db_api.registry_create(self.ctx, cluster_id,
+                                      'NODE_STATUS_POLLING', 60,
+                                      {'foo': 'bar'}, engine_id=engine_id)
+
+    def test_registry_create(self):
+        res = self._create('C1')
+
+        self.assertIsNotNone(res.id)
+        self.assertEqual('C1', res.cluster_id)
+        self.assertEqual('NODE_STATUS_POLLING', res.check_type)
+        self.assertEqual(60, res.interval)
+        self.assertEqual({'foo': 'bar'}, res.params)
+        self.assertIsNone(res.engine_id)
+
+    def test_registry_claim(self):
+        self._create('C1')
+        self._create('C2', engine_id='E2')
+        self._create('C3', engine_id='E3')
+        self._create('C4', engine_id='E1')
+
+        res = db_api.registry_claim(self.ctx, 'E1')
+        self.assertEqual(['C1', 'C4'], sorted(r.cluster_id for r in res))
+
+        # Registries of dead engines are taken over
+        res = db_api.registry_claim(self.ctx, 'E1', dead_engines=['E3'])
+        self.assertEqual(['C1', 'C3', 'C4'],
+                         sorted(r.cluster_id for r in res))
+        self.assertEqual(['E1', 'E2'],
+                         sorted(db_api.registry_engines(self.ctx)))
+
+    def test_registry_claim_two_engines(self):
+        for i in range(5):
+            self._create('C%s' % i)
+        self._create('C5', engine_id='E3')
+
+        # Both engines are alive and take over the registries of dead E3
+        res1 = db_api.registry_claim(self.ctx, 'E1', dead_engines=['E3'],
+                                     num_engines=2)
+        self.assertEqual(3, len(res1))
+        res2 = db_api.registry_claim(self.ctx, 'E2', dead_engines=['E3'],
+                                     num_engines=2)
+        self.assertEqual(2, len(res2))
+
+        # The last one is claimed in a later period
+        res2 = db_api.registry_claim(self.ctx, 'E2', dead_engines=['E3'],
+                                     num_engines=2)
+        self.assertEqual(3, len(res2))
+
+        clusters = [r.cluster_id for r in res1 + res2]
+        self.assertEqual(['C%s' % i for i in range(6)], sorted(clusters))
+        self.assertEqual(['E1', 'E2'],
+                         sorted(db_api.registry_engines(self.ctx)))
+
+    def test_registry_release(self):
+        self._create('C1', engine_id='E1')
+        self._create('C2', engine_id='E2')
+
+        db_api.registry_release(self.ctx, 'E1')
+
+        self.assertEqual(['E2'], db_api.registry_engines(self.ctx))
+        res = db_api.registry_claim(self.ctx, 'E3')
+        self.assertEqual(['C1'], [r.cluster_id for r in res])
+
+    def test_registry_delete(self):
+        self._create('C1', engine_id='E1')
+        db_api.node_health_update(self.ctx, 'C1', [],
+                                  {'N1': ('HEALTHY', 'OK')}, tu.utcnow())
+
+        db_api.registry_delete(self.ctx, 'C1')
+
+        self.assertEqual([], db_api.registry_claim(self.ctx, 'E1'))
+        self.assertEqual({}, db_api.node_health_get_all(self.ctx, 'C1'))
+
+
+class DBAPINodeHealthTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(DBAPINodeHealthTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.t1 = datetime.datetime(2016, 1, 1, 12, 0, 0)
+        self.t2 = datetime.datetime(2016, 1, 1, 12, 1, 0)
+
+    def test_node_health_update(self):
+        changes = {
+            'N1': ('HEALTHY', 'Good'),
+            'N2': ('UNHEALTHY', 'Bad'),
+        }
+        db_api.node_health_update(self.ctx, 'C1', [], changes, self.t1)
+        db_api.node_health_update(self.ctx, 'C2', [],
+                                  {'N3': ('HEALTHY', 'Good')}, self.t1)
+
+        res = db_api.node_health_get_all(self.ctx, 'C1')
+
+        self.assertEqual(['N1', 'N2'], sorted(res))
+        self.assertEqual('HEALTHY', res['N1'].status)
+        self.assertEqual('Good', res['N1'].status_reason)
+        self.assertEqual(self.t1, res['N1'].checked_time)
+        self.assertEqual(self.t1, res['N1'].changed_time)
+        self.assertEqual('UNHEALTHY', res['N2'].status)
+
+        # N1 is unchanged while N2 recovers
+        db_api.node_health_update(self.ctx, 'C1', ['N1'],
+                                  {'N2': ('HEALTHY', 'Good')}, self.t2)
+
+        res = db_api.node_health_get_all(self.ctx, 'C1')
+        self.assertEqual(self.t2, res['N1'].checked_time)
+        self.assertEqual(self.t1, res['N1'].changed_time)
+        self.assertEqual('HEALTHY', res['N2'].status)
+        self.assertEqual(self.t2, res['N2'].changed_time)
+
+    def test_node_health_delete(self):
+        db_api.node_health_update(self.ctx, 'C1', [],
+                                  {'N1': ('HEALTHY', 'Good'),
+                                   'N2': ('HEALTHY', 'Good')}, self.t1)
+
+        self.assertEqual(0, db_api.node_health_delete(self.ctx, []))
+        self.assertEqual(1, db_api.node_health_delete(self.ctx, ['N1']))
+
+        self.assertEqual(['N2'],
+                         list(db_api.node_health_get_all(self.ctx, 'C1')))
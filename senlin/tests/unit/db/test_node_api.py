@@ -416,6 +416,79 @@ class DBAPINodeTest(base.SenlinTestCase):
         self.assertEqual(set([node0.id, node1.id]),
                          set([nodes[0].id, nodes[1].id]))
 
+    def test_node_ids_by_cluster(self):
+        node0 = shared.create_node(self.ctx, None, self.profile)
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile)
+        node2 = shared.create_node(self.ctx, self.cluster, self.profile,
+                                   status='ERROR')
+
+        res = db_api.node_ids_by_cluster(self.ctx, self.cluster.id)
+        self.assertEqual(set([node1.id, node2.id]), set(res))
+        self.assertNotIn(node0.id, res)
+
+        res = db_api.node_ids_by_cluster(self.ctx, self.cluster.id,
+                                         filters={'status': 'ERROR'})
+        self.assertEqual([node2.id], res)
+
+        db_api.node_delete(self.ctx, node1.id)
+        res = db_api.node_ids_by_cluster(self.ctx, self.cluster.id)
+        self.assertEqual([node2.id], res)
+
+    def test_node_ids_by_cluster_diff_project(self):
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile)
+
+        ctx_new = utils.dummy_context(project='a_different_project')
+        res = db_api.node_ids_by_cluster(ctx_new, self.cluster.id)
+        self.assertEqual([], res)
+        res = db_api.node_ids_by_cluster(ctx_new, self.cluster.id,
+                                         project_safe=False)
+        self.assertEqual([node1.id], res)
+
+    def test_node_brief_by_cluster(self):
+        shared.create_node(self.ctx, None, self.profile)
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile,
+                                   status='ERROR')
+        node2 = shared.create_node(self.ctx, self.cluster, self.profile)
+        node3 = shared.create_node(self.ctx, self.cluster, self.profile)
+        db_api.node_delete(self.ctx, node3.id)
+
+        res = db_api.node_brief_by_cluster(self.ctx, self.cluster.id)
+
+        res = sorted(res, key=lambda r: r.id)
+        nodes = sorted([node1, node2], key=lambda n: n.id)
+        self.assertEqual([n.id for n in nodes], [r.id for r in res])
+        for node, row in zip(nodes, res):
+            self.assertEqual(node.name, row.name)
+            self.assertEqual(node.status, row.status)
+            self.assertEqual(node.created_time, row.created_time)
+            self.assertEqual(self.profile.created_time,
+                             row.profile_created_time)
+
+        ctx_new = utils.dummy_context(project='a_different_project')
+        res = db_api.node_brief_by_cluster(ctx_new, self.cluster.id)
+        self.assertEqual([], res)
+        res = db_api.node_brief_by_cluster(ctx_new, self.cluster.id,
+                                           project_safe=False)
+        self.assertEqual(2, len(res))
+
+    def test_node_placements_by_cluster(self):
+        shared.create_node(self.ctx, None, self.profile,
+                           data={'placement': {'zone': 'AZ0'}})
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile,
+                                   data={'placement': {'zone': 'AZ1'}})
+        node2 = shared.create_node(self.ctx, self.cluster, self.profile,
+                                   data={'foo': 'bar'})
+
+        res = db_api.node_placements_by_cluster(self.ctx, self.cluster.id)
+
+        self.assertEqual(sorted([(node1.id, {'zone': 'AZ1'}),
+                                 (node2.id, {})]),
+                         sorted(res))
+
+        ctx_new = utils.dummy_context(project='a_different_project')
+        res = db_api.node_placements_by_cluster(ctx_new, self.cluster.id)
+        self.assertEqual([], res)
+
     def test_node_get_by_name_and_cluster(self):
         node_name = 'test_node_007'
         shared.create_node(self.ctx, self.cluster, self.profile,
@@ -481,6 +554,50 @@ class DBAPINodeTest(base.SenlinTestCase):
                                               project_safe=False)
         self.assertIsNotNone(node)
 
+    def test_node_get_all_by_physical_id(self):
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           physical_id=UUID1)
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           physical_id=UUID2)
+        shared.create_node(self.ctx, self.cluster, self.profile,
+                           physical_id=UUID3, deleted_time=tu.utcnow())
+
+        nodes = db_api.node_get_all_by_physical_id(self.ctx,
+                                                   [UUID1, UUID3, 'other'])
+        self.assertEqual([UUID1], [n.physical_id for n in nodes])
+
+        ctx_new = utils.dummy_context(project='a_different_project')
+        nodes = db_api.node_get_all_by_physical_id(ctx_new, [UUID1, UUID2])
+        self.assertEqual([], nodes)
+        nodes = db_api.node_get_all_by_physical_id(ctx_new, [UUID1, UUID2],
+                                                   project_safe=False)
+        self.assertEqual([UUID1, UUID2],
+                         sorted(n.physical_id for n in nodes))
+
+    def test_node_status_update(self):
+        node1 = shared.create_node(self.ctx, self.cluster, self.profile)
+        node2 = shared.create_node(self.ctx, self.cluster, self.profile)
+        node3 = shared.create_node(self.ctx, self.cluster, self.profile,
+                                   status='UPDATING')
+
+        res = db_api.node_status_update(
+            self.ctx, {node1.id: ('ERROR', 'Server was deleted.'),
+                       node2.id: ('WARNING', 'Server is stopped.'),
+                       node3.id: ('ERROR', 'Server was deleted.')},
+            statuses=['ACTIVE', 'ERROR', 'WARNING'])
+
+        self.assertEqual(2, res)
+        # The update bypasses the objects cached in the session
+        ctx = utils.dummy_context()
+        node = db_api.node_get(ctx, node1.id)
+        self.assertEqual('ERROR', node.status)
+        self.assertEqual('Server was deleted.', node.status_reason)
+        node = db_api.node_get(ctx, node2.id)
+        self.assertEqual('WARNING', node.status)
+        # Nodes not in the given statuses are left alone
+        node = db_api.node_get(ctx, node3.id)
+        self.assertEqual('UPDATING', node.status)
+
     def test_node_update(self):
         node = shared.create_node(self.ctx, self.cluster, self.profile)
         new_attributes = {
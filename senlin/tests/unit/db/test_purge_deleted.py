@@ -72,3 +72,17 @@ class DBAPIPurgeTest(base.SenlinTestCase):
         # 5 hours
         db_api.purge_deleted(age=18000, unit='seconds')
         self.verify_left(0)
+
+    def test_purge_deleted_events_in_batches(self):
+        self.patchobject(db_api, 'PURGE_BATCH_SIZE', new=2)
+        now = timeutils.utcnow()
+        for i in range(5):
+            shared.create_event(self.ctx,
+                                timestamp=now - datetime.timedelta(days=3))
+        shared.create_event(self.ctx, timestamp=now)
+
+        db_api.purge_deleted(age=2, unit='days')
+
+        events = db_api.event_get_all(self.ctx)
+        self.assertEqual(1, len(events))
+        self.assertEqual(now, events[0].timestamp)
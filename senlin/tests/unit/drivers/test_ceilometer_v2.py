@@ -27,7 +27,7 @@ class TestCeilometerV2(base.SenlinTestCase):
         self.conn_params = self.ctx.to_dict()
         self.mock_conn = mock.Mock()
         self.mock_create = self.patchobject(
-            sdk, 'create_connection',
+            sdk, 'get_connection',
             return_value=self.mock_conn)
 
     def test_init(self):
@@ -45,3 +45,29 @@ class TestSenlinDriver(base.SenlinTestCase):
         sd = driver_base.SenlinDriver('cloud_backend_2')
         self.assertEqual('Compute2', sd.compute)
         self.assertEqual('Orchestration2', sd.orchestration)
+
+
+class TestDriverBase(base.SenlinTestCase):
+
+    def test_scope_trust(self):
+        params = {'auth_url': 'URL', 'region_name': 'R1', 'trust_id': 'T1',
+                  'user_id': 'U1'}
+
+        res = driver_base.DriverBase(params).scope
+
+        self.assertEqual(('URL', 'R1', 'trust', 'T1'), res)
+
+    def test_scope_trust_list(self):
+        params = {'auth_url': 'URL', 'trust_id': ['T1']}
+
+        res = driver_base.DriverBase(params).scope
+
+        self.assertEqual(('URL', None, 'trust', ('T1',)), res)
+        hash(res)
+
+    def test_scope_user(self):
+        params = {'auth_url': 'URL', 'user_id': 'U1', 'project_id': 'P1'}
+
+        res = driver_base.DriverBase(params).scope
+
+        self.assertEqual(('URL', None, 'U1', None, 'P1', None), res)
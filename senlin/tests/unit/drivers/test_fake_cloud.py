@@ -0,0 +1,207 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+
+import eventlet
+import mock
+from openstack import exceptions as sdk_exc
+from oslo_config import cfg
+
+from senlin.engine import environment
+from senlin.profiles.os.nova import server
+from senlin.tests.drivers import fake
+from senlin.tests.drivers.fake import cloud
+from senlin.tests.unit.common import base
+
+
+class TestFakeCloud(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestFakeCloud, self).setUp()
+        self.addCleanup(cloud.reset)
+        self.now = 1000.0
+        self.patchobject(cloud.time, 'time', side_effect=lambda: self.now)
+        self.conn = cloud.Connection({'project_id': 'PROJECT'})
+
+    def _set(self, name, value):
+        cfg.CONF.set_override(name, value, group='fake_cloud',
+                              enforce_type=True)
+
+    def test_server_life_cycle(self):
+        self._set('build_time', 10.0)
+        compute = self.conn.compute
+
+        srv = compute.create_server(name='s1', flavorRef='1',
+                                    imageRef=cloud.IMAGE_ID)
+
+        self.assertEqual('BUILD', srv.status)
+        self.assertEqual('nova', srv.to_dict()['OS-EXT-AZ:availability_zone'])
+        self.now += 10
+        self.assertEqual('ACTIVE', compute.get_server(srv.id).status)
+
+        # Changed servers are found by their update time
+        since = datetime.datetime.utcfromtimestamp(self.now - 1)
+        res = compute.servers(changes_since=since.isoformat())
+        self.assertEqual([srv.id], [s.id for s in res])
+
+        compute.delete_server(srv.id)
+        self.assertIsNone(compute.find_server(srv.id))
+        self.assertRaises(sdk_exc.ResourceNotFound, compute.get_server,
+                          srv.id)
+        self.assertEqual({}, cloud.get_cloud().ports)
+
+    def test_server_build_failure(self):
+        self._set('build_failure_rate', 1.0)
+
+        srv = self.conn.compute.create_server(name='s1')
+
+        self.assertEqual('ERROR', self.conn.compute.get_server(srv.id).status)
+
+    def test_create_servers(self):
+        self.conn.compute.create_server(name='batch', max_count=3,
+                                        min_count=1)
+
+        res = self.conn.compute.servers(name='^batch-')
+
+        self.assertEqual(['batch-1', 'batch-2', 'batch-3'],
+                         sorted(s.name for s in res))
+        addresses = set(s.addresses['private'][0]['addr'] for s in res)
+        self.assertEqual(3, len(addresses))
+
+    def test_stack_life_cycle(self):
+        self._set('update_time', 5.0)
+        orch = self.conn.orchestration
+
+        stack = orch.create_stack(stack_name='st1', template={})
+        self.assertEqual('CREATE_COMPLETE', orch.get_stack(stack.id).status)
+
+        orch.delete_stack(stack.id)
+        self.assertEqual('DELETE_IN_PROGRESS',
+                         orch.get_stack(stack.id).status)
+        self.now += 5
+        self.assertEqual([], orch.stacks(id=[stack.id]))
+        res = orch.stacks(id=[stack.id], show_deleted=True)
+        self.assertEqual(['DELETE_COMPLETE'], [s.status for s in res])
+        self.assertIsNone(orch.find_stack('st1'))
+
+    def test_load_balancer_busy(self):
+        self._set('update_time', 2.0)
+        net = self.conn.network
+        lb = net.create_load_balancer(vip_subnet_id=cloud.SUBNET_ID)
+        listener = net.create_listener(loadbalancer_id=lb.id,
+                                       protocol='HTTP', protocol_port=80)
+        self.now += 2
+        pool = net.create_pool(listener_id=listener.id, protocol='HTTP',
+                               lb_algorithm='ROUND_ROBIN')
+        self.now += 2
+
+        net.create_pool_member(pool_id=pool.id, address='10.0.0.1',
+                               protocol_port=80, subnet_id=cloud.SUBNET_ID)
+
+        res = net.find_load_balancer(lb.id)
+        self.assertEqual('PENDING_UPDATE', res.provisioning_status)
+        # Changes are rejected until the load-balancer is active again
+        ex = self.assertRaises(sdk_exc.HttpException, net.create_pool_member,
+                               pool_id=pool.id, address='10.0.0.2',
+                               protocol_port=80, subnet_id=cloud.SUBNET_ID)
+        self.assertEqual(409, ex.status_code)
+        self.now += 2
+        self.assertEqual('ACTIVE',
+                         net.find_load_balancer(lb.id).provisioning_status)
+        self.assertEqual(1, len(net.pool_members(pool.id)))
+
+    def test_failure_injection(self):
+        self._set('failure_rate', 1.0)
+
+        ex = self.assertRaises(sdk_exc.HttpException,
+                               self.conn.compute.flavors)
+
+        self.assertEqual(500, ex.status_code)
+
+    def test_rate_limit(self):
+        self._set('rate_limit', 2)
+        compute = self.conn.compute
+
+        compute.flavors()
+        compute.flavors()
+        ex = self.assertRaises(sdk_exc.HttpException, compute.flavors)
+        self.assertEqual(429, ex.status_code)
+        # Each service has its own limit
+        self.conn.network.find_network('private')
+
+        self.now += 0.5
+        compute.flavors()
+        self.assertEqual(4, cloud.get_cloud().requests['compute'])
+        self.assertEqual(1, cloud.get_cloud().rejected['compute'])
+
+    @mock.patch.object(eventlet, 'sleep')
+    def test_latency(self, mock_sleep):
+        self._set('latency', 0.5)
+        self.conn.compute.flavors()
+        mock_sleep.assert_called_once_with(0.5)
+
+        self._set('latency_distribution', 'uniform')
+        self._set('latency_spread', 0.1)
+        self.conn.compute.flavors()
+        delay = mock_sleep.call_args[0][0]
+        self.assertTrue(0.4 <= delay <= 0.6)
+
+    def test_drivers(self):
+        params = {'user_id': 'USER', 'project_id': 'PROJECT'}
+
+        nc = fake.compute(params)
+        srv = nc.server_create(name='s1', metadata={'k': 'v'})
+        nc.server_metadata_update(server_id=srv.id, cluster='C1')
+        self.assertEqual({'server_id': srv.id, 'cluster': 'C1'},
+                         nc.server_metadata_get(server_id=srv.id))
+
+        network = fake.network(params).network_get('private')
+        self.assertEqual(cloud.NETWORK_ID, network.id)
+
+        token, expires_at = fake.identity.get_token_info(**params)
+        self.assertIsNotNone(token)
+        self.assertEqual('USER', fake.identity.get_user_id(**params))
+
+        lb = fake.loadbalancing(params)
+        self.assertIsInstance(lb.nc(), fake.network)
+
+    def test_server_profile(self):
+        environment.global_env().register_driver('fake', fake)
+        cfg.CONF.set_override('cloud_backend', 'fake', enforce_type=True)
+        cfg.CONF.set_override('status_poll_interval', 0, enforce_type=True)
+        self.addCleanup(server._reference_cache.clear)
+        spec = {
+            'type': 'os.nova.server',
+            'version': '1.0',
+            'properties': {
+                'name': 'srv',
+                'flavor': 'm1.small',
+                'image': 'cirros',
+                'networks': [{'network': 'private'}],
+            }
+        }
+        profile = server.ServerProfile('s1', spec)
+        self.patchobject(profile, '_build_conn_params',
+                         return_value={'trust_id': 'TRUST'})
+        nodes = [mock.Mock(id='N%s' % i, physical_id=None, cluster_id='C1',
+                           data={}, user='USER', project='PROJECT')
+                 for i in range(3)]
+        for node in nodes:
+            node.name = node.id
+
+        for node in nodes:
+            node.physical_id = profile.do_create(node)
+
+        self.assertEqual(3, len(cloud.get_cloud().servers))
+        res = profile.do_check_many(nodes)
+        self.assertEqual({'N0': True, 'N1': True, 'N2': True}, res)
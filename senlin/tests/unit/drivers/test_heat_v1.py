@@ -11,7 +11,10 @@
 # under the License.
 
 import mock
+from oslo_config import cfg
 
+from senlin.common import poller
+from senlin.common import waiter
 from senlin.drivers.openstack import heat_v1
 from senlin.drivers.openstack import sdk
 from senlin.tests.unit.common import base
@@ -26,7 +29,7 @@ class TestHeatV1(base.SenlinTestCase):
         self.context = utils.dummy_context()
         self.conn_params = self.context.to_dict()
         self.mock_conn = mock.Mock()
-        self.mock_create = self.patchobject(sdk, 'create_connection',
+        self.mock_create = self.patchobject(sdk, 'get_connection',
                                             return_value=self.mock_conn)
         self.orch = self.mock_conn.orchestration
         self.hc = heat_v1.HeatClient(self.conn_params)
@@ -55,6 +58,10 @@ class TestHeatV1(base.SenlinTestCase):
         self.hc.stack_list()
         self.orch.stacks.assert_called_once_with()
 
+        self.orch.stacks.reset_mock()
+        self.hc.stack_list(id=['stack_id'])
+        self.orch.stacks.assert_called_once_with(id=['stack_id'])
+
     def test_stack_update(self):
         fake_params = {
             "name": "new_name",
@@ -66,3 +73,40 @@ class TestHeatV1(base.SenlinTestCase):
     def test_stack_delete(self):
         self.hc.stack_delete('stack_id', ignore_missing=True)
         self.orch.delete_stack.assert_called_once_with('stack_id', True)
+
+    @mock.patch.object(poller, 'get_poller')
+    def test_wait_for_stack_polled(self, mock_get):
+        stack_poller = mock.Mock()
+        mock_get.return_value = stack_poller
+        check = mock.Mock()
+
+        res = self.hc.wait_for_stack('stack_id', check, timeout=10)
+
+        self.assertEqual(stack_poller.wait.return_value, res)
+        mock_get.assert_called_once_with(('stack',) + self.hc.scope,
+                                         self.hc._list_stacks,
+                                         self.hc.stack_find)
+        stack_poller.wait.assert_called_once_with(
+            'stack_id', check, 'stack stack_id', timeout=10)
+
+    @mock.patch.object(waiter, 'wait_for')
+    def test_wait_for_stack_not_polled(self, mock_wait):
+        cfg.CONF.set_override('status_poll_interval', 0, enforce_type=True)
+        check = mock.Mock()
+
+        res = self.hc.wait_for_stack('stack_id', check)
+
+        self.assertEqual(mock_wait.return_value, res)
+        mock_wait.assert_called_once_with(mock.ANY, 'stack stack_id',
+                                          timeout=None, interval=2,
+                                          max_interval=20)
+        mock_wait.call_args[0][0]()
+        self.orch.find_stack.assert_called_once_with('stack_id')
+        check.assert_called_once_with(self.orch.find_stack.return_value)
+
+    def test_list_stacks(self):
+        res = self.hc._list_stacks(['S1', 'S2'], 'SINCE')
+
+        self.assertEqual(self.orch.stacks.return_value, res)
+        self.orch.stacks.assert_called_once_with(id=['S1', 'S2'],
+                                                 show_deleted=True)
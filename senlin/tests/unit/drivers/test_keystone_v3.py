@@ -21,7 +21,7 @@ from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 
 
-@mock.patch.object(sdk, 'create_connection')
+@mock.patch.object(sdk, 'get_connection')
 class TestKeystoneV3(base.SenlinTestCase):
 
     def setUp(self):
@@ -29,6 +29,7 @@ class TestKeystoneV3(base.SenlinTestCase):
 
         self.ctx = utils.dummy_context()
         self.conn = mock.Mock()
+        self.addCleanup(kv3._catalog_cache.clear)
 
     def test_init(self, mock_create):
         mock_create.return_value = self.conn
@@ -99,6 +100,7 @@ class TestKeystoneV3(base.SenlinTestCase):
 
         # returning None
         self.conn.identity.endpoints.return_value = []
+        kc.refresh_catalog()
 
         res = kc.endpoint_get('FAKE_ID')
 
@@ -205,6 +207,68 @@ class TestKeystoneV3(base.SenlinTestCase):
         self.assertEqual(['fake_region'], res)
         self.conn.identity.regions.assert_called_once_with(p1='v1', p2='v2')
 
+    def test_catalog_cached(self, mock_create):
+        self.conn.identity.regions.return_value = ['fake_region']
+        self.conn.identity.services.return_value = [
+            {'name': 'senlin', 'type': 'clustering', 'id': 'id2'}]
+        mock_create.return_value = self.conn
+        kc = kv3.KeystoneClient({'trust_id': 'TRUST1'})
+
+        kc.region_list()
+        kc.service_get('clustering')
+
+        # clients using the same trust share the cached catalog
+        kc = kv3.KeystoneClient({'trust_id': 'TRUST1', 'k': 'v'})
+        self.assertEqual(['fake_region'], kc.region_list())
+        self.assertEqual('id2', kc.service_get('clustering')['id'])
+        self.assertEqual(1, self.conn.identity.regions.call_count)
+        self.assertEqual(1, self.conn.identity.services.call_count)
+
+        kc = kv3.KeystoneClient({'trust_id': 'TRUST2'})
+        kc.region_list()
+        self.assertEqual(2, self.conn.identity.regions.call_count)
+
+        # explicit refresh
+        kc.refresh_catalog()
+        kc.region_list()
+        self.assertEqual(3, self.conn.identity.regions.call_count)
+
+        cfg.CONF.set_override('catalog_cache_ttl', 0, enforce_type=True)
+        kc.region_list()
+        self.assertEqual(4, self.conn.identity.regions.call_count)
+
+    def test_catalog_cached_trust_list(self, mock_create):
+        self.conn.identity.regions.return_value = ['fake_region']
+        mock_create.return_value = self.conn
+        # Policies give the trust ID in a list
+        kc = kv3.KeystoneClient({'trust_id': ['TRUST1']})
+
+        self.assertEqual(['fake_region'], kc.region_list())
+
+        kc = kv3.KeystoneClient({'trust_id': ['TRUST1']})
+        self.assertEqual(['fake_region'], kc.region_list())
+        self.assertEqual(1, self.conn.identity.regions.call_count)
+
+        kc.refresh_catalog()
+        kc.region_list()
+        self.assertEqual(2, self.conn.identity.regions.call_count)
+
+    @mock.patch('time.time')
+    def test_catalog_negative_cached(self, mock_time, mock_create):
+        self.conn.identity.services.return_value = []
+        mock_create.return_value = self.conn
+        kc = kv3.KeystoneClient({'trust_id': 'TRUST1'})
+        mock_time.return_value = 1000
+
+        self.assertIsNone(kc.service_get('clustering'))
+        mock_time.return_value = 1029
+        self.assertIsNone(kc.service_get('clustering'))
+        self.assertEqual(1, self.conn.identity.services.call_count)
+
+        mock_time.return_value = 1030
+        self.assertIsNone(kc.service_get('clustering'))
+        self.assertEqual(2, self.conn.identity.services.call_count)
+
     @mock.patch.object(sdk, 'authenticate')
     def test_get_token(self, mock_auth, mock_create):
         access_info = {'token': '123', 'user_id': 'abc', 'project_id': 'xyz'}
@@ -215,6 +279,17 @@ class TestKeystoneV3(base.SenlinTestCase):
         mock_auth.assert_called_once_with(key='value')
         self.assertEqual('123', token)
 
+    @mock.patch.object(sdk, 'authenticate')
+    def test_get_token_info(self, mock_auth, mock_create):
+        access_info = {'token': '123', 'user_id': 'abc', 'project_id': 'xyz',
+                       'expires_at': 'EXPIRES'}
+        mock_auth.return_value = access_info
+
+        res = kv3.KeystoneClient.get_token_info(key='value')
+
+        mock_auth.assert_called_once_with(key='value')
+        self.assertEqual(('123', 'EXPIRES'), res)
+
     @mock.patch.object(sdk, 'authenticate')
     def test_get_user_id(self, mock_auth, mock_create):
         access_info = {'token': '123', 'user_id': 'abc', 'project_id': 'xyz'}
@@ -13,13 +13,14 @@
 import eventlet
 import mock
 
+from oslo_config import cfg
 from oslo_context import context as oslo_context
 
 from senlin.common import exception
 from senlin.common.i18n import _
+from senlin.common import waiter
 from senlin.drivers.openstack import lbaas
 from senlin.drivers.openstack import neutron_v2
-from senlin.engine import event
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 
@@ -92,18 +93,39 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
                                                 ignore_not_found=True)
         self.assertTrue(res)
 
-    @mock.patch.object(eventlet, 'sleep')
-    def test_wait_for_lb_ready_timeout(self, mock_sleep):
+    @mock.patch.object(waiter, 'wait_for')
+    def test_wait_for_lb_ready_timeout(self, mock_wait):
         lb_id = 'LB_ID'
         lb_obj = mock.Mock()
         lb_obj.id = lb_id
         self.nc.loadbalancer_get.return_value = lb_obj
+        mock_wait.side_effect = exception.ResourceTimeout(
+            resource='loadbalancer LB_ID', timeout=2)
 
         lb_obj.provisioning_status = 'PENDING_UPDATE'
         lb_obj.operating_status = 'OFFLINE'
         res = self.lb_driver._wait_for_lb_ready(lb_id, timeout=2)
         self.assertFalse(res)
-        mock_sleep.assert_called_once_with(2)
+        mock_wait.assert_called_once_with(mock.ANY, 'loadbalancer LB_ID',
+                                          timeout=2, interval=1,
+                                          max_interval=5)
+        check = mock_wait.call_args[0][0]
+        self.assertFalse(check())
+
+    @mock.patch.object(waiter, 'wait_for')
+    def test_wait_for_lb_ready_cancelled(self, mock_wait):
+        mock_wait.side_effect = exception.ResourceWaitCancelled(
+            resource='loadbalancer LB_ID', action='ACTION_ID')
+
+        res = self.lb_driver._wait_for_lb_ready('LB_ID')
+        self.assertFalse(res)
+
+    def test_wait_for_lb_ready_get_failed(self):
+        self.nc.loadbalancer_get.side_effect = exception.InternalError(
+            code=500, message='GET FAILED')
+
+        res = self.lb_driver._wait_for_lb_ready('LB_ID')
+        self.assertFalse(res)
 
     def test_lb_create_succeeded(self):
         lb_obj = mock.Mock()
@@ -144,8 +166,7 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.lb_driver._wait_for_lb_ready.assert_has_calls(
             calls, any_order=False)
 
-    @mock.patch.object(event, 'warning')
-    def test_lb_create_loadbalancer_creation_failed(self, mock_event):
+    def test_lb_create_loadbalancer_creation_failed(self):
         lb_obj = mock.Mock()
         lb_obj.id = 'LB_ID'
         subnet_obj = mock.Mock()
@@ -185,11 +206,9 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.assertFalse(status)
         msg = _('Failed in creating loadbalancer: CREATE FAILED.')
         self.assertEqual(msg, res)
-        self.assertTrue(mock_event.called)
 
-    @mock.patch.object(event, 'warning')
     @mock.patch.object(eventlet, 'sleep')
-    def test_lb_create_listener_creation_failed(self, mock_sleep, mock_event):
+    def test_lb_create_listener_creation_failed(self, mock_sleep):
         lb_obj = mock.Mock()
         listener_obj = mock.Mock()
         lb_obj.id = 'LB_ID'
@@ -228,10 +247,8 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.assertFalse(status)
         msg = _('Failed in creating lb listener: CREATE FAILED.')
         self.assertEqual(msg, res)
-        self.assertTrue(mock_event.called)
 
-    @mock.patch.object(event, 'warning')
-    def test_lb_create_pool_creation_failed(self, mock_event):
+    def test_lb_create_pool_creation_failed(self):
         lb_obj = mock.Mock()
         listener_obj = mock.Mock()
         pool_obj = mock.Mock()
@@ -276,7 +293,6 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.assertFalse(status)
         msg = _('Failed in creating lb pool: CREATE FAILED.')
         self.assertEqual(msg, res)
-        self.assertTrue(mock_event.called)
 
     def test_lb_delete(self):
         kwargs = {
@@ -299,8 +315,7 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.lb_driver._wait_for_lb_ready.assert_has_calls(
             calls, any_order=False)
 
-    @mock.patch.object(event, 'warning')
-    def test_lb_healthmonitor_delete_internalerror(self, mock_event):
+    def test_lb_healthmonitor_delete_internalerror(self):
         kwargs = {
             'loadbalancer': 'LB_ID',
             'listener': 'LISTENER_ID',
@@ -313,10 +328,8 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.assertFalse(status)
         msg = _('Failed in deleting healthmonitor: DELETE FAILED.')
         self.assertEqual(msg, res)
-        self.assertTrue(mock_event.called)
 
-    @mock.patch.object(event, 'warning')
-    def test_lb_pool_delete_internalerror(self, mock_event):
+    def test_lb_pool_delete_internalerror(self):
         kwargs = {
             'loadbalancer': 'LB_ID',
             'listener': 'LISTENER_ID',
@@ -331,10 +344,8 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.assertFalse(status)
         msg = _('Failed in deleting lb pool: DELETE FAILED.')
         self.assertEqual(msg, res)
-        self.assertTrue(mock_event.called)
 
-    @mock.patch.object(event, 'warning')
-    def test_lb_listener_delete_internalerror(self, mock_event):
+    def test_lb_listener_delete_internalerror(self):
         kwargs = {
             'loadbalancer': 'LB_ID',
             'listener': 'LISTENER_ID',
@@ -349,7 +360,6 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.assertFalse(status)
         msg = _('Failed in deleting listener: DELETE FAILED.')
         self.assertEqual(msg, res)
-        self.assertTrue(mock_event.called)
 
     def test_lb_delete_no_physical_object(self):
         kwargs = {'loadbalancer': 'LB_ID'}
@@ -413,9 +423,8 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         res = self.lb_driver._get_node_address(node, version=4)
         self.assertEqual({}, res)
 
-    @mock.patch.object(event, 'warning')
     @mock.patch.object(lbaas.LoadBalancerDriver, '_get_node_address')
-    def test_member_add(self, mock_get_node_address, mock_event):
+    def test_member_add(self, mock_get_node_address):
         node = mock.Mock()
         lb_id = 'LB_ID'
         pool_id = 'POOL_ID'
@@ -452,7 +461,6 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
             code=500, message="Can't find subnet1")
         res = self.lb_driver.member_add(node, lb_id, pool_id, port, subnet)
         self.assertIsNone(res)
-        self.assertTrue(mock_event.called)
 
         # Exception happens in network_get
         self.nc.subnet_get.side_effect = None
@@ -461,7 +469,6 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
             code=500, message="Can't find NETWORK_ID")
         res = self.lb_driver.member_add(node, lb_id, pool_id, port, subnet)
         self.assertIsNone(res)
-        self.assertTrue(mock_event.called)
 
         # Exception happens in pool_member_create
         self.nc.subnet_get.side_effect = None
@@ -472,7 +479,6 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
             code=500, message="CREATE FAILED")
         res = self.lb_driver.member_add(node, lb_id, pool_id, port, subnet)
         self.assertIsNone(res)
-        self.assertTrue(mock_event.called)
 
     @mock.patch.object(lbaas.LoadBalancerDriver, '_get_node_address')
     def test_member_add_node_no_address(self, mock_get_node_address):
@@ -522,8 +528,7 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         self.nc.pool_member_delete.assert_called_once_with(pool_id, member_id)
         self.lb_driver._wait_for_lb_ready.assert_called_once_with(lb_id)
 
-    @mock.patch.object(event, 'warning')
-    def test_member_remove_failed(self, mock_event):
+    def test_member_remove_failed(self):
         lb_id = 'LB_ID'
         pool_id = 'POOL_ID'
         member_id = 'MEMBER_ID'
@@ -535,10 +540,145 @@ class TestNeutronLBaaSDriver(base.SenlinTestCase):
         res = self.lb_driver.member_remove(lb_id, pool_id, member_id)
         self.assertFalse(res)
         self.nc.pool_member_delete.assert_called_once_with(pool_id, member_id)
-        self.assertTrue(mock_event.called)
 
         self.nc.pool_member_delete.side_effect = None
         self.lb_driver._wait_for_lb_ready.return_value = False
         res = self.lb_driver.member_remove(lb_id, pool_id, member_id)
         self.assertIsNone(res)
         self.lb_driver._wait_for_lb_ready.assert_called_once_with(lb_id)
+
+    def _setup_members(self):
+        subnet_obj = mock.Mock(id='SUBNET_ID', network_id='NETWORK_ID')
+        port1 = mock.Mock(device_id='SERVER1', fixed_ips=[
+            {'subnet_id': 'OTHER_SUBNET', 'ip_address': '10.0.0.1'},
+            {'subnet_id': 'SUBNET_ID', 'ip_address': 'fd00::1'},
+            {'subnet_id': 'SUBNET_ID', 'ip_address': '192.168.1.1'},
+        ])
+        port2 = mock.Mock(device_id='SERVER2', fixed_ips=[
+            {'subnet_id': 'SUBNET_ID', 'ip_address': '192.168.1.2'},
+        ])
+        self.nc.subnet_get.return_value = subnet_obj
+        self.nc.port_list.return_value = [port1, port2]
+        self.lb_driver._wait_for_lb_ready = mock.Mock(return_value=True)
+        node1 = mock.Mock(id='NODE1', physical_id='SERVER1')
+        node2 = mock.Mock(id='NODE2', physical_id='SERVER2')
+        node3 = mock.Mock(id='NODE3', physical_id='SERVER3')
+        return node1, node2, node3
+
+    def test_members_add(self):
+        node1, node2, node3 = self._setup_members()
+
+        def _create(pool_id, address, port, subnet_id):
+            return mock.Mock(id='MEMBER_' + address)
+
+        self.nc.pool_member_create.side_effect = _create
+
+        res = self.lb_driver.members_add([node1, node2, node3], 'LB_ID',
+                                         'POOL_ID', 80, 'subnet1')
+
+        self.assertEqual({'NODE1': 'MEMBER_192.168.1.1',
+                          'NODE2': 'MEMBER_192.168.1.2'}, res)
+        self.nc.subnet_get.assert_called_once_with('subnet1')
+        self.nc.port_list.assert_called_once_with(network_id='NETWORK_ID')
+        self.nc.pool_member_create.assert_has_calls([
+            mock.call('POOL_ID', '192.168.1.1', 80, 'SUBNET_ID'),
+            mock.call('POOL_ID', '192.168.1.2', 80, 'SUBNET_ID'),
+        ], any_order=True)
+        self.assertEqual(2, self.nc.pool_member_create.call_count)
+        self.lb_driver._wait_for_lb_ready.assert_called_once_with('LB_ID')
+        self.assertFalse(node1.get_details.called)
+
+    def test_members_add_no_nodes(self):
+        res = self.lb_driver.members_add([], 'LB_ID', 'POOL_ID', 80,
+                                         'subnet1')
+        self.assertEqual({}, res)
+        self.assertFalse(self.nc.subnet_get.called)
+
+    def test_members_add_subnet_failed(self):
+        node1, node2, node3 = self._setup_members()
+        self.nc.subnet_get.side_effect = exception.InternalError(
+            code=500, message="Can't find subnet1")
+
+        res = self.lb_driver.members_add([node1], 'LB_ID', 'POOL_ID', 80,
+                                         'subnet1')
+        self.assertEqual({}, res)
+        self.assertFalse(self.nc.pool_member_create.called)
+
+    @mock.patch.object(eventlet, 'sleep')
+    def test_members_add_retry_conflict(self, mock_sleep):
+        node1, node2, node3 = self._setup_members()
+        member = mock.Mock(id='MEMBER_ID')
+        conflict = exception.InternalError(code=409, message='PENDING_UPDATE')
+        # More conflicts than members created in parallel
+        self.nc.pool_member_create.side_effect = [conflict] * 5 + [member]
+
+        res = self.lb_driver.members_add([node1], 'LB_ID', 'POOL_ID', 80,
+                                         'subnet1')
+        self.assertEqual({'NODE1': 'MEMBER_ID'}, res)
+        self.assertEqual(6, self.nc.pool_member_create.call_count)
+        self.assertEqual(5, mock_sleep.call_count)
+        self.lb_driver._wait_for_lb_ready.assert_called_once_with('LB_ID')
+
+    def test_members_add_conflict_timeout(self):
+        node1, node2, node3 = self._setup_members()
+        self.patchobject(lbaas, 'MEMBER_CHANGE_TIMEOUT', new=0)
+        self.nc.pool_member_create.side_effect = exception.InternalError(
+            code=409, message='PENDING_UPDATE')
+
+        res = self.lb_driver.members_add([node1], 'LB_ID', 'POOL_ID', 80,
+                                         'subnet1')
+        self.assertEqual({}, res)
+        self.assertEqual(1, self.nc.pool_member_create.call_count)
+
+    def test_members_add_create_failed(self):
+        node1, node2, node3 = self._setup_members()
+        self.nc.pool_member_create.side_effect = [
+            exception.InternalError(code=500, message='CREATE FAILED'),
+            mock.Mock(id='MEMBER2'),
+        ]
+        cfg.CONF.set_override('lb_member_concurrency', 1, enforce_type=True)
+
+        res = self.lb_driver.members_add([node1, node2], 'LB_ID', 'POOL_ID',
+                                         80, 'subnet1')
+        self.assertEqual({'NODE2': 'MEMBER2'}, res)
+
+    def test_members_add_lb_not_ready(self):
+        node1, node2, node3 = self._setup_members()
+        self.nc.pool_member_create.return_value = mock.Mock(id='MEMBER_ID')
+        self.lb_driver._wait_for_lb_ready.return_value = False
+
+        # Members created are still returned so they are not leaked
+        res = self.lb_driver.members_add([node1, node2], 'LB_ID', 'POOL_ID',
+                                         80, 'subnet1')
+        self.assertEqual({'NODE1': 'MEMBER_ID', 'NODE2': 'MEMBER_ID'}, res)
+
+    def test_members_remove(self):
+        self.lb_driver._wait_for_lb_ready = mock.Mock(return_value=True)
+
+        res = self.lb_driver.members_remove('LB_ID', 'POOL_ID',
+                                            ['MEMBER1', 'MEMBER2'])
+        self.assertEqual(['MEMBER1', 'MEMBER2'], res)
+        self.nc.pool_member_delete.assert_has_calls([
+            mock.call('POOL_ID', 'MEMBER1'),
+            mock.call('POOL_ID', 'MEMBER2'),
+        ], any_order=True)
+        self.lb_driver._wait_for_lb_ready.assert_called_once_with('LB_ID')
+
+    def test_members_remove_failed(self):
+        self.lb_driver._wait_for_lb_ready = mock.Mock(return_value=False)
+
+        def _delete(pool_id, member_id):
+            if member_id == 'MEMBER1':
+                raise exception.InternalError(code=500, message='FAILED')
+
+        self.nc.pool_member_delete.side_effect = _delete
+
+        # The lb doesn't become ready after the members are deleted
+        res = self.lb_driver.members_remove('LB_ID', 'POOL_ID',
+                                            ['MEMBER1', 'MEMBER2'])
+        self.assertEqual([], res)
+
+        self.lb_driver._wait_for_lb_ready.return_value = True
+        res = self.lb_driver.members_remove('LB_ID', 'POOL_ID',
+                                            ['MEMBER1', 'MEMBER2'])
+        self.assertEqual(['MEMBER2'], res)
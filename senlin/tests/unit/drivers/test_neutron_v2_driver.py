@@ -25,15 +25,15 @@ class TestNeutronV2Driver(base.SenlinTestCase):
         self.context = utils.dummy_context()
         self.conn_params = self.context.to_dict()
         self.conn = mock.Mock()
-        with mock.patch.object(sdk, 'create_connection') as mock_creare_conn:
+        with mock.patch.object(sdk, 'get_connection') as mock_creare_conn:
             mock_creare_conn.return_value = self.conn
             self.nc = neutron_v2.NeutronClient(self.context)
 
-    @mock.patch.object(sdk, 'create_connection')
-    def test_init(self, mock_create_connection):
+    @mock.patch.object(sdk, 'get_connection')
+    def test_init(self, mock_get_connection):
         params = self.conn_params
         neutron_v2.NeutronClient(params)
-        mock_create_connection.assert_called_once_with(params)
+        mock_get_connection.assert_called_once_with(params)
 
     def test_network_get(self):
         net_id = 'network_identifier'
@@ -53,6 +53,15 @@ class TestNeutronV2Driver(base.SenlinTestCase):
         self.conn.network.find_subnet.assert_called_once_with(subnet_id)
         self.assertEqual(subnet_obj, res)
 
+    def test_port_list(self):
+        ports = [mock.Mock(), mock.Mock()]
+
+        self.conn.network.ports.return_value = iter(ports)
+        res = self.nc.port_list(network_id='NETWORK_ID')
+        self.conn.network.ports.assert_called_once_with(
+            network_id='NETWORK_ID')
+        self.assertEqual(ports, res)
+
     def test_loadbalancer_get(self):
         lb_id = 'loadbalancer_identifier'
         loadbalancer_obj = mock.Mock()
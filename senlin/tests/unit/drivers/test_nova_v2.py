@@ -10,11 +10,16 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+
 import mock
 from oslo_config import cfg
 
 from openstack.compute.v2 import server_metadata
 
+from senlin.common import exception
+from senlin.common import poller
+from senlin.common import waiter
 from senlin.drivers.openstack import nova_v2
 from senlin.drivers.openstack import sdk
 from senlin.tests.unit.common import base
@@ -25,12 +30,13 @@ class TestNovaV2(base.SenlinTestCase):
 
     def setUp(self):
         super(TestNovaV2, self).setUp()
+        cfg.CONF.set_override('status_poll_interval', 0, enforce_type=True)
 
         self.ctx = utils.dummy_context()
         self.conn_params = self.ctx.to_dict()
         self.mock_conn = mock.Mock()
         self.mock_create = self.patchobject(
-            sdk, 'create_connection',
+            sdk, 'get_connection',
             return_value=self.mock_conn)
         self.compute = self.mock_conn.compute
 
@@ -203,26 +209,117 @@ class TestNovaV2(base.SenlinTestCase):
         d.server_create(name='foo')
         self.compute.create_server.assert_called_once_with(name='foo')
 
-    def test_wait_for_server(self):
+    def test_server_create_many(self):
+        servers = [mock.Mock(), mock.Mock()]
+        self.compute.servers.return_value = iter(servers)
+        self.compute.create_server.return_value = mock.Mock(
+            reservation_id='r-1234')
+        d = nova_v2.NovaClient(self.conn_params)
+
+        res = d.server_create_many(3, name='foo', flavorRef='F')
+
+        self.assertEqual(servers, res)
+        self.compute.create_server.assert_called_once_with(
+            name='foo', flavorRef='F', min_count=1, max_count=3,
+            return_reservation_id=True)
+        self.compute.servers.assert_called_once_with(
+            True, reservation_id='r-1234')
+
+    def test_server_create_many_no_reservation_id(self):
+        self.compute.servers.return_value = iter([])
+        self.compute.create_server.return_value = mock.Mock(
+            reservation_id=None)
+        d = nova_v2.NovaClient(self.conn_params)
+
+        d.server_create_many(3, name='web.1+x', flavorRef='F')
+
+        # The name is matched literally
+        self.compute.servers.assert_called_once_with(
+            True, name='^web\\.1\\+x-')
+
+    @mock.patch.object(poller, 'get_poller')
+    def test_wait_for_server_polled(self, mock_get):
+        server_poller = mock.Mock()
+        mock_get.return_value = server_poller
         d = nova_v2.NovaClient(self.conn_params)
-        d.wait_for_server('foo', 'STATUS1', ['STATUS2'], 5, 10)
-        self.compute.wait_for_server.assert_called_once_with(
-            'foo', status='STATUS1', failures=['STATUS2'], interval=5, wait=10)
 
-    def test_wait_for_server_default_value(self):
+        res = d.wait_for_server('foo', timeout=10)
+
+        self.assertEqual(server_poller.wait.return_value, res)
+        mock_get.assert_called_once_with(('server',) + d.scope,
+                                         d._list_changed_servers,
+                                         d.server_get)
+        server_poller.wait.assert_called_once_with('foo', mock.ANY,
+                                                   'server foo', timeout=10)
+        check = server_poller.wait.call_args[0][1]
+        self.assertIsNone(check(None))
+        self.assertIsNone(check(mock.Mock(status='BUILD')))
+        server = mock.Mock(status='ACTIVE')
+        self.assertEqual(server, check(server))
+        self.assertRaises(exception.ResourceStatusError, check,
+                          mock.Mock(status='ERROR'))
+
+    def test_list_changed_servers(self):
         d = nova_v2.NovaClient(self.conn_params)
-        d.wait_for_server('foo', timeout=10)
-        self.compute.wait_for_server.assert_called_once_with(
-            'foo', status='ACTIVE', failures=['ERROR'], interval=2, wait=10)
+        since = datetime.datetime(2016, 1, 1, 12, 0, 0)
 
-    def test_wait_for_server_with_default_timeout(self):
+        res = d._list_changed_servers(['foo'], since)
+
+        self.assertEqual(self.compute.servers.return_value, res)
+        self.compute.servers.assert_called_once_with(
+            details=True, changes_since='2016-01-01T11:55:00')
+
+    @mock.patch.object(waiter, 'wait_for')
+    def test_wait_for_server(self, mock_wait):
+        d = nova_v2.NovaClient(self.conn_params)
+        res = d.wait_for_server('foo', 'STATUS1', ['STATUS2'], 5, 10)
+        self.assertEqual(mock_wait.return_value, res)
+        mock_wait.assert_called_once_with(mock.ANY, 'server foo',
+                                          timeout=10, interval=5)
+
+        # The check returns the server when it reaches the status
+        check = mock_wait.call_args[0][0]
+        server = mock.Mock(id='foo', status='STATUS1')
+        self.compute.get_server.return_value = server
+        self.assertEqual(server, check())
+        self.compute.get_server.assert_called_once_with('foo')
+
+        server.status = 'BUILD'
+        self.assertIsNone(check())
+
+        server.status = 'STATUS2'
+        self.assertRaises(exception.ResourceStatusError, check)
+
+    @mock.patch.object(waiter, 'wait_for')
+    def test_wait_for_server_default_value(self, mock_wait):
+        server = mock.Mock(id='FAKE_ID')
+        d = nova_v2.NovaClient(self.conn_params)
+        d.wait_for_server(server, timeout=10)
+        mock_wait.assert_called_once_with(mock.ANY, 'server FAKE_ID',
+                                          timeout=10, interval=2)
+
+        check = mock_wait.call_args[0][0]
+        self.compute.get_server.return_value = mock.Mock(status='ERROR')
+        self.assertRaises(exception.ResourceStatusError, check)
+        self.compute.get_server.assert_called_once_with(server)
+
+    @mock.patch.object(waiter, 'wait_for')
+    def test_wait_for_server_with_default_timeout(self, mock_wait):
         timeout = cfg.CONF.default_action_timeout
 
         d = nova_v2.NovaClient(self.conn_params)
         d.wait_for_server('foo')
-        self.compute.wait_for_server.assert_called_once_with(
-            'foo', status='ACTIVE', failures=['ERROR'], interval=2,
-            wait=timeout)
+        mock_wait.assert_called_once_with(mock.ANY, 'server foo',
+                                          timeout=timeout, interval=2)
+
+    @mock.patch.object(waiter, 'wait_for')
+    def test_wait_for_server_timeout(self, mock_wait):
+        mock_wait.side_effect = exception.ResourceTimeout(
+            resource='server foo', timeout=10)
+
+        d = nova_v2.NovaClient(self.conn_params)
+        self.assertRaises(exception.InternalError, d.wait_for_server, 'foo',
+                          timeout=10)
 
     def test_server_get(self):
         d = nova_v2.NovaClient(self.conn_params)
@@ -269,22 +366,36 @@ class TestNovaV2(base.SenlinTestCase):
             'fakeid', 'new_image', name='new_name',
             admin_password='new_pass', **attrs)
 
-    def test_wait_for_server_delete(self):
-        self.compute.find_server.return_value = 'FOO'
+    @mock.patch.object(waiter, 'wait_for')
+    def test_wait_for_server_delete(self, mock_wait):
+        server = mock.Mock(id='FAKE_ID')
+        self.compute.find_server.return_value = server
 
         d = nova_v2.NovaClient(self.conn_params)
         d.wait_for_server_delete('foo', 120)
         self.compute.find_server.assert_called_once_with('foo', True)
-        self.compute.wait_for_delete.assert_called_once_with('FOO', wait=120)
+        mock_wait.assert_called_once_with(mock.ANY,
+                                          'deletion of server FAKE_ID',
+                                          timeout=120, interval=2)
+
+        # The check looks up the server by ID until it is gone
+        check = mock_wait.call_args[0][0]
+        self.assertFalse(check())
+        self.compute.find_server.return_value = None
+        self.assertTrue(check())
+        self.compute.find_server.assert_called_with('FAKE_ID', True)
 
-    def test_wait_for_server_delete_with_default_timeout(self):
+    @mock.patch.object(waiter, 'wait_for')
+    def test_wait_for_server_delete_with_default_timeout(self, mock_wait):
         cfg.CONF.set_override('default_action_timeout', 360, enforce_type=True)
-        self.compute.find_server.return_value = 'FOO'
+        self.compute.find_server.return_value = mock.Mock(id='FAKE_ID')
 
         d = nova_v2.NovaClient(self.conn_params)
         d.wait_for_server_delete('foo')
         self.compute.find_server.assert_called_once_with('foo', True)
-        self.compute.wait_for_delete.assert_called_once_with('FOO', wait=360)
+        mock_wait.assert_called_once_with(mock.ANY,
+                                          'deletion of server FAKE_ID',
+                                          timeout=360, interval=2)
 
     def test_wait_for_server_delete_server_doesnt_exist(self):
         self.compute.find_server.return_value = None
@@ -13,11 +13,14 @@
 import mock
 from openstack import connection
 from openstack import profile
+from oslo_config import cfg
 from oslo_serialization import jsonutils
 from requests import exceptions as req_exc
 import six
 
 from senlin.common import exception as senlin_exc
+from senlin.drivers.openstack import keystone_v3
+from senlin.drivers.openstack import nova_v2
 from senlin.drivers.openstack import sdk
 from senlin.tests.unit.common import base
 
@@ -128,6 +131,22 @@ class OpenStackSDKTest(base.SenlinTestCase):
         self.assertEqual(500, ex.code)
         self.assertEqual('BOOM', ex.message)
 
+    def test_translate_exception_senlin_exception(self):
+        error = senlin_exc.ResourceStatusError(resource_id='FAKE_ID',
+                                               status='ERROR', reason='BOOM')
+
+        @sdk.translate_exception
+        def test_func(driver):
+            raise error
+
+        mock_parse = self.patchobject(sdk, 'parse_exception')
+        ex = self.assertRaises(senlin_exc.ResourceStatusError,
+                               test_func, mock.Mock())
+
+        self.assertIs(error, ex)
+        self.assertEqual('FAKE_ID', ex.kwargs['resource_id'])
+        self.assertEqual(0, mock_parse.call_count)
+
     @mock.patch.object(profile, 'Profile')
     @mock.patch.object(connection, 'Connection')
     def test_create_connection_token(self, mock_conn, mock_profile):
@@ -215,13 +234,107 @@ class OpenStackSDKTest(base.SenlinTestCase):
         x_conn.session.get_token.return_value = 'TOKEN'
         x_conn.session.get_user_id.return_value = 'test-user-id'
         x_conn.session.get_project_id.return_value = 'test-project-id'
+        x_access = x_conn.session.auth.get_access.return_value
         access_info = {
             'token': 'TOKEN',
             'user_id': 'test-user-id',
-            'project_id': 'test-project-id'
+            'project_id': 'test-project-id',
+            'expires_at': x_access.expires
         }
 
         res = sdk.authenticate(foo='bar')
 
         self.assertEqual(access_info, res)
         mock_conn.assert_called_once_with({'foo': 'bar'})
+
+
+class ConnectionPoolTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(ConnectionPoolTest, self).setUp()
+        self.pool = sdk.ConnectionPool()
+        self.now = 1000.0
+        self.patchobject(sdk.time, 'time', side_effect=lambda: self.now)
+        self.mock_create = self.patchobject(
+            sdk, 'create_connection', side_effect=lambda p: mock.Mock())
+
+    def test_get_shared(self):
+        params = {'auth_url': 'URL', 'trust_id': 'TRUST',
+                  'region_name': 'R1'}
+
+        res = self.pool.get(params)
+
+        self.assertIs(res, self.pool.get(dict(params)))
+        self.mock_create.assert_called_once_with(params)
+        # The parameters of the caller are left untouched
+        self.assertEqual('R1', params['region_name'])
+        self.assertIsNot(res, self.pool.get(dict(params, region_name='R2')))
+        self.assertIsNot(res, self.pool.get(dict(params, trust_id='OTHER')))
+
+    def test_get_idle(self):
+        res = self.pool.get({'user_id': 'U1'})
+        self.now += 599
+        self.assertIs(res, self.pool.get({'user_id': 'U1'}))
+
+        self.now += 601
+        self.assertIsNot(res, self.pool.get({'user_id': 'U1'}))
+        self.assertEqual(2, self.mock_create.call_count)
+
+    def test_get_full(self):
+        cfg.CONF.set_override('connection_pool_size', 2, enforce_type=True)
+        c1 = self.pool.get({'user_id': 'U1'})
+        c2 = self.pool.get({'user_id': 'U2'})
+        # U1 becomes the most recently used connection
+        self.assertIs(c1, self.pool.get({'user_id': 'U1'}))
+
+        self.pool.get({'user_id': 'U3'})
+
+        self.assertIs(c1, self.pool.get({'user_id': 'U1'}))
+        self.assertIsNot(c2, self.pool.get({'user_id': 'U2'}))
+
+    def test_get_disabled(self):
+        cfg.CONF.set_override('connection_pool_size', 0, enforce_type=True)
+
+        res = self.pool.get({'user_id': 'U1'})
+
+        self.assertIsNot(res, self.pool.get({'user_id': 'U1'}))
+
+    def test_get_trust_list(self):
+        # Policies give the trust ID in a list
+        res = self.pool.get({'auth_url': 'URL', 'trust_id': ['T1']})
+
+        self.assertIs(res, self.pool.get({'auth_url': 'URL',
+                                          'trust_id': ['T1']}))
+        self.assertIsNot(res, self.pool.get({'auth_url': 'URL',
+                                             'trust_id': ['T2']}))
+
+    def test_get_unhashable(self):
+        res = self.pool.get({'user_id': 'U1', 'foo': set(['bar'])})
+
+        self.assertIsNot(res, self.pool.get({'user_id': 'U1',
+                                             'foo': set(['bar'])}))
+
+    def test_clear(self):
+        res = self.pool.get({'user_id': 'U1'})
+
+        self.pool.clear()
+
+        self.assertIsNot(res, self.pool.get({'user_id': 'U1'}))
+
+    @mock.patch.object(sdk._pool, 'get')
+    def test_get_connection(self, mock_get):
+        res = sdk.get_connection({'foo': 'bar'})
+
+        self.assertEqual(mock_get.return_value, res)
+        mock_get.assert_called_once_with({'foo': 'bar'})
+
+    def test_get_connection_drivers_of_policy(self):
+        self.patchobject(sdk, '_pool', new=self.pool)
+        # Parameters given to drivers by policies
+        params = {'auth_url': 'URL', 'trust_id': ['TRUST']}
+
+        nc = nova_v2.NovaClient(params)
+        kc = keystone_v3.KeystoneClient(params)
+
+        self.assertIs(nc.conn, kc.conn)
+        self.assertEqual(1, self.mock_create.call_count)
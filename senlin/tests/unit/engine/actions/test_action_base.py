@@ -18,8 +18,10 @@ import six
 
 from senlin.common import context
 from senlin.common import exception
+from senlin.common import waiter
 from senlin.db.sqlalchemy import api as db_api
 from senlin.engine.actions import base as action_base
+from senlin.engine.actions import custom_action
 from senlin.engine import cluster as cluster_mod
 from senlin.engine import cluster_policy as cp_mod
 from senlin.engine import environment
@@ -473,7 +475,8 @@ class ActionBaseTest(base.SenlinTestCase):
         action = action_base.Action('OBJID', 'OBJECT_ACTION', self.ctx)
         action.id = 'FAKE_ID'
         action.timeout = 10
-        self.patchobject(action, 'is_timeout', return_value=True)
+        self.patchobject(custom_action.CustomAction, 'is_timeout',
+                         return_value=True)
 
         res = action._check_signal()
         self.assertEqual(action.RES_TIMEOUT, res)
@@ -483,7 +486,8 @@ class ActionBaseTest(base.SenlinTestCase):
         action = action_base.Action('OBJID', 'OBJECT_ACTION', self.ctx)
         action.id = 'FAKE_ID'
         action.timeout = 100
-        self.patchobject(action, 'is_timeout', return_value=False)
+        self.patchobject(custom_action.CustomAction, 'is_timeout',
+                         return_value=False)
         sig_cmd = mock.Mock()
         mock_query.return_value = sig_cmd
 
@@ -496,7 +500,8 @@ class ActionBaseTest(base.SenlinTestCase):
         action = action_base.Action('OBJID', 'OBJECT_ACTION', self.ctx)
         action.id = 'FAKE_ID'
         action.timeout = 100
-        self.patchobject(action, 'is_timeout', return_value=False)
+        self.patchobject(custom_action.CustomAction, 'is_timeout',
+                         return_value=False)
 
         mock_query.return_value = action.SIG_CANCEL
         res = action.is_cancelled()
@@ -514,7 +519,8 @@ class ActionBaseTest(base.SenlinTestCase):
         action = action_base.Action('OBJID', 'OBJECT_ACTION', self.ctx)
         action.id = 'FAKE_ID'
         action.timeout = 100
-        self.patchobject(action, 'is_timeout', return_value=False)
+        self.patchobject(custom_action.CustomAction, 'is_timeout',
+                         return_value=False)
 
         mock_query.return_value = action.SIG_SUSPEND
         res = action.is_suspended()
@@ -532,7 +538,8 @@ class ActionBaseTest(base.SenlinTestCase):
         action = action_base.Action('OBJID', 'OBJECT_ACTION', self.ctx)
         action.id = 'FAKE_ID'
         action.timeout = 100
-        self.patchobject(action, 'is_timeout', return_value=False)
+        self.patchobject(custom_action.CustomAction, 'is_timeout',
+                         return_value=False)
 
         mock_query.return_value = action.SIG_RESUME
         res = action.is_resumed()
@@ -805,7 +812,7 @@ class ActionProcTest(base.SenlinTestCase):
         action = action_base.Action('OBJID', 'OBJECT_ACTION', self.ctx)
         action.owner = 'WORKER'
         action.start_time = 123456
-        self.patchobject(action, 'execute',
+        self.patchobject(custom_action.CustomAction, 'execute',
                          return_value=(action.RES_OK, 'BIG SUCCESS'))
         mock_load.return_value = action
 
@@ -826,7 +833,8 @@ class ActionProcTest(base.SenlinTestCase):
         action = action_base.Action('OBJID', 'OBJECT_ACTION', self.ctx)
         action.owner = 'WORKER'
         action.start_time = 123456
-        self.patchobject(action, 'execute', side_effect=Exception('Boom!'))
+        self.patchobject(custom_action.CustomAction, 'execute',
+                         side_effect=Exception('Boom!'))
         mock_load.return_value = action
 
         res = action_base.ActionProc(self.ctx, 'ACTION')
@@ -835,3 +843,25 @@ class ActionProcTest(base.SenlinTestCase):
         mock_load.assert_called_once_with(self.ctx, action_id='ACTION')
         self.assertEqual(action.FAILED, action.status)
         self.assertEqual('Boom!', action.status_reason)
+
+    @mock.patch.object(event, 'info')
+    @mock.patch.object(action_base.Action, 'load')
+    @mock.patch.object(db_api, 'action_mark_succeeded')
+    def test_action_proc_binds_waiter(self, mock_mark, mock_load,
+                                      mock_event_info):
+        action = action_base.Action('OBJID', 'OBJECT_ACTION', self.ctx)
+        action.start_time = 123456
+        owners = []
+
+        def execute():
+            owners.append(waiter.current_action())
+            return action.RES_OK, 'BIG SUCCESS'
+
+        self.patchobject(custom_action.CustomAction, 'execute',
+                         side_effect=execute)
+        mock_load.return_value = action
+
+        res = action_base.ActionProc(self.ctx, 'ACTION')
+        self.assertTrue(res)
+        self.assertEqual([action], owners)
+        self.assertIsNone(waiter.current_action())
@@ -11,6 +11,7 @@
 # under the License.
 
 import mock
+from oslo_config import cfg
 
 from senlin.common import exception
 from senlin.common import scaleutils
@@ -20,10 +21,12 @@ from senlin.engine.actions import cluster_action as ca
 from senlin.engine import cluster as cluster_mod
 from senlin.engine import dispatcher
 from senlin.engine import event as event_mod
+from senlin.engine import fanout
 from senlin.engine import node as node_mod
 from senlin.engine import scheduler
 from senlin.engine import senlin_lock
 from senlin.policies import base as policy_base
+from senlin.profiles import base as profile_base
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
 
@@ -89,9 +92,12 @@ class ClusterActionWaitTest(base.SenlinTestCase):
     def test_wait_dependents(self, mock_reschedule, mock_load):
         action = ca.ClusterAction('ID', 'ACTION', self.ctx)
         action.id = 'FAKE_ID'
-        self.patchobject(action, 'get_status', side_effect=self.statuses)
-        self.patchobject(action, 'is_cancelled', side_effect=self.cancelled)
-        self.patchobject(action, 'is_timeout', side_effect=self.timeout)
+        self.patchobject(ca.ClusterAction, 'get_status',
+                         side_effect=self.statuses)
+        self.patchobject(ca.ClusterAction, 'is_cancelled',
+                         side_effect=self.cancelled)
+        self.patchobject(ca.ClusterAction, 'is_timeout',
+                         side_effect=self.timeout)
 
         res_code, res_msg = action._wait_for_dependents()
         self.assertEqual(self.code, res_code)
@@ -99,6 +105,137 @@ class ClusterActionWaitTest(base.SenlinTestCase):
         self.assertEqual(self.rescheduled_times, mock_reschedule.call_count)
 
 
+@mock.patch.object(cluster_mod.Cluster, 'load')
+class ClusterActionFanoutTest(base.SenlinTestCase):
+
+    def setUp(self):
+        super(ClusterActionFanoutTest, self).setUp()
+        self.ctx = utils.dummy_context()
+        cfg.CONF.set_override('max_actions_per_batch', 2, enforce_type=True)
+        self.addCleanup(fanout._windows.clear)
+
+    @mock.patch.object(db_api, 'action_update')
+    @mock.patch.object(dispatcher, 'start_action')
+    def test_start_dependents(self, mock_start, mock_update, mock_load):
+        action = ca.ClusterAction('CLUSTER_ID', 'CLUSTER_ACTION', self.ctx)
+        pending = ['A1', 'A2', 'A3']
+
+        res = action._start_dependents(pending)
+
+        self.assertEqual(2, res)
+        self.assertEqual(['A3'], pending)
+        mock_update.assert_has_calls([
+            mock.call(action.context, 'A1', {'status': 'READY'}),
+            mock.call(action.context, 'A2', {'status': 'READY'}),
+        ])
+        mock_start.assert_has_calls([mock.call(action_id='A1'),
+                                     mock.call(action_id='A2')])
+
+        # The window is full
+        mock_start.reset_mock()
+        self.assertEqual(2, action._start_dependents(pending, 2))
+        self.assertEqual(['A3'], pending)
+        self.assertFalse(mock_start.called)
+
+    @mock.patch.object(db_api, 'cluster_throttled_get')
+    @mock.patch.object(db_api, 'action_update')
+    @mock.patch.object(dispatcher, 'start_action')
+    def test_start_dependents_throttled(self, mock_start, mock_update,
+                                        mock_throttled, mock_load):
+        action = ca.ClusterAction('CLUSTER_ID', 'CLUSTER_ACTION', self.ctx)
+        fanout.get_window('CLUSTER_ID').reported = 0
+        # Rate limited in a derived action run by another engine
+        mock_throttled.return_value = 1
+        pending = ['A1', 'A2', 'A3']
+
+        self.assertEqual(1, action._start_dependents(pending))
+
+        self.assertEqual(['A2', 'A3'], pending)
+        mock_start.assert_called_once_with(action_id='A1')
+        mock_throttled.assert_called_once_with(action.context, 'CLUSTER_ID')
+
+    @mock.patch.object(db_api, 'action_count_running_by_cluster')
+    @mock.patch.object(db_api, 'action_update')
+    @mock.patch.object(dispatcher, 'start_action')
+    def test_start_dependents_other_actions(self, mock_start, mock_update,
+                                            mock_count, mock_load):
+        action = ca.ClusterAction('CLUSTER_ID', 'CLUSTER_ACTION', self.ctx)
+        # A derived action of another action on the cluster is running
+        mock_count.return_value = 1
+        pending = ['A1', 'A2', 'A3']
+
+        self.assertEqual(1, action._start_dependents(pending))
+
+        self.assertEqual(['A2', 'A3'], pending)
+        mock_start.assert_called_once_with(action_id='A1')
+        mock_count.assert_called_once_with(action.context, 'CLUSTER_ID')
+
+    @mock.patch.object(db_api, 'action_update')
+    @mock.patch.object(dispatcher, 'start_action')
+    def test_start_dependents_unlimited(self, mock_start, mock_update,
+                                        mock_load):
+        cfg.CONF.set_override('max_actions_per_batch', 0, enforce_type=True)
+        action = ca.ClusterAction('CLUSTER_ID', 'CLUSTER_ACTION', self.ctx)
+        pending = ['A1', 'A2', 'A3']
+
+        self.assertEqual(3, action._start_dependents(pending))
+        self.assertEqual([], pending)
+        self.assertEqual(3, mock_start.call_count)
+
+    @mock.patch.object(scheduler, 'reschedule')
+    @mock.patch.object(db_api, 'action_get')
+    @mock.patch.object(ca.ClusterAction, '_start_dependents')
+    def test_wait_dependents_sliding(self, mock_start, mock_get,
+                                     mock_reschedule, mock_load):
+        action = ca.ClusterAction('CLUSTER_ID', 'CLUSTER_ACTION', self.ctx)
+        action.id = 'FAKE_ID'
+        self.patchobject(ca.ClusterAction, 'get_status',
+                         side_effect=['WAITING', 'WAITING', 'READY'])
+        self.patchobject(ca.ClusterAction, 'is_cancelled', return_value=False)
+        self.patchobject(ca.ClusterAction, 'is_timeout', return_value=False)
+        # Two actions running and two pending, then one of those running
+        # completes
+        mock_get.side_effect = [
+            mock.Mock(depends_on=['A1', 'A2', 'A3', 'A4']),
+            mock.Mock(depends_on=['A2', 'A3', 'A4']),
+        ]
+
+        def _start(pending, running=0):
+            del pending[:1]
+            return running + 1
+
+        mock_start.side_effect = _start
+        window = fanout.get_window('CLUSTER_ID')
+        window.throttled()
+        self.patchobject(window, 'completed')
+        pending = ['A3', 'A4']
+
+        res_code, res_msg = action._wait_for_dependents(pending)
+
+        self.assertEqual(action.RES_OK, res_code)
+        mock_start.assert_has_calls([mock.call(mock.ANY, 2),
+                                     mock.call(mock.ANY, 2)])
+        window.completed.assert_called_once_with(1)
+        self.assertEqual([], pending)
+        self.assertEqual(2, mock_reschedule.call_count)
+
+    @mock.patch.object(db_api, 'action_update')
+    def test_wait_dependents_failed(self, mock_update, mock_load):
+        action = ca.ClusterAction('CLUSTER_ID', 'CLUSTER_ACTION', self.ctx)
+        action.id = 'FAKE_ID'
+        self.patchobject(ca.ClusterAction, 'get_status', return_value='FAILED')
+        pending = ['A3']
+
+        res_code, res_msg = action._wait_for_dependents(pending)
+
+        self.assertEqual(action.RES_ERROR, res_code)
+        # Actions not started are cancelled
+        mock_update.assert_called_once_with(
+            action.context, 'A3', {'status': 'CANCELLED',
+                                   'status_reason': 'Action not started.'})
+        self.assertEqual([], pending)
+
+
 @mock.patch.object(cluster_mod.Cluster, 'load')
 class ClusterActionTest(base.SenlinTestCase):
 
@@ -165,9 +302,9 @@ class ClusterActionTest(base.SenlinTestCase):
                                          'CLUSTER_ACTION_ID')
         mock_update.assert_called_once_with(
             action.context, n_action.id,
-            {'status': n_action.READY})
+            {'status': 'READY'})
         mock_start.assert_called_once_with(action_id='NODE_ACTION_ID')
-        mock_wait.assert_called_once_with()
+        mock_wait.assert_called_once_with([])
         self.assertEqual({'nodes_added': ['NODE_ID']}, action.outputs)
 
     @mock.patch.object(db_api, 'cluster_get')
@@ -183,6 +320,67 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual(action.RES_OK, res_code)
         self.assertEqual('', res_msg)
 
+    @mock.patch.object(ca.ClusterAction, '_create_in_bulk')
+    @mock.patch.object(db_api, 'action_update')
+    @mock.patch.object(db_api, 'cluster_next_index')
+    @mock.patch.object(node_mod, 'Node')
+    @mock.patch.object(db_api, 'action_add_dependency')
+    @mock.patch.object(dispatcher, 'start_action')
+    @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
+    def test_create_nodes_bulk(self, mock_wait, mock_start, mock_dep,
+                               mock_node, mock_index, mock_update,
+                               mock_bulk, mock_load):
+        cfg.CONF.set_override('enable_bulk_create', True, enforce_type=True)
+        cluster = mock.Mock(id='01234567-123434')
+        mock_load.return_value = cluster
+        nodes = [mock.Mock(id='NODE_ID_1'), mock.Mock(id='NODE_ID_2')]
+        mock_node.side_effect = nodes
+        mock_index.side_effect = [123, 124]
+        action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
+        self.patchobject(base_action, 'Action')
+        mock_wait.return_value = (action.RES_OK, 'All dependents completed')
+
+        action._create_nodes(2)
+
+        # Nodes are created in bulk before their actions are started
+        mock_bulk.assert_called_once_with(nodes)
+        self.assertEqual(2, mock_start.call_count)
+
+    @mock.patch.object(profile_base.Profile, 'create_objects')
+    def test_create_in_bulk(self, mock_create, mock_load):
+        cluster = mock.Mock(id='CLUSTER_ID')
+        mock_load.return_value = cluster
+        action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
+
+        def _node(node_id, zone):
+            return mock.Mock(id=node_id, physical_id=None,
+                             data={'placement': {'zone': zone}})
+
+        nodes = [_node('N1', 'AZ1'), _node('N2', 'AZ2'), _node('N3', 'AZ1'),
+                 _node('N4', 'AZ1'), _node('N5', 'AZ3'), _node('N6', 'AZ3')]
+
+        def _create(ctx, group):
+            if group[0].id == 'N5':
+                raise exception.InternalError(code=500, message='Boom')
+            # The last node of the group is left without a server
+            return {'N1': 'S1', 'N3': 'S3'}
+
+        mock_create.side_effect = _create
+
+        action._create_in_bulk(nodes)
+
+        # Nodes are grouped by placement, single nodes are left alone
+        self.assertEqual(2, mock_create.call_count)
+        mock_create.assert_any_call(action.context,
+                                    [nodes[0], nodes[2], nodes[3]])
+        mock_create.assert_any_call(action.context, [nodes[4], nodes[5]])
+        self.assertEqual('S1', nodes[0].physical_id)
+        nodes[0].store.assert_called_once_with(action.context)
+        self.assertEqual('S3', nodes[2].physical_id)
+        self.assertIsNone(nodes[3].physical_id)
+        self.assertFalse(nodes[3].store.called)
+        self.assertIsNone(nodes[4].physical_id)
+
     @mock.patch.object(db_api, 'action_update')
     @mock.patch.object(db_api, 'cluster_next_index')
     @mock.patch.object(node_mod, 'Node')
@@ -239,13 +437,13 @@ class ClusterActionTest(base.SenlinTestCase):
 
         update_calls = [
             mock.call(action.context, node_action_1.id,
-                      {'status': node_action_1.READY}),
+                      {'status': 'READY'}),
             mock.call(action.context, node_action_2.id,
-                      {'status': node_action_2.READY})
+                      {'status': 'READY'})
         ]
         mock_update.assert_has_calls(update_calls)
         self.assertEqual(2, mock_start.call_count)
-        mock_wait.assert_called_once_with()
+        mock_wait.assert_called_once_with([])
         self.assertEqual({'nodes_added': [node1.id, node2.id]}, action.outputs)
         self.assertEqual({'region': 'regionOne'}, node1.data['placement'])
         self.assertEqual({'region': 'regionTwo'}, node2.data['placement'])
@@ -323,7 +521,7 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
 
-        x_create_nodes = self.patchobject(action, '_create_nodes',
+        x_create_nodes = self.patchobject(ca.ClusterAction, '_create_nodes',
                                           return_value=(action.RES_OK, 'OK'))
         # do it
         res_code, res_msg = action.do_create()
@@ -362,7 +560,7 @@ class ClusterActionTest(base.SenlinTestCase):
 
         # do it
         for code in [action.RES_CANCEL, action.RES_TIMEOUT, action.RES_ERROR]:
-            self.patchobject(action, '_create_nodes',
+            self.patchobject(ca.ClusterAction, '_create_nodes',
                              return_value=(code, 'Really Bad'))
 
             res_code, res_msg = action.do_create()
@@ -380,7 +578,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.do_create.return_value = True
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
-        self.patchobject(action, '_create_nodes',
+        self.patchobject(ca.ClusterAction, '_create_nodes',
                          return_value=(action.RES_RETRY, 'retry'))
 
         # do it
@@ -396,13 +594,9 @@ class ClusterActionTest(base.SenlinTestCase):
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
     def test_do_update_multi(self, mock_wait, mock_start, mock_dep,
                              mock_update, mock_load):
-        node1 = mock.Mock()
-        node1.id = 'fake id 1'
-        node2 = mock.Mock()
-        node2.id = 'fake id 2'
         cluster = mock.Mock()
         cluster.id = 'FAKE_ID'
-        cluster.nodes = [node1, node2]
+        cluster.node_ids = ['fake id 1', 'fake id 2']
         cluster.ACTIVE = 'ACTIVE'
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
@@ -426,9 +620,9 @@ class ClusterActionTest(base.SenlinTestCase):
         self.assertEqual(2, mock_dep.call_count)
         update_calls = [
             mock.call(action.context, n_action_1.id,
-                      {'status': n_action_1.READY}),
+                      {'status': 'READY'}),
             mock.call(action.context, n_action_2.id,
-                      {'status': n_action_2.READY})
+                      {'status': 'READY'})
         ]
         mock_update.assert_has_calls(update_calls)
 
@@ -440,7 +634,7 @@ class ClusterActionTest(base.SenlinTestCase):
     def test_do_update_empty_cluster(self, mock_load):
         cluster = mock.Mock()
         cluster.id = 'FAKE_ID'
-        cluster.nodes = []
+        cluster.node_ids = []
         cluster.ACTIVE = 'ACTIVE'
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
@@ -455,17 +649,78 @@ class ClusterActionTest(base.SenlinTestCase):
             action.context, 'ACTIVE', 'Cluster update completed.',
             profile_id='FAKE_PROFILE')
 
+    @mock.patch.object(scheduler, 'reschedule')
+    @mock.patch.object(ca.ClusterAction, '_update_nodes')
+    def test_do_update_batches(self, mock_update_nodes, mock_sleep,
+                               mock_load):
+        cluster = mock.Mock()
+        cluster.id = 'FAKE_ID'
+        cluster.ACTIVE = 'ACTIVE'
+        mock_load.return_value = cluster
+        action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
+        action.id = 'CLUSTER_ACTION_ID'
+        action.inputs = {'new_profile_id': 'FAKE_PROFILE'}
+        action.data = {
+            'update': {
+                'pause_time': 10,
+                'plan': [['N1', 'N2'], ['N3', 'N4'], ['N5']],
+            }
+        }
+        mock_update_nodes.return_value = (action.RES_OK, 'OK')
+
+        # do it
+        res_code, res_msg = action.do_update()
+
+        self.assertEqual(action.RES_OK, res_code)
+        self.assertEqual('Cluster update completed.', res_msg)
+        mock_update_nodes.assert_has_calls([
+            mock.call('FAKE_PROFILE', ['N1', 'N2']),
+            mock.call('FAKE_PROFILE', ['N3', 'N4']),
+            mock.call('FAKE_PROFILE', ['N5']),
+        ])
+        # Pause between batches only
+        mock_sleep.assert_has_calls([mock.call('CLUSTER_ACTION_ID', 10),
+                                     mock.call('CLUSTER_ACTION_ID', 10)])
+        self.assertEqual(2, mock_sleep.call_count)
+
+    @mock.patch.object(scheduler, 'reschedule')
+    @mock.patch.object(ca.ClusterAction, '_update_nodes')
+    def test_do_update_batch_failed(self, mock_update_nodes, mock_sleep,
+                                    mock_load):
+        cluster = mock.Mock()
+        cluster.id = 'FAKE_ID'
+        cluster.WARNING = 'WARNING'
+        mock_load.return_value = cluster
+        action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
+        action.inputs = {'new_profile_id': 'FAKE_PROFILE'}
+        action.data = {
+            'update': {
+                'pause_time': 0,
+                'plan': [['N1'], ['N2']],
+            }
+        }
+        mock_update_nodes.return_value = (action.RES_ERROR, 'Failed')
+
+        # do it
+        res_code, res_msg = action.do_update()
+
+        self.assertEqual(action.RES_ERROR, res_code)
+        self.assertEqual('Failed', res_msg)
+        # The remaining batches are not updated
+        mock_update_nodes.assert_called_once_with('FAKE_PROFILE', ['N1'])
+        self.assertFalse(mock_sleep.called)
+        cluster.set_status.assert_called_once_with(action.context,
+                                                   'WARNING', 'Failed')
+
     @mock.patch.object(db_api, 'action_update')
     @mock.patch.object(db_api, 'action_add_dependency')
     @mock.patch.object(dispatcher, 'start_action')
     @mock.patch.object(ca.ClusterAction, '_wait_for_dependents')
     def test_do_update_failed_wait(self, mock_wait, mock_start, mock_dep,
                                    mock_update, mock_load):
-        node = mock.Mock()
-        node.id = 'fake node id'
         cluster = mock.Mock()
         cluster.id = 'FAKE_CLUSTER'
-        cluster.nodes = [node]
+        cluster.node_ids = ['fake node id']
         cluster.ACTIVE = 'ACTIVE'
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
@@ -486,9 +741,9 @@ class ClusterActionTest(base.SenlinTestCase):
         n_action.store.assert_called_once_with(action.context)
         self.assertEqual(1, mock_dep.call_count)
         mock_update.assert_called_once_with(
-            action.context, n_action.id, {'status': n_action.READY})
+            action.context, n_action.id, {'status': 'READY'})
         self.assertEqual(1, mock_start.call_count)
-        mock_wait.assert_called_once_with()
+        mock_wait.assert_called_once_with([])
 
     @mock.patch.object(db_api, 'action_update')
     @mock.patch.object(db_api, 'action_add_dependency')
@@ -524,9 +779,9 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_dep.assert_called_once_with(action.context, 'NODE_ACTION_ID',
                                          'CLUSTER_ACTION_ID')
         mock_update.assert_called_once_with(
-            action.context, n_action.id, {'status': n_action.READY})
+            action.context, n_action.id, {'status': 'READY'})
         mock_start.assert_called_once_with(action_id='NODE_ACTION_ID')
-        mock_wait.assert_called_once_with()
+        mock_wait.assert_called_once_with([])
         self.assertEqual(['NODE_ID'], action.outputs['nodes_removed'])
         cluster.remove_node.assert_called_once_with('NODE_ID')
 
@@ -564,14 +819,14 @@ class ClusterActionTest(base.SenlinTestCase):
         n_action_2.store.assert_called_once_with(action.context)
         update_calls = [
             mock.call(action.context, n_action_1.id,
-                      {'status': n_action_1.READY}),
+                      {'status': 'READY'}),
             mock.call(action.context, n_action_2.id,
-                      {'status': n_action_2.READY})
+                      {'status': 'READY'})
         ]
         mock_update.assert_has_calls(update_calls)
         self.assertEqual(2, mock_dep.call_count)
         self.assertEqual(2, mock_start.call_count)
-        mock_wait.assert_called_once_with()
+        mock_wait.assert_called_once_with([])
         self.assertEqual({'nodes_removed': ['NODE_1', 'NODE_2']},
                          action.outputs)
         cluster.remove_node.assert_has_calls([
@@ -659,12 +914,7 @@ class ClusterActionTest(base.SenlinTestCase):
     def test_do_delete_success(self, mock_load):
         cluster = mock.Mock()
         cluster.id = 'FAKE_CLUSTER'
-        node1 = mock.Mock()
-        node1.id = 'NODE_1'
-        node2 = mock.Mock()
-        node2.id = 'NODE_2'
-
-        cluster.nodes = [node1, node2]
+        cluster.node_ids = ['NODE_1', 'NODE_2']
         cluster.DELETING = 'DELETING'
         cluster.do_delete.return_value = True
 
@@ -673,7 +923,7 @@ class ClusterActionTest(base.SenlinTestCase):
         action = ca.ClusterAction(cluster.id, 'CLUSTER_DELETE', self.ctx)
         action.data = {}
 
-        mock_delete = self.patchobject(action, '_delete_nodes',
+        mock_delete = self.patchobject(ca.ClusterAction, '_delete_nodes',
                                        return_value=(action.RES_OK, 'Good'))
 
         # do it
@@ -703,7 +953,7 @@ class ClusterActionTest(base.SenlinTestCase):
         action.data = {}
 
         # timeout
-        self.patchobject(action, '_delete_nodes',
+        self.patchobject(ca.ClusterAction, '_delete_nodes',
                          return_value=(action.RES_TIMEOUT, 'Timeout!'))
         res_code, res_msg = action.do_delete()
 
@@ -715,7 +965,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.set_status.reset_mock()
 
         # error
-        self.patchobject(action, '_delete_nodes',
+        self.patchobject(ca.ClusterAction, '_delete_nodes',
                          return_value=(action.RES_ERROR, 'Error!'))
         res_code, res_msg = action.do_delete()
 
@@ -727,7 +977,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.set_status.reset_mock()
 
         # cancel
-        self.patchobject(action, '_delete_nodes',
+        self.patchobject(ca.ClusterAction, '_delete_nodes',
                          return_value=(action.RES_CANCEL, 'Cancelled!'))
         res_code, res_msg = action.do_delete()
 
@@ -738,7 +988,7 @@ class ClusterActionTest(base.SenlinTestCase):
             mock.call(action.context, 'ACTIVE', 'Cancelled!')])
 
         # retry
-        self.patchobject(action, '_delete_nodes',
+        self.patchobject(ca.ClusterAction, '_delete_nodes',
                          return_value=(action.RES_RETRY, 'Busy!'))
         res_code, res_msg = action.do_delete()
 
@@ -758,7 +1008,7 @@ class ClusterActionTest(base.SenlinTestCase):
         action = ca.ClusterAction(cluster.id, 'CLUSTER_DELETE', self.ctx)
         action.data = {}
 
-        self.patchobject(action, '_delete_nodes',
+        self.patchobject(ca.ClusterAction, '_delete_nodes',
                          return_value=(action.RES_OK, 'Good'))
         # do it
         res_code, res_msg = action.do_delete()
@@ -813,9 +1063,9 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_dep.assert_called_once_with(action.context, 'NODE_ACTION_ID',
                                          'CLUSTER_ACTION_ID')
         mock_update.assert_called_once_with(
-            action.context, 'NODE_ACTION_ID', {'status': node_action.READY})
+            action.context, 'NODE_ACTION_ID', {'status': 'READY'})
         mock_start.assert_called_once_with(action_id='NODE_ACTION_ID')
-        mock_wait.assert_called_once_with()
+        mock_wait.assert_called_once_with([])
         cluster.add_node.assert_called_once_with(node)
 
     @mock.patch.object(db_api, 'action_update')
@@ -883,15 +1133,15 @@ class ClusterActionTest(base.SenlinTestCase):
                       'CLUSTER_ACTION_ID')])
         mock_update.assert_has_calls([
             mock.call(action.context, 'NODE_ACTION_ID_1',
-                      {'status': node_action_1.READY}),
+                      {'status': 'READY'}),
             mock.call(action.context, 'NODE_ACTION_ID_2',
-                      {'status': node_action_2.READY})
+                      {'status': 'READY'})
         ])
         mock_start.assert_has_calls([
             mock.call(action_id='NODE_ACTION_ID_1'),
             mock.call(action_id='NODE_ACTION_ID_2')])
 
-        mock_wait.assert_called_once_with()
+        mock_wait.assert_called_once_with([])
         cluster.add_node.assert_has_calls([
             mock.call(node1), mock.call(node2)])
 
@@ -1006,7 +1256,7 @@ class ClusterActionTest(base.SenlinTestCase):
         # assertions
         mock_update.assert_called_once_with(
             action.context, 'NODE_ACTION_ID',
-            {'status': node_action.READY})
+            {'status': 'READY'})
         self.assertEqual(action.RES_TIMEOUT, res_code)
         self.assertEqual('Timeout!', res_msg)
         self.assertEqual({}, action.data)
@@ -1374,7 +1624,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'CLUSTER_ID'
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = []
+        cluster.node_ids = []
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {}
@@ -1400,7 +1650,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'CLUSTER_ID'
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = []
+        cluster.node_ids = []
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {'creation': {'count': 3}}
@@ -1426,7 +1676,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'CLUSTER_ID'
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = []
+        cluster.node_ids = []
         mock_load.return_value = cluster
 
         action = ca.ClusterAction('ID', 'CLUSTER_ACTION', self.ctx)
@@ -1468,7 +1718,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.desired_capacity = 3
         cluster.min_size = 1
         cluster.max_size = 4
-        cluster.nodes = [mock.Mock() for i in range(3)]
+        cluster.node_ids = ['NODE1', 'NODE2', 'NODE3']
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {}
@@ -1489,7 +1739,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.desired_capacity = 3
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = [mock.Mock()]
+        cluster.node_ids = ['NODE1']
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {}
@@ -1526,11 +1776,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'CID'
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = []
-        for i in range(10):
-            node = mock.Mock()
-            node.id = 'NODE_ID_%s' % (i + 1)
-            cluster.nodes.append(node)
+        cluster.node_ids = ['NODE_ID_%s' % (i + 1) for i in range(10)]
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {}
@@ -1559,11 +1805,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'CID'
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = []
-        for i in range(5):
-            node = mock.Mock()
-            node.id = 'NODE_ID_%s' % (i + 1)
-            cluster.nodes.append(node)
+        cluster.node_ids = ['NODE_ID_%s' % (i + 1) for i in range(5)]
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {
@@ -1599,11 +1841,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'CID'
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = []
-        for i in range(5):
-            node = mock.Mock()
-            node.id = 'NODE_ID_%s' % (i + 1)
-            cluster.nodes.append(node)
+        cluster.node_ids = ['NODE_ID_%s' % (i + 1) for i in range(5)]
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {}
@@ -1629,11 +1867,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'CID'
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = []
-        for i in range(5):
-            node = mock.Mock()
-            node.id = 'NODE_ID_%s' % (i + 1)
-            cluster.nodes.append(node)
+        cluster.node_ids = ['NODE_ID_%s' % (i + 1) for i in range(5)]
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {}
@@ -1652,11 +1886,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'CID'
         cluster.min_size = 0
         cluster.max_size = -1
-        cluster.nodes = []
-        for i in range(2):
-            node = mock.Mock()
-            node.id = 'NODE_ID_%s' % (i + 1)
-            cluster.nodes.append(node)
+        cluster.node_ids = ['NODE_ID_%s' % (i + 1) for i in range(2)]
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {}
@@ -1680,11 +1910,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'CID'
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = []
-        for i in range(2):
-            node = mock.Mock()
-            node.id = 'NODE_ID_%s' % (i + 1)
-            cluster.nodes.append(node)
+        cluster.node_ids = ['NODE_ID_%s' % (i + 1) for i in range(2)]
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {}
@@ -1705,11 +1931,7 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.desired_capacity = 3
         cluster.min_size = 1
         cluster.max_size = -1
-        cluster.nodes = []
-        for i in range(5):
-            node = mock.Mock()
-            node.id = 'NODE_ID_%s' % (i + 1)
-            cluster.nodes.append(node)
+        cluster.node_ids = ['NODE_ID_%s' % (i + 1) for i in range(5)]
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_ACTION', self.ctx)
         action.data = {}
@@ -1882,7 +2104,8 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'FAKE_CLUSTER'
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_FLY', self.ctx)
-        action.do_fly = mock.Mock(return_value=(action.RES_OK, 'Good!'))
+        self.patchobject(ca.ClusterAction, 'do_fly', create=True,
+                         return_value=(action.RES_OK, 'Good!'))
         action.data = {
             'status': policy_base.CHECK_OK,
             'reason': 'Policy checking passed'
@@ -1904,7 +2127,8 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'FAKE_CLUSTER'
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_FLY', self.ctx)
-        action.do_fly = mock.Mock(return_value=(action.RES_OK, 'Good!'))
+        self.patchobject(ca.ClusterAction, 'do_fly', create=True,
+                         return_value=(action.RES_OK, 'Good!'))
         action.data = {
             'status': policy_base.CHECK_ERROR,
             'reason': 'Something is wrong.'
@@ -1959,8 +2183,9 @@ class ClusterActionTest(base.SenlinTestCase):
         cluster.id = 'FAKE_CLUSTER'
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_FLY', self.ctx)
-        action.do_fly = mock.Mock(return_value=(action.RES_OK, 'Cool!'))
-        mock_check = self.patchobject(action, 'policy_check',
+        self.patchobject(ca.ClusterAction, 'do_fly', create=True,
+                         return_value=(action.RES_OK, 'Cool!'))
+        mock_check = self.patchobject(ca.ClusterAction, 'policy_check',
                                       side_effect=fake_check)
 
         res_code, res_msg = action._execute()
@@ -1983,7 +2208,7 @@ class ClusterActionTest(base.SenlinTestCase):
         mock_load.return_value = cluster
         action = ca.ClusterAction(cluster.id, 'CLUSTER_FLY', self.ctx)
         action.id = 'ACTION_ID'
-        self.patchobject(action, '_execute',
+        self.patchobject(ca.ClusterAction, '_execute',
                          return_value=(action.RES_OK, 'success'))
         mock_acquire.return_value = action
 
@@ -2022,7 +2247,7 @@ class ClusterActionTest(base.SenlinTestCase):
         action = ca.ClusterAction(cluster.id, 'CLUSTER_DELETE', self.ctx)
         action.id = 'ACTION_ID'
         mock_acquire.return_value = action
-        self.patchobject(action, '_execute',
+        self.patchobject(ca.ClusterAction, '_execute',
                          return_value=(action.RES_ERROR, 'Failed execution.'))
 
         res_code, res_msg = action.execute()
@@ -304,7 +304,8 @@ class NodeActionTest(base.SenlinTestCase):
         node.id = 'NID'
         mock_load.return_value = node
         action = node_action.NodeAction(node.id, 'NODE_SING', self.ctx)
-        action.do_sing = mock.Mock(return_value=(action.RES_OK, 'GOOD'))
+        self.patchobject(node_action.NodeAction, 'do_sing', create=True,
+                         return_value=(action.RES_OK, 'GOOD'))
 
         res_code, res_msg = action._execute()
 
@@ -446,7 +447,8 @@ class NodeActionTest(base.SenlinTestCase):
             'status': policy_mod.CHECK_OK,
             'reason': 'Policy checking passed'
         }
-        self.patchobject(action, '_execute', side_effect=fake_execute)
+        self.patchobject(node_action.NodeAction, '_execute',
+                         side_effect=fake_execute)
         mock_acquire.return_value = 'ACTION_ID'
         mock_acquire_node.return_value = 'ACTION_ID'
 
@@ -491,7 +493,7 @@ class NodeActionTest(base.SenlinTestCase):
             'status': policy_mod.CHECK_OK,
             'reason': 'Policy checking passed'
         }
-        self.patchobject(action, '_execute',
+        self.patchobject(node_action.NodeAction, '_execute',
                          return_value=(action.RES_ERROR, 'Execution Failed'))
         mock_acquire.return_value = 'ACTION_ID'
         mock_acquire_node.return_value = 'ACTION_ID'
@@ -541,10 +543,10 @@ class NodeActionTest(base.SenlinTestCase):
         action = node_action.NodeAction('NODE_ID', 'NODE_FLY', self.ctx,
                                         cause='RPC Request')
         action.id = 'ACTION_ID'
-        mock_check = self.patchobject(action, 'policy_check',
+        mock_check = self.patchobject(node_action.NodeAction, 'policy_check',
                                       side_effect=fake_check)
         # check result
-        self.patchobject(action, '_execute',
+        self.patchobject(node_action.NodeAction, '_execute',
                          return_value=(action.RES_OK, 'Ignored'))
         mock_acquire.return_value = 'ACTION_ID'
         mock_acquire_node.return_value = 'ACTION_ID'
@@ -10,14 +10,22 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import datetime
+import logging
+
+import fixtures
+from oslo_messaging.rpc import dispatcher as rpc
 from oslo_utils import timeutils
 import six
 
 from senlin.common import exception
+from senlin.db import api as db_api
 from senlin.engine import event as event_mod
+from senlin.engine import event_archive
 from senlin.engine import service
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
+from senlin.tests.unit.db import shared
 
 
 class EventTest(base.SenlinTestCase):
@@ -188,3 +196,146 @@ class EventTest(base.SenlinTestCase):
         # others
         self.assertRaises(exception.EventNotFound,
                           self.eng.event_find, self.ctx, 'Bogus')
+
+    def test_event_list_time_range(self):
+        ts = timeutils.utcnow()
+        e1 = event_mod.Event(ts - datetime.timedelta(hours=1), 20,
+                             context=self.ctx)
+        e1.store(self.ctx)
+        e2 = event_mod.Event(ts, 20, context=self.ctx)
+        eid2 = e2.store(self.ctx)
+
+        result = self.eng.event_list(self.ctx, start_time=ts.isoformat())
+
+        self.assertEqual([eid2], [e['id'] for e in result])
+
+    def test_event_list_bad_time(self):
+        ex = self.assertRaises(rpc.ExpectedException,
+                               self.eng.event_list, self.ctx,
+                               start_time='yesterday')
+        self.assertEqual(exception.InvalidParameter, ex.exc_info[0])
+
+    def _archive_events(self):
+        path = self.useFixture(fixtures.TempDir()).path
+        archive = event_archive.EventArchive(path)
+        self.patchobject(event_archive, 'get_archive', return_value=archive)
+        # events from day 1 to 5, named in reverse order of time
+        eids = [
+            shared.create_event(self.ctx,
+                                timestamp=datetime.datetime(2016, 1, i),
+                                obj_name='node%s' % (6 - i)).id
+            for i in range(1, 6)
+        ]
+        archive.archive(self.ctx, datetime.datetime(2016, 1, 3))
+        return archive, eids
+
+    def test_event_list_with_archive(self):
+        archive, eids = self._archive_events()
+        mock_read = self.patchobject(archive, '_read_segment',
+                                     wraps=archive._read_segment)
+
+        result = self.eng.event_list(self.ctx,
+                                     start_time='2016-01-01T00:00:00',
+                                     sort_dir='desc')
+        self.assertEqual(eids[::-1], [e['id'] for e in result])
+
+        # time range within database
+        mock_read.reset_mock()
+        result = self.eng.event_list(self.ctx,
+                                     start_time='2016-01-03T00:00:00')
+        self.assertEqual(eids[2:], [e['id'] for e in result])
+        self.assertEqual(0, mock_read.call_count)
+
+        # no lower bound of time, the archive is read as far as needed
+        result = self.eng.event_list(self.ctx, limit=1)
+        self.assertEqual(eids[:1], [e['id'] for e in result])
+        self.assertEqual(1, mock_read.call_count)
+
+        # sorted by other keys, only for a time range
+        mock_read.reset_mock()
+        result = self.eng.event_list(self.ctx, sort_keys=['obj_name'])
+        self.assertEqual(eids[:1:-1], [e['id'] for e in result])
+        self.assertEqual(0, mock_read.call_count)
+
+        result = self.eng.event_list(self.ctx, sort_keys=['obj_name'],
+                                     start_time='2016-01-01T00:00:00',
+                                     limit=3, marker=eids[4])
+        self.assertEqual(eids[3::-1][:3], [e['id'] for e in result])
+        self.assertEqual(2, mock_read.call_count)
+
+    def test_event_list_with_archive_paginated(self):
+        archive, eids = self._archive_events()
+        mock_load = self.patchobject(event_mod.Event, 'load_all',
+                                     wraps=event_mod.Event.load_all)
+
+        def list_pages(sort_dir):
+            pages = []
+            marker = None
+            while True:
+                result = self.eng.event_list(self.ctx, limit=2, marker=marker,
+                                             sort_dir=sort_dir)
+                if not result:
+                    return pages
+                pages.append([e['id'] for e in result])
+                marker = result[-1]['id']
+
+        self.assertEqual([eids[:2], eids[2:4], eids[4:]], list_pages('asc'))
+        self.assertEqual([eids[:2:-1], eids[2:0:-1], eids[:1]],
+                         list_pages('desc'))
+        # only what a page needs is loaded from database
+        for call in mock_load.call_args_list:
+            self.assertIn(call[1]['limit'], (1, 2))
+
+        # unknown marker
+        result = self.eng.event_list(self.ctx, limit=2, marker='BOGUS')
+        self.assertEqual([], result)
+
+    def _rollup(self, bucket, count, cluster_id='C1', level=logging.INFO,
+                status='ACTIVE'):
+        return {'bucket': bucket, 'project': self.ctx.project,
+                'cluster_id': cluster_id, 'action': 'NODE_CREATE',
+                'level': level, 'status': status, 'count': count}
+
+    def test_event_aggregate(self):
+        t1 = datetime.datetime(2016, 1, 1, 10)
+        t2 = datetime.datetime(2016, 1, 1, 11)
+        t3 = datetime.datetime(2016, 1, 2, 9)
+        db_api.event_rollup_update(self.ctx, [
+            self._rollup(t1, 1),
+            self._rollup(t1, 2, level=logging.ERROR, status='ERROR'),
+            self._rollup(t2, 4, cluster_id='C2'),
+            self._rollup(t3, 8),
+        ])
+
+        result = self.eng.event_aggregate(self.ctx)
+        self.assertEqual([{'count': 15}], result)
+
+        result = self.eng.event_aggregate(self.ctx, group_by=['cluster_id'])
+        self.assertEqual([{'cluster_id': 'C1', 'count': 11},
+                          {'cluster_id': 'C2', 'count': 4}], result)
+
+        result = self.eng.event_aggregate(self.ctx, bucket='day')
+        self.assertEqual([{'bucket': '2016-01-01T00:00:00', 'count': 7},
+                          {'bucket': '2016-01-02T00:00:00', 'count': 8}],
+                         result)
+
+        result = self.eng.event_aggregate(self.ctx, bucket='hour',
+                                          filters={'cluster_id': 'C1'},
+                                          end_time='2016-01-02T00:00:00')
+        self.assertEqual([{'bucket': '2016-01-01T10:00:00', 'count': 3}],
+                         result)
+
+        result = self.eng.event_aggregate(self.ctx, group_by=['status'],
+                                          filters={'level': ['error', '20']})
+        self.assertEqual([{'status': 'ACTIVE', 'count': 13},
+                          {'status': 'ERROR', 'count': 2}], result)
+
+    def test_event_aggregate_bad_params(self):
+        for kwargs in ({'group_by': ['obj_name']}, {'bucket': 'week'},
+                       {'filters': {'user': 'U1'}},
+                       {'filters': {'level': 'LOUD'}},
+                       {'start_time': 'yesterday'}):
+            ex = self.assertRaises(rpc.ExpectedException,
+                                   self.eng.event_aggregate, self.ctx,
+                                   **kwargs)
+            self.assertEqual(exception.InvalidParameter, ex.exc_info[0])
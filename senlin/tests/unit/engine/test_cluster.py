@@ -20,6 +20,7 @@ from senlin.db.sqlalchemy import api as db_api
 from senlin.engine import cluster as clusterm
 from senlin.engine import cluster_policy as cp_mod
 from senlin.engine import event as eventm
+from senlin.engine import node as nodem
 from senlin.policies import base as policy_base
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
@@ -43,6 +44,19 @@ class TestCluster(base.SenlinTestCase):
 
         return db_api.cluster_create(self.context, values)
 
+    def _create_node(self, node_id, cluster_id):
+        values = {
+            'id': node_id,
+            'profile_id': self.profile.id,
+            'cluster_id': cluster_id,
+            'name': 'test-node',
+            'user': self.context.user,
+            'project': self.context.project,
+            'status': 'ACTIVE',
+        }
+
+        return db_api.node_create(self.context, values)
+
     def _create_profile(self, profile_id):
         values = {
             'id': profile_id,
@@ -87,7 +101,7 @@ class TestCluster(base.SenlinTestCase):
         self.assertEqual('Initializing', cluster.status_reason)
         self.assertEqual({}, cluster.data)
         self.assertEqual({}, cluster.metadata)
-        self.assertEqual({'profile': None, 'nodes': [], 'policies': []},
+        self.assertEqual({'profile': None, 'nodes': None, 'policies': None},
                          cluster.rt)
 
     def test_cluster_init_with_none(self):
@@ -373,10 +387,12 @@ class TestCluster(base.SenlinTestCase):
         self.assertEqual([], cluster.nodes)
 
         # with nodes
-        node1 = mock.Mock()
-        node2 = mock.Mock()
-        cluster.rt = {'nodes': [node1, node2]}
+        node1 = mock.Mock(id='NODE1')
+        node2 = mock.Mock(id='NODE2')
+        cluster.add_node(node1)
+        cluster.add_node(node2)
         self.assertEqual([node1, node2], cluster.nodes)
+        self.assertEqual(['NODE1', 'NODE2'], cluster.node_ids)
 
     def test_cluster_policies_property(self):
         cluster = clusterm.Cluster('test-cluster', 0, self.profile.id,
@@ -387,9 +403,55 @@ class TestCluster(base.SenlinTestCase):
         # with policies attached
         policy1 = mock.Mock()
         policy2 = mock.Mock()
-        cluster.rt = {'policies': [policy1, policy2]}
+        cluster.rt['policies'] = [policy1, policy2]
         self.assertEqual([policy1, policy2], cluster.policies)
 
+    def test_cluster_runtime_data_lazy_load(self):
+        cluster = clusterm.Cluster('test-cluster', 0, self.profile.id,
+                                   project=self.context.project)
+        cluster.store(self.context)
+        node = self._create_node('NODE1', cluster.id)
+
+        mock_load_all = self.patchobject(nodem.Node, 'load_all',
+                                         return_value=[node])
+        result = clusterm.Cluster.load(self.context, cluster.id)
+
+        # nothing loaded on construction
+        self.assertEqual({'profile': None, 'nodes': None, 'policies': None},
+                         result.rt)
+        self.assertEqual(0, mock_load_all.call_count)
+
+        # membership is loaded once, on first access
+        self.assertEqual([node], result.nodes)
+        self.assertEqual([node], result.nodes)
+        mock_load_all.assert_called_once_with(self.context,
+                                              cluster_id=cluster.id)
+        self.assertEqual(self.profile.id, result.profile.id)
+        self.assertEqual([], result.policies)
+
+    def test_cluster_node_ids_not_loaded(self):
+        cluster = clusterm.Cluster('test-cluster', 0, self.profile.id,
+                                   project=self.context.project)
+        cluster.store(self.context)
+        self._create_node('NODE1', cluster.id)
+
+        result = clusterm.Cluster.load(self.context, cluster.id)
+        self.assertEqual(['NODE1'], result.node_ids)
+        # membership cache is not populated
+        self.assertIsNone(result.rt['nodes'])
+
+    def test_cluster_add_node_not_loaded(self):
+        cluster = clusterm.Cluster('test-cluster', 0, self.profile.id,
+                                   project=self.context.project)
+        cluster.store(self.context)
+        node = mock.Mock(id='NODE1')
+
+        cluster.add_node(node)
+        cluster.remove_node('NODE1')
+
+        # deltas are not applied until membership is loaded
+        self.assertIsNone(cluster.rt['nodes'])
+
     def test_cluster_add_node(self):
         cluster = clusterm.Cluster('test-cluster', 0, self.profile.id,
                                    project=self.context.project)
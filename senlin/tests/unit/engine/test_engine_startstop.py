@@ -13,10 +13,12 @@
 import uuid
 
 import mock
+from oslo_config import cfg
 
 from senlin.common import consts
 from senlin.common import context
 from senlin.common import messaging as rpc_messaging
+from senlin.engine import event as event_mod
 from senlin.engine import service
 from senlin.tests.unit.common import base
 
@@ -35,6 +37,8 @@ class EngineBasicTest(base.SenlinTestCase):
         self.fake_rpc_server = mock.Mock()
         self.get_rpc = self.patchobject(rpc_messaging, 'get_rpc_server',
                                         return_value=self.fake_rpc_server)
+        self.start_writer = self.patchobject(event_mod, 'start_writer')
+        self.stop_writer = self.patchobject(event_mod, 'stop_writer')
 
     # TODO(Yanyan Hu): Remove this decorator after DB session related
     # work is done.
@@ -51,6 +55,7 @@ class EngineBasicTest(base.SenlinTestCase):
         self.gen_id.assert_called_once_with()
         self.assertEqual('1234', self.eng.engine_id)
         self.assertIsNotNone(self.eng.TG)
+        self.start_writer.assert_called_once_with(self.eng.TG)
 
         mock_disp_cls.assert_called_once_with(self.eng,
                                               self.eng.dispatcher_topic,
@@ -75,6 +80,25 @@ class EngineBasicTest(base.SenlinTestCase):
         self.assertEqual(self.fake_rpc_server, self.eng._rpc_server)
         self.fake_rpc_server.start.assert_called_once_with()
 
+    @mock.patch('senlin.engine.listener.NotificationListener')
+    def test_engine_start_stop_listener(self, mock_listener_cls,
+                                        mock_msg_cls, mock_hm_cls,
+                                        mock_disp_cls):
+        mock_listener = mock_listener_cls.return_value
+
+        self.eng.start()
+        self.assertFalse(mock_listener_cls.called)
+        self.assertIsNone(self.eng.listener)
+
+        cfg.CONF.set_override('enable_notification_listener', True,
+                              enforce_type=True)
+        self.eng.start()
+        self.assertEqual(mock_listener, self.eng.listener)
+        mock_listener.start.assert_called_once_with()
+
+        self.eng.stop()
+        mock_listener.stop.assert_called_once_with()
+
     def test_engine_stop(self, mock_msg_cls, mock_hm_cls, mock_disp_cls):
         mock_disp = mock_disp_cls.return_value
         mock_hm = mock_hm_cls.return_value
@@ -87,6 +111,7 @@ class EngineBasicTest(base.SenlinTestCase):
 
         mock_disp.stop.assert_called_once_with()
         mock_hm.stop.assert_called_once_with()
+        self.stop_writer.assert_called_once_with()
 
     def test_engine_stop_with_exception(self, mock_msg_cls, mock_hm_cls,
                                         mock_disp_cls):
@@ -0,0 +1,178 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import logging
+
+import mock
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+from senlin.common import event_hub
+from senlin.db.sqlalchemy import api as db_api
+from senlin.engine import event as eventm
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+
+
+class TestEventWriter(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestEventWriter, self).setUp()
+        self.context = utils.dummy_context()
+        self.entity = mock.Mock(id='NODE_ID', status='ACTIVE',
+                                status_reason='Good', cluster_id='')
+        self.entity.name = 'node1'
+        self.addCleanup(eventm.stop_writer)
+        self.mock_publish = self.patchobject(event_hub, 'publish_events')
+
+    def _event(self, level=logging.INFO):
+        return eventm.Event(timeutils.utcnow(), level, self.entity,
+                            action='NODE_CREATE', context=self.context)
+
+    def test_put_and_flush(self):
+        writer = eventm.EventWriter(10)
+        event = self._event()
+
+        writer.put(event)
+
+        self.assertIsNotNone(event.id)
+        self.assertEqual(1, len(writer))
+        self.assertIsNone(db_api.event_get(self.context, event.id))
+
+        writer.flush()
+
+        self.assertEqual(0, len(writer))
+        record = db_api.event_get(self.context, event.id)
+        self.assertEqual('NODE_ID', record.obj_id)
+        self.assertEqual('NODE_CREATE', record.action)
+        self.mock_publish.assert_called_once_with(writer.context,
+                                                  [event.to_dict()])
+
+    def test_put_flush_when_full(self):
+        writer = eventm.EventWriter(2)
+        mock_flush = self.patchobject(writer, 'flush')
+
+        writer.put(self._event())
+        self.assertEqual(0, mock_flush.call_count)
+        writer.put(self._event())
+        mock_flush.assert_called_once_with()
+
+    @mock.patch.object(db_api, 'event_create')
+    @mock.patch.object(db_api, 'event_create_batch')
+    def test_flush_failed(self, mock_create, mock_create_one):
+        mock_create.side_effect = Exception('boom')
+        mock_create_one.side_effect = Exception('boom')
+        writer = eventm.EventWriter(10)
+        writer.put(self._event())
+
+        writer.flush()
+
+        self.assertEqual(1, mock_create.call_count)
+        self.assertEqual(1, mock_create_one.call_count)
+        self.assertEqual(0, len(writer))
+        self.assertEqual(0, self.mock_publish.call_count)
+
+    @mock.patch.object(db_api, 'event_create_batch')
+    def test_flush_failed_save_each(self, mock_create):
+        mock_create.side_effect = Exception('boom')
+        writer = eventm.EventWriter(10)
+        good = self._event()
+        bad = self._event()
+        writer.put(good)
+        writer.put(bad)
+        saved = []
+        real_create = db_api.event_create
+
+        def _create(context, values):
+            if values['id'] == bad.id:
+                raise Exception('boom')
+            saved.append(values['id'])
+            return real_create(context, values)
+
+        self.patchobject(db_api, 'event_create', side_effect=_create)
+
+        writer.flush()
+
+        # Only the bad event is lost
+        self.assertEqual([good.id], saved)
+        self.assertIsNotNone(db_api.event_get(self.context, good.id))
+        self.mock_publish.assert_called_once_with(writer.context,
+                                                  [good.to_dict()])
+
+    def test_start_stop_writer(self):
+        cfg.CONF.set_override('event_batch_size', 10, enforce_type=True)
+        tg = mock.Mock()
+
+        writer = eventm.start_writer(tg)
+
+        self.assertIsNotNone(writer)
+        tg.add_timer.assert_called_once_with(
+            cfg.CONF.event_flush_interval, writer.flush)
+
+        eventm.info(self.context, self.entity, 'NODE_CREATE')
+        self.assertEqual(1, len(writer))
+
+        eventm.stop_writer()
+        self.assertEqual(0, len(writer))
+        self.assertEqual(1, len(db_api.event_get_all(self.context)))
+
+    def test_start_writer_disabled(self):
+        cfg.CONF.set_override('event_batch_size', 0, enforce_type=True)
+        tg = mock.Mock()
+
+        self.assertIsNone(eventm.start_writer(tg))
+        self.assertEqual(0, tg.add_timer.call_count)
+
+        eventm.info(self.context, self.entity, 'NODE_CREATE')
+        self.assertEqual(1, len(db_api.event_get_all(self.context)))
+        self.assertEqual(1, self.mock_publish.call_count)
+
+    def test_publish_failed(self):
+        self.mock_publish.side_effect = Exception('boom')
+
+        eventm.info(self.context, self.entity, 'NODE_CREATE')
+
+        self.assertEqual(1, len(db_api.event_get_all(self.context)))
+
+    def test_min_level(self):
+        eventm.debug(self.context, self.entity, 'NODE_CREATE')
+        self.assertEqual(0, len(db_api.event_get_all(self.context)))
+
+        cfg.CONF.set_override('event_min_level', 'DEBUG', enforce_type=True)
+        eventm.debug(self.context, self.entity, 'NODE_CREATE')
+        self.assertEqual(1, len(db_api.event_get_all(self.context)))
+
+        cfg.CONF.set_override('event_min_level', 'ERROR', enforce_type=True)
+        eventm.warning(self.context, self.entity, 'NODE_CREATE')
+        self.assertEqual(1, len(db_api.event_get_all(self.context)))
+
+    def test_flush_rollup(self):
+        writer = eventm.EventWriter(10)
+        writer.put(self._event())
+        writer.put(self._event())
+        writer.put(self._event(logging.ERROR))
+
+        writer.flush()
+
+        rows = db_api.event_rollup_get(self.context, group_by=['level'])
+        self.assertEqual([(logging.INFO, 2), (logging.ERROR, 1)],
+                         sorted((r['level'], r['count']) for r in rows))
+
+    @mock.patch.object(db_api, 'event_rollup_update')
+    def test_rollup_failed(self, mock_update):
+        mock_update.side_effect = Exception('boom')
+
+        eventm.info(self.context, self.entity, 'NODE_CREATE')
+
+        self.assertEqual(1, mock_update.call_count)
+        self.assertEqual(1, len(db_api.event_get_all(self.context)))
+        self.assertEqual(1, self.mock_publish.call_count)
@@ -0,0 +1,168 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import datetime
+import os
+
+import fixtures
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+from senlin.db.sqlalchemy import api as db_api
+from senlin.engine import event as event_mod
+from senlin.engine import event_archive
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+from senlin.tests.unit.db import shared
+
+
+class TestEventArchive(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestEventArchive, self).setUp()
+        self.ctx = utils.dummy_context()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'events')
+        self.archive = event_archive.EventArchive(self.path)
+        self.day1 = datetime.datetime(2016, 1, 1, 12, 0, 0, 123456)
+        self.day2 = datetime.datetime(2016, 1, 2, 12, 0, 0)
+        self.day3 = datetime.datetime(2016, 1, 3, 12, 0, 0)
+
+    def _create_events(self):
+        self.e1 = shared.create_event(self.ctx, timestamp=self.day1,
+                                      cluster_id='C1', obj_id='C1',
+                                      meta_data={'k': 'v'})
+        self.e2 = shared.create_event(self.ctx, timestamp=self.day2,
+                                      cluster_id='C2', obj_id='N2')
+        self.e3 = shared.create_event(self.ctx, timestamp=self.day3,
+                                      cluster_id='C1', obj_id='N3')
+
+    def test_archive(self):
+        self._create_events()
+        before = datetime.datetime(2016, 1, 3)
+
+        res = self.archive.archive(self.ctx, before)
+
+        self.assertEqual(2, res)
+        self.assertEqual(before, self.archive.horizon)
+        events = db_api.event_get_all(self.ctx)
+        self.assertEqual([self.e3.id], [e.id for e in events])
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.path, '2016-01-01.jsonl.gz')))
+        self.assertEqual({'clusters': ['C1'], 'count': 1},
+                         self.archive.index['segments']['2016-01-01'])
+        self.assertEqual({'clusters': ['C2'], 'count': 1},
+                         self.archive.index['segments']['2016-01-02'])
+
+        # a fresh archive object reads the saved index
+        archive = event_archive.EventArchive(self.path)
+        self.assertEqual(before, archive.horizon)
+        events = list(archive.query())
+        self.assertEqual([self.e1.id, self.e2.id], [e.id for e in events])
+        self.assertEqual(self.day1, events[0].timestamp)
+        self.assertEqual({'k': 'v'}, events[0].metadata)
+
+    def test_archive_append(self):
+        self._create_events()
+        self.archive.archive(self.ctx, datetime.datetime(2016, 1, 2))
+        e4 = shared.create_event(self.ctx, timestamp=self.day1,
+                                 cluster_id='C4')
+
+        res = self.archive.archive(self.ctx, datetime.datetime(2016, 1, 2))
+
+        self.assertEqual(1, res)
+        self.assertEqual({'clusters': ['C1', 'C4'], 'count': 2},
+                         self.archive.index['segments']['2016-01-01'])
+        events = list(self.archive.query())
+        self.assertEqual([self.e1.id, e4.id], [e.id for e in events])
+
+    def test_query(self):
+        self._create_events()
+        self.archive.archive(self.ctx, datetime.datetime(2016, 1, 4))
+
+        events = self.archive.query(filters={'cluster_id': 'C1'})
+        self.assertEqual([self.e1.id, self.e3.id], [e.id for e in events])
+
+        events = self.archive.query(filters={'obj_id': ['N2', 'N3']})
+        self.assertEqual([self.e2.id, self.e3.id], [e.id for e in events])
+
+        events = self.archive.query(start_time=self.day2,
+                                    end_time=self.day3)
+        self.assertEqual([self.e2.id], [e.id for e in events])
+
+        events = self.archive.query(project=self.ctx.project)
+        self.assertEqual(3, len(list(events)))
+        events = self.archive.query(project='another_project')
+        self.assertEqual([], list(events))
+
+    def test_query_sorted(self):
+        self._create_events()
+        self.archive.archive(self.ctx, datetime.datetime(2016, 1, 2))
+        e4 = shared.create_event(self.ctx, timestamp=self.day1 -
+                                 datetime.timedelta(hours=1))
+        self.archive.archive(self.ctx, datetime.datetime(2016, 1, 4))
+
+        events = self.archive.query(sort_dir='asc')
+        self.assertEqual([e4.id, self.e1.id, self.e2.id, self.e3.id],
+                         [e.id for e in events])
+
+        events = self.archive.query(sort_dir='desc')
+        self.assertEqual(self.e3.id, next(events).id)
+        self.assertEqual([self.e2.id, self.e1.id, e4.id],
+                         [e.id for e in events])
+
+    def test_query_empty(self):
+        self.assertIsNone(self.archive.horizon)
+        self.assertEqual([], list(self.archive.query()))
+
+    def test_get_archive(self):
+        self.assertIsNone(event_archive.get_archive())
+        self.assertEqual(0, event_archive.archive_events())
+
+        cfg.CONF.set_override('event_archive_dir', self.path,
+                              enforce_type=True)
+        archive = event_archive.get_archive()
+        self.assertEqual(self.path, archive.path)
+
+    def test_archive_events(self):
+        cfg.CONF.set_override('event_archive_dir', self.path,
+                              enforce_type=True)
+        now = timeutils.utcnow()
+        old = shared.create_event(self.ctx,
+                                  timestamp=now - datetime.timedelta(days=3))
+        new = shared.create_event(self.ctx, timestamp=now)
+
+        res = event_archive.archive_events(age=2)
+
+        self.assertEqual(1, res)
+        events = db_api.event_get_all(self.ctx)
+        self.assertEqual([new.id], [e.id for e in events])
+        archived = list(event_archive.get_archive().query())
+        self.assertEqual([old.id], [e.id for e in archived])
+
+    def test_sort_events(self):
+        ts = timeutils.utcnow()
+        e1 = event_mod.Event(ts, 20, id='E1', obj_name='b')
+        e2 = event_mod.Event(ts + datetime.timedelta(seconds=1), 20,
+                             id='E2', obj_name='a')
+        e3 = event_mod.Event(ts + datetime.timedelta(seconds=2), 20,
+                             id='E3', obj_name='c')
+
+        res = event_archive.sort_events([e3, e1, e2])
+        self.assertEqual([e1, e2, e3], res)
+
+        res = event_archive.sort_events([e3, e1, e2], sort_keys='obj_name',
+                                        sort_dir='desc')
+        self.assertEqual([e3, e1, e2], res)
+
+        res = event_archive.sort_events([e3, e1, e2], marker='E1', limit=1)
+        self.assertEqual([e2], res)
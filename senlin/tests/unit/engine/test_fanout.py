@@ -0,0 +1,141 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from oslo_config import cfg
+
+from senlin.db import api as db_api
+from senlin.engine import fanout
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+from senlin.tests.unit.db import shared
+
+
+class TestWindow(base.SenlinTestCase):
+
+    def test_available(self):
+        window = fanout.Window(4)
+
+        self.assertEqual(4, window.available(0))
+        self.assertEqual(1, window.available(3))
+        self.assertEqual(0, window.available(5))
+
+    def test_available_unlimited(self):
+        window = fanout.Window(0)
+
+        self.assertIsNone(window.available(100))
+
+    def test_throttled(self):
+        window = fanout.Window(10)
+
+        window.throttled()
+        self.assertEqual(5, window.limit)
+        window.throttled()
+        window.throttled()
+        window.throttled()
+        self.assertEqual(1, window.limit)
+        window.throttled()
+        self.assertEqual(1, window.limit)
+
+    def test_completed(self):
+        window = fanout.Window(4)
+        window.throttled()
+        self.assertEqual(2, window.limit)
+
+        # Grows by one for every limit's worth of completions
+        window.completed()
+        self.assertEqual(2, window.limit)
+        window.completed()
+        self.assertEqual(3, window.limit)
+        window.completed(3)
+        self.assertEqual(4, window.limit)
+        # Never beyond the configured size
+        window.completed(100)
+        self.assertEqual(4, window.limit)
+
+
+class TestWindowRegistry(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestWindowRegistry, self).setUp()
+        self.addCleanup(fanout._windows.clear)
+
+    def test_get_window(self):
+        window = fanout.get_window('CLUSTER')
+
+        self.assertEqual(10, window.size)
+        self.assertIs(window, fanout.get_window('CLUSTER'))
+        self.assertIsNot(window, fanout.get_window('OTHER'))
+
+    def test_get_window_resized(self):
+        window = fanout.get_window('CLUSTER')
+        cfg.CONF.set_override('max_actions_per_batch', 3, enforce_type=True)
+
+        res = fanout.get_window('CLUSTER')
+
+        self.assertIsNot(window, res)
+        self.assertEqual(3, res.limit)
+
+    def test_report_throttled(self):
+        ctx = utils.dummy_context()
+        profile = shared.create_profile(ctx)
+        cluster = shared.create_cluster(ctx, profile, data={'foo': 'bar'})
+
+        fanout.report_throttled(ctx, cluster.id)
+        fanout.report_throttled(ctx, cluster.id)
+
+        self.assertEqual(2, db_api.cluster_throttled_get(ctx, cluster.id))
+        # cluster data is left untouched
+        self.assertEqual({'foo': 'bar'},
+                         db_api.cluster_get(ctx, cluster.id).data)
+        # No window created for clusters not fanning out
+        self.assertNotIn(cluster.id, fanout._windows)
+
+        # Orphan nodes or clusters gone
+        fanout.report_throttled(ctx, None)
+        fanout.report_throttled(ctx, 'BOGUS')
+
+    def test_sync_window(self):
+        ctx = utils.dummy_context()
+        profile = shared.create_profile(ctx)
+        cluster = shared.create_cluster(ctx, profile)
+        # Rate limits recorded before the window is used
+        fanout.report_throttled(ctx, cluster.id)
+
+        window = fanout.sync_window(ctx, cluster.id)
+        self.assertIs(window, fanout.get_window(cluster.id))
+        self.assertEqual(10, window.limit)
+
+        # Rate limits met by derived actions, possibly on other engines
+        fanout.report_throttled(ctx, cluster.id)
+        fanout.report_throttled(ctx, cluster.id)
+        fanout.sync_window(ctx, cluster.id)
+        self.assertEqual(5, window.limit)
+
+        fanout.sync_window(ctx, cluster.id)
+        self.assertEqual(5, window.limit)
+
+    def test_sync_window_unlimited(self):
+        cfg.CONF.set_override('max_actions_per_batch', 0, enforce_type=True)
+        mock_get = self.patchobject(db_api, 'cluster_throttled_get')
+
+        window = fanout.sync_window(utils.dummy_context(), 'CLUSTER')
+
+        self.assertIsNone(window.available(100))
+        self.assertFalse(mock_get.called)
+
+    def test_drop_window(self):
+        fanout.get_window('CLUSTER')
+
+        fanout.drop_window('CLUSTER')
+        fanout.drop_window('CLUSTER')
+
+        self.assertNotIn('CLUSTER', fanout._windows)
@@ -0,0 +1,246 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from eventlet import event
+import eventlet
+import mock
+
+from senlin.db import api as db_api
+from senlin.engine import event as event_mod
+from senlin.engine import health_manager as hm
+from senlin.engine import node as node_mod
+from senlin.profiles import base as profile_base
+from senlin.tests.unit.common import base
+
+
+class TestHealthManager(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestHealthManager, self).setUp()
+        self.tgm = mock.Mock()
+        engine = mock.Mock(engine_id='ENGINE_ID')
+        self.hm = hm.Health_Manager(engine, 'TOPIC', '1.0', self.tgm)
+        self.now = 1000.0
+        self.patchobject(hm, 'wallclock', side_effect=lambda: self.now)
+
+    def _registry(self, cluster_id, interval=60):
+        return mock.Mock(cluster_id=cluster_id,
+                         check_type='NODE_STATUS_POLLING',
+                         interval=interval, params={})
+
+    @mock.patch.object(hm, 'notify')
+    @mock.patch.object(db_api, 'registry_claim')
+    @mock.patch.object(db_api, 'registry_engines')
+    def test_load_registries(self, mock_engines, mock_claim, mock_notify):
+        mock_engines.return_value = ['ENGINE_ID', 'E2', 'E3']
+        # E2 is alive, E3 is not
+        mock_notify.side_effect = lambda ctx, method, engine_id: (
+            engine_id == 'E2')
+        mock_claim.return_value = [self._registry('C1'),
+                                   self._registry('C2')]
+        ctx = mock.Mock()
+
+        self.hm._load_registries(ctx)
+
+        mock_notify.assert_has_calls([mock.call(ctx, 'listening', 'E2'),
+                                      mock.call(ctx, 'listening', 'E3')],
+                                     any_order=True)
+        mock_claim.assert_called_once_with(ctx, 'ENGINE_ID',
+                                           dead_engines=['E3'],
+                                           num_engines=2)
+        self.assertEqual(['C1', 'C2'], sorted(self.hm.registries))
+        entry = self.hm.registries['C1']
+        self.assertEqual(60, entry['interval'])
+        self.assertFalse(entry['running'])
+        self.assertTrue(1000 <= entry['next'] <= 1060)
+
+        # Clusters no longer registered are dropped, others are kept
+        mock_engines.return_value = []
+        mock_claim.return_value = [self._registry('C1', interval=30)]
+        self.hm._load_registries(ctx)
+
+        self.assertEqual(['C1'], list(self.hm.registries))
+        self.assertIs(entry, self.hm.registries['C1'])
+        self.assertEqual(30, entry['interval'])
+
+    @mock.patch.object(hm, 'notify')
+    @mock.patch.object(db_api, 'registry_claim')
+    @mock.patch.object(db_api, 'registry_engines')
+    def test_load_registries_engines_checked_concurrently(
+            self, mock_engines, mock_claim, mock_notify):
+        mock_engines.return_value = ['E2', 'E3', 'E4']
+        mock_claim.return_value = []
+        checking = []
+        done = event.Event()
+
+        def _notify(ctx, method, engine_id):
+            # Each check times out unless all of them are in progress
+            checking.append(engine_id)
+            if len(checking) == 3:
+                done.send()
+            with eventlet.Timeout(1, False):
+                done.wait()
+                return True
+            return False
+
+        mock_notify.side_effect = _notify
+        ctx = mock.Mock()
+
+        self.hm._load_registries(ctx)
+
+        mock_claim.assert_called_once_with(ctx, 'ENGINE_ID', dead_engines=[],
+                                           num_engines=4)
+
+    def test_check_due(self):
+        self.hm.registries = {
+            'C1': {'cluster_id': 'C1', 'check_type': 'NODE_STATUS_POLLING',
+                   'interval': 60, 'next': 900, 'running': False},
+            'C2': {'cluster_id': 'C2', 'check_type': 'NODE_STATUS_POLLING',
+                   'interval': 60, 'next': 1100, 'running': False},
+            'C3': {'cluster_id': 'C3', 'check_type': 'NODE_STATUS_POLLING',
+                   'interval': 60, 'next': 900, 'running': True},
+            'C4': {'cluster_id': 'C4', 'check_type': 'VM_LIFECYCLE_EVENTS',
+                   'interval': 60, 'next': 900, 'running': False},
+        }
+
+        self.hm._check_due()
+
+        entry = self.hm.registries['C1']
+        self.tgm.start.assert_called_once_with(self.hm._run_check, entry)
+        self.assertTrue(entry['running'])
+        self.assertEqual(1060, entry['next'])
+
+    @mock.patch.object(hm.Health_Manager, 'check_cluster')
+    def test_run_check(self, mock_check):
+        entry = {'cluster_id': 'C1', 'running': True}
+        mock_check.side_effect = Exception('boom')
+
+        self.hm._run_check(entry)
+
+        mock_check.assert_called_once_with(mock.ANY, 'C1')
+        self.assertFalse(entry['running'])
+
+    @mock.patch.object(db_api, 'registry_delete')
+    @mock.patch.object(db_api, 'cluster_get')
+    def test_check_cluster_deleted(self, mock_get, mock_delete):
+        mock_get.return_value = None
+        self.hm.registries = {'C1': {}}
+        ctx = mock.Mock()
+
+        self.hm.check_cluster(ctx, 'C1')
+
+        mock_get.assert_called_once_with(ctx, 'C1', project_safe=False)
+        mock_delete.assert_called_once_with(ctx, 'C1')
+        self.assertEqual({}, self.hm.registries)
+
+    @mock.patch.object(db_api, 'node_health_delete')
+    @mock.patch.object(db_api, 'node_health_update')
+    @mock.patch.object(db_api, 'node_health_get_all')
+    @mock.patch.object(event_mod, 'info')
+    @mock.patch.object(event_mod, 'warning')
+    @mock.patch.object(profile_base.Profile, 'load')
+    @mock.patch.object(node_mod.Node, 'load_all')
+    @mock.patch.object(db_api, 'cluster_get')
+    def test_check_cluster(self, mock_cluster, mock_nodes, mock_profile,
+                           mock_warning, mock_info, mock_health_get,
+                           mock_health_update, mock_health_delete):
+        mock_cluster.return_value = mock.Mock(user='USER', project='PROJ',
+                                              domain=None)
+
+        def _node(node_id, status='ACTIVE'):
+            return mock.Mock(id=node_id, status=status, ACTIVE='ACTIVE',
+                             profile_id='P1')
+
+        # N1 stays healthy, N2 fails, N3 recovers, N4 is new, N5 is being
+        # updated and N6 can't be checked.
+        nodes = [_node('N1'), _node('N2'), _node('N3'), _node('N4'),
+                 _node('N5', 'UPDATING'), _node('N6')]
+        mock_nodes.return_value = nodes
+        profile = mock_profile.return_value
+        profile.do_check_many.return_value = {
+            'N1': True, 'N2': False, 'N3': True, 'N4': True, 'N6': None,
+        }
+        mock_health_get.return_value = {
+            'N1': mock.Mock(status='HEALTHY'),
+            'N2': mock.Mock(status='HEALTHY'),
+            'N3': mock.Mock(status='UNHEALTHY'),
+            'N6': mock.Mock(status='HEALTHY'),
+            'N9': mock.Mock(status='HEALTHY'),
+        }
+
+        self.hm.check_cluster(mock.Mock(), 'C1')
+
+        # The profile is loaded once and checks all active nodes together
+        mock_profile.assert_called_once_with(mock.ANY, 'P1')
+        profile.do_check_many.assert_called_once_with(
+            [nodes[0], nodes[1], nodes[2], nodes[3], nodes[5]])
+        mock_health_update.assert_called_once_with(
+            mock.ANY, 'C1', ['N1'], {
+                'N2': ('UNHEALTHY', 'Node failed health check.'),
+                'N3': ('HEALTHY', 'Node passed health check.'),
+                'N4': ('HEALTHY', 'Node passed health check.'),
+            }, mock.ANY)
+        # Only transitions produce events
+        mock_warning.assert_called_once_with(
+            mock.ANY, nodes[1], 'HEALTH_CHECK', 'UNHEALTHY',
+            'Node failed health check.')
+        mock_info.assert_called_once_with(
+            mock.ANY, nodes[2], 'HEALTH_CHECK', 'HEALTHY',
+            'Node passed health check.')
+        mock_health_delete.assert_called_once_with(mock.ANY, ['N9'])
+
+    @mock.patch.object(db_api, 'node_health_delete')
+    @mock.patch.object(db_api, 'node_health_update')
+    @mock.patch.object(db_api, 'node_health_get_all')
+    @mock.patch.object(event_mod, 'warning')
+    @mock.patch.object(profile_base.Profile, 'load')
+    @mock.patch.object(node_mod.Node, 'load_all')
+    @mock.patch.object(db_api, 'cluster_get')
+    def test_check_cluster_by_profile(self, mock_cluster, mock_nodes,
+                                      mock_profile, mock_warning,
+                                      mock_health_get, mock_health_update,
+                                      mock_health_delete):
+        mock_cluster.return_value = mock.Mock(user='USER', project='PROJ',
+                                              domain=None)
+        nodes = [mock.Mock(id='N1', status='ACTIVE', ACTIVE='ACTIVE',
+                           profile_id='P1'),
+                 mock.Mock(id='N2', status='ACTIVE', ACTIVE='ACTIVE',
+                           profile_id='P2'),
+                 mock.Mock(id='N3', status='ACTIVE', ACTIVE='ACTIVE',
+                           profile_id='P1')]
+        mock_nodes.return_value = nodes
+        p1 = mock.Mock()
+        p1.do_check_many.return_value = {'N1': False, 'N3': True}
+        p2 = mock.Mock()
+        p2.do_check_many.side_effect = Exception('boom')
+        mock_profile.side_effect = lambda ctx, pid: {'P1': p1, 'P2': p2}[pid]
+        mock_health_get.return_value = {}
+
+        self.hm.check_cluster(mock.Mock(), 'C1')
+
+        p1.do_check_many.assert_called_once_with([nodes[0], nodes[2]])
+        p2.do_check_many.assert_called_once_with([nodes[1]])
+        # Nodes of the profile failing the check are left alone
+        mock_health_update.assert_called_once_with(
+            mock.ANY, 'C1', [], {
+                'N1': ('UNHEALTHY', 'Node failed health check.'),
+                'N3': ('HEALTHY', 'Node passed health check.'),
+            }, mock.ANY)
+        mock_warning.assert_called_once_with(
+            mock.ANY, nodes[0], 'HEALTH_CHECK', 'UNHEALTHY',
+            'Node failed health check.')
+
+    @mock.patch.object(db_api, 'registry_release')
+    def test_stop(self, mock_release):
+        self.hm.stop()
+
+        mock_release.assert_called_once_with(mock.ANY, 'ENGINE_ID')
@@ -0,0 +1,169 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import time
+
+import mock
+from oslo_config import cfg
+import oslo_messaging
+
+from senlin.common import messaging
+from senlin.db import api as db_api
+from senlin.engine import event as event_mod
+from senlin.engine import listener
+from senlin.tests.unit.common import base
+
+
+class TestParsers(base.SenlinTestCase):
+
+    def test_server_status(self):
+        def _status(state, task=''):
+            return listener.server_status({'instance_id': 'S1',
+                                           'state': state,
+                                           'state_description': task})
+
+        self.assertEqual(('S1', 'ACTIVE', 'Server is active.'),
+                         _status('active'))
+        self.assertEqual(('S1', 'ERROR', 'Server is in error.'),
+                         _status('error'))
+        self.assertEqual(('S1', 'ERROR', 'Server was deleted.'),
+                         _status('deleted'))
+        self.assertEqual(('S1', 'WARNING', 'Server is stopped.'),
+                         _status('stopped'))
+        self.assertIsNone(_status('building'))
+        self.assertIsNone(_status('active', 'deleting'))
+        self.assertIsNone(listener.server_status({'state': 'active'}))
+
+    def test_stack_status(self):
+        def _status(state, reason=None):
+            return listener.stack_status({
+                'stack_identity': 'arn:openstack:heat::P1:stacks/name/ST1',
+                'state': state,
+                'state_reason': reason})
+
+        self.assertEqual(('ST1', 'ACTIVE', 'Stack is UPDATE_COMPLETE.'),
+                         _status('UPDATE_COMPLETE'))
+        self.assertEqual(('ST1', 'ERROR', 'Stack was deleted.'),
+                         _status('DELETE_COMPLETE'))
+        self.assertEqual(('ST1', 'ERROR', 'Resource failed'),
+                         _status('UPDATE_FAILED', 'Resource failed'))
+        self.assertIsNone(_status('UPDATE_IN_PROGRESS'))
+        self.assertIsNone(listener.stack_status({'state': 'CREATE_COMPLETE'}))
+
+
+class TestNotificationListener(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestNotificationListener, self).setUp()
+        self.listener = listener.NotificationListener()
+
+    def _node(self, node_id, physical_id, status='ACTIVE'):
+        return mock.Mock(id=node_id, physical_id=physical_id, status=status,
+                         user='USER', project='PROJ', domain=None)
+
+    @mock.patch.object(event_mod, 'info')
+    @mock.patch.object(event_mod, 'warning')
+    @mock.patch.object(db_api, 'node_status_update')
+    @mock.patch.object(db_api, 'node_get_all_by_physical_id')
+    def test_process(self, mock_get, mock_update, mock_warning, mock_info):
+        nodes = [self._node('N1', 'S1'),
+                 self._node('N2', 'S2', 'ERROR'),
+                 self._node('N3', 'S3', 'UPDATING'),
+                 self._node('N4', 'S4')]
+        mock_get.return_value = nodes
+        mock_update.return_value = 2
+
+        res = self.listener.process([
+            ('S1', 'WARNING', 'Server is stopped.'),
+            None,
+            # Only the last state of a server counts
+            ('S1', 'ERROR', 'Server was deleted.'),
+            ('S2', 'ACTIVE', 'Server is active.'),
+            ('S3', 'ERROR', 'Server is in error.'),
+            ('S4', 'ACTIVE', 'Server is active.'),
+        ])
+
+        self.assertEqual(2, res)
+        mock_get.assert_called_once_with(mock.ANY, mock.ANY,
+                                         project_safe=False)
+        self.assertEqual(['S1', 'S2', 'S3', 'S4'],
+                         sorted(mock_get.call_args[0][1]))
+        mock_update.assert_called_once_with(
+            mock.ANY, {'N1': ('ERROR', 'Server was deleted.'),
+                       'N2': ('ACTIVE', 'Server is active.')},
+            statuses=listener.MUTABLE_STATUSES)
+        mock_warning.assert_called_once_with(
+            mock.ANY, nodes[0], 'NOTIFICATION', 'ERROR',
+            'Server was deleted.')
+        mock_info.assert_called_once_with(
+            mock.ANY, nodes[1], 'NOTIFICATION', 'ACTIVE',
+            'Server is active.')
+
+    @mock.patch.object(db_api, 'node_status_update')
+    @mock.patch.object(db_api, 'node_get_all_by_physical_id')
+    def test_process_nothing(self, mock_get, mock_update):
+        self.assertEqual(0, self.listener.process([None]))
+        self.assertFalse(mock_get.called)
+
+        mock_get.return_value = [self._node('N1', 'S1')]
+        res = self.listener.process([('S1', 'ACTIVE', 'Server is active.')])
+
+        self.assertEqual(0, res)
+        self.assertFalse(mock_update.called)
+
+    @mock.patch.object(db_api, 'node_get_all_by_physical_id')
+    def test_process_db_error(self, mock_get):
+        mock_get.side_effect = Exception('boom')
+
+        res = self.listener.process([('S1', 'ACTIVE', 'Server is active.')])
+
+        self.assertEqual(0, res)
+
+    @mock.patch.object(listener.NotificationListener, 'process')
+    def test_fake_transport(self, mock_process):
+        # Notifications sent by a notifier on the fake transport are
+        # received in batches and filtered by event type. Real threads are
+        # used as the test process is not monkey patched for eventlet.
+        def _get_listener(targets, endpoints, **kwargs):
+            return oslo_messaging.get_batch_notification_listener(
+                messaging.TRANSPORT, targets, endpoints,
+                executor='threading', **kwargs)
+
+        self.patchobject(messaging, 'get_notification_listener',
+                         side_effect=_get_listener)
+        self.patchobject(listener, 'EXCHANGES', new=('senlin',))
+        cfg.CONF.set_override('notification_batch_size', 2,
+                              enforce_type=True)
+        received = []
+        mock_process.side_effect = lambda updates: received.extend(updates)
+        self.listener.start()
+        self.addCleanup(self.listener.stop)
+
+        notifier = oslo_messaging.Notifier(messaging.TRANSPORT,
+                                           publisher_id='compute.host',
+                                           driver='messaging',
+                                           topic='notifications')
+        notifier.info({}, 'compute.instance.delete.end',
+                      {'instance_id': 'S1', 'state': 'deleted',
+                       'state_description': ''})
+        notifier.info({}, 'compute.metrics.update', {'instance_id': 'S2'})
+        notifier.error({}, 'orchestration.stack.update.error',
+                       {'stack_identity': 'arn:stacks/name/ST1',
+                        'state': 'UPDATE_FAILED', 'state_reason': 'Boom'})
+
+        for i in range(100):
+            if len(received) >= 2:
+                break
+            time.sleep(0.05)
+
+        self.assertEqual([('S1', 'ERROR', 'Server was deleted.'),
+                          ('ST1', 'ERROR', 'Boom')], received)
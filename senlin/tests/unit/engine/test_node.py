@@ -20,6 +20,7 @@ from senlin.common.i18n import _
 from senlin.common import utils as common_utils
 from senlin.db.sqlalchemy import api as db_api
 from senlin.engine import event as eventm
+from senlin.engine import fanout
 from senlin.engine import node as nodem
 from senlin.profiles import base as profiles_base
 from senlin.tests.unit.common import base
@@ -206,6 +207,27 @@ class TestNode(base.SenlinTestCase):
         self.assertEqual(node1.id, nodes[0].id)
         self.assertEqual(node2.id, nodes[1].id)
 
+    def test_node_load_all_shares_profile(self):
+        self._create_node('NODE1')
+        self._create_node('NODE2')
+
+        profile = mock.Mock()
+        mock_load = self.patchobject(profiles_base.Profile, 'load',
+                                     return_value=profile)
+
+        nodes = nodem.Node.load_all(self.context)
+
+        self.assertEqual(2, len(nodes))
+        self.assertIs(profile, nodes[0].rt['profile'])
+        self.assertIs(profile, nodes[1].rt['profile'])
+        mock_load.assert_called_once_with(self.context, 'PROFILE_ID',
+                                          project_safe=False)
+
+    def test_node_no_instance_dict(self):
+        node = nodem.Node('node1', self.profile.id, self.cluster.id)
+        self.assertFalse(hasattr(node, '__dict__'))
+        self.assertRaises(AttributeError, setattr, node, 'foo', 'bar')
+
     def test_node_to_dict(self):
         node = self._create_node('NODE1')
         self.assertIsNotNone(node.id)
@@ -344,6 +366,23 @@ class TestNode(base.SenlinTestCase):
         mock_warning.assert_called_with(self.context, node, 'CREATE',
                                         'STATUS', six.text_type(ex))
 
+    @mock.patch.object(fanout, 'report_throttled')
+    @mock.patch.object(eventm, 'warning')
+    def test_node_handle_exception_rate_limited(self, mock_warning,
+                                                mock_throttled):
+        node = nodem.Node('node1', self.profile.id, self.cluster.id,
+                          self.context)
+        node.store(self.context)
+
+        ex = exception.InternalError(code=429, message='Too many requests')
+        node._handle_exception(self.context, 'CREATE', 'STATUS', ex)
+        mock_throttled.assert_called_once_with(self.context, self.cluster.id)
+
+        mock_throttled.reset_mock()
+        ex = exception.InternalError(code=500, message='Boom')
+        node._handle_exception(self.context, 'CREATE', 'STATUS', ex)
+        self.assertFalse(mock_throttled.called)
+
     @mock.patch.object(eventm, 'info')
     @mock.patch.object(nodem.Node, 'store')
     @mock.patch.object(nodem.Node, 'set_status')
@@ -458,6 +497,27 @@ class TestNode(base.SenlinTestCase):
                                     reason='Deletion failed')
         mock_event.assert_called_once_with(self.context, node, 'delete')
 
+    @mock.patch.object(eventm, 'warning')
+    @mock.patch.object(eventm, 'info')
+    @mock.patch.object(profiles_base.Profile, 'delete_object')
+    def test_node_delete_resource_timeout(self, mock_delete, mock_info,
+                                          mock_warning):
+        mock_delete.side_effect = exception.ResourceTimeout(
+            timeout=60, resource='server fake_id')
+        node = nodem.Node('node1', self.profile.id, self.cluster.id,
+                          self.context)
+        node.physical_id = 'fake_id'
+        node.store(self.context)
+
+        res = node.do_delete(self.context)
+
+        self.assertFalse(res)
+        self.assertEqual('ERROR', node.status)
+        self.assertEqual('Deletion failed', node.status_reason)
+        # the server may still exist
+        self.assertEqual('fake_id', node.physical_id)
+        self.assertIsNotNone(db_api.node_get(self.context, node.id))
+
     @mock.patch.object(nodem.Node, 'set_status')
     @mock.patch.object(profiles_base.Profile, 'update_object')
     def test_node_update(self, mock_update, mock_status):
@@ -501,6 +561,24 @@ class TestNode(base.SenlinTestCase):
                                                       'ERROR', ex)
         self.assertNotEqual('NEW_PROFILE_ID', node.profile_id)
 
+    @mock.patch.object(eventm, 'warning')
+    @mock.patch.object(profiles_base.Profile, 'update_object')
+    def test_node_update_resource_wait_cancelled(self, mock_update,
+                                                 mock_warning):
+        mock_update.side_effect = exception.ResourceWaitCancelled(
+            resource='server fake_id', action='FAKE_ACTION')
+        node = nodem.Node('node1', self.profile.id, self.cluster.id,
+                          self.context)
+        node.physical_id = 'fake_id'
+        node.store(self.context)
+
+        res = node.do_update(self.context, {'name': 'node2'})
+
+        self.assertFalse(res)
+        self.assertEqual('ERROR', node.status)
+        self.assertEqual('node1', node.name)
+        self.assertEqual('fake_id', node.physical_id)
+
     @mock.patch.object(db_api, 'node_migrate')
     def test_node_join_same_cluster(self, mock_migrate):
         node = nodem.Node('node1', self.profile.id, self.cluster.id,
@@ -529,6 +607,25 @@ class TestNode(base.SenlinTestCase):
         self.assertEqual(mock_migrate.return_value.index, node.index)
         self.assertIsNotNone(node.updated_time)
 
+    @mock.patch.object(db_api, 'node_update')
+    @mock.patch.object(profiles_base.Profile, 'join_cluster')
+    @mock.patch.object(db_api, 'node_migrate')
+    def test_node_join_record_placement(self, mock_migrate, mock_join_cluster,
+                                        mock_update):
+        node = nodem.Node('node1', self.profile.id, self.cluster.id,
+                          self.context, id='NODE_ID')
+
+        def join_cluster(ctx, obj, cluster_id):
+            obj.data['placement'] = {'zone': 'AZ1'}
+
+        mock_join_cluster.side_effect = join_cluster
+
+        res = node.do_join(self.context, 'NEW_CLUSTER_ID')
+
+        self.assertTrue(res)
+        mock_update.assert_called_once_with(
+            self.context, 'NODE_ID', {'data': {'placement': {'zone': 'AZ1'}}})
+
     @mock.patch.object(db_api, 'node_migrate')
     def test_node_leave_no_cluster(self, mock_migrate):
         node = nodem.Node('node1', self.profile.id, None, self.context)
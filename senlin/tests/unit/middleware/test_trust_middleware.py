@@ -27,6 +27,7 @@ class TestTrustMiddleware(base.SenlinTestCase):
         super(TestTrustMiddleware, self).setUp()
         self.context = utils.dummy_context()
         self.middleware = trust.TrustMiddleware(None)
+        self.addCleanup(trust._trust_cache.clear)
 
     @mock.patch('senlin.db.api')
     def test_get_trust_already_exists(self, mock_db_api):
@@ -65,3 +66,28 @@ class TestTrustMiddleware(base.SenlinTestCase):
         self.assertTrue(kc.trust_get_by_trustor.called)
         self.assertTrue(kc.trust_create.called)
         self.assertTrue(db_api.cred_create.called)
+
+    @mock.patch.object(trust.TrustMiddleware, '_load_trust')
+    def test_get_trust_cached(self, mock_load):
+        mock_load.return_value = 'FAKE_TRUST_ID'
+
+        self.assertEqual('FAKE_TRUST_ID',
+                         self.middleware._get_trust(self.context))
+        self.assertEqual('FAKE_TRUST_ID',
+                         self.middleware._get_trust(self.context))
+        mock_load.assert_called_once_with(self.context)
+
+        # Trusts are cached per user and project
+        ctx = utils.dummy_context(user_id='OTHER_USER')
+        self.middleware._get_trust(ctx)
+        self.assertEqual(2, mock_load.call_count)
+
+    @mock.patch.object(context, 'get_service_context')
+    def test_get_admin_id_cached(self, mock_get_service_context):
+        mock_get_service_context.return_value = {'k1': 'v1'}
+        kc = mock.Mock()
+        kc.get_user_id.return_value = 'FAKE_ADMIN_ID'
+
+        self.assertEqual('FAKE_ADMIN_ID', self.middleware._get_admin_id(kc))
+        self.assertEqual('FAKE_ADMIN_ID', self.middleware._get_admin_id(kc))
+        kc.get_user_id.assert_called_once_with(k1='v1')
@@ -10,8 +10,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import mock
+import datetime
+import time
 
+import mock
 from oslo_config import cfg
 from oslo_serialization import jsonutils
 from oslo_utils import timeutils
@@ -31,6 +33,7 @@ class TestWebhookMiddleware(base.SenlinTestCase):
         super(TestWebhookMiddleware, self).setUp()
         self.ctx = utils.dummy_context()
         self.middleware = webhook_middleware.WebhookMiddleware(None)
+        self.addCleanup(webhook_middleware._token_cache.clear)
 
         self.url_slices = {
             '00_url_base': 'http://HOST_IP:PORT/v1',
@@ -134,18 +137,18 @@ class TestWebhookMiddleware(base.SenlinTestCase):
                 self.auth_token = auth_token
 
         sd = mock.Mock()
-        sd.identity.get_token.return_value = 'TEST_TOKEN'
+        sd.identity.get_token_info.return_value = ('TEST_TOKEN', None)
         mock_senlindriver.return_value = sd
 
-        token = self.middleware._get_token(**self.credential)
-        self.assertEqual('TEST_TOKEN', token)
+        res = self.middleware._get_token(**self.credential)
+        self.assertEqual(('TEST_TOKEN', None), res)
 
     @mock.patch.object(driver_base, 'SenlinDriver')
     def test_get_token_failed(self, mock_senlindriver):
         self.credential['webhook_id'] = 'WEBHOOK_ID'
 
         sd = mock.Mock()
-        sd.identity.get_token.side_effect = Exception()
+        sd.identity.get_token_info.side_effect = Exception()
         mock_senlindriver.return_value = sd
 
         self.assertRaises(exception.Forbidden, self.middleware._get_token,
@@ -172,7 +175,7 @@ class TestWebhookMiddleware(base.SenlinTestCase):
         mock_cred = self.patchobject(self.middleware, '_get_credential',
                                      return_value={'KEY': 'VAL'})
         mock_token = self.patchobject(self.middleware, '_get_token',
-                                      return_value='FAKE_TOKEN')
+                                      return_value=('FAKE_TOKEN', None))
 
         res = self.middleware.process_request(req)
         self.assertIsNone(res)
@@ -221,3 +224,75 @@ class TestWebhookMiddleware(base.SenlinTestCase):
         mock_extract.assert_called_once_with(req.url)
         mock_cred.assert_called_once_with('WEBHOOK_ID', 'TEST_KEY')
         self.assertNotIn('X-Auth-Token', req.headers)
+
+    def _trigger(self, key='KEY'):
+        req = mock.Mock(method='POST', headers={})
+        req.url = 'http://HOST/v1/webhooks/WEBHOOK_ID/trigger?key=%s' % key
+        self.middleware.process_request(req)
+        return req.headers.get('X-Auth-Token')
+
+    def test_process_request_cached(self):
+        expires_at = timeutils.utcnow() + datetime.timedelta(hours=1)
+        mock_cred = self.patchobject(self.middleware, '_get_credential',
+                                     return_value={'KEY': 'VAL'})
+        mock_token = self.patchobject(self.middleware, '_get_token',
+                                      side_effect=[('T1', expires_at),
+                                                   ('T2', expires_at)])
+
+        self.assertEqual('T1', self._trigger())
+        self.assertEqual('T1', self._trigger())
+        self.assertEqual(1, mock_cred.call_count)
+        self.assertEqual(1, mock_token.call_count)
+
+        # Tokens are cached per key
+        self.assertEqual('T2', self._trigger('OTHER'))
+        self.assertEqual(2, mock_cred.call_count)
+
+    def test_process_request_cache_expired(self):
+        now = [1000.0]
+        self.patchobject(time, 'time', side_effect=lambda: now[0])
+        expires_at = timeutils.utcnow() + datetime.timedelta(hours=1)
+        self.patchobject(self.middleware, '_get_credential',
+                         return_value={'KEY': 'VAL'})
+        self.patchobject(self.middleware, '_get_token',
+                         side_effect=[('T1', expires_at),
+                                      ('T2', expires_at)])
+
+        self.assertEqual('T1', self._trigger())
+        # Not reused once about to expire
+        now[0] += 3600 - webhook_middleware.TOKEN_EXPIRY_MARGIN
+        self.assertEqual('T2', self._trigger())
+
+    def test_process_request_cache_ttl(self):
+        cfg.CONF.set_override('webhook_token_cache_ttl', 0, enforce_type=True)
+        expires_at = timeutils.utcnow() + datetime.timedelta(hours=1)
+        self.patchobject(self.middleware, '_get_credential',
+                         return_value={'KEY': 'VAL'})
+        self.patchobject(self.middleware, '_get_token',
+                         side_effect=[('T1', expires_at),
+                                      ('T2', expires_at)])
+
+        self.assertEqual('T1', self._trigger())
+        self.assertEqual('T2', self._trigger())
+
+    def test_process_request_token_expiring(self):
+        expires_at = timeutils.utcnow() + datetime.timedelta(
+            seconds=webhook_middleware.TOKEN_EXPIRY_MARGIN)
+        self.patchobject(self.middleware, '_get_credential',
+                         return_value={'KEY': 'VAL'})
+        self.patchobject(self.middleware, '_get_token',
+                         side_effect=[('T1', expires_at),
+                                      ('T2', expires_at)])
+
+        # A token about to expire is used once but not cached
+        self.assertEqual('T1', self._trigger())
+        self.assertEqual('T2', self._trigger())
+
+    def test_invalidate(self):
+        cache = webhook_middleware._token_cache
+        for key in [('W1', 'K1'), ('W1', 'K2'), ('W2', 'K1')]:
+            cache.get(key, lambda: ('T', None), 60)
+
+        webhook_middleware.invalidate('W1')
+
+        self.assertEqual([('W2', 'K1')], list(cache._entries))
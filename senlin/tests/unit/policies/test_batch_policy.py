@@ -0,0 +1,88 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from senlin.db import api as db_api
+from senlin.policies import batch_policy as bp
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+
+
+class TestBatchPolicy(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestBatchPolicy, self).setUp()
+        self.context = utils.dummy_context()
+        self.spec = {
+            'type': 'senlin.policy.batching',
+            'version': '1.0',
+            'properties': {
+                'min_in_service': 1,
+                'max_batch_size': 2,
+                'pause_time': 8,
+            }
+        }
+
+    def test_policy_init(self):
+        policy = bp.BatchPolicy('test-batch', self.spec)
+
+        self.assertEqual(1, policy.min_in_service)
+        self.assertEqual(2, policy.max_batch_size)
+        self.assertEqual(8, policy.pause_time)
+
+    def test_get_batch_size(self):
+        policy = bp.BatchPolicy('test-batch', self.spec)
+
+        self.assertEqual(2, policy._get_batch_size(10))
+        self.assertEqual(1, policy._get_batch_size(2))
+        # Not enough nodes to keep in service
+        self.assertEqual(1, policy._get_batch_size(1))
+
+    def test_get_batch_size_unlimited(self):
+        self.spec['properties']['max_batch_size'] = -1
+        self.spec['properties']['min_in_service'] = 3
+        policy = bp.BatchPolicy('test-batch', self.spec)
+
+        self.assertEqual(7, policy._get_batch_size(10))
+        self.assertEqual(1, policy._get_batch_size(3))
+
+    def test_create_plan(self):
+        policy = bp.BatchPolicy('test-batch', self.spec)
+
+        res = policy._create_plan(['N1', 'N2', 'N3', 'N4', 'N5'])
+
+        self.assertEqual([['N1', 'N2'], ['N3', 'N4'], ['N5']], res)
+        self.assertEqual([], policy._create_plan([]))
+
+    @mock.patch.object(db_api, 'node_ids_by_cluster')
+    def test_pre_op(self, mock_ids):
+        mock_ids.return_value = ['N1', 'N2', 'N3']
+        action = mock.Mock(context=self.context, data={})
+        policy = bp.BatchPolicy('test-batch', self.spec)
+
+        res = policy.pre_op('CLUSTER_ID', action)
+
+        self.assertTrue(res)
+        mock_ids.assert_called_once_with(self.context, 'CLUSTER_ID')
+        expected = {
+            'pause_time': 8,
+            'plan': [['N1', 'N2'], ['N3']],
+        }
+        self.assertEqual(expected, action.data['update'])
+        action.store.assert_called_once_with(self.context)
+
+    def test_post_op(self):
+        action = mock.Mock()
+        policy = bp.BatchPolicy('test-batch', self.spec)
+
+        self.assertTrue(policy.post_op('CLUSTER_ID', action))
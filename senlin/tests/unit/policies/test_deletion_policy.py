@@ -189,6 +189,23 @@ class TestDeletionPolicy(base.SenlinTestCase):
         self.assertEqual(self.nodes_p1[0], nodes[1])
         self._delete_nodes(self.nodes_p3[0])
 
+    @mock.patch.object(db_api, 'profile_get')
+    @mock.patch.object(db_api, 'node_get_all_by_cluster')
+    def test_select_candidates_single_query(self, mock_nodes, mock_profile):
+        criteria = dp.DeletionPolicy.OLDEST_PROFILE_FIRST
+        self.spec['properties']['criteria'] = criteria
+        policy = dp.DeletionPolicy('test-policy', self.spec)
+        mock_brief = self.patchobject(db_api, 'node_brief_by_cluster',
+                                      wraps=db_api.node_brief_by_cluster)
+
+        nodes = policy._select_candidates(self.context, self.cluster['id'], 4)
+
+        self.assertEqual(self.nodes_p1 + [self.nodes_p2[0]], nodes)
+        mock_brief.assert_called_once_with(self.context, self.cluster['id'],
+                                           project_safe=True)
+        self.assertEqual(0, mock_nodes.call_count)
+        self.assertEqual(0, mock_profile.call_count)
+
     @mock.patch.object(scaleutils, 'parse_resize_params')
     @mock.patch.object(db_api, 'cluster_get')
     def test_pre_op(self, mock_cluster, mock_parse):
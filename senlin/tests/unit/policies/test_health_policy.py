@@ -0,0 +1,75 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import mock
+
+from senlin.db import api as db_api
+from senlin.policies import health_policy
+from senlin.tests.unit.common import base
+from senlin.tests.unit.common import utils
+
+
+class TestHealthPolicy(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestHealthPolicy, self).setUp()
+        self.context = utils.dummy_context()
+        self.spec = {
+            'type': 'senlin.policy.health',
+            'version': '1.0',
+            'properties': {
+                'detection': {
+                    'type': 'NODE_STATUS_POLLING',
+                    'options': {
+                        'interval': 120,
+                    },
+                },
+                'recovery': {
+                    'actions': ['REBUILD'],
+                },
+            }
+        }
+        self.cluster = mock.Mock(id='CLUSTER_ID')
+
+    def test_policy_init(self):
+        policy = health_policy.HealthPolicy('test-policy', self.spec)
+
+        self.assertEqual('NODE_STATUS_POLLING', policy.check_type)
+        self.assertEqual(120, policy.interval)
+        self.assertEqual(['REBUILD'], policy.recovery_actions)
+
+    @mock.patch.object(db_api, 'registry_create')
+    def test_attach(self, mock_create):
+        policy = health_policy.HealthPolicy('test-policy', self.spec)
+
+        res, data = policy.attach(self.cluster)
+
+        self.assertTrue(res)
+        mock_create.assert_called_once_with(
+            self.context, 'CLUSTER_ID', 'NODE_STATUS_POLLING', 120,
+            {'recovery_actions': ['REBUILD']})
+        expected = {
+            'type': 'NODE_STATUS_POLLING',
+            'interval': 120,
+            'counter': 0,
+        }
+        self.assertEqual(expected, data['HealthPolicy']['data'])
+
+    @mock.patch.object(db_api, 'registry_delete')
+    def test_detach(self, mock_delete):
+        policy = health_policy.HealthPolicy('test-policy', self.spec)
+
+        res, data = policy.detach(self.cluster)
+
+        self.assertTrue(res)
+        self.assertEqual('', data)
+        mock_delete.assert_called_once_with(self.context, 'CLUSTER_ID')
@@ -17,6 +17,7 @@ from senlin.common import consts
 from senlin.db import api as db_api
 from senlin.drivers import base as driver_base
 from senlin.engine import cluster_policy
+from senlin.engine import event as event_mod
 from senlin.engine import node as node_mod
 from senlin.policies import base as policy_base
 from senlin.policies import lb_policy
@@ -126,8 +127,8 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
     def test_attach_succeeded(self, m_conn, m_attach, m_load, m_build):
         cluster = mock.Mock()
         cluster.id = 'CLUSTER_ID'
-        node1 = mock.Mock()
-        node2 = mock.Mock()
+        node1 = mock.Mock(id='NODE1_ID')
+        node2 = mock.Mock(id='NODE2_ID')
         m_attach.return_value = (True, None)
         m_load.return_value = [node1, node2]
         m_build.return_value = 'policy_data'
@@ -139,18 +140,18 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
         policy = lb_policy.LoadBalancingPolicy('test-policy', self.spec)
 
         self.lb_driver.lb_create.return_value = (True, data)
-        self.lb_driver.member_add.side_effect = ['MEMBER1_ID', 'MEMBER2_ID']
+        self.lb_driver.members_add.return_value = {
+            'NODE1_ID': 'MEMBER1_ID',
+            'NODE2_ID': 'MEMBER2_ID',
+        }
         res, data = policy.attach(cluster)
         self.assertTrue(res)
         self.assertEqual('policy_data', data)
         self.lb_driver.lb_create.assert_called_once_with(policy.vip_spec,
                                                          policy.pool_spec)
         m_load.assert_called_once_with(mock.ANY, cluster_id=cluster.id)
-        member_add_calls = [
-            mock.call(node1, 'LB_ID', 'POOL_ID', 80, 'test-subnet'),
-            mock.call(node2, 'LB_ID', 'POOL_ID', 80, 'test-subnet')
-        ]
-        self.lb_driver.member_add.assert_has_calls(member_add_calls)
+        self.lb_driver.members_add.assert_called_once_with(
+            [node1, node2], 'LB_ID', 'POOL_ID', 80, 'test-subnet')
         node1.data.update.assert_called_once_with({'lb_member': 'MEMBER1_ID'})
         node2.data.update.assert_called_once_with({'lb_member': 'MEMBER2_ID'})
         node1.store.assert_called_once_with(mock.ANY)
@@ -171,7 +172,9 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
     @mock.patch.object(lb_policy.LoadBalancingPolicy, '_build_conn_params')
     @mock.patch.object(node_mod.Node, 'load_all')
     @mock.patch.object(policy_base.Policy, 'attach')
-    def test_attach_failed_lb_creation_error(self, m_attach, m_load, m_conn):
+    @mock.patch.object(event_mod, 'warning')
+    def test_attach_failed_lb_creation_error(self, m_event, m_attach, m_load,
+                                             m_conn):
         cluster = mock.Mock()
         m_attach.return_value = (True, None)
 
@@ -181,14 +184,20 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
         self.lb_driver.lb_create.return_value = (False, 'error')
         res = policy.attach(cluster)
         self.assertEqual((False, 'error'), res)
+        m_event.assert_called_once_with(mock.ANY, cluster, 'LB_CREATE',
+                                        'ERROR', 'error')
 
     @mock.patch.object(lb_policy.LoadBalancingPolicy, '_build_conn_params')
     @mock.patch.object(node_mod.Node, 'load_all')
     @mock.patch.object(policy_base.Policy, 'attach')
-    def test_attach_failed_member_add(self, mock_attach, mock_load, m_conn):
+    @mock.patch.object(event_mod, 'warning')
+    def test_attach_failed_member_add(self, m_event, mock_attach, mock_load,
+                                      m_conn):
         cluster = mock.Mock()
         mock_attach.return_value = (True, None)
-        mock_load.return_value = ['node1', 'node2']
+        node1 = mock.Mock(id='NODE1_ID')
+        node2 = mock.Mock(id='NODE2_ID')
+        mock_load.return_value = [node1, node2]
         lb_data = {
             'loadbalancer': 'LB_ID',
             'pool': 'POOL_ID'
@@ -196,12 +205,16 @@ class TestLoadBalancingPolicy(base.SenlinTestCase):
 
         policy = lb_policy.LoadBalancingPolicy('test-policy', self.spec)
 
-        # lb_driver.member_add return None
+        # lb_driver.members_add failed in adding one of the nodes
         self.lb_driver.lb_create.return_value = (True, lb_data)
-        self.lb_driver.member_add.return_value = None
+        self.lb_driver.members_add.return_value = {'NODE1_ID': 'MEMBER1_ID'}
         res = policy.attach(cluster)
         self.assertEqual((False, 'Failed in adding node into lb pool'), res)
         self.lb_driver.lb_delete.assert_called_once_with(**lb_data)
+        self.assertFalse(node1.store.called)
+        m_event.assert_called_once_with(
+            mock.ANY, cluster, 'POOL_MEMBER_CREATE', 'ERROR',
+            'Failed in adding node into lb pool')
 
 
 @mock.patch.object(lb_policy.LoadBalancingPolicy, '_build_conn_params')
@@ -282,7 +295,9 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         m_extract.assert_called_once_with(cp_data)
         self.lb_driver.lb_delete.assert_called_once_with(**policy_data)
 
-    def test_detach_failed_lb_delete(self, m_extract, m_load, m_conn):
+    @mock.patch.object(event_mod, 'warning')
+    def test_detach_failed_lb_delete(self, m_event, m_extract, m_load,
+                                     m_conn):
         cluster = mock.Mock()
         self.lb_driver.lb_delete.return_value = (False, 'lb_delete failed.')
 
@@ -291,6 +306,8 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         res, data = policy.detach(cluster)
         self.assertFalse(res)
         self.assertEqual('lb_delete failed.', data)
+        m_event.assert_called_once_with(mock.ANY, cluster, 'LB_DELETE',
+                                        'ERROR', 'lb_delete failed.')
 
     def test_post_op_no_nodes(self, m_extract, m_load, m_conn):
         action = mock.Mock()
@@ -301,15 +318,15 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         res = policy.post_op('FAKE_ID', action)
         self.assertIsNone(res)
 
-    @mock.patch.object(node_mod.Node, 'load')
+    @mock.patch.object(node_mod.Node, 'load_all')
     @mock.patch.object(db_api, 'cluster_get')
     def test_post_op_add_nodes(self, m_cluster_get, m_node_load, m_extract,
                                m_load, m_conn):
         cid = 'CLUSTER_ID'
         cluster = mock.Mock()
         m_cluster_get.return_value = cluster
-        node1 = mock.Mock()
-        node2 = mock.Mock()
+        node1 = mock.Mock(id='NODE1_ID')
+        node2 = mock.Mock(id='NODE2_ID')
         node1.data = {}
         node2.data = {}
         action = mock.Mock()
@@ -330,8 +347,11 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             }
         }
         cp.data = cp_data
-        self.lb_driver.member_add.side_effect = ['MEMBER1_ID', 'MEMBER2_ID']
-        m_node_load.side_effect = [node1, node2]
+        self.lb_driver.members_add.return_value = {
+            'NODE1_ID': 'MEMBER1_ID',
+            'NODE2_ID': 'MEMBER2_ID',
+        }
+        m_node_load.return_value = [node1, node2]
         m_load.return_value = cp
         m_extract.return_value = policy_data
 
@@ -342,25 +362,24 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         m_conn.assert_called_once_with(cluster)
         m_load.assert_called_once_with('action_context', cid, policy.id)
         m_extract.assert_called_once_with(cp_data)
-        calls_node_load = [mock.call('action_context', node_id=n,
-                                     show_deleted=True
-                                     ) for n in ['NODE1_ID', 'NODE2_ID']]
-        m_node_load.assert_has_calls(calls_node_load)
-        calls_member_add = [mock.call(n, 'LB_ID', 'POOL_ID', 80, 'test-subnet'
-                                      ) for n in [node1, node2]]
-        self.lb_driver.member_add.assert_has_calls(calls_member_add)
+        m_node_load.assert_called_once_with(
+            'action_context', filters={'id': ['NODE1_ID', 'NODE2_ID']},
+            show_deleted=True)
+        self.assertFalse(self.lb_driver.members_remove.called)
+        self.lb_driver.members_add.assert_called_once_with(
+            [node1, node2], 'LB_ID', 'POOL_ID', 80, 'test-subnet')
         node1.store.assert_called_once_with('action_context')
         node2.store.assert_called_once_with('action_context')
         self.assertEqual({'lb_member': 'MEMBER1_ID'}, node1.data)
         self.assertEqual({'lb_member': 'MEMBER2_ID'}, node2.data)
 
-    @mock.patch.object(node_mod.Node, 'load')
+    @mock.patch.object(node_mod.Node, 'load_all')
     @mock.patch.object(db_api, 'cluster_get')
     def test_post_op_add_nodes_in_pool(self, m_cluster_get, m_node_load,
                                        m_extract, m_load, m_conn):
         cluster_id = 'CLUSTER_ID'
-        node1 = mock.Mock()
-        node2 = mock.Mock()
+        node1 = mock.Mock(id='NODE1_ID')
+        node2 = mock.Mock(id='NODE2_ID')
         node1.data = {'lb_member': 'MEMBER1_ID'}
         node2.data = {}
         action = mock.Mock()
@@ -373,30 +392,35 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             'pool': 'POOL_ID',
             'healthmonitor': 'HM_ID'
         }
-        self.lb_driver.member_add.side_effect = ['MEMBER2_ID']
-        m_node_load.side_effect = [node1, node2]
+        self.lb_driver.members_add.return_value = {'NODE2_ID': 'MEMBER2_ID'}
+        m_node_load.return_value = [node1, node2]
         m_extract.return_value = policy_data
 
         policy = lb_policy.LoadBalancingPolicy('test-policy', self.spec)
         res = policy.post_op(cluster_id, action)
         self.assertIsNone(res)
-        self.lb_driver.member_add.assert_called_once_with(
-            node2, 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        self.lb_driver.members_add.assert_called_once_with(
+            [node2], 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        self.assertFalse(node1.store.called)
+        self.assertEqual({'lb_member': 'MEMBER2_ID'}, node2.data)
 
-    @mock.patch.object(node_mod.Node, 'load')
+    @mock.patch.object(node_mod.Node, 'load_all')
     @mock.patch.object(db_api, 'cluster_get')
-    def test_post_op_add_nodes_failed(self, m_cluster_get, m_node_load,
-                                      m_extract, m_load, m_conn):
+    @mock.patch.object(event_mod, 'warning')
+    def test_post_op_add_nodes_failed(self, m_event, m_cluster_get,
+                                      m_node_load, m_extract, m_load, m_conn):
         cluster_id = 'CLUSTER_ID'
-        node1 = mock.Mock()
+        node1 = mock.Mock(id='NODE1_ID')
         node1.data = {}
+        node2 = mock.Mock(id='NODE2_ID')
+        node2.data = {}
         action = mock.Mock()
         action.data = {}
-        action.outputs = {'nodes_added': ['NODE1_ID']}
+        action.outputs = {'nodes_added': ['NODE1_ID', 'NODE2_ID']}
         action.context = 'action_context'
         action.action = consts.CLUSTER_RESIZE
-        self.lb_driver.member_add.return_value = None
-        m_node_load.side_effect = [node1]
+        self.lb_driver.members_add.return_value = {'NODE2_ID': 'MEMBER2_ID'}
+        m_node_load.return_value = [node1, node2]
         m_extract.return_value = {
             'loadbalancer': 'LB_ID',
             'listener': 'LISTENER_ID',
@@ -411,19 +435,27 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         self.assertEqual(policy_base.CHECK_ERROR, action.data['status'])
         self.assertEqual('Failed in adding new node(s) into lb pool.',
                          action.data['reason'])
-        self.lb_driver.member_add.assert_called_once_with(
-            node1, 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        self.lb_driver.members_add.assert_called_once_with(
+            [node1, node2], 'LB_ID', 'POOL_ID', 80, 'test-subnet')
+        # Nodes added successfully are still recorded
+        self.assertFalse(node1.store.called)
+        node2.store.assert_called_once_with('action_context')
+        self.assertEqual({'lb_member': 'MEMBER2_ID'}, node2.data)
+        m_event.assert_called_once_with(
+            'action_context', m_cluster_get.return_value,
+            'POOL_MEMBER_CREATE', 'ERROR',
+            'Failed in adding new node(s) into lb pool.')
 
-    @mock.patch.object(node_mod.Node, 'load')
+    @mock.patch.object(node_mod.Node, 'load_all')
     @mock.patch.object(db_api, 'cluster_get')
     def test_post_op_del_nodes_ok(self, m_cluster_get, m_node_load, m_extract,
                                   m_load, m_conn):
         cluster_id = 'CLUSTER_ID'
         cluster = mock.Mock()
         m_cluster_get.return_value = cluster
-        node1 = mock.Mock()
+        node1 = mock.Mock(id='NODE1_ID')
         node1.data = {'lb_member': 'MEMBER1_ID'}
-        node2 = mock.Mock()
+        node2 = mock.Mock(id='NODE2_ID')
         node2.data = {'lb_member': 'MEMBER2_ID'}
         action = mock.Mock()
         action.data = {}
@@ -444,8 +476,9 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
             }
         }
         cp.data = cp_data
-        self.lb_driver.member_remove.return_value = True
-        m_node_load.side_effect = [node1, node2]
+        self.lb_driver.members_remove.return_value = ['MEMBER1_ID',
+                                                      'MEMBER2_ID']
+        m_node_load.return_value = [node1, node2]
         m_load.return_value = cp
         m_extract.return_value = policy_data
 
@@ -458,32 +491,28 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         m_conn.assert_called_once_with(cluster)
         m_load.assert_called_once_with('action_context', cluster_id, policy.id)
         m_extract.assert_called_once_with(cp_data)
-        calls_node_load = [
-            mock.call(mock.ANY, node_id='NODE1_ID', show_deleted=True),
-            mock.call(mock.ANY, node_id='NODE2_ID', show_deleted=True)
-        ]
-        m_node_load.assert_has_calls(calls_node_load)
-        calls_member_del = [
-            mock.call('LB_ID', 'POOL_ID', 'MEMBER1_ID'),
-            mock.call('LB_ID', 'POOL_ID', 'MEMBER2_ID')
-        ]
-        self.lb_driver.member_remove.assert_has_calls(calls_member_del)
-
-    @mock.patch.object(node_mod.Node, 'load')
+        m_node_load.assert_called_once_with(
+            mock.ANY, filters={'id': ['NODE1_ID', 'NODE2_ID']},
+            show_deleted=True)
+        self.lb_driver.members_remove.assert_called_once_with(
+            'LB_ID', 'POOL_ID', ['MEMBER1_ID', 'MEMBER2_ID'])
+        self.assertFalse(self.lb_driver.members_add.called)
+
+    @mock.patch.object(node_mod.Node, 'load_all')
     @mock.patch.object(db_api, 'cluster_get')
     def test_post_op_del_nodes_not_in_pool(self, m_cluster_get, m_node_load,
                                            m_extract, m_load, m_conn):
         cluster_id = 'CLUSTER_ID'
-        node1 = mock.Mock()
-        node2 = mock.Mock()
+        node1 = mock.Mock(id='NODE1_ID')
+        node2 = mock.Mock(id='NODE2_ID')
         node1.data = {}
         node2.data = {'lb_member': 'MEMBER2_ID'}
         action = mock.Mock()
         action.outputs = {'nodes_removed': ['NODE1_ID', 'NODE2_ID']}
         action.context = 'action_context'
         action.action = consts.CLUSTER_RESIZE
-        self.lb_driver.member_remove.return_value = True
-        m_node_load.side_effect = [node1, node2]
+        self.lb_driver.members_remove.return_value = ['MEMBER2_ID']
+        m_node_load.return_value = [node1, node2]
         m_extract.return_value = {
             'loadbalancer': 'LB_ID',
             'listener': 'LISTENER_ID',
@@ -494,23 +523,24 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         policy = lb_policy.LoadBalancingPolicy('test-policy', self.spec)
         res = policy.post_op(cluster_id, action)
         self.assertIsNone(res)
-        self.lb_driver.member_remove.assert_called_once_with(
-            'LB_ID', 'POOL_ID', 'MEMBER2_ID')
+        self.lb_driver.members_remove.assert_called_once_with(
+            'LB_ID', 'POOL_ID', ['MEMBER2_ID'])
 
-    @mock.patch.object(node_mod.Node, 'load')
+    @mock.patch.object(node_mod.Node, 'load_all')
     @mock.patch.object(db_api, 'cluster_get')
-    def test_post_op_del_nodes_failed(self, m_cluster_get, m_node_load,
-                                      m_extract, m_load, m_conn):
+    @mock.patch.object(event_mod, 'warning')
+    def test_post_op_del_nodes_failed(self, m_event, m_cluster_get,
+                                      m_node_load, m_extract, m_load, m_conn):
         cluster_id = 'CLUSTER_ID'
-        node1 = mock.Mock()
+        node1 = mock.Mock(id='NODE1_ID')
         node1.data = {'lb_member': 'MEMBER1_ID'}
         action = mock.Mock()
         action.data = {}
         action.outputs = {'nodes_removed': ['NODE1_ID']}
         action.context = 'action_context'
         action.action = consts.CLUSTER_RESIZE
-        self.lb_driver.member_remove.return_value = False
-        m_node_load.side_effect = [node1]
+        self.lb_driver.members_remove.return_value = []
+        m_node_load.return_value = [node1]
         m_extract.return_value = {
             'loadbalancer': 'LB_ID',
             'listener': 'LISTENER_ID',
@@ -526,5 +556,10 @@ class TestLoadBalancingPolicyOperations(base.SenlinTestCase):
         self.assertEqual(policy_base.CHECK_ERROR, action.data['status'])
         self.assertEqual('Failed in removing deleted node(s) from lb pool.',
                          action.data['reason'])
-        self.lb_driver.member_remove.assert_called_once_with(
-            'LB_ID', 'POOL_ID', 'MEMBER1_ID')
+        self.lb_driver.members_remove.assert_called_once_with(
+            'LB_ID', 'POOL_ID', ['MEMBER1_ID'])
+        self.assertFalse(self.lb_driver.members_add.called)
+        m_event.assert_called_once_with(
+            'action_context', m_cluster_get.return_value,
+            'POOL_MEMBER_DELETE', 'ERROR',
+            'Failed in removing deleted node(s) from lb pool.')
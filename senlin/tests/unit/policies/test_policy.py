@@ -389,7 +389,7 @@ class TestPolicyBase(base.SenlinTestCase):
         # Profile type of cluster is not in policy's target scope
         profile = mock.Mock()
         profile.type = 'os.nova.server'
-        cluster.rt = {'profile': profile}
+        cluster.profile = profile
         policy.PROFILE_TYPE = ['os.heat.resource']
         msg = 'Policy not applicable on profile type: os.nova.server'
         res = policy.attach(cluster)
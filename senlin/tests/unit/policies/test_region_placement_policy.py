@@ -12,6 +12,7 @@
 
 import mock
 
+from senlin.db import api as db_api
 from senlin.drivers import base as driver_base
 from senlin.engine import cluster as cluster_mod
 from senlin.policies import base as policy_base
@@ -103,27 +104,21 @@ class TestRegionPlacementPolicy(base.SenlinTestCase):
             self.assertIn(r, result)
         self.assertNotIn('R4', result)
 
-    def test__get_current_dist(self):
-        node1 = mock.Mock()
-        node1.data = {
-            'placement': {
-                'region_name': 'R1'
-            }
-        }
-        node2 = mock.Mock()
-        node2.data = {
-            'placement': {
-                'region_name': 'R2',
-            }
-        }
-        node3 = mock.Mock()
-        node3.data = {'key': 'value'}
-
-        nodes = [node1, node2, node3]
+    @mock.patch.object(db_api, 'node_placements_by_cluster')
+    def test__get_current_dist(self, mock_placements):
+        mock_placements.return_value = [
+            ('N1', {'region_name': 'R1'}),
+            ('N2', {'region_name': 'R2'}),
+            ('N3', {}),
+            ('N4', {'region_name': 'R5'}),
+        ]
+        cluster = mock.Mock(id='FAKE_CLUSTER')
 
         policy = rp.RegionPlacementPolicy('p1', self.spec)
         regions = policy.regions
-        result = policy._get_current_dist(regions, nodes)
+        result = policy._get_current_dist(self.context, regions, cluster)
+
+        mock_placements.assert_called_once_with(self.context, 'FAKE_CLUSTER')
 
         self.assertEqual(4, len(result))
         self.assertEqual(1, result['R1'])
@@ -186,8 +181,9 @@ class TestRegionPlacementPolicy(base.SenlinTestCase):
 
         mock_load.assert_called_once_with(action.context, 'FAKE_CLUSTER')
         policy._validate_regions.assert_called_once_with(cluster)
-        policy._get_current_dist.assert_called_once_with(policy.regions,
-                                                         cluster.nodes)
+        policy._get_current_dist.assert_called_once_with(action.context,
+                                                         policy.regions,
+                                                         cluster)
         policy._create_plan.assert_called_once_with(current_dist, regions, 3)
 
     @mock.patch.object(cluster_mod.Cluster, 'load')
@@ -272,6 +268,7 @@ class TestRegionPlacementPolicy(base.SenlinTestCase):
 
         mock_load.assert_called_once_with(action.context, 'FAKE_CLUSTER')
         policy._validate_regions.assert_called_once_with(cluster)
-        policy._get_current_dist.assert_called_once_with(policy.regions,
-                                                         cluster.nodes)
+        policy._get_current_dist.assert_called_once_with(action.context,
+                                                         policy.regions,
+                                                         cluster)
         policy._create_plan.assert_called_once_with(current_dist, regions, 3)
@@ -11,11 +11,13 @@
 # under the License.
 
 import mock
+from oslo_config import cfg
 from oslo_utils import timeutils
 import six
 
 from senlin.db.sqlalchemy import api as db_api
 from senlin.engine import cluster as cluster_base
+from senlin.engine import node as node_mod
 from senlin.policies import zone_placement as zp
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
@@ -43,6 +45,7 @@ class TestZonePlacementPolicy(base.SenlinTestCase):
                                             self.profile1['id'])
         self.nodes_p1 = self._create_nodes(self.cluster['id'],
                                            self.profile1['id'], 10)
+        self.addCleanup(zp._zone_cache.clear)
 
     def _create_profile(self, profile_id):
         values = {
@@ -132,28 +135,74 @@ class TestZonePlacementPolicy(base.SenlinTestCase):
         result = policy._validate_zones(self.cluster)
         self.assertEqual(0, len(result))
 
+    def test__validate_zones_cached(self):
+        nc = mock.Mock()
+        nc.availability_zone_list.return_value = [
+            {'zoneState': {'available': 1}, 'zoneName': 'AZ1'},
+            {'zoneState': {'available': 0}, 'zoneName': 'AZ2'},
+        ]
+        policy = zp.ZonePlacementPolicy('test-policy', self.spec)
+        policy._novaclient = nc
+
+        result = policy._validate_zones(self.cluster)
+        self.assertEqual({'AZ1': 100}, result)
+
+        # another policy instance shares the cached zones
+        policy = zp.ZonePlacementPolicy('test-policy', self.spec)
+        policy._novaclient = nc
+        result = policy._validate_zones(self.cluster)
+        self.assertEqual({'AZ1': 100}, result)
+        self.assertEqual(1, nc.availability_zone_list.call_count)
+
+        cfg.CONF.set_override('placement_cache_ttl', 0, enforce_type=True)
+        policy._validate_zones(self.cluster)
+        self.assertEqual(2, nc.availability_zone_list.call_count)
+
+    def _mock_node_details(self, details):
+        mock_details = mock.Mock(return_value=details)
+
+        def load(ctx, node_id):
+            record = db_api.node_get(ctx, node_id)
+            return mock.Mock(data=record.data, get_details=mock_details)
+
+        self.patchobject(node_mod.Node, 'load', side_effect=load)
+        return mock_details
+
     def test__get_current_dist(self):
-        node1 = mock.Mock()
-        node1.get_details.return_value = {
-            'OS-EXT-AZ:availability_zone': 'AZ1',
-        }
-        node2 = mock.Mock()
-        node2.get_details.return_value = {
-            'foobar': 'irrelevant'
-        }
+        for i, zone in enumerate(['AZ1', 'AZ1', 'AZ2', 'AZ5']):
+            db_api.node_update(self.context, self.nodes_p1[i],
+                               {'data': {'placement': {'zone': zone}}})
 
-        cluster = mock.Mock()
-        cluster.nodes = [node1, node2]
+        mock_details = self._mock_node_details({'foobar': 'irrelevant'})
 
         policy = zp.ZonePlacementPolicy('test-policy', self.spec)
         zones = policy.zones
-        result = policy._get_current_dist(self.context, zones, cluster)
+        result = policy._get_current_dist(self.context, zones, self.cluster)
+
+        self.assertEqual({'AZ1': 2, 'AZ2': 1, 'AZ3': 0, 'AZ4': 0}, result)
+        # zones of the other nodes are not known
+        self.assertEqual(6, mock_details.call_count)
+
+    def test__get_current_dist_record_zone(self):
+        mock_details = self._mock_node_details(
+            {'OS-EXT-AZ:availability_zone': 'AZ3'})
+        policy = zp.ZonePlacementPolicy('test-policy', self.spec)
+
+        result = policy._get_current_dist(self.context, policy.zones,
+                                          self.cluster)
+
+        self.assertEqual(10, result['AZ3'])
+        self.assertEqual(10, mock_details.call_count)
+        node = db_api.node_get(self.context, self.nodes_p1[0])
+        self.assertEqual({'key1': 'value1', 'placement': {'zone': 'AZ3'}},
+                         node.data)
 
-        self.assertEqual(4, len(result))
-        self.assertEqual(1, result['AZ1'])
-        self.assertEqual(0, result['AZ2'])
-        self.assertEqual(0, result['AZ3'])
-        self.assertEqual(0, result['AZ4'])
+        # zones recorded are used afterwards
+        mock_details.reset_mock()
+        result = policy._get_current_dist(self.context, policy.zones,
+                                          self.cluster)
+        self.assertEqual(10, result['AZ3'])
+        self.assertEqual(0, mock_details.call_count)
 
     def test_balance_strategy(self):
         # each az's ratio is same (default), test the placement
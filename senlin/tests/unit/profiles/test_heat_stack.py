@@ -12,7 +12,11 @@
 
 import mock
 
+from senlin.common import exception
+from senlin.common import poller
 from senlin.drivers import base as driver_base
+from senlin.drivers.openstack import heat_v1
+from senlin.drivers.openstack import sdk
 from senlin.profiles.os.heat import stack
 from senlin.tests.unit.common import base
 from senlin.tests.unit.common import utils
@@ -106,6 +110,27 @@ class TestHeatStackProfile(base.SenlinTestCase):
                                                        fake_action))
         self.assertEqual(2, profile.hc.stack_get.call_count)
 
+    def test_check_stack_status_not_found(self):
+        profile = stack.StackProfile('t', self.spec)
+
+        self.assertTrue(profile._check_stack_status(None, 'DELETE'))
+        self.assertFalse(profile._check_stack_status(None, 'CREATE'))
+        self.assertFalse(profile._check_stack_status(None, 'UPDATE'))
+
+    def test_wait_for_action_delete_not_found(self):
+        profile = stack.StackProfile('t', self.spec)
+        profile.stack_id = 'FAKE_ID'
+        self.patchobject(sdk, 'get_connection')
+        self.patchobject(poller, 'get_poller', return_value=None)
+        hc = heat_v1.HeatClient({})
+        hc.conn.orchestration.find_stack.return_value = None
+        profile.hc = hc
+
+        # Finishes at once rather than waiting for the stack to show up
+        profile._wait_for_action(mock.Mock(), 'DELETE')
+
+        hc.conn.orchestration.find_stack.assert_called_once_with('FAKE_ID')
+
     def test_do_create(self):
         profile = stack.StackProfile('t', self.spec)
 
@@ -114,11 +139,10 @@ class TestHeatStackProfile(base.SenlinTestCase):
         fake_stack = mock.Mock()
         profile.hc = mock.MagicMock()
         fake_stack.id = 'ce8ae86c-9810-4cb1-8888-7fb53bc523bf'
-        profile._check_action_complete = mock.MagicMock(return_value=True)
         profile.hc.stack_create = mock.MagicMock(return_value=fake_stack)
         self.assertEqual(fake_stack.id, profile.do_create(test_stack))
         self.assertTrue(profile.hc.stack_create.called)
-        self.assertTrue(profile._check_action_complete.called)
+        self.assertTrue(profile.hc.wait_for_stack.called)
 
     def test_do_delete(self):
         profile = stack.StackProfile('t', self.spec)
@@ -126,11 +150,10 @@ class TestHeatStackProfile(base.SenlinTestCase):
         test_stack = mock.Mock()
         test_stack.physical_id = 'ce8ae86c-9810-4cb1-8888-7fb53bc523bf'
         profile.hc = mock.MagicMock()
-        profile._check_action_complete = mock.MagicMock(return_value=True)
         profile.hc.stack_delete = mock.MagicMock()
         self.assertTrue(profile.do_delete(test_stack))
         self.assertTrue(profile.hc.stack_delete.called)
-        self.assertTrue(profile._check_action_complete.called)
+        self.assertTrue(profile.hc.wait_for_stack.called)
 
     def test_do_update(self):
         profile = stack.StackProfile('t', self.spec)
@@ -160,11 +183,10 @@ class TestHeatStackProfile(base.SenlinTestCase):
         # Check Update Stack Path
         test_stack.physical_id = 'ce8ae86c-9810-4cb1-8888-7fb53bc523bf'
         profile.hc = mock.MagicMock()
-        profile._check_action_complete = mock.MagicMock(return_value=True)
         profile.hc.stack_update = mock.MagicMock()
         self.assertTrue(profile.do_update(test_stack, new_profile))
         self.assertTrue(profile.hc.stack_update.called)
-        self.assertTrue(profile._check_action_complete.called)
+        self.assertTrue(profile.hc.wait_for_stack.called)
 
     def test_do_check(self):
         profile = stack.StackProfile('t', self.spec)
@@ -173,17 +195,11 @@ class TestHeatStackProfile(base.SenlinTestCase):
         test_stack = mock.Mock()
         test_stack.physical_id = 'ce8ae86c-9810-4cb1-8888-7fb53bc523bf'
         fake_stack = mock.Mock()
-        fake_stack_complete = mock.Mock()
-        fake_stack_complete.status = 'CHECK_COMPLETE'
-
-        # Setup side effect of mock call to handle checking status
-        # within while loop. 3rd call in while loop results in
-        # fake_stack_complete mock object with a "complete" status.
-        side_effect = [fake_stack, fake_stack, fake_stack_complete]
 
         # Check path where stack status can't be checked
         fake_stack.check = mock.MagicMock(side_effect=Exception())
-        heat_client.stack_get = mock.MagicMock(side_effect=side_effect)
+        heat_client.stack_get = mock.MagicMock(return_value=fake_stack)
+        heat_client.wait_for_stack.return_value = 'CHECK_COMPLETE'
         profile.heat = mock.MagicMock(return_value=heat_client)
         self.assertFalse(profile.do_check(test_stack))
         self.assertTrue(profile.heat.called)
@@ -195,8 +211,93 @@ class TestHeatStackProfile(base.SenlinTestCase):
         fake_stack.status = 'CHECK_IN_PROGRESS'
         self.assertTrue(profile.do_check(test_stack))
         self.assertEqual(2, profile.heat.call_count)
-        self.assertEqual(3, heat_client.stack_get.call_count)
+        self.assertEqual(2, heat_client.stack_get.call_count)
         self.assertTrue(fake_stack.check.called)
+        heat_client.wait_for_stack.assert_called_once_with(
+            test_stack.physical_id, mock.ANY)
+
+    def test_wait_for_action(self):
+        profile = stack.StackProfile('t', self.spec)
+        profile.stack_id = 'FAKE_ID'
+        profile.hc = mock.Mock()
+
+        profile._wait_for_action(mock.Mock(), 'CREATE')
+
+        # The stack timeout is given in minutes
+        profile.hc.wait_for_stack.assert_called_once_with(
+            'FAKE_ID', mock.ANY, timeout=3600)
+        check = profile.hc.wait_for_stack.call_args[0][1]
+        self.assertFalse(check(None))
+        self.assertFalse(check(mock.Mock(status='CREATE_IN_PROGRESS')))
+        self.assertTrue(check(mock.Mock(status='CREATE_COMPLETE')))
+        self.assertRaises(exception.ResourceStatusError, check,
+                          mock.Mock(status='CREATE_FAILED'))
+
+    def test_wait_for_action_no_timeout(self):
+        del self.spec['properties']['timeout']
+        profile = stack.StackProfile('t', self.spec)
+        profile.stack_id = 'FAKE_ID'
+        profile.hc = mock.Mock()
+
+        profile._wait_for_action(mock.Mock(), 'DELETE')
+
+        profile.hc.wait_for_stack.assert_called_once_with(
+            'FAKE_ID', mock.ANY, timeout=None)
+
+    def test_do_check_waits(self):
+        profile = stack.StackProfile('t', self.spec)
+
+        heat_client = mock.Mock()
+        test_stack = mock.Mock()
+        test_stack.physical_id = 'FAKE_ID'
+        heat_client.stack_get.return_value = mock.Mock(
+            status='CHECK_IN_PROGRESS')
+        heat_client.wait_for_stack.return_value = 'CHECK_FAILED'
+        profile.heat = mock.Mock(return_value=heat_client)
+
+        self.assertFalse(profile.do_check(test_stack))
+        heat_client.wait_for_stack.assert_called_once_with('FAKE_ID',
+                                                           mock.ANY)
+        check = heat_client.wait_for_stack.call_args[0][1]
+        self.assertIsNone(check(None))
+        self.assertIsNone(check(mock.Mock(status='CHECK_IN_PROGRESS')))
+        self.assertEqual('CHECK_COMPLETE',
+                         check(mock.Mock(status='CHECK_COMPLETE')))
+
+    def test_do_check_many(self):
+        profile = stack.StackProfile('t', self.spec)
+        profile.hc = mock.Mock()
+        objs = [mock.Mock(id='N1', physical_id='S1'),
+                mock.Mock(id='N2', physical_id='S2'),
+                mock.Mock(id='N3', physical_id='S3'),
+                mock.Mock(id='N4', physical_id='S4'),
+                mock.Mock(id='N5', physical_id=None)]
+        profile.hc.stack_list.return_value = [
+            mock.Mock(id='S1', status='UPDATE_COMPLETE'),
+            mock.Mock(id='S2', status='UPDATE_FAILED'),
+            mock.Mock(id='S3', status='DELETE_IN_PROGRESS'),
+        ]
+
+        res = profile.do_check_many(objs)
+
+        self.assertEqual({'N1': True, 'N2': False, 'N3': False, 'N4': False,
+                          'N5': False}, res)
+        profile.hc.stack_list.assert_called_once_with(
+            id=['S1', 'S2', 'S3', 'S4'])
+        self.assertFalse(profile.hc.stack_get.called)
+
+    def test_do_check_many_batched(self):
+        self.patchobject(stack, 'STACK_LIST_BATCH', new=2)
+        profile = stack.StackProfile('t', self.spec)
+        profile.hc = mock.Mock()
+        profile.hc.stack_list.return_value = []
+        objs = [mock.Mock(id='N%s' % i, physical_id='S%s' % i)
+                for i in range(3)]
+
+        profile.do_check_many(objs)
+
+        profile.hc.stack_list.assert_has_calls([
+            mock.call(id=['S0', 'S1']), mock.call(id=['S2'])])
 
     def test_do_get_details(self):
         profile = stack.StackProfile('t', self.spec)
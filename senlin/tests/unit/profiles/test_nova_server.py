@@ -14,6 +14,7 @@ import base64
 import copy
 
 import mock
+from oslo_config import cfg
 from oslo_utils import encodeutils
 import six
 
@@ -30,6 +31,7 @@ class TestNovaServerProfile(base.SenlinTestCase):
 
     def setUp(self):
         super(TestNovaServerProfile, self).setUp()
+        self.addCleanup(server._reference_cache.clear)
 
         self.context = utils.dummy_context()
         self.spec = {
@@ -134,7 +136,7 @@ class TestNovaServerProfile(base.SenlinTestCase):
         mock_random_name.return_value = '12345678'
         novaclient = mock.Mock()
         neutronclient = mock.Mock()
-        test_server = mock.Mock()
+        test_server = mock.Mock(physical_id=None)
         test_server.name = 'TEST_SERVER'
         test_server.cluster_id = 'FAKE_CLUSTER_ID'
         test_server.data = {
@@ -163,8 +165,8 @@ class TestNovaServerProfile(base.SenlinTestCase):
         server_id = profile.do_create(test_server)
 
         mock_random_name.assert_called_once_with(8)
-        novaclient.image_find.assert_called_once_with('FAKE_IMAGE')
-        novaclient.flavor_find.assert_called_once_with('FLAV', False)
+        novaclient.image_find.assert_called_once_with('FAKE_IMAGE', True)
+        novaclient.flavor_find.assert_called_once_with('FLAV', True)
         neutronclient.network_get.assert_called_once_with('FAKE_NET')
 
         attrs = dict(
@@ -207,12 +209,35 @@ class TestNovaServerProfile(base.SenlinTestCase):
         novaclient.server_create.assert_called_once_with(**attrs)
         self.assertEqual(nova_server.id, server_id)
 
+    def test_do_create_record_zone(self):
+        novaclient = mock.Mock()
+        created = mock.Mock()
+        created.to_dict.return_value = {'OS-EXT-AZ:availability_zone': 'AZ2'}
+        novaclient.wait_for_server.return_value = created
+        node = mock.Mock(physical_id=None)
+        node.name = 'node1'
+        node.data = {'foo': 'bar'}
+        spec = {
+            'type': 'os.nova.server',
+            'version': '1.0',
+            'properties': {'flavor': 'FLAV', 'name': 'FAKE_SERVER_NAME'},
+        }
+        profile = server.ServerProfile('t', spec)
+        profile._novaclient = novaclient
+
+        profile.do_create(node)
+
+        novaclient.wait_for_server.assert_called_once_with(
+            novaclient.server_create.return_value)
+        self.assertEqual({'foo': 'bar', 'placement': {'zone': 'AZ2'}},
+                         node.data)
+
     @mock.patch.object(common_utils, 'random_name')
     def test_do_create_port_and_fixedip_not_defined(self, mock_random_name):
         mock_random_name.return_value = '12345678'
         novaclient = mock.Mock()
         neutronclient = mock.Mock()
-        test_server = mock.Mock()
+        test_server = mock.Mock(physical_id=None)
         test_server.name = 'TEST_SERVER'
         test_server.cluster_id = 'FAKE_CLUSTER_ID'
         test_server.data = {}
@@ -266,7 +291,7 @@ class TestNovaServerProfile(base.SenlinTestCase):
         mock_random_name.return_value = '12345678'
         novaclient = mock.Mock()
         neutronclient = mock.Mock()
-        test_server = mock.Mock()
+        test_server = mock.Mock(physical_id=None)
         test_server.name = 'TEST_SERVER'
         test_server.cluster_id = 'FAKE_CLUSTER_ID'
         test_server.data = {}
@@ -312,7 +337,7 @@ class TestNovaServerProfile(base.SenlinTestCase):
     def test_do_create_obj_name_cluster_id_is_none(self):
         novaclient = mock.Mock()
         neutronclient = mock.Mock()
-        test_server = mock.Mock()
+        test_server = mock.Mock(physical_id=None)
         test_server.name = None
         test_server.cluster_id = None
         test_server.data = {}
@@ -354,7 +379,7 @@ class TestNovaServerProfile(base.SenlinTestCase):
     def test_do_create_bdm_v2(self):
         novaclient = mock.Mock()
         neutronclient = mock.Mock()
-        test_server = mock.Mock()
+        test_server = mock.Mock(physical_id=None)
         test_server.name = None
         test_server.cluster_id = None
         test_server.data = {}
@@ -429,7 +454,7 @@ class TestNovaServerProfile(base.SenlinTestCase):
         nc = mock.Mock()
         profile = server.ServerProfile('t', self.spec)
         profile._novaclient = nc
-        test_server = mock.Mock()
+        test_server = mock.Mock(physical_id=None)
         test_server.physical_id = None
 
         self.assertTrue(profile.do_delete(test_server))
@@ -441,7 +466,7 @@ class TestNovaServerProfile(base.SenlinTestCase):
         nc.server_delete.return_value = None
         profile._novaclient = nc
 
-        test_server = mock.Mock()
+        test_server = mock.Mock(physical_id=None)
         test_server.physical_id = 'FAKE_ID'
 
         res = profile.do_delete(test_server)
@@ -589,8 +614,8 @@ class TestNovaServerProfile(base.SenlinTestCase):
         ]
         novaclient.server_get.return_value = server_obj
         novaclient.server_interface_list.return_value = existing_ports
-        neutronclient.network_get.side_effect = [net1, net1,
-                                                 net1, net2]
+        nets = {'net1': net1, 'net2': net2}
+        neutronclient.network_get.side_effect = lambda n: nets[n]
 
         profile = server.ServerProfile('t', self.spec)
         profile._novaclient = novaclient
@@ -607,6 +632,8 @@ class TestNovaServerProfile(base.SenlinTestCase):
             mock.call(server_obj, port_id='port4'),
         ]
         novaclient.server_interface_create.assert_has_calls(calls)
+        # Each network is looked up once
+        self.assertEqual(2, neutronclient.network_get.call_count)
 
     @mock.patch.object(server.ServerProfile, '_update_image')
     def test_do_update_image_succeeded(self, mock_update_image):
@@ -712,7 +739,7 @@ class TestNovaServerProfile(base.SenlinTestCase):
         profile = server.ServerProfile('t', self.spec)
         profile._novaclient = novaclient
         profile._update_image(obj, None, 'new_image', 'adminpass')
-        novaclient.image_find.assert_called_once_with('new_image')
+        novaclient.image_find.assert_called_once_with('new_image', True)
         novaclient.server_get.assert_called_once_with('FAKE_ID')
         novaclient.server_rebuild.assert_called_once_with('FAKE_ID',
                                                           '456',
@@ -735,13 +762,13 @@ class TestNovaServerProfile(base.SenlinTestCase):
                                'adminpass')
         msg = _("Failed in updating FAKE_ID.")
         self.assertEqual(msg, six.text_type(ex))
-        novaclient.image_find.assert_called_once_with('old_image')
+        novaclient.image_find.assert_called_once_with('old_image', True)
 
     def test_do_update_no_physical_id(self):
         profile = server.ServerProfile('t', self.spec)
         profile._novaclient = mock.Mock()
 
-        test_server = mock.Mock()
+        test_server = mock.Mock(physical_id=None)
         test_server.physical_id = None
 
         new_profile = mock.Mock()
@@ -750,11 +777,201 @@ class TestNovaServerProfile(base.SenlinTestCase):
         res = profile.do_update(test_server, new_profile)
         self.assertTrue(res)
 
+    @mock.patch.object(common_utils, 'random_name')
+    def test_do_create_started(self, mock_random):
+        mock_random.return_value = 'abcdefgh'
+        nc = mock.Mock()
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        obj = mock.Mock(physical_id='SERVER_ID', data={})
+        obj.name = 'node-2'
+        created = mock.Mock()
+        nc.wait_for_server.return_value = created
+        self.patchobject(profile, '_record_zone')
+
+        res = profile.do_create(obj)
+
+        self.assertEqual('SERVER_ID', res)
+        nc.wait_for_server.assert_called_once_with('SERVER_ID')
+        # The server created in bulk is named after its node
+        nc.server_update.assert_called_once_with('SERVER_ID',
+                                                 name='node-2-abcdefgh')
+        profile._record_zone.assert_called_once_with(obj, created)
+        self.assertFalse(nc.server_create.called)
+
+    def test_do_create_started_rename_failed(self):
+        nc = mock.Mock()
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        obj = mock.Mock(physical_id='SERVER_ID', data={})
+        obj.name = 'node-2'
+        self.patchobject(profile, '_record_zone')
+        nc.server_update.side_effect = exception.InternalError(
+            code=500, message='Boom')
+
+        self.assertEqual('SERVER_ID', profile.do_create(obj))
+        self.assertFalse(nc.server_delete.called)
+
+    def test_do_create_started_failed(self):
+        nc = mock.Mock()
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        obj = mock.Mock(physical_id='SERVER_ID', data={})
+        obj.name = 'NODE'
+        self.patchobject(profile, '_create_params',
+                         return_value={'name': 'NODE-X'})
+        self.patchobject(profile, '_record_zone')
+        nc.wait_for_server.side_effect = [
+            exception.ResourceStatusError(resource_id='SERVER_ID',
+                                          status='ERROR', reason='Boom'),
+            mock.Mock()]
+        nc.server_create.return_value = mock.Mock(id='NEW_ID')
+
+        res = profile.do_create(obj)
+
+        # The failed server is replaced by one created separately
+        self.assertEqual('NEW_ID', res)
+        nc.server_delete.assert_called_once_with('SERVER_ID')
+        nc.server_create.assert_called_once_with(name='NODE-X')
+
+    def test_do_create_many(self):
+        nc = mock.Mock()
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        objs = [mock.Mock(id='N%s' % i) for i in range(3)]
+        objs[0].name = 'node-1'
+        self.patchobject(profile, '_create_params',
+                         return_value={'name': 'node-1-xyz', 'flavorRef': 'F'})
+        nc.server_create_many.return_value = [mock.Mock(id='S1'),
+                                              mock.Mock(id='S2')]
+
+        res = profile.do_create_many(objs)
+
+        self.assertEqual({'N0': 'S1', 'N1': 'S2'}, res)
+        profile._create_params.assert_called_once_with(objs[0])
+        nc.server_create_many.assert_called_once_with(
+            3, name='node-1-xyz', flavorRef='F')
+
+    def test_do_create_many_single(self):
+        nc = mock.Mock()
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+
+        self.assertEqual({}, profile.do_create_many([mock.Mock()]))
+        self.assertFalse(nc.server_create_many.called)
+
+    def test_resolve_cached(self):
+        nc = mock.Mock()
+        nc.image_find.return_value = mock.Mock(id='IMAGE_ID')
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        obj = mock.Mock(user='U1', project='P1')
+
+        self.assertEqual('IMAGE_ID', profile._image_id(obj, 'IMAGE'))
+        self.assertEqual('IMAGE_ID', profile._image_id(obj, 'IMAGE'))
+        nc.image_find.assert_called_once_with('IMAGE', True)
+
+        # Other credentials look the image up again
+        obj2 = mock.Mock(user='U1', project='P2')
+        self.assertEqual('IMAGE_ID', profile._image_id(obj2, 'IMAGE'))
+        self.assertEqual(2, nc.image_find.call_count)
+
+    def test_resolve_not_found(self):
+        nc = mock.Mock()
+        nc.flavor_find.return_value = None
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        obj = mock.Mock(user='U1', project='P1')
+
+        ex = self.assertRaises(exception.ResourceNotFound,
+                               profile._flavor_id, obj, 'FLAV')
+        self.assertEqual('The resource (FLAV) could not be found.',
+                         six.text_type(ex))
+        # Missing references are cached too
+        self.assertRaises(exception.ResourceNotFound,
+                          profile._flavor_id, obj, 'FLAV')
+        nc.flavor_find.assert_called_once_with('FLAV', True)
+
+    def test_resolve_no_cache(self):
+        cfg.CONF.set_override('reference_cache_ttl', 0, enforce_type=True)
+        nc = mock.Mock()
+        nc.flavor_find.return_value = mock.Mock(id='FLAVOR_ID')
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        obj = mock.Mock(user='U1', project='P1')
+
+        profile._flavor_id(obj, 'FLAV')
+        profile._flavor_id(obj, 'FLAV')
+
+        self.assertEqual(2, nc.flavor_find.call_count)
+
     def test_do_check(self):
-        # Not implemented in server profile yet.
+        nc = mock.Mock()
         profile = server.ServerProfile('t', self.spec)
-        res = profile.do_check(mock.Mock())
-        self.assertTrue(res)
+        profile._novaclient = nc
+        obj = mock.Mock(physical_id='FAKE_ID')
+
+        nc.server_get.return_value = mock.Mock(status='ACTIVE')
+        self.assertTrue(profile.do_check(obj))
+        nc.server_get.assert_called_once_with('FAKE_ID')
+
+        nc.server_get.return_value = mock.Mock(status='SHUTOFF')
+        self.assertFalse(profile.do_check(obj))
+
+        nc.server_get.return_value = None
+        self.assertFalse(profile.do_check(obj))
+
+    def test_do_check_not_found(self):
+        nc = mock.Mock()
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        obj = mock.Mock(physical_id='FAKE_ID')
+
+        nc.server_get.side_effect = exception.InternalError(
+            code=404, message='Not found')
+        self.assertFalse(profile.do_check(obj))
+
+        nc.server_get.side_effect = exception.InternalError(
+            code=500, message='Boom')
+        self.assertRaises(exception.InternalError, profile.do_check, obj)
+
+        obj.physical_id = None
+        self.assertFalse(profile.do_check(obj))
+
+    def test_do_check_many(self):
+        nc = mock.Mock()
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        objs = [mock.Mock(id='N1', physical_id='S1'),
+                mock.Mock(id='N2', physical_id='S2'),
+                mock.Mock(id='N3', physical_id=None),
+                mock.Mock(id='N4', physical_id='S4'),
+                mock.Mock(id='N5', physical_id='S5')]
+        nc.server_list.return_value = [mock.Mock(id='S1', status='ACTIVE'),
+                                       mock.Mock(id='S2', status='ERROR'),
+                                       mock.Mock(id='S9', status='ACTIVE')]
+        # Servers missing from the list are checked one by one
+        nc.server_get.side_effect = [
+            exception.InternalError(code=404, message='Not found'),
+            exception.InternalError(code=500, message='Boom'),
+        ]
+
+        res = profile.do_check_many(objs)
+
+        self.assertEqual({'N1': True, 'N2': False, 'N3': False,
+                          'N4': False, 'N5': None}, res)
+        nc.server_list.assert_called_once_with()
+        nc.server_get.assert_has_calls([mock.call('S4'), mock.call('S5')])
+
+    def test_do_check_many_no_physical_id(self):
+        nc = mock.Mock()
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+
+        res = profile.do_check_many([mock.Mock(id='N1', physical_id=None)])
+
+        self.assertEqual({'N1': False}, res)
+        self.assertFalse(nc.server_list.called)
 
     def test_do_get_details(self):
         nc = mock.Mock()
@@ -969,9 +1186,12 @@ class TestNovaServerProfile(base.SenlinTestCase):
         profile._novaclient = nc
         nc.server_metadata_get.return_value = {'FOO': 'BAR'}
         nc.server_metadata_update.return_value = 'Boom'
+        nc.server_get.return_value.to_dict.return_value = {
+            'OS-EXT-AZ:availability_zone': 'AZ2'}
 
         obj = mock.Mock()
         obj.physical_id = 'FAKE_ID'
+        obj.data = {}
         cluster_id = "FAKE_CLUSTER_ID"
 
         res = profile.do_join(obj, cluster_id)
@@ -979,6 +1199,23 @@ class TestNovaServerProfile(base.SenlinTestCase):
         nc.server_metadata_get.assert_called_once_with(server_id='FAKE_ID')
         nc.server_metadata_update.assert_called_once_with(
             FOO='BAR', cluster='FAKE_CLUSTER_ID')
+        nc.server_get.assert_called_once_with('FAKE_ID')
+        self.assertEqual({'placement': {'zone': 'AZ2'}}, obj.data)
+
+    def test_do_join_zone_recorded(self):
+        nc = mock.Mock()
+        profile = server.ServerProfile('t', self.spec)
+        profile._novaclient = nc
+        nc.server_metadata_get.return_value = {}
+
+        obj = mock.Mock()
+        obj.physical_id = 'FAKE_ID'
+        obj.data = {'placement': {'zone': 'AZ1'}}
+
+        profile.do_join(obj, 'FAKE_CLUSTER_ID')
+
+        self.assertEqual(0, nc.server_get.call_count)
+        self.assertEqual({'placement': {'zone': 'AZ1'}}, obj.data)
 
     def test_do_join_server_not_created(self):
         # Test path where server not specified
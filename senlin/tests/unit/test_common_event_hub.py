@@ -0,0 +1,151 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import threading
+
+import mock
+
+from senlin.common import consts
+from senlin.common import event_hub
+from senlin.common import messaging
+from senlin.tests.unit.common import base
+
+
+def _match_all(event):
+    return True
+
+
+class TestEventHub(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestEventHub, self).setUp()
+        self.hub = event_hub.EventHub(3)
+
+    def _events(self, *ids):
+        return [{'id': i, 'obj_id': 'OBJ_%s' % i} for i in ids]
+
+    def test_watch_after_cursor(self):
+        self.hub.publish(self._events('E1', 'E2', 'E3'))
+
+        events, cursor = self.hub.watch('E1', _match_all, 0)
+
+        self.assertEqual(['E2', 'E3'], [e['id'] for e in events])
+        self.assertEqual('E3', cursor)
+
+    def test_watch_filtered(self):
+        self.hub.publish(self._events('E1', 'E2', 'E3'))
+
+        events, cursor = self.hub.watch(
+            'E1', lambda e: e['obj_id'] == 'OBJ_E2', 0)
+
+        self.assertEqual(['E2'], [e['id'] for e in events])
+        self.assertEqual('E3', cursor)
+
+    def test_watch_timeout(self):
+        self.hub.publish(self._events('E1'))
+
+        events, cursor = self.hub.watch(None, _match_all, 0)
+
+        self.assertEqual([], events)
+        self.assertIsNone(cursor)
+
+        events, cursor = self.hub.watch('E1', _match_all, 0)
+
+        self.assertEqual([], events)
+        self.assertEqual('E1', cursor)
+
+    def test_watch_unknown_cursor(self):
+        self.hub.publish(self._events('E1', 'E2', 'E3', 'E4'))
+
+        # E1 has been evicted from the hub
+        events, cursor = self.hub.watch('E1', _match_all, 0)
+
+        self.assertIsNone(events)
+        self.assertEqual('E1', cursor)
+
+        events, cursor = self.hub.watch('E2', _match_all, 0)
+        self.assertEqual(['E3', 'E4'], [e['id'] for e in events])
+
+    def test_watch_since(self):
+        self.hub.publish(self._events('E1'))
+        since = self.hub.position()
+        self.hub.publish(self._events('E2'))
+
+        events, cursor = self.hub.watch(None, _match_all, 0, since=since)
+
+        self.assertEqual(['E2'], [e['id'] for e in events])
+        self.assertEqual('E2', cursor)
+
+    def test_watch_wakeup(self):
+        self.hub.publish(self._events('E1'))
+        timer = threading.Timer(0.1, self.hub.publish, [self._events('E2')])
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        events, cursor = self.hub.watch('E1', _match_all, 10)
+
+        self.assertEqual(['E2'], [e['id'] for e in events])
+        self.assertEqual('E2', cursor)
+
+    @mock.patch.object(messaging, 'get_rpc_server')
+    def test_start(self, mock_server):
+        self.hub.start()
+
+        target = mock_server.call_args[0][0]
+        self.assertEqual(consts.EVENT_TOPIC, target.topic)
+        self.assertIsNotNone(target.server)
+        mock_server.assert_called_once_with(target, self.hub)
+        mock_server.return_value.start.assert_called_once_with()
+
+        # Events broadcast by engines are fed to the hub
+        self.hub.publish_events(mock.Mock(), self._events('E1', 'E2'))
+        events, cursor = self.hub.watch('E1', _match_all, 0)
+        self.assertEqual(['E2'], [e['id'] for e in events])
+
+    @mock.patch.object(event_hub.EventHub, 'start')
+    def test_global_hub(self, mock_start):
+        self.patchobject(event_hub, '_hub', new=None)
+
+        hub = event_hub.global_hub()
+
+        self.assertIsInstance(hub, event_hub.EventHub)
+        self.assertIs(hub, event_hub.global_hub())
+        mock_start.assert_called_once_with()
+
+    @mock.patch.object(messaging, 'get_rpc_client')
+    def test_publish_events(self, mock_rpc):
+        ctx = mock.Mock()
+
+        event_hub.publish_events(ctx, [{'id': 'E1'}])
+
+        mock_rpc.assert_called_once_with(version=consts.RPC_API_VERSION)
+        mock_client = mock_rpc.return_value
+        mock_client.prepare.assert_called_once_with(
+            version=consts.RPC_API_VERSION,
+            topic=consts.EVENT_TOPIC,
+            fanout=True)
+
+        # Cast to the endpoint of the hubs rather than to engines
+        mock_context = mock_client.prepare.return_value
+        mock_context.cast.assert_called_once_with(
+            ctx, 'publish_events', events=[{'id': 'E1'}])
+
+    def test_match_filters(self):
+        event = {'action': 'CREATE', 'level': 20}
+
+        self.assertTrue(event_hub.match_filters(event, {}))
+        self.assertTrue(event_hub.match_filters(event, {'level': 20}))
+        self.assertTrue(event_hub.match_filters(
+            event, {'action': ['CREATE', 'DELETE']}))
+        self.assertFalse(event_hub.match_filters(event, {'level': 30}))
+        self.assertFalse(event_hub.match_filters(
+            event, {'action': ['DELETE'], 'level': 20}))
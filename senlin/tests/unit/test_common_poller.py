@@ -0,0 +1,173 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+import mock
+from oslo_config import cfg
+
+from senlin.common import exception
+from senlin.common import poller
+from senlin.tests.unit.common import base
+
+
+class FakeResource(object):
+
+    def __init__(self, id, status):
+        self.id = id
+        self.status = status
+
+
+def _check_active(resource):
+    if resource is None:
+        return None
+    if resource.status == 'ERROR':
+        raise exception.ResourceStatusError(resource_id=resource.id,
+                                            status=resource.status,
+                                            reason='failed')
+    return resource.status == 'ACTIVE' and resource
+
+
+class TestStatusPoller(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestStatusPoller, self).setUp()
+        self.statuses = {}
+        self.lister = mock.Mock(side_effect=self._list)
+        self.getter = mock.Mock(side_effect=self._get)
+        self.poller = poller.StatusPoller('KEY', self.lister, self.getter,
+                                          0.01)
+
+    def _list(self, ids, since):
+        return [FakeResource(i, s) for i, s in self.statuses.items()]
+
+    def _get(self, resource_id):
+        return FakeResource(resource_id, self.statuses[resource_id])
+
+    def _become(self, resource_id, status, delay):
+        eventlet.sleep(delay)
+        self.statuses[resource_id] = status
+
+    def test_wait_many(self):
+        ids = ['R%s' % i for i in range(20)]
+        for resource_id in ids:
+            self.statuses[resource_id] = 'BUILD'
+
+        def _list(ids, since):
+            # All resources become active by the third round
+            if self.lister.call_count == 3:
+                for resource_id in ids:
+                    self.statuses[resource_id] = 'ACTIVE'
+            return self._list(ids, since)
+
+        self.lister.side_effect = _list
+        threads = [eventlet.spawn(self.poller.wait, i, _check_active,
+                                  'resource %s' % i, timeout=5)
+                   for i in ids]
+        results = [th.wait() for th in threads]
+
+        self.assertEqual(ids, [r.id for r in results])
+        # All resources are queried together in each round
+        self.assertEqual(3, self.lister.call_count)
+        for args in self.lister.call_args_list:
+            self.assertEqual(set(ids), set(args[0][0]))
+        self.assertFalse(self.getter.called)
+        self.assertEqual({}, self.poller.waiters)
+
+    def test_wait_failed(self):
+        self.statuses['R1'] = 'BUILD'
+        eventlet.spawn(self._become, 'R1', 'ERROR', 0.02)
+
+        self.assertRaises(exception.ResourceStatusError,
+                          self.poller.wait, 'R1', _check_active,
+                          'resource R1', timeout=5)
+        self.assertEqual({}, self.poller.waiters)
+
+    def test_wait_timeout(self):
+        self.statuses['R1'] = 'BUILD'
+
+        self.assertRaises(exception.ResourceTimeout,
+                          self.poller.wait, 'R1', _check_active,
+                          'resource R1', timeout=0.05)
+        self.assertEqual({}, self.poller.waiters)
+
+    def test_wait_missing_from_list(self):
+        self.lister.side_effect = None
+        self.lister.return_value = []
+        self.statuses['R1'] = 'ACTIVE'
+
+        res = self.poller.wait('R1', _check_active, 'resource R1',
+                               timeout=5)
+
+        self.assertEqual('R1', res.id)
+        self.getter.assert_called_once_with('R1')
+        self.assertEqual(poller.FALLBACK_ROUNDS, self.lister.call_count)
+
+    def test_wait_missing_get_failed(self):
+        self.lister.side_effect = None
+        self.lister.return_value = []
+        self.getter.side_effect = exception.ResourceNotFound(resource='R1')
+
+        self.assertRaises(exception.ResourceNotFound,
+                          self.poller.wait, 'R1', _check_active,
+                          'resource R1', timeout=5)
+
+    def test_wait_list_failed(self):
+        self.statuses['R1'] = 'ACTIVE'
+        self.lister.side_effect = [Exception('boom'), self._list([], None)]
+
+        res = self.poller.wait('R1', _check_active, 'resource R1',
+                               timeout=5)
+
+        self.assertEqual('R1', res.id)
+        self.assertEqual(2, self.lister.call_count)
+
+
+class TestGetPoller(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestGetPoller, self).setUp()
+        self.addCleanup(poller._pollers.clear)
+
+    def test_get_poller(self):
+        lister = mock.Mock()
+        getter = mock.Mock()
+
+        res = poller.get_poller(('server', 'SCOPE'), lister, getter)
+
+        self.assertIsInstance(res, poller.StatusPoller)
+        self.assertEqual(lister, res.lister)
+        self.assertEqual(getter, res.getter)
+        self.assertEqual(5, res.interval)
+
+        # Pollers are shared in the same scope
+        self.assertIs(res, poller.get_poller(('server', 'SCOPE'),
+                                             mock.Mock(), mock.Mock()))
+        self.assertIsNot(res, poller.get_poller(('server', 'OTHER'),
+                                                lister, getter))
+
+    def test_get_poller_disabled(self):
+        cfg.CONF.set_override('status_poll_interval', 0, enforce_type=True)
+
+        self.assertIsNone(poller.get_poller(('server', 'SCOPE'), mock.Mock(),
+                                            mock.Mock()))
+
+    def test_poller_removed_when_idle(self):
+        cfg.CONF.set_override('status_poll_interval', 1, enforce_type=True)
+        lister = mock.Mock(return_value=[FakeResource('R1', 'ACTIVE')])
+
+        res = poller.get_poller(('server', 'SCOPE'), lister, mock.Mock())
+        res.interval = 0.01
+        res.wait('R1', _check_active, 'resource R1', timeout=5)
+        res.thread.wait()
+
+        self.assertIsNone(res.thread)
+        self.assertNotIn(('server', 'SCOPE'), poller._pollers)
@@ -0,0 +1,104 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from senlin.common import exception
+from senlin.common import schema
+from senlin.tests.unit.common import base
+
+
+class TestSpec(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestSpec, self).setUp()
+        self.schema = {
+            'key1': schema.String('first key', default='value1'),
+            'key2': schema.Integer('second key', required=True),
+            'key3': schema.List(
+                'third key',
+                schema=schema.Integer('list item'),
+            ),
+            'key4': schema.Map(
+                'fourth key',
+                schema={
+                    'sub1': schema.Integer('sub key', default=1),
+                },
+            ),
+        }
+
+    def test_resolve_value(self):
+        spec = schema.Spec(self.schema, {'key2': '2', 'key3': ['1', 2],
+                                         'key4': {}})
+
+        self.assertEqual('value1', spec['key1'])
+        self.assertEqual(2, spec['key2'])
+        self.assertEqual([1, 2], spec['key3'])
+        self.assertEqual({'sub1': 1}, spec['key4'])
+
+    def test_resolve_value_not_assigned(self):
+        spec = schema.Spec(self.schema, {'key1': 'v'})
+
+        self.assertIsNone(spec['key3'])
+        ex = self.assertRaises(ValueError, spec.resolve_value, 'key2')
+        self.assertEqual('Required spec item "key2" not assigned',
+                         str(ex))
+        ex = self.assertRaises(KeyError, spec.resolve_value, 'key5')
+        self.assertIn('Invalid spec item: "key5"', str(ex))
+
+    def test_resolve_value_cached(self):
+        spec = schema.Spec(self.schema, {'key2': 2})
+        mock_resolve = self.patchobject(self.schema['key2'], 'resolve',
+                                        return_value=2)
+
+        self.assertEqual(2, spec['key2'])
+        self.assertEqual(2, spec['key2'])
+        mock_resolve.assert_called_once_with(2)
+
+    def test_default_resolved_once(self):
+        item = self.schema['key1']
+        mock_resolve = self.patchobject(item, 'resolve',
+                                        return_value='value1')
+
+        self.assertEqual('value1', item.get_default())
+        self.assertEqual('value1', item.get_default())
+        mock_resolve.assert_called_once_with('value1')
+
+        item.default = 'value2'
+        item.get_default()
+        mock_resolve.assert_called_with('value2')
+
+    def test_validate(self):
+        spec = schema.Spec(self.schema, {'key2': 2, 'key3': [1]})
+        mock_resolve = self.patchobject(spec, 'resolve_value',
+                                        wraps=spec.resolve_value)
+
+        spec.validate()
+        self.assertEqual(4, mock_resolve.call_count)
+
+        # validated spec is not validated again
+        spec.validate()
+        self.assertEqual(4, mock_resolve.call_count)
+
+    def test_validate_unrecognizable_key(self):
+        spec = schema.Spec(self.schema, {'key2': 2, 'foo': 'bar'})
+
+        ex = self.assertRaises(exception.SpecValidationFailed,
+                               spec.validate)
+        self.assertEqual('Unrecognizable spec item "foo"',
+                         str(ex))
+
+    def test_validate_bad_list_item(self):
+        spec = schema.Spec(self.schema, {'key2': 2, 'key3': [1, 'x']})
+
+        ex = self.assertRaises(exception.SpecValidationFailed,
+                               spec.validate)
+        self.assertEqual('The value "x" cannot be converted into an '
+                         'integer.', str(ex))
@@ -10,7 +10,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import threading
+
 from cryptography import fernet
+import mock
 import requests
 from requests import exceptions
 import six
@@ -209,3 +212,144 @@ class TestRandomName(base.SenlinTestCase):
 
         result = utils.random_name(-9)
         self.assertEqual('', result)
+
+
+class TestHashable(base.SenlinTestCase):
+
+    def test_hashable(self):
+        self.assertEqual('T1', utils.hashable('T1'))
+        self.assertEqual(('T1',), utils.hashable(['T1']))
+        self.assertEqual((('a', (1, 2)), ('b', (('c', 'd'),))),
+                         utils.hashable({'b': {'c': 'd'}, 'a': [1, 2]}))
+
+
+class TestExpiringCache(base.SenlinTestCase):
+
+    @mock.patch('time.time')
+    def test_get(self, mock_time):
+        cache = utils.ExpiringCache()
+        loader = mock.Mock(side_effect=['V1', 'V2', 'V3'])
+        mock_time.return_value = 100
+
+        self.assertEqual('V1', cache.get('K', loader, 10))
+        mock_time.return_value = 109
+        self.assertEqual('V1', cache.get('K', loader, 10))
+        self.assertEqual(1, loader.call_count)
+
+        # expired
+        mock_time.return_value = 110
+        self.assertEqual('V2', cache.get('K', loader, 10))
+
+        cache.clear()
+        self.assertEqual('V3', cache.get('K', loader, 10))
+
+    def test_get_not_cached(self):
+        cache = utils.ExpiringCache()
+        loader = mock.Mock(side_effect=['V1', 'V2'])
+
+        self.assertEqual('V1', cache.get('K', loader, 0))
+        self.assertEqual('V2', cache.get('K', loader, 0))
+
+    @mock.patch('time.time')
+    def test_get_negative_ttl(self, mock_time):
+        cache = utils.ExpiringCache()
+        loader = mock.Mock(side_effect=[None, None, 'V1', []])
+        mock_time.return_value = 100
+
+        self.assertIsNone(cache.get('K', loader, 10, 2))
+        mock_time.return_value = 101
+        self.assertIsNone(cache.get('K', loader, 10, 2))
+        self.assertEqual(1, loader.call_count)
+
+        mock_time.return_value = 102
+        self.assertIsNone(cache.get('K', loader, 10, 2))
+        self.assertEqual(2, loader.call_count)
+
+        # empty values are not cached when negative ttl is zero
+        mock_time.return_value = 110
+        self.assertEqual('V1', cache.get('K2', loader, 10, 0))
+        self.assertEqual([], cache.get('K3', loader, 10, 0))
+        self.assertEqual('V1', cache.get('K2', loader, 10, 0))
+        self.assertEqual(4, loader.call_count)
+
+    @mock.patch('time.time')
+    def test_get_ttl_of_value(self, mock_time):
+        cache = utils.ExpiringCache()
+        loader = mock.Mock(side_effect=[5, 0, 8])
+        mock_time.return_value = 100
+
+        # Each value is cached for the number of seconds it holds
+        self.assertEqual(5, cache.get('K', loader, lambda v: v))
+        mock_time.return_value = 104
+        self.assertEqual(5, cache.get('K', loader, lambda v: v))
+        self.assertEqual(1, loader.call_count)
+
+        mock_time.return_value = 105
+        self.assertEqual(0, cache.get('K', loader, lambda v: v))
+        self.assertEqual(8, cache.get('K', loader, lambda v: v))
+        self.assertEqual(3, loader.call_count)
+
+    def test_invalidate(self):
+        cache = utils.ExpiringCache()
+        loader = mock.Mock(return_value='V')
+        for key in [('A', 1), ('A', 2), ('B', 1)]:
+            cache.get(key, loader, 10)
+
+        cache.invalidate(lambda key: key[0] == 'A')
+        for key in [('A', 1), ('A', 2), ('B', 1)]:
+            cache.get(key, loader, 10)
+        self.assertEqual(5, loader.call_count)
+
+        cache.invalidate()
+        cache.get(('B', 1), loader, 10)
+        self.assertEqual(6, loader.call_count)
+
+    def test_get_load_failed(self):
+        cache = utils.ExpiringCache()
+        loader = mock.Mock(side_effect=[Exception('boom'), 'V1'])
+
+        self.assertRaises(Exception, cache.get, 'K', loader, 10)
+        self.assertEqual('V1', cache.get('K', loader, 10))
+        self.assertEqual({}, cache._loading)
+
+    def test_get_max_size(self):
+        cache = utils.ExpiringCache(max_size=2)
+        loader = mock.Mock(side_effect=lambda: 'V')
+
+        cache.get('K1', loader, 10)
+        cache.get('K2', loader, 10)
+        # K1 becomes the most recently used value
+        cache.get('K1', loader, 10)
+        cache.get('K3', loader, 10)
+        self.assertEqual(3, loader.call_count)
+
+        cache.get('K1', loader, 10)
+        self.assertEqual(3, loader.call_count)
+        cache.get('K2', loader, 10)
+        self.assertEqual(4, loader.call_count)
+
+    def test_get_concurrent(self):
+        cache = utils.ExpiringCache()
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def load():
+            started.set()
+            release.wait()
+            return 'V'
+
+        loader = mock.Mock(side_effect=load)
+        threads = [threading.Thread(
+            target=lambda: results.append(cache.get('K', loader, 10)))
+            for i in range(3)]
+        threads[0].start()
+        started.wait()
+        for t in threads[1:]:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(['V', 'V', 'V'], results)
+        self.assertEqual(1, loader.call_count)
@@ -0,0 +1,125 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import eventlet
+import mock
+import six
+
+from senlin.common import exception
+from senlin.common import waiter
+from senlin.tests.unit.common import base
+
+
+class TestWaiter(base.SenlinTestCase):
+
+    def setUp(self):
+        super(TestWaiter, self).setUp()
+        self.now = 1000.0
+        self.sleeps = []
+        self.patchobject(waiter, 'wallclock', side_effect=lambda: self.now)
+        self.patchobject(eventlet, 'sleep', side_effect=self._sleep)
+        self.addCleanup(waiter.bind_action, None)
+
+    def _sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def test_wait_for_immediate(self):
+        check = mock.Mock(return_value='RESULT')
+
+        res = waiter.wait_for(check, 'thing', timeout=10)
+
+        self.assertEqual('RESULT', res)
+        check.assert_called_once_with()
+        self.assertEqual([], self.sleeps)
+
+    def test_wait_for_backoff(self):
+        check = mock.Mock(side_effect=[False, None, False, False, 'DONE'])
+
+        res = waiter.wait_for(check, 'thing', timeout=100, interval=1,
+                              max_interval=3, backoff=2, jitter=0)
+
+        self.assertEqual('DONE', res)
+        self.assertEqual(5, check.call_count)
+        self.assertEqual([1, 2, 3, 3], self.sleeps)
+
+    def test_wait_for_jitter(self):
+        check = mock.Mock(side_effect=[False, True])
+
+        with mock.patch('random.uniform', return_value=1.1) as mock_random:
+            waiter.wait_for(check, 'thing', timeout=100, interval=2,
+                            jitter=0.1)
+
+        mock_random.assert_called_once_with(0.9, 1.1)
+        self.assertEqual([2.2], self.sleeps)
+
+    def test_wait_for_timeout(self):
+        check = mock.Mock(return_value=False)
+
+        ex = self.assertRaises(exception.ResourceTimeout,
+                               waiter.wait_for, check, 'thing', timeout=5,
+                               interval=2, backoff=1, jitter=0)
+
+        self.assertEqual('Timed out after 5 seconds waiting for thing.',
+                         six.text_type(ex))
+        # The last sleep is cut short to end at the deadline
+        self.assertEqual([2, 2, 1], self.sleeps)
+        self.assertEqual(4, check.call_count)
+
+    def test_wait_for_check_raises(self):
+        check = mock.Mock(side_effect=[False, exception.ResourceStatusError(
+            resource_id='R', status='ERROR', reason='boom')])
+
+        self.assertRaises(exception.ResourceStatusError,
+                          waiter.wait_for, check, 'thing', timeout=10,
+                          jitter=0)
+        self.assertEqual([1], self.sleeps)
+
+    def test_wait_for_action_cancelled(self):
+        action = mock.Mock(id='ACTION_ID', start_time=None)
+        action.is_cancelled.side_effect = [False, True]
+        check = mock.Mock(return_value=False)
+        waiter.bind_action(action)
+
+        ex = self.assertRaises(exception.ResourceWaitCancelled,
+                               waiter.wait_for, check, 'thing', jitter=0)
+
+        self.assertEqual('Waiting for thing was cancelled by action '
+                         'ACTION_ID.', six.text_type(ex))
+        self.assertEqual(2, check.call_count)
+        self.assertEqual([1], self.sleeps)
+
+    def test_wait_for_action_deadline(self):
+        # The action has 3 seconds left to run
+        action = mock.Mock(id='ACTION_ID', start_time=self.now - 7,
+                           timeout=10)
+        action.is_cancelled.return_value = False
+        check = mock.Mock(return_value=False)
+
+        self.assertRaises(exception.ResourceTimeout,
+                          waiter.wait_for, check, 'thing', timeout=60,
+                          interval=2, backoff=1, jitter=0, action=action)
+        self.assertEqual([2, 1], self.sleeps)
+
+    def test_bind_action(self):
+        self.assertIsNone(waiter.current_action())
+
+        action = mock.Mock()
+        waiter.bind_action(action)
+        self.assertEqual(action, waiter.current_action())
+
+        # Other green threads don't see the binding
+        th = eventlet.spawn(waiter.current_action)
+        self.assertIsNone(th.wait())
+
+        waiter.bind_action(None)
+        self.assertIsNone(waiter.current_action())
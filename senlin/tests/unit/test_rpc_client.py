@@ -481,8 +481,21 @@ class EngineRpcAPITestCase(base.SenlinTestCase):
             'sort_dir': mock.ANY,
             'project_safe': mock.ANY,
             'show_deleted': mock.ANY,
+            'start_time': mock.ANY,
+            'end_time': mock.ANY,
         }
         self._test_engine_api('event_list', 'call', **default_args)
 
+    def test_event_aggregate(self):
+        default_args = {
+            'group_by': mock.ANY,
+            'bucket': mock.ANY,
+            'filters': mock.ANY,
+            'start_time': mock.ANY,
+            'end_time': mock.ANY,
+            'project_safe': mock.ANY,
+        }
+        self._test_engine_api('event_aggregate', 'call', **default_args)
+
     def test_get_revision(self):
         self._test_engine_api('get_revision', 'call')